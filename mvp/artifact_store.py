@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import Dict, Optional
+
+import aiofiles
+
+logger = logging.getLogger(__name__)
+
+'''
+요청 처리 중 만들어지는 파일(기능 정의서 PDF 추출 텍스트 등)을 저장하는 artifact store
+- backend는 환경 변수 ARTIFACT_STORE_BACKEND로 선택한다.
+    - "local": ARTIFACT_DIR에 파일로 저장한다. 전체 크기는 ARTIFACT_MAX_BYTES, 마지막 사용 후 보관 기간은 ARTIFACT_MAX_AGE초로
+      제한하고, 쓸 때마다 기간이 지난 파일과 크기를 넘는 가장 오래 사용하지 않은(mtime 기준) 파일을 삭제한다.
+    - "none": 아무것도 저장하지 않는다. (디스크를 쓰지 않는 환경)
+- 쓰기는 ArtifactWriter의 대기열에 넣고 바로 반환하며, background worker가 thread에서 파일을 쓴다. 요청은 디스크를 기다리지 않는다.
+  대기열에 남아 있는 artifact도 읽을 수 있고, 대기열(ARTIFACT_WRITE_QUEUE_SIZE)이 가득 차면 저장하지 않고 버린다.
+- 서버 lifespan에서 worker를 시작하고(start_artifact_writer) 종료 시 남은 쓰기를 마친 뒤 멈춘다(close_artifact_writer).
+  lifespan 밖(스크립트, 테스트)에서는 처음 사용할 때 현재 event loop에 worker를 시작한다.
+'''
+
+ARTIFACT_STORE_BACKEND = os.getenv("ARTIFACT_STORE_BACKEND") or "local"
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR") or os.path.join(os.path.dirname(__file__), "asset", "artifacts")
+ARTIFACT_MAX_BYTES = int(os.getenv("ARTIFACT_MAX_BYTES") or 200 * 1024 * 1024)
+ARTIFACT_MAX_AGE = int(os.getenv("ARTIFACT_MAX_AGE") or 60 * 60 * 24 * 30)     # 기본 30일
+ARTIFACT_WRITE_QUEUE_SIZE = int(os.getenv("ARTIFACT_WRITE_QUEUE_SIZE") or 100)
+
+# artifact 이름은 디렉터리를 벗어나지 않도록 파일 이름 문자만 허용
+NAME_PATTERN = re.compile(r"[\w.-]+")
+TEMP_SUFFIX = ".tmp"
+
+
+def _check_name(name: str) -> str:
+    if not NAME_PATTERN.fullmatch(name) or name.startswith(".") or name.endswith(TEMP_SUFFIX):
+        raise ValueError(f"artifact 이름이 올바르지 않습니다: {name!r}")
+    return name
+
+
+class LocalDiskArtifactStore:
+    """디렉터리에 artifact를 파일로 저장하고 크기/기간 한도를 넘는 파일을 삭제하는 store"""
+
+    def __init__(self, directory: str = ARTIFACT_DIR, max_bytes: int = ARTIFACT_MAX_BYTES, max_age: int = ARTIFACT_MAX_AGE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, _check_name(name))
+
+    async def get(self, name: str) -> Optional[str]:
+        """
+        저장된 artifact를 반환합니다. 읽은 파일은 mtime을 갱신하여 삭제 순서에서 뒤로 보냅니다.
+
+        Returns:
+            Optional[str]: artifact 내용 (없거나 읽지 못하면 None)
+        """
+        path = self._path(name)
+        try:
+            async with aiofiles.open(path, "r", encoding="utf-8") as f:
+                text = await f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"⚠️ artifact를 읽지 못했습니다 (없는 것으로 진행): {name} ({str(e)})")
+            return None
+        return text
+
+    def write(self, name: str, text: str) -> None:
+        """
+        artifact를 저장하고 한도를 넘는 파일을 삭제합니다. (background worker의 thread에서 실행)
+        임시 파일에 쓴 뒤 이름을 바꾸므로, 다른 요청이 쓰다 만 파일을 읽지 않습니다. 실패하면 임시 파일을 삭제합니다.
+
+        Raises:
+            OSError: 파일 저장에 실패한 경우
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(name)
+        temp_path = f"{path}.{os.getpid()}{TEMP_SUFFIX}"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        self.evict()
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """
+        마지막 사용 후 max_age가 지난 파일을 삭제하고, 전체 크기가 max_bytes 이하가 될 때까지 가장 오래 사용하지 않은 파일부터 삭제합니다.
+        다른 thread/process가 쓰고 있는 임시 파일은 삭제하지 않습니다.
+
+        Returns:
+            int: 삭제한 파일 수
+        """
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.is_file() and not entry.name.endswith(TEMP_SUFFIX)]
+        except FileNotFoundError:
+            return 0
+        now = time.time() if now is None else now
+        files = sorted((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries)
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for mtime, size, path in files:
+            if total <= self.max_bytes and now - mtime <= self.max_age:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        if removed:
+            logger.info(f"🧹 artifact {removed}개 삭제 (남은 크기: {total} bytes)")
+        return removed
+
+
+class NullArtifactStore:
+    """아무것도 저장하지 않는 store"""
+
+    async def get(self, name: str) -> Optional[str]:
+        return None
+
+    def write(self, name: str, text: str) -> None:
+        pass
+
+    def evict(self, now: Optional[float] = None) -> int:
+        return 0
+
+
+class ArtifactWriter:
+    """artifact 쓰기를 대기열에 넣고 background worker에서 store에 저장합니다."""
+
+    def __init__(self, store, queue_size: int = ARTIFACT_WRITE_QUEUE_SIZE):
+        self.store = store
+        self.queue_size = queue_size
+        self._pending: Dict[str, str] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        """현재 event loop에 worker를 시작합니다. (이미 실행 중이면 그대로 사용)"""
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._pending.clear()
+        self._loop = loop
+        self._worker = asyncio.create_task(self._run())
+
+    async def get(self, name: str) -> Optional[str]:
+        """대기열에 있는 artifact를 먼저 확인한 뒤 store에서 읽습니다."""
+        if name in self._pending:
+            return self._pending[name]
+        return await self.store.get(name)
+
+    def put(self, name: str, text: str) -> bool:
+        """
+        artifact 쓰기를 대기열에 넣고 바로 반환합니다.
+
+        Returns:
+            bool: 대기열에 넣었으면 True, 대기열이 가득 차서 버렸으면 False
+
+        Raises:
+            ValueError: artifact 이름이 올바르지 않은 경우
+        """
+        _check_name(name)
+        self.start()
+        try:
+            self._queue.put_nowait((name, text))
+        except asyncio.QueueFull:
+            logger.warning(f"⚠️ artifact 쓰기 대기열이 가득 차서 저장하지 않습니다: {name}")
+            return False
+        self._pending[name] = text
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            name, text = await self._queue.get()
+            try:
+                await asyncio.to_thread(self.store.write, name, text)
+                logger.info(f"✅ artifact 저장: {name}")
+            except Exception as e:
+                logger.error(f"🚨 artifact 저장 중 오류 발생: {name} ({str(e)})", exc_info=True)
+            finally:
+                # 같은 이름이 다시 대기열에 들어온 경우 최신 내용을 유지
+                if self._pending.get(name) is text:
+                    del self._pending[name]
+                self._queue.task_done()
+
+    async def flush(self) -> None:
+        """대기열의 쓰기가 모두 끝날 때까지 기다립니다."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        """남은 쓰기를 마친 뒤 worker를 멈춥니다."""
+        await self.flush()
+        worker, self._worker = self._worker, None
+        # 다른 event loop(이미 종료된 테스트 등)의 worker는 그 loop와 함께 정리됨
+        if worker is not None and self._loop is asyncio.get_running_loop():
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+
+
+def create_artifact_store(backend: str = ARTIFACT_STORE_BACKEND):
+    """환경 변수 ARTIFACT_STORE_BACKEND에 따라 artifact store를 생성합니다. ("local" 또는 "none")"""
+    if backend == "none":
+        return NullArtifactStore()
+    if backend != "local":
+        logger.warning(f"⚠️ 알 수 없는 artifact store backend입니다 (local 사용): {backend}")
+    return LocalDiskArtifactStore()
+
+
+_writer: Optional[ArtifactWriter] = None
+
+
+def get_artifact_writer() -> ArtifactWriter:
+    """공유 artifact writer를 반환합니다. (처음 호출할 때 store를 생성)"""
+    global _writer
+    if _writer is None:
+        _writer = ArtifactWriter(create_artifact_store())
+    return _writer
+
+
+async def start_artifact_writer() -> ArtifactWriter:
+    """공유 artifact writer의 worker를 시작합니다."""
+    writer = get_artifact_writer()
+    writer.start()
+    logger.info(f"✅ artifact writer 시작 ({type(writer.store).__name__})")
+    return writer
+
+
+async def close_artifact_writer() -> None:
+    """남은 artifact 쓰기를 마친 뒤 worker를 멈춥니다."""
+    if _writer is not None:
+        await _writer.stop()
+        logger.info("✅ artifact writer 종료")
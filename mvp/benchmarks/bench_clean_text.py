@@ -0,0 +1,67 @@
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from read_pdf_util import normalize_text  # noqa: E402
+
+'''
+PDF 텍스트 정리 benchmark
+- 기존 방식: 페이지마다 5번의 re.sub(호출마다 pattern 조회)으로 정리한 뒤, 합친 문서 전체를 같은 방식으로 다시 정리
+- normalize_text: 미리 compile한 pattern 하나로 페이지마다 한 번만 정리 (문단 경계 유지)
+
+실행: python benchmarks/bench_clean_text.py [페이지 수]
+'''
+
+WORDS = ("사용자는", "이메일로", "로그인할", "수", "있습니다.", "기능", "요구사항", "( 선택 )", "조회", "등록", "API", "서버", "!", "결제,", "알림")
+
+
+def legacy_clean_text(text):
+    text = re.sub(r'\s+', ' ', text)
+    text = text.strip()
+    text = re.sub(r'\s+([.,!?])', r'\1', text)
+    text = re.sub(r'\(\s+', '(', text)
+    text = re.sub(r'\s+\)', ')', text)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    return text
+
+
+def legacy(pages):
+    return legacy_clean_text("\n\n".join(legacy_clean_text(page) for page in pages))
+
+
+def single_pass(pages):
+    return "\n\n".join(normalize_text(page) for page in pages)
+
+
+def make_pages(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    pages = []
+    for _ in range(n):
+        lines = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))) for _ in range(40)]
+        # 빈 줄(문단)과 줄 끝 공백, 연속된 공백이 섞인 PyPDF2 추출 결과 형태
+        pages.append("\n".join(line + (" \n" if rng.random() < 0.1 else "  ") for line in lines))
+    return pages
+
+
+def measure(func, pages, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(pages)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    pages = make_pages(n)
+    megabytes = sum(len(page.encode("utf-8")) for page in pages) / (1024 * 1024)
+    legacy_time = measure(legacy, pages)
+    single_time = measure(single_pass, pages)
+    print(f"pages: {n}, size: {megabytes:.1f} MB")
+    print(f"legacy      : {legacy_time * 1000:.1f} ms ({megabytes / legacy_time:.1f} MB/s)")
+    print(f"single pass : {single_time * 1000:.1f} ms ({megabytes / single_time:.1f} MB/s, {legacy_time / single_time:.1f}x)")
@@ -0,0 +1,91 @@
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from read_pdf_util import (SpooledPdfFile, extract_pdf_text_in_pool,  # noqa: E402
+                           read_spooled_pdf)
+
+'''
+PDF 텍스트 추출 benchmark
+- 기존 방식: 현재 process에서 모든 페이지를 순서대로 추출 (read_spooled_pdf)
+- process pool: 페이지를 PDF_PAGES_PER_TASK개씩 나누어 worker process에서 동시에 추출 (extract_pdf_text_in_pool)
+
+실행: python benchmarks/bench_pdf_extraction.py [페이지 수] [worker 수]
+'''
+
+LINES_PER_PAGE = 40
+
+
+def make_pdf(pages: int) -> bytes:
+    """페이지마다 LINES_PER_PAGE줄의 텍스트가 있는 PDF를 생성합니다."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,   # 페이지 목록은 페이지 객체 번호가 정해진 뒤 작성
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(pages):
+        lines = b" ".join(
+            b"(Feature %d-%d: user can search, filter and export project items.) Tj T*" % (page, line)
+            for line in range(LINES_PER_PAGE)
+        )
+        stream = b"BT /F1 10 Tf 12 TL 40 800 Td " + lines + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects)))
+        page_ids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % i for i in page_ids), pages)
+
+    body = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(body))
+        body += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(body)
+    body += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    body += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    body += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF" % (len(objects) + 1, xref)
+    return bytes(body)
+
+
+def spool(pdf: bytes) -> SpooledPdfFile:
+    spooled_file = SpooledPdfFile(max_size=4 * 1024 * 1024)
+    spooled_file.write(pdf)
+    spooled_file.seek(0)
+    return spooled_file
+
+
+def measure_single(pdf: bytes) -> float:
+    with spool(pdf) as spooled_file:
+        started = time.perf_counter()
+        read_spooled_pdf(spooled_file)
+        return time.perf_counter() - started
+
+
+async def measure_pool(pdf: bytes, executor: ProcessPoolExecutor) -> float:
+    with spool(pdf) as spooled_file:
+        started = time.perf_counter()
+        await extract_pdf_text_in_pool(spooled_file, executor)
+        return time.perf_counter() - started
+
+
+async def main(pages: int, workers: int) -> None:
+    pdf = make_pdf(pages)
+    single_time = measure_single(pdf)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        await measure_pool(make_pdf(1), executor)   # worker process 생성 비용은 측정에서 제외
+        pool_time = await measure_pool(pdf, executor)
+    print(f"pages: {pages}, size: {len(pdf) / 1024:.0f} KiB, workers: {workers}")
+    print(f"single : {single_time * 1000:.0f} ms")
+    print(f"pool   : {pool_time * 1000:.0f} ms ({single_time / pool_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.INFO)
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    asyncio.run(main(pages, workers))
@@ -0,0 +1,77 @@
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from priority_engine import bucket_task_priorities, score_tasks  # noqa: E402
+
+'''
+우선순위 계산 benchmark
+- 기존 방식: task마다 scalar priority 계산 후 Python 루프로 분위수 구간화
+- priority_engine: NumPy 배열로 점수 계산과 구간화를 한 번에 수행
+
+실행: python benchmarks/bench_priority.py [task 수]
+'''
+
+WORKHOURS_PER_DAY = 8
+
+
+def scalar_priority(expected_days: float, difficulty: float) -> int:
+    time_score = 1 - (expected_days / 30)
+    diff_score = (5 - difficulty) / 4
+    return math.ceil((0.8 * time_score + 0.2 * diff_score) * 299) + 1
+
+
+def legacy(tasks):
+    for task in tasks:
+        days = min(max(task["expected_workhours"] / WORKHOURS_PER_DAY, 0), 30)
+        task["priority"] = scalar_priority(days, task["difficulty"])
+    priority_list = list(set(task["priority"] for task in tasks))
+    p30 = np.percentile(priority_list, 30)
+    p70 = np.percentile(priority_list, 70)
+    for task in tasks:
+        if task["priority"] <= p30:
+            task["priority"] = 50
+        elif task["priority"] <= p70:
+            task["priority"] = 150
+        else:
+            task["priority"] = 250
+    return tasks
+
+
+def vectorized(tasks):
+    score_tasks(tasks, WORKHOURS_PER_DAY)
+    return bucket_task_priorities(tasks)
+
+
+def make_tasks(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        {"_id": str(i), "difficulty": rng.randint(1, 5), "expected_workhours": rng.uniform(1, 120)}
+        for i in range(n)
+    ]
+
+
+def measure(func, n: int, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        tasks = make_tasks(n)
+        started = time.perf_counter()
+        func(tasks)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    assert [t["priority"] for t in legacy(make_tasks(n))] == [t["priority"] for t in vectorized(make_tasks(n))]
+    legacy_time = measure(legacy, n)
+    vectorized_time = measure(vectorized, n)
+    print(f"tasks: {n}")
+    print(f"legacy     : {legacy_time * 1000:.2f} ms")
+    print(f"vectorized : {vectorized_time * 1000:.2f} ms ({legacy_time / vectorized_time:.1f}x)")
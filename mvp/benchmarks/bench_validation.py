@@ -0,0 +1,76 @@
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from payload_models import validate_feature_specs  # noqa: E402
+
+'''
+기능 명세 검증 benchmark
+- 기존 방식: 기능마다 필수 필드 확인, isinstance 검사, 문자열 날짜 비교, strptime으로 expectedDays 계산
+- payload_models: Pydantic v2 TypeAdapter로 목록 전체를 한 번에 검증하고 보정
+
+실행: python benchmarks/bench_validation.py [기능 수]
+'''
+
+FIELDS = ("name", "useCase", "input", "output", "precondition", "postcondition", "startDate", "endDate", "difficulty")
+PROJECT_START, PROJECT_END = "2024-03-01", "2024-06-30"
+
+
+def legacy(features):
+    for feature in features:
+        missing_fields = [field for field in FIELDS if feature.get(field) is None]
+        if missing_fields:
+            raise ValueError(f"기능 '{feature.get('name', 'unknown')}'에 {missing_fields} 필드가 누락되었습니다.")
+        if not isinstance(feature["difficulty"], int) or not 1 <= feature["difficulty"] <= 5:
+            feature["difficulty"] = 1
+        if not feature["startDate"] >= PROJECT_START:
+            feature["startDate"] = PROJECT_START
+        if not feature["endDate"] <= PROJECT_END:
+            feature["endDate"] = PROJECT_END
+        start_date = datetime.strptime(feature["startDate"], "%Y-%m-%d")
+        end_date = datetime.strptime(feature["endDate"], "%Y-%m-%d")
+        feature["expectedDays"] = max(int((end_date - start_date).days), 1)
+    return features
+
+
+def compiled(features):
+    return validate_feature_specs(features, PROJECT_START, PROJECT_END)
+
+
+def make_features(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    features = []
+    for i in range(n):
+        start = rng.randint(1, 28)
+        features.append({
+            "_id": str(i), "name": f"기능 {i}", "useCase": "사용 사례", "input": "입력", "output": "출력",
+            "precondition": "전제 조건", "postcondition": "결과 조건",
+            "startDate": f"2024-{rng.randint(2, 5):02d}-{start:02d}", "endDate": f"2024-{rng.randint(5, 7):02d}-{start:02d}",
+            "difficulty": rng.choice([1, 2, 3, 4, 5, 7, "3"]), "priority": 100,
+        })
+    return features
+
+
+def measure(func, n: int, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        features = make_features(n)
+        started = time.perf_counter()
+        func(features)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.WARNING)    # 보정 경고 로그 출력 비용은 측정에서 제외
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    legacy_time = measure(legacy, n)
+    compiled_time = measure(compiled, n)
+    print(f"features: {n}")
+    print(f"legacy   : {legacy_time * 1000:.2f} ms")
+    print(f"compiled : {compiled_time * 1000:.2f} ms ({legacy_time / compiled_time:.1f}x)")
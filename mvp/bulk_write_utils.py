@@ -0,0 +1,135 @@
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+'''
+MongoDB bulk upsert 유틸
+- 문서를 key 필드(예: featureId, projectId) 기준의 UpdateOne(upsert=True) 연산으로 변환하여 unordered bulk_write로 한 번에 저장한다.
+- 같은 요청이 재시도되어도 key가 같은 문서는 갱신될 뿐 중복 생성되지 않는다. (createdAt은 최초 생성 시에만 기록)
+- batch_size로 bulk_write 한 번에 포함할 연산 수를 조절하며, use_transaction=True이면 모든 batch를 하나의 transaction으로 묶는다.
+'''
+
+BULK_WRITE_BATCH_SIZE = int(os.getenv("BULK_WRITE_BATCH_SIZE") or 1000)
+BULK_WRITE_USE_TRANSACTION = (os.getenv("BULK_WRITE_USE_TRANSACTION") or "false").lower() == "true"
+FEATURE_KEY_FIELDS = ("featureId", "projectId")
+
+
+def build_upsert_operations(documents: List[Dict[str, Any]], key_fields: Sequence[str], created_at: Optional[datetime] = None) -> List[UpdateOne]:
+    """
+    문서 목록을 key 필드 기준의 upsert 연산 목록으로 변환합니다.
+
+    Args:
+        documents (List[Dict[str, Any]]): 저장할 문서 목록
+        key_fields (Sequence[str]): 문서를 식별하는 필드 목록
+        created_at (Optional[datetime]): 새로 생성되는 문서에 기록할 createdAt (기본값: 현재 UTC 시각)
+
+    Returns:
+        List[UpdateOne]: upsert 연산 목록
+
+    Raises:
+        ValueError: 문서에 key 필드가 없는 경우
+    """
+    created_at = created_at or datetime.utcnow()
+    operations = []
+    for document in documents:
+        missing = [field for field in key_fields if document.get(field) is None]
+        if missing:
+            raise ValueError(f"upsert할 문서에 key 필드 {missing}가 없습니다: {document}")
+        key = {field: document[field] for field in key_fields}
+        fields = {field: value for field, value in document.items() if field not in ("_id", "createdAt")}
+        operations.append(UpdateOne(key, {"$set": fields, "$setOnInsert": {"createdAt": created_at}}, upsert=True))
+    return operations
+
+
+async def bulk_upsert(
+    collection,
+    documents: List[Dict[str, Any]],
+    key_fields: Sequence[str],
+    batch_size: int = BULK_WRITE_BATCH_SIZE,
+    use_transaction: bool = False,
+) -> Dict[str, int]:
+    """
+    문서 목록을 unordered bulk_write upsert로 저장합니다.
+
+    Args:
+        collection: motor collection
+        documents (List[Dict[str, Any]]): 저장할 문서 목록
+        key_fields (Sequence[str]): 문서를 식별하는 필드 목록
+        batch_size (int): bulk_write 한 번에 포함할 연산 수
+        use_transaction (bool): True이면 모든 batch를 하나의 transaction으로 저장 (replica set 필요)
+
+    Returns:
+        Dict[str, int]: matched, modified, upserted 문서 수
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size는 0보다 커야 합니다.")
+    operations = build_upsert_operations(documents, key_fields)
+    summary = {"matched": 0, "modified": 0, "upserted": 0}
+    if not operations:
+        return summary
+
+    async def write_batches(session=None) -> None:
+        for start in range(0, len(operations), batch_size):
+            result = await collection.bulk_write(operations[start:start + batch_size], ordered=False, session=session)
+            summary["matched"] += result.matched_count
+            summary["modified"] += result.modified_count
+            summary["upserted"] += result.upserted_count
+
+    if use_transaction:
+        async with await collection.database.client.start_session() as session:
+            async with session.start_transaction():
+                await write_batches(session)
+    else:
+        await write_batches()
+    logger.info(f"✅ {collection.name} bulk upsert 완료: 연산 {len(operations)}개, 결과 {summary}")
+    return summary
+
+
+def build_feature_document(feature: Dict[str, Any], project_id: str) -> Dict[str, Any]:
+    """Redis의 기능 명세 초안을 feature collection에 저장할 문서로 변환합니다."""
+    return {
+        "featureId": feature["_id"],
+        "name": feature["name"],
+        "useCase": feature["useCase"],
+        "input": feature["input"],
+        "output": feature["output"],
+        "precondition": feature["precondition"],
+        "postcondition": feature["postcondition"],
+        "expectedDays": feature["expectedDays"],
+        "startDate": feature["startDate"],
+        "endDate": feature["endDate"],
+        "difficulty": feature["difficulty"],
+        "priority": feature["priority"],
+        "relfeatIds": feature.get("relfeatIds") or [],
+        "embedding": feature.get("embedding") or [],
+        "projectId": project_id,
+    }
+
+
+async def upsert_features(
+    feature_collection,
+    features: List[Dict[str, Any]],
+    project_id: str,
+    batch_size: int = BULK_WRITE_BATCH_SIZE,
+    use_transaction: bool = BULK_WRITE_USE_TRANSACTION,
+) -> Dict[str, int]:
+    """
+    기능 명세 목록을 featureId, projectId 기준으로 한 번에 upsert합니다.
+
+    Args:
+        feature_collection: feature collection
+        features (List[Dict[str, Any]]): 기능 명세 목록 (_id가 featureId로 저장됨)
+        project_id (str): 프로젝트 id
+        batch_size (int): bulk_write 한 번에 포함할 연산 수
+        use_transaction (bool): True이면 transaction 안에서 저장
+
+    Returns:
+        Dict[str, int]: matched, modified, upserted 문서 수
+    """
+    documents = [build_feature_document(feature, project_id) for feature in features]
+    return await bulk_upsert(feature_collection, documents, FEATURE_KEY_FIELDS, batch_size, use_transaction)
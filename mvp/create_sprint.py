@@ -4,20 +4,29 @@ import json
 import logging
 import math
 import os
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
-import numpy as np
 from dotenv import load_dotenv
-from feature_specification import calculate_priority
 from gpt_utils import extract_json_from_gpt_response, safe_chat_completion
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from mongodb_setting import (get_epic_collection, get_feature_collection,
                              get_project_collection, get_task_collection,
                              get_user_collection, init_collections)
 from openai import AsyncOpenAI
-from project_member_utils import get_project_members
+from payload_models import validate_sprints, validate_tasks
+from priority_engine import (PENDING_PRIORITY, bucket_task_priorities,
+                             score_tasks)
+from project_member_utils import get_project_member_context
+from prompt_registry import (get_prompt_version, record_prompt_usage,
+                             register_prompt, render_project_context)
+from prompt_serializer import (FIELD_WHITELISTS, AliasMap, encode_records,
+                               encode_tasks_by_epic, record_token_savings,
+                               restore_tasks_by_epic)
+from task_cache import (load_cached_tasks, make_task_cache_key,
+                        save_cached_tasks)
+from task_scheduler import (format_date, resolve_workhours_per_day,
+                            schedule_tasks, to_date)
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +47,15 @@ async def calculate_eff_mandays(efficiency_factor: float, number_of_developers:
     logger.info(f"⚙️  Sprint별 효율적인 작업 배정 시간: {eff_mandays}시간")
     return eff_mandays
 
+async def report_progress(progress_callback: Optional[Callable[[str, int], Awaitable[None]]], stage: str, progress: int) -> None:
+    # sprint 생성 job의 단계별 진행 상황 전달 (callback이 없으면 무시)
+    if progress_callback is None:
+        return
+    try:
+        await progress_callback(stage, progress)
+    except Exception as e:
+        logger.warning(f"⚠️ 진행 상황 전달 중 오류 발생: {str(e)}")
+
 async def calculate_percentiles(tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     '''
     "tasks": [
@@ -54,122 +72,263 @@ async def calculate_percentiles(tasks: List[Dict[str, Any]]) -> List[Dict[str, A
     ]
     '''
     
-    # task별 priority 값을 모아서 percentile 30, 70 추출
-    priority_values = [task["priority"] for task in tasks if "priority" in task]
-    p30 = np.percentile(priority_values, 30)
-    p70 = np.percentile(priority_values, 70)
-    
-    # 각 task의 priority 값을 분위수에 따라 재조정
-    for task in tasks:
-        original_priority = task["priority"]
-        if original_priority <= p30:
-            task["priority"] = 50       # Low
-        elif original_priority <= p70:
-            task["priority"] = 150      # Medium
-        else:
-            task["priority"] = 250      # High
+    # task별 priority 값의 percentile 30, 70을 기준으로 Low(50), Medium(150), High(250) 재조정
+    bucket_task_priorities(tasks)
     logger.info(f"🔍 H:30, M:40, L:30 비율로 우선순위 재조정한 결과: {tasks}")
     
     return tasks
 
 
-########## =================== Create Task ===================== ##########
-'''
-경우마다 서로 다른 context 정보를 사용해서 Task를 구성하게 됨.
-1. create_task_from_feature: feature collection에 저장된 UseCase, input, output, priority, workhours, assignee, start & endDate 모두 사용
-2. create_task_from_epic: epic title, description & task title, description, assignee, priority, expected_workhours 사용
-3. create_task_from_null: project & epic의 description 사용
-'''
-async def create_task_from_feature(epic_id: str, feature_id: str, project_id: str, workhours_per_day: int) -> List[Dict[str, Any]]:
-    feature_collection, project_collection, epic_collection, task_collection, user_collection = await init_collections()
-    logger.info(f"🔍 기존의 feature 정보로부터 task 정의 시작: {feature_id}")
-    assert feature_id is not None, "feature로부터 정의된 epic에 대해 task를 정의하는 스텝이므로 feature_id가 존재해야 합니다."
-    feature = await feature_collection.find_one({"featureId": feature_id})
-    
-    task_creation_from_feature_prompt = ChatPromptTemplate.from_template(
-    """
-    당신은 애자일 마스터입니다. 당신의 주요 언어는 한국어입니다. 당신의 업무는 규칙에 따라 주어진 epic에 대한 정보를 바탕으로 각 epic의 하위 task를 정의하는 것입니다.
+### LLM 프롬프트 (지침은 import 시점에 한 번만 compile하고, 요청별 값은 마지막 메시지로 전달)
+TASK_FROM_FEATURE_PROMPT = register_prompt(
+    "task_from_feature",
+    instructions="""
+    당신의 업무는 규칙에 따라 요청으로 주어진 epic에 대한 정보를 바탕으로 epic의 하위 task를 정의하는 것입니다.
     규칙은 다음과 같습니다.
-    1. 반드시 하나 이상의 task를 생성해야 합니다. task는 {epic_title}과 {epic_description}를 참고하여 개발할 수 있는 구체적인 수준으로 정의해야 합니다.
-    예를 들어 {epic_description}이 "알람 기능 개발"이라면 task의 title은 "알람 API response 정의", task의 description은 "알람 API에서 frontend가 backend에 전송할 response의 body의 내용을 정의"와 같이 구체적으로 작성되어야 합니다.
-    2. {workhours_per_day}는 팀원들이 하루에 개발에 사용하는 시간입니다. {epic_expected_workhours} 이하의 값으로 task별 전체 개발 예상 시간을 산정하고, 이를 {workhours_per_day}로 나누어 expected_workhours를 task 별로 정의하세요.
+    1. 반드시 하나 이상의 task를 생성해야 합니다. task는 epic의 title과 description을 참고하여 개발할 수 있는 구체적인 수준으로 정의해야 합니다.
+    예를 들어 epic의 description이 "알람 기능 개발"이라면 task의 title은 "알람 API response 정의", task의 description은 "알람 API에서 frontend가 backend에 전송할 response의 body의 내용을 정의"와 같이 구체적으로 작성되어야 합니다.
+    2. 1일 개발 시간은 팀원들이 하루에 개발에 사용하는 시간입니다. task별 전체 개발 예상 시간을 시간 단위로 산정하여 expected_workhours로 정의하세요. task들의 expected_workhours 합은 epic의 전체 개발 가능 시간 이하여야 합니다.
     3. difficulty는 반드시 1 이상 5 이하의 정수여야 합니다. 절대 이 범위를 벗어나지 마세요.
-    4. assignee는 반드시 {project_members}에 존재하는 멤버여야 합니다. 절대 이를 어겨선 안됩니다. 반환할 때는 FE, BE와 같은 포지션을 제외하고 이름만 반환하세요. assignee는 반드시 한 명이어야 합니다.
-    5. "{epic_endDate} - {epic_startDate} >= expected_workhours" 조건을 만족하는지 검사하세요. 만약 만족하지 못한다면 startDate를 {epic_startDate}, endDate를 {epic_endDate}로 지정하세요.
-    6. 만약 5번의 조건을 만족한다면 startDate가 {epic_startDate}보다 빠른지 검사하세요. 빠르다면 startDate를 {epic_startDate}로 지정하세요. 빠르지 않다면 그대로 유지하세요.
-    7. 만약 5번의 조건을 만족한다면 endDate가 {epic_endDate}보다 늦은지 검사하세요. 늦다면 endDate를 {epic_endDate}로 지정하세요. 늦지 않다면 그대로 유지하세요.
+    4. assignee는 반드시 프로젝트 멤버여야 합니다. 절대 이를 어겨선 안됩니다. 반환할 때는 FE, BE와 같은 포지션을 제외하고 이름만 반환하세요. assignee는 반드시 한 명이어야 합니다.
+    
+    결과를 다음과 같은 형식으로 반환해 주세요.
+    {{
+        "tasks": [
+            {{
+                "title": "string",
+                "description": "string",
+                "assignee": "string",
+                "difficulty": int,
+                "expected_workhours": float
+            }},
+            ...
+        ]
+    }}
+    """,
+    request="""
+    epic title: {epic_title}
+    epic description:
+    {epic_description}
+    1일 개발 시간: {workhours_per_day}시간
+    epic의 전체 개발 가능 시간: {epic_expected_workhours}시간
+    """,
+)
 
-    현재 프로젝트에 참여 중인 멤버들의 정보는 다음과 같습니다:
-    {project_members}
+TASK_FROM_EPIC_PROMPT = register_prompt(
+    "task_from_epic",
+    instructions="""
+    당신의 업무는 규칙에 따라 요청으로 주어진 epic과 epic의 하위 task에 대해 null인 필드의 값을 생성하는 것입니다.
+    task 목록은 "id|title|description|assignee|priority" 형식이며 id는 taskId, null은 값이 없는 필드입니다.
+    
+    규칙은 다음과 같습니다.
+    1. epic description이 "null"인지 확인하세요. 만약 null이라면 epic title로부터 epic description을 구성하세요. epic title에 대해 예상되는 사용 시나리오, 입력 데이터, 출력 데이터를 내용으로 포함하세요.
+    2. 1번을 마무리 했다면, null 필드 목록에 "description", "assignee", "startDate", "endDate", "priority" 중에 어떤 값들이 존재하는지 확인하세요.
+    3. 2번에서 확인한 내용별로 다음의 규칙을 지켜서 값을 생성하고 결과를 반환하세요.
+    3-1. "description"이 확인된다면 epic description과 task의 title을 참고하여 task의 "description"을 정의하세요.
+    예를 들어 epic description이 "알람 기능 개발"이고, task의 title이 "알람 API response 정의"라면, task의 description은 "알람 API에서 frontend가 backend에 전송할 response의 body의 내용을 정의"와 같이 구체적으로 작성되어야 합니다.
+    만약 task의 title이 epic description과 관련이 없다면, epic description을 참고하여 task의 description의 생성과 함께 task의 title도 수정하세요.
+    3-2. "assignee"가 확인된다면 프로젝트 멤버 중에서 적절한 멤버를 선택하여 task의 "assignee"를 정의하세요.
+    assignee는 반드시 프로젝트 멤버여야 합니다. 절대 이를 어겨선 안됩니다. 반환할 때는 FE, BE와 같은 포지션을 제외하고 이름만 반환하세요. assignee는 반드시 한 명이어야 합니다.
+    3-3. "priority"가 확인된다면 difficulty와 expected_workhours를 정의하세요.
+    difficulty는 반드시 1 이상 5 이하의 정수여야 합니다. 절대 이 범위를 벗어나지 마세요.
+    1일 개발 시간은 팀원들이 하루 중 개발에 사용하는 시간이므로 이를 참고하여 task 개발에 소요될 것으로 예상되는 전체 시간을 시간 단위로 산정하고 expected_workhours로 정의하세요.
+    4. 마지막으로 가장 중요한 규칙입니다. null 필드 목록에 존재하지 않는 task의 모든 필드들은 task 목록에 존재하는 값을 그대로 반환해야 합니다.
+    다시 한 번 강조합니다. null 필드 목록에 존재하지 않는 task의 모든 필드들은 2번과 3번의 과정과 관련없으므로 task 목록에 존재하는 값을 그대로 반환해야 합니다. taskId도 그대로 반환하세요.
+    
+    반드시 다음 JSON 형식으로만 응답해주세요. 다른 형식의 응답은 허용되지 않습니다:
+    {{
+        "epic_description": "string",
+        "tasks": [
+            {{
+                "taskId": "string",
+                "title": "string",
+                "description": "string",
+                "assignee": "string",
+                "difficulty": int,
+                "expected_workhours": float
+            }},
+            ...
+        ]
+    }}
+    """,
+    request="""
+    epic title: {epic_title}
+    epic description: {epic_description}
+    null 필드 목록: {null_fields}
+    1일 개발 시간: {workhours_per_day}시간
+    
+    task 목록:
+    {task_db_data}
+    """,
+)
+
+TASK_FROM_NULL_PROMPT = register_prompt(
+    "task_from_null",
+    instructions="""
+    당신의 업무는 규칙에 따라 요청으로 주어진 epic에 대한 정보를 바탕으로 epic의 하위 task를 정의하는 것입니다.
+    규칙은 다음과 같습니다.
+    1. epic description이 "null"이 아니라면 그대로 반환하고, "null"이라면 프로젝트 description을 참고해서 새롭게 정의한 description을 반환하세요.
+    2. task는 epic description을 수행하기 위한 아주 자세한 개발 단위를 정의해야 합니다.
+    예를 들어 epic description이 "알람 기능 개발"이라면 task의 title은 "알람 API response 정의", task의 description은 "알람 API에서 frontend가 backend에 전송할 response의 body의 내용을 정의"와 같이 구체적으로 작성되어야 합니다.
+    3. difficulty는 1 이상 5 이하의 정수여야 합니다. 절대 이 범위를 벗어나지 마세요.
+    4. assignee는 반드시 프로젝트 멤버여야 합니다. 절대 이를 어겨선 안됩니다. 반환할 때는 FE, BE와 같은 포지션을 제외하고 이름만 반환하세요. assignee는 반드시 한 명이어야 합니다.
+    5. 1일 개발 시간은 팀원들이 하루 중 개발에 사용하는 시간이므로 이를 참고하여 task 개발에 소요될 것으로 예상되는 전체 시간을 시간 단위로 산정하고 expected_workhours로 정의하세요.
     
     결과를 다음과 같은 형식으로 반환해 주세요.
     {{
+        "epic_description": "string",
         "tasks": [
             {{
                 "title": "string",
                 "description": "string",
                 "assignee": "string",
-                "startDate": "YYYY-MM-DD",
-                "endDate": "YYYY-MM-DD",
                 "difficulty": int,
                 "expected_workhours": float
             }},
             ...
         ]
     }}
-    """)
-    project_members = await get_project_members(project_id)
-    assert project_members is not None, "project_members가 존재하지 않습니다."
-    
-    messages = task_creation_from_feature_prompt.format_messages(
-        project_members=project_members,
-        epic_title=feature["name"],
-        epic_description="사용 시나리오: "+feature["useCase"]+"\n"+"입력 데이터: "+feature["input"]+"\n"+"출력 데이터: "+feature["output"],
-        epic_startDate=feature["startDate"],
-        epic_endDate=feature["endDate"],
-        epic_expected_workhours=feature["expectedDays"],
-        workhours_per_day=workhours_per_day
-    )
+    """,
+    request="""
+    프로젝트 description: {project_description}
+    epic description: {epic_description}
+    1일 개발 시간: {workhours_per_day}시간
+    """,
+)
+
+SPRINT_PROMPT = register_prompt(
+    "sprint",
+    instructions="""
+    당신의 업무는 요청으로 주어지는 Epic과 Epic별 Task의 정보를 바탕으로 적절한 Sprint Backlog를 생성하는 것입니다.
+    Epic 목록은 epic별로 "[epic epicId]" 줄과 "id|title|assignee|expected_workhours|priority" 형식의 task 목록으로 구성되어 있습니다. id는 taskId입니다.
     
-    # LLM Config
-    llm = ChatOpenAI(
-        model_name="gpt-4o-mini",
-        temperature=0.4,
-    )
-    response = await safe_chat_completion(llm, messages)
+    다음의 과정을 반드시 순서대로 진행하고 모두 완료해야 합니다.
+    1. 요청의 스프린트 주기와 스프린트 개수를 확인하고, sprints 배열에 순서대로 스프린트 개수 이하의 sprint를 반환하세요.
+    2. 각 스프린트에는 Epic 목록의 epic이 최소 하나 이상 포함되어야 합니다. 스프린트에 epic을 배정할 때 해당 epic의 모든 task를 누락없이 포함하세요.
+    3. Epic 목록은 priority가 높은 순서대로 정렬된 데이터이므로, 각 스프린트에 되도록 제공된 순서대로 epic을 추가하세요.
+    4. epic에 포함된 task들의 priority를 점검하세요. 같은 epic에 포함된 task들의 priority는 서로 값이 30 이상씩 차이가 나야 합니다.
+    만약 그렇지 않다면, task의 priority를 task가 존재하는 순서대로 300부터 50씩 감소하도록 조정하세요. 반드시 같은 epic에 속한 task들이 서로 같은 priority 값을 가지지 않도록 한 번 더 확인하세요.
+    5. 각 epic에 포함된 task들의 expected_workhours 값을 모두 합산하여 sprint별 총 작업량을 계산하세요.
+    6. 계산된 총 작업량이 eff_mandays를 초과하는지 검사하세요. 만약 초과한다면 모든 task의 expected_workhours를 0.75배로 일괄되게 축소하세요.
+    7. 0.75배로 조정된 "expected_workhours"의 합산이 eff_mandays를 초과하는지 검토하세요. 초과할 경우, 모든 task의 expected_workhours를 0.5배로 한 번 더 바꾸세요. 초과하지 않는 경우에는 바꿀 필요 없이 다음 단계로 넘어가세요.
+    8. sprint_days, eff_mandays, workhours_per_day를 4~6번의 계산 과정에 사용한 값 그대로 반환하세요.
+    9. Epic 목록에 정의된 epicId와 taskId는 반드시 그대로 반환하세요. 다시 한 번 말합니다, epicId와 taskId는 절대로 바꾸지 말고 필요한 곳에 그대로 반환하세요.
+    10. 스프린트의 description은 해당 스프린트에 포함된 epic들의 성격을 정의할 수 있는 하나의 문장으로 작성하고, 스프린트의 title은 description을 요약하여 제목으로 정의하세요.
+    
+    결과를 다음과 같은 형식으로 반환하세요. 날짜는 별도로 계산되므로 sprint와 task의 날짜는 반환하지 마세요.
+    반드시 tasks의 모든 field가 값을 가지는지 확인하세요. 또한 priority 값이 중복되는 task가 존재하지 않도록 하세요.
+    반드시 다음 JSON 형식으로만 응답해주세요. 다른 형식의 응답은 허용되지 않습니다:
+    {{
+        "sprint_days": int,
+        "eff_mandays": int,
+        "workhours_per_day": int,
+        "sprints": [
+        {{
+            "title": "string",
+            "description": "string",
+            "epics": [
+            {{
+                "epicId": "string",
+                "tasks": [
+                {{
+                    "taskId": "string",
+                    "expected_workhours": int,
+                    "priority": int
+                }},
+                ...
+                ]
+            }},
+            ...
+            ]
+        }},
+        ...
+        ]
+    }}
+    """,
+    request="""
+    스프린트 주기(sprint_days): {sprint_days}일
+    스프린트 개수: {number_of_sprints}개
+    sprint별 작업 가능 시간(eff_mandays): {eff_mandays}시간
+    1일 작업 시간(workhours_per_day): {workhours_per_day}시간
+    
+    Epic 목록:
+    {epics}
+    """,
+)
+
+
+########## =================== Create Task ===================== ##########
+'''
+경우마다 서로 다른 context 정보를 사용해서 Task를 구성하게 됨.
+1. create_task_from_feature: feature collection에 저장된 UseCase, input, output, priority, workhours, assignee, start & endDate 모두 사용
+2. create_task_from_epic: epic title, description & task title, description, assignee, priority, expected_workhours 사용
+3. create_task_from_null: project & epic의 description 사용
+'''
+async def create_task_from_feature(epic_id: str, feature_id: str, project_id: str, workhours_per_day: int, force_regenerate: bool = False, feature: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    feature_collection, project_collection, epic_collection, task_collection, user_collection = await init_collections()
+    logger.info(f"🔍 기존의 feature 정보로부터 task 정의 시작: {feature_id}")
+    assert feature_id is not None, "feature로부터 정의된 epic에 대해 task를 정의하는 스텝이므로 feature_id가 존재해야 합니다."
+    if feature is None:     # 호출한 곳에서 이미 조회한 feature 문서가 있으면 다시 조회하지 않음
+        feature = await feature_collection.find_one({"featureId": feature_id})
+    
+    member_context = await get_project_member_context(project_id)
+    project_members = member_context.member_tuples()
+    
+    # feature 내용, workhours_per_day, 멤버 구성이 같다면 이전에 생성된 task 목록을 재사용
+    cache_key = make_task_cache_key("feature", None, feature, workhours_per_day, project_members, prompt_version=get_prompt_version("task_from_feature"))
+    gpt_result = None if force_regenerate else await load_cached_tasks(cache_key)
+    if gpt_result is None:
+        messages = TASK_FROM_FEATURE_PROMPT.format_messages(
+            project_context=render_project_context(member_context),
+            epic_title=feature["name"],
+            epic_description="사용 시나리오: "+feature["useCase"]+"\n"+"입력 데이터: "+feature["input"]+"\n"+"출력 데이터: "+feature["output"],
+            epic_expected_workhours=feature["expectedDays"] * workhours_per_day,
+            workhours_per_day=workhours_per_day
+        )
+    
+        # LLM Config
+        llm = ChatOpenAI(
+            model_name="gpt-4o-mini",
+            temperature=0.4,
+        )
+        response = await safe_chat_completion(llm, messages)
+        record_prompt_usage("task_from_feature", response)
 
-    try:
-        content = response.content
         try:
-            gpt_result = extract_json_from_gpt_response(content)
+            content = response.content
+            try:
+                gpt_result = extract_json_from_gpt_response(content)
+            except Exception as e:
+                logger.error(f"GPT util 사용 중 오류 발생: {str(e)}", exc_info=True)
+                raise e
+        
         except Exception as e:
-            logger.error(f"GPT util 사용 중 오류 발생: {str(e)}", exc_info=True)
+            logger.error(f"GPT API 처리 중 오류 발생: {e}", exc_info=True)
             raise e
-        
-    except Exception as e:
-        logger.error(f"GPT API 처리 중 오류 발생: {e}", exc_info=True)
-        raise e
+        # 검증을 통과한 task 목록만 캐시 (형식이 잘못된 응답이 캐시되어 이후 요청이 계속 실패하지 않도록)
+        tasks = validate_tasks(gpt_result.get("tasks") if isinstance(gpt_result, dict) else None)
+        await save_cached_tasks(cache_key, {"tasks": tasks})
+    else:
+        tasks = validate_tasks(gpt_result["tasks"])
     
     task_to_store = []
-    tasks = gpt_result["tasks"]
     logger.info("⚙️ gpt가 반환한 결과로부터 task 정보를 추출합니다.")
     for task in tasks:
         task_data = {
             "title": task["title"],
             "description": task["description"],
             "assignee": task["assignee"],
-            "startDate": task["startDate"],
-            "endDate": task["endDate"],
-            "priority": calculate_priority(task["difficulty"], task["expected_workhours"]),
+            "startDate": "",
+            "endDate": "",
+            "difficulty": task["difficulty"],
+            "expected_workhours": task["expected_workhours"],
+            "priority": None,
             "epic": epic_id
         }
-        if task_data["startDate"] <= feature["startDate"]:
-            logger.warning(f"⚠️ task {task['title']}의 startDate가 epic의 startDate보다 이전입니다. 이를 바탕으로 정의된 task의 startDate를 epic의 startDate로 조정합니다.")
-            task_data["startDate"] = feature["startDate"]
-        if task_data["endDate"] >= feature["endDate"]:
-            logger.warning(f"⚠️ task {task['title']}의 endDate가 epic의 endDate보다 이후입니다. 이를 바탕으로 정의된 task의 endDate를 epic의 endDate로 조정합니다.")
-            task_data["endDate"] = feature["endDate"]
         task_to_store.append(task_data)
+    score_tasks(task_to_store, workhours_per_day)
+    # task의 일정은 LLM이 아닌 scheduler가 feature(epic) 기간 안에서 결정
+    schedule_tasks(task_to_store, feature["startDate"], feature["endDate"], workhours_per_day)
     logger.info(f"🔍 epic {epic_id}에 속한 task 정의 완료: {task_to_store}")
     return task_to_store
 
@@ -178,6 +337,8 @@ async def create_task_from_epic(epic_id: str, project_id: str, task_db_data: Lis
     feature_collection, project_collection, epic_collection, task_collection, user_collection = await init_collections()
     logger.info(f"🔍 기존의 epic과 task 정보로부터 task 정의 시작: {epic_id}")
     assert epic_id is not None, "epic에 _id가 없습니다."    # epic은 id가 없으면 안 됨
+    if isinstance(task_db_data, dict):  # 단일 task 문서가 전달된 경우
+        task_db_data = [task_db_data]
     assert len(task_db_data) > 0, "task_db_data가 매개변수로 전달되지 않음."
     try:
         epic = await epic_collection.find_one({"_id": epic_id})
@@ -198,48 +359,21 @@ async def create_task_from_epic(epic_id: str, project_id: str, task_db_data: Lis
             null_fields.append("endDate")
         if task["priority"] is None:
             null_fields.append("priority")
+    null_fields = list(dict.fromkeys(null_fields))    # 중복 제거 (순서 유지)
     
-    task_creation_from_epic_prompt = ChatPromptTemplate.from_template("""
-    당신은 애자일 마스터입니다. 당신의 주요 언어는 한국어입니다. 당신의 업무는 규칙에 따라 주어진 epic과 epic의 하위 task에 대해 null인 필드의 값을 생성하는 것입니다.
-    규칙은 다음과 같습니다.
-    1. {epic_description}이 "null"인지 확인하세요. 만약 null이라면 {epic_title}으로부터 {epic_description}을 구성하세요. {epic_title}에 대해 예상되는 사용 시나리오, 입력 데이터, 출력 데이터를 내용으로 포함하세요.
-    2. 1번을 마무리 했다면, {null_fields}에 "description", "assignee", "startDate", "endDate", "priority" 중에 어떤 값들이 존재하는지 확인하세요.
-    3. 2번에서 확인한 내용별로 다음의 규칙을 지켜서 값을 생성하고 결과를 반환하세요.
-    3-1. "description"이 확인된다면 {epic_description}과 task의 title을 참고하여 task의 "description"을 정의하세요.
-    예를 들어 {epic_description}이 "알람 기능 개발"이고, task의 title이 "알람 API response 정의"라면, task의 description은 "알람 API에서 frontend가 backend에 전송할 response의 body의 내용을 정의"와 같이 구체적으로 작성되어야 합니다.
-    만약 task의 title이 {epic_description}과 관련이 없다면, {epic_description}을 참고하여 task의 description의 생성과 함께 task의 title도 수정하세요.
-    3-2. "assignee"가 확인된다면 {project_members}에 존재하는 멤버 중에서 적절한 멤버를 선택하여 task의 "assignee"를 정의하세요.
-    assignee는 반드시 {project_members}에 존재하는 멤버여야 합니다. 절대 이를 어겨선 안됩니다. 반환할 때는 FE, BE와 같은 포지션을 제외하고 이름만 반환하세요. assignee는 반드시 한 명이어야 합니다.
-    3-3. "priority"가 확인된다면 difficulty와 expected_workhours를 정의하세요.
-    difficulty는 반드시 1 이상 5 이하의 정수여야 합니다. 절대 이 범위를 벗어나지 마세요.
-    {workhours_per_day}는 팀원들이 하루 중 개발에 사용하는 시간이므로 이를 바탕으로 task 개발에 소요될 것으로 예상되는 시간을 산정한 다음, {workhours_per_day}로 나누어 expected_workhours를 정의하세요.
-    4. 마지막으로 가장 중요한 규칙입니다. {null_fields}에 존재하지 않는 task의 모든 필드들은 {task_db_data}에 존재하는 값을 그대로 반환해야 합니다.
-    다시 한 번 강조합니다. {null_fields}에 존재하지 않는 task의 모든 필드들은 2번과 3번의 과정과 관련없으므로 {task_db_data}에 존재하는 값을 그대로 반환해야 합니다.
+    # task 문서 전체 대신 필요한 필드만 짧은 alias(T1, T2, ...)와 함께 전달
+    aliases = AliasMap()
+    task_db_text = encode_records(task_db_data, FIELD_WHITELISTS["task_from_epic.tasks"], aliases, "T")
+    record_token_savings("task_from_epic", task_db_data, task_db_text)
     
-    반드시 다음 JSON 형식으로만 응답해주세요. 다른 형식의 응답은 허용되지 않습니다:
-    {{
-        "epic_description": "string",
-        "tasks": [
-            {{
-                "title": "string",
-                "description": "string",
-                "assignee": "string",
-                "difficulty": int,
-                "expected_workhours": float
-            }},
-            ...
-        ]
-    }}
-    """)
-    project_members = await get_project_members(project_id)
-    assert project_members is not None, "project_members가 존재하지 않습니다."
+    member_context = await get_project_member_context(project_id)
     
-    messages = task_creation_from_epic_prompt.format_messages(
+    messages = TASK_FROM_EPIC_PROMPT.format_messages(
+        project_context = render_project_context(member_context),
         null_fields = null_fields,
         epic_title = epic["title"],
         epic_description = epic["description"] if epic["description"] is not None else "null",
-        task_db_data = task_db_data,
-        project_members = project_members,
+        task_db_data = task_db_text,
         workhours_per_day = workhours_per_day
     )
     
@@ -248,6 +382,7 @@ async def create_task_from_epic(epic_id: str, project_id: str, task_db_data: Lis
         temperature=0.4,
     )
     response = await llm.ainvoke(messages)
+    record_prompt_usage("task_from_epic", response)
     try:
         content = response.content
         try:
@@ -260,7 +395,7 @@ async def create_task_from_epic(epic_id: str, project_id: str, task_db_data: Lis
         raise e
     
     task_to_store = []
-    tasks = gpt_result["tasks"]
+    tasks = validate_tasks(gpt_result["tasks"])
     logger.info("⚙️ gpt가 반환한 결과로부터 task 정보를 추출합니다.")
     for task in tasks:
         task_data = {
@@ -269,10 +404,21 @@ async def create_task_from_epic(epic_id: str, project_id: str, task_db_data: Lis
             "assignee": task["assignee"],
             "startDate": "",
             "endDate": "",
-            "priority": calculate_priority(task["difficulty"], task["expected_workhours"]),
+            "difficulty": task["difficulty"],
+            "expected_workhours": task["expected_workhours"],
+            "priority": None,
             "epic": epic_id
         }
+        # taskId로 원래 task를 찾아 null이 아니었던 필드는 기존 값으로 복원 (DB에 저장된 일정 포함)
+        original = aliases.resolve(task.get("taskId"))
+        if isinstance(original, dict):
+            for field in ("description", "assignee", "startDate", "endDate"):
+                if original.get(field) is not None:
+                    task_data[field] = original[field]
+            if original.get("description") is not None:
+                task_data["title"] = original["title"]
         task_to_store.append(task_data)
+    score_tasks(task_to_store, workhours_per_day)
     logger.info(f"🔍 epic {epic_id}에 속한 task 정의 완료: {task_to_store}")
     epic_description = gpt_result["epic_description"]
     if epic["description"] is None:
@@ -281,39 +427,11 @@ async def create_task_from_epic(epic_id: str, project_id: str, task_db_data: Lis
     return task_to_store
 
 
-async def create_task_from_null(epic_id: str, project_id: str, workhours_per_day: int) -> List[Dict[str, Any]]:
+async def create_task_from_null(epic_id: str, project_id: str, workhours_per_day: int, force_regenerate: bool = False) -> List[Dict[str, Any]]:
     feature_collection, project_collection, epic_collection, task_collection, user_collection = await init_collections()
     logger.info(f"🔍 null로부터 task 정의 시작: {epic_id}")
-    task_creation_from_null_prompt = ChatPromptTemplate.from_template(
-    """
-    당신은 애자일 마스터입니다. 당신의 주요 언어는 한국어입니다. 당신의 업무는 규칙에 따라 주어진 epic에 대한 정보를 바탕으로 각 epic의 하위 task를 정의하는 것입니다.
-    규칙은 다음과 같습니다.
-    1. {epic_description}이 "null"이 아니라면 그대로 반환하고, "null"이라면 {project_description}을 참고해서 새롭게 정의한 description을 반환하세요.
-    2. task는 {epic_description}을 수행하기 위한 아주 자세한 개발 단위를 정의해야 합니다.
-    예를 들어 "epic_description"이 "알람 기능 개발"이라면 task의 title은 "알람 API response 정의", task의 description은 "알람 API에서 frontend가 backend에 전송할 response의 body의 내용을 정의"와 같이 구체적으로 작성되어야 합니다.
-    3. task의 assignee는 {project_members}에 존재하는 멤버여야 합니다. 명심하세요. assignee는 반드시 한 명이어야 합니다. 반환할 때는 FE, BE와 같은 포지션을 제외하고 이름만 반환하세요.
-    4. difficulty는 1 이상 5 이하의 정수여야 합니다. 절대 이 범위를 벗어나지 마세요.
-    5. assignee는 반드시 {project_members}에 존재하는 멤버여야 합니다. 절대 이를 어겨선 안됩니다. 반환할 때는 FE, BE와 같은 포지션을 제외하고 이름만 반환하세요. assignee는 반드시 한 명이어야 합니다.
-    6. {workhours_per_day}는 팀원들이 하루 중 개발에 사용하는 시간이므로 이를 바탕으로 task 개발에 소요될 것으로 예상되는 시간을 산정한 다음, {workhours_per_day}로 나누어 expected_workhours를 정의하세요.
-    
-    결과를 다음과 같은 형식으로 반환해 주세요.
-    {{
-        "epic_description": "string",
-        "tasks": [
-            {{
-                "title": "string",
-                "description": "string",
-                "assignee": "string",
-                "difficulty": int,
-                "expected_workhours": float
-            }},
-            ...
-        ]
-    }}
-    
-    """)
-    project_members = await get_project_members(project_id)
-    assert project_members is not None, "project_members가 존재하지 않습니다."
+    member_context = await get_project_member_context(project_id)
+    project_members = member_context.member_tuples()
     
     project = await project_collection.find_one({"_id": project_id})
     project_description = project["description"]
@@ -323,31 +441,40 @@ async def create_task_from_null(epic_id: str, project_id: str, workhours_per_day
     epic_description = epic["description"]
     logger.info(f"🔍 context로 전달할 epic description: {epic_description}")
     
-    messages = task_creation_from_null_prompt.format_messages(
-        project_description = project_description,
-        epic_description = epic_description if epic_description is not None else "null",
-        project_members = project_members,
-        workhours_per_day = workhours_per_day
-    )
-    
-    llm = ChatOpenAI(
-        model_name="gpt-4o-mini",
-        temperature=0.4,
-    )
-    response = await llm.ainvoke(messages)
-    try:
-        content = response.content
+    # epic, 프로젝트 description, workhours_per_day, 멤버 구성이 같다면 이전에 생성된 task 목록을 재사용
+    cache_key = make_task_cache_key("null", epic, None, workhours_per_day, project_members, extra={"project_description": project_description}, prompt_version=get_prompt_version("task_from_null"))
+    gpt_result = None if force_regenerate else await load_cached_tasks(cache_key, required_fields=("epic_description",))
+    if gpt_result is None:
+        messages = TASK_FROM_NULL_PROMPT.format_messages(
+            project_context = render_project_context(member_context),
+            project_description = project_description,
+            epic_description = epic_description if epic_description is not None else "null",
+            workhours_per_day = workhours_per_day
+        )
+    
+        llm = ChatOpenAI(
+            model_name="gpt-4o-mini",
+            temperature=0.4,
+        )
+        response = await llm.ainvoke(messages)
+        record_prompt_usage("task_from_null", response)
         try:
-            gpt_result = extract_json_from_gpt_response(content)
+            content = response.content
+            try:
+                gpt_result = extract_json_from_gpt_response(content)
+            except Exception as e:
+                logger.error(f"GPT util 사용 중 오류 발생: {str(e)}", exc_info=True)
+                raise e
         except Exception as e:
-            logger.error(f"GPT util 사용 중 오류 발생: {str(e)}", exc_info=True)
+            logger.error(f"GPT API 처리 중 오류 발생: {e}", exc_info=True)
             raise e
-    except Exception as e:
-        logger.error(f"GPT API 처리 중 오류 발생: {e}", exc_info=True)
-        raise e
+        # 검증을 통과한 task 목록만 캐시 (형식이 잘못된 응답이 캐시되어 이후 요청이 계속 실패하지 않도록)
+        tasks = validate_tasks(gpt_result.get("tasks") if isinstance(gpt_result, dict) else None)
+        await save_cached_tasks(cache_key, {"tasks": tasks, "epic_description": gpt_result.get("epic_description")})
+    else:
+        tasks = validate_tasks(gpt_result["tasks"])
     
     task_to_store = []
-    tasks = gpt_result["tasks"]
     logger.info("⚙️ gpt가 반환한 결과로부터 task 정보를 추출합니다.")
     for task in tasks:
         task_data = {
@@ -356,13 +483,16 @@ async def create_task_from_null(epic_id: str, project_id: str, workhours_per_day
             "assignee": task["assignee"],
             "startDate": "",
             "endDate": "",
-            "priority": calculate_priority(task["difficulty"], task["expected_workhours"]),
+            "difficulty": task["difficulty"],
+            "expected_workhours": task["expected_workhours"],
+            "priority": None,
             "epic": epic_id
         }
         task_to_store.append(task_data)
+    score_tasks(task_to_store, workhours_per_day)
     logger.info(f"🔍 epic {epic_id}에 속한 task 정의 완료: {task_to_store}")
-    epic_description = gpt_result["epic_description"]
-    if epic["description"] is None:
+    epic_description = gpt_result.get("epic_description")
+    if epic["description"] is None and epic_description is not None:
         epic["description"] = epic_description
         logger.info(f"🔍 epic {epic['title']}의 description이 공란인 관계로 새롭게 정의된 {epic_description}을 저장합니다.")
     
@@ -384,11 +514,11 @@ Sprint 생성 POST API에 라우팅 되는 함수
 6. pendingTaskIds가 task_db_data에 모두 존재하는지 검사한다. 누락된 task는 task_id로 정보를 가져와서 task_db_data에 추가한다.
 7. task_db_data를 epic 단위로 묶어서 tasks_by_epic을 정의하고 epic과 epic 내 task를 우선순위("priority") 내림차순 정렬한다.
 8. 정렬된 tasks_by_epic을 바탕으로 각 epic의 총 우선순위를 계산하고, epic 단위로 sprint를 확장하면서 epic에 속한 task들의 expected_workhours의 합이 effective_mandays를 초과하지 않는지 검사한다.
-9. 첫 번째 sprint에 들어갈 epic을 확정하고, 포함된 task들의 startDate, endDate를 expected_workhours를 바탕으로 정의한다.
-이때 startDate 또는 endDate가 존재한다면 해당 값을 그대로 사용하고, 존재하지 않는다면 sprint 시작일을 startDate로 통일한다.
+9. 첫 번째 sprint에 들어갈 epic을 확정하고, 포함된 task들의 startDate, endDate를 task_scheduler로 정의한다.
+이때 expected_workhours, workhours_per_day, 담당자별 가용 일정, epic(feature) 기간과 sprint 기간을 고려하며 주말은 제외한다.
 '''
 
-async def create_sprint(project_id: str, pending_tasks_ids: Optional[List[str]], start_date: datetime) -> Dict[str, Any]:
+async def create_sprint(project_id: str, pending_tasks_ids: Optional[List[str]], start_date: datetime, force_regenerate: bool = False, progress_callback: Optional[Callable[[str, int], Awaitable[None]]] = None) -> Dict[str, Any]:
     feature_collection, project_collection, epic_collection, task_collection, user_collection = await init_collections()
     logger.info(f"🔍 스프린트 생성 시작: {project_id}")
     assert project_id is not None, "project_id가 존재하지 않습니다."
@@ -405,10 +535,11 @@ async def create_sprint(project_id: str, pending_tasks_ids: Optional[List[str]],
         logger.error(f"🚨 epic collection 접근 중 오류 발생: {e}", exc_info=True)
         raise e
     logger.info("✅ MongoDB에서 epic 정보들 로드 완료")
+    await report_progress(progress_callback, "epics_loaded", 10)
     
     ### 2단계: projectId를 사용하여 프로젝트 멤버 정보("project_members")를 구성한다.
-    project_members = await get_project_members(project_id)
-    assert project_members is not None, "project_members가 존재하지 않습니다."
+    member_context = await get_project_member_context(project_id)
+    project_members = member_context.member_tuples()
     
     ### 3단계: 전체 프로젝트 기간에 따라 sprint_days, workhours_per_day를 정의하고, 정의된 값들을 바탕으로 effective_mandays를 계산한다.
     # 프로젝트 기간 정보 추출
@@ -453,11 +584,12 @@ async def create_sprint(project_id: str, pending_tasks_ids: Optional[List[str]],
     efficiency_factor = 1.0
     number_of_developers = len(project_members)
     eff_mandays = await calculate_eff_mandays(efficiency_factor, number_of_developers, sprint_days, workhours_per_day)
-    
+    await report_progress(progress_callback, "capacity_calculated", 20)
     
     ### 4단계: 각 epic에 대한 task 정보("task_db_data")를 조회한다. 이떄 조회된 task들이 task_id를 갖는지 검사한다.
     ### 만약 featureId가 존재하는 epic이거나 task가 없는 epic이라면 task를 생성하는 로직을 추가로 수행한다.
     captured_tasks=[]
+    epic_windows = {}   # feature로부터 정의된 epic의 (startDate, endDate)
     for epic in epics:
         assert epic["_id"] is not None, "epic에 _id가 없습니다."    # epic은 id가 없으면 안 됨
         epic_id = epic["_id"]
@@ -476,23 +608,14 @@ async def create_sprint(project_id: str, pending_tasks_ids: Optional[List[str]],
                 if "featureId" in epic and epic["featureId"] is not None:  # featureId가 존재하는 epic
                     logger.info(f"❌ - ✅ epic {epic['title']}에 featureId가 존재합니다. feature 정보로부터 새로운 task 정보를 생성합니다.")
                     feature_id = epic["featureId"]
-                    task_defined_from_feature = await create_task_from_feature(epic_id, feature_id, project_id, workhours_per_day)
-                    try:
-                        for task in task_defined_from_feature:
-                            task["priority"] = calculate_priority(task["difficulty"], task["expected_workhours"])
-                    except Exception as e:
-                        logger.error(f"🚨 feature 정보로부터 새롭게 정의된 task의 우선순위 계산 중 오류 발생: {e}", exc_info=True)
-                        raise e
+                    feature = await feature_collection.find_one({"featureId": feature_id})
+                    task_defined_from_feature = await create_task_from_feature(epic_id, feature_id, project_id, workhours_per_day, force_regenerate, feature=feature)
+                    if feature is not None:
+                        epic_windows[epic_id] = (feature["startDate"], feature["endDate"])
                     captured_tasks.extend(task_defined_from_feature)
                 else:
                     logger.info(f"❌ - ❌ epic {epic['title']}의 featureId가 없습니다. epic 정보로부터 새로운 task 정보를 생성합니다.")
-                    task_defined_from_null = await create_task_from_null(epic_id, project_id, workhours_per_day)
-                    try:
-                        for task in task_defined_from_null:
-                            task["priority"] = calculate_priority(task["difficulty"], task["expected_workhours"])
-                    except Exception as e:
-                        logger.error(f"🚨 null 정보로부터 새롭게 정의된 task의 우선순위 계산 중 오류 발생: {e}", exc_info=True)
-                        raise e
+                    task_defined_from_null = await create_task_from_null(epic_id, project_id, workhours_per_day, force_regenerate)
                     captured_tasks.extend(task_defined_from_null)
             else:   # 정의된 하위 task가 있는 epic은 기존 task 정보를 사용하되, null인 값을 채워 넣습니다.
                 logger.info(f"✅ epic {epic['title']}의 task 정보가 이미 존재합니다. 기존 task 정보를 사용합니다.")
@@ -516,7 +639,8 @@ async def create_sprint(project_id: str, pending_tasks_ids: Optional[List[str]],
                         # pendingTask는 이미 포함되어 있었든 아니든 중요도를 높게 변경해서 epic의 맨 앞에 위치시킨다.
                         try:
                             for task in task_defined_from_epic:
-                                task["priority"] = 300
+                                task["pending"] = True
+                                task["priority"] = PENDING_PRIORITY
                             captured_tasks.extend(task_defined_from_epic)
                         except Exception as e:
                             logger.error(f"🚨 pendingTaskId: {pending_task_id}인 task를 맨 앞에 위치시키는 중 오류 발생: {e}", exc_info=True)
@@ -562,69 +686,35 @@ async def create_sprint(project_id: str, pending_tasks_ids: Optional[List[str]],
     assert len(tasks_by_epic) > 0, "tasks_by_epic 정의에 실패했습니다."
     
     logger.warning(f"❗️ tasks_by_epic (에픽 별로 정의된 태스크 목록입니다. 다음의 항목이 중복된 내용 없이 잘 구성되어 있는지 반드시 확인하세요): {tasks_by_epic}")
+    await report_progress(progress_callback, "tasks_defined", 60)
+    
+    ### Sprint 기간 정의하기: 날짜 계산은 LLM이 아닌 로컬에서 수행한다.
+    sprint_start_date = to_date(start_date)
+    last_date = to_date(project_end_date)
+    if last_date < sprint_start_date:
+        logger.warning(f"⚠️ 프로젝트 종료일 {last_date}이 스프린트 시작일 {sprint_start_date}보다 이전입니다. 스프린트 주기만큼의 기간을 사용합니다.")
+        last_date = sprint_start_date + timedelta(days=sprint_days - 1)
+    number_of_sprints = max(1, math.ceil(((last_date - sprint_start_date).days + 1) / sprint_days))
+    sprint_windows = []
+    for i in range(number_of_sprints):
+        window_start = sprint_start_date + timedelta(days=i * sprint_days)
+        window_end = min(window_start + timedelta(days=sprint_days - 1), last_date)
+        sprint_windows.append((window_start, window_end))
+    logger.info(f"⚙️ 스프린트 {number_of_sprints}개의 기간: {sprint_windows}")
+    
+    # 프롬프트에는 필요한 필드만 짧은 alias(E1, T1, ...)와 함께 전달하고, 응답을 받은 뒤 원래 epic/task 정보로 복원
+    aliases = AliasMap()
+    epics_text = encode_tasks_by_epic(tasks_by_epic, aliases)
+    record_token_savings("sprint", tasks_by_epic, epics_text)
     
     ### Sprint 정의하기
-    sprint_prompt = ChatPromptTemplate.from_template("""
-    당신은 애자일 마스터입니다. 당신의 업무는 주어지는 Epic과 Epic별 Task의 정보를 바탕으로 적절한 Sprint Backlog를 생성하는 것입니다.
-    명심하세요. 당신의 주요 언어는 한국어입니다.
-    다음의 과정을 반드시 순서대로 진행하고 모두 완료해야 합니다.
-    1. 현재 설정된 스프린트의 주기는 {sprint_days}일입니다. 날짜 {today}부터 {project_end_date}까지 프로젝트가 진행되므로 {sprint_days} 단위로 총 몇 개의 sprint가 구성될 수 있고, 각 sprint의 시작일과 종료일은 무엇인지 판단하세요.
-    2. 각 스프린트에는 {epics}에 정의된 epic이 최소 하나 이상 포함되어야 합니다. 각 epic마다 "epicId" 필드가 존재하고, 각 epic에는 "tasks" 필드가 존재하므로 스프린트에 epic을 배정할 때 해당 epic의 모든 정보를 누락없이 포함하세요.
-    3. {epics}는 priority가 높은 순서대로 정렬된 데이터이므로, 각 스프린트에 되도록 제공된 순서대로 epic을 추가하세요.
-    4. epic에 포함된 task들의 priority를 점검하세요. 같은 epic에 포함된 task들의 priority는 서로 값이 30 이상씩 차이가 나야 합니다.
-    만약 그렇지 않다면, task의 priority를 task가 존재하는 순서대로 300부터 50씩 감소하도록 조정하세요. 반드시 같은 epic에 속한 task들이 서로 같은 priority 값을 가지지 않도록 한 번 더 확인하세요.
-    5. 각 epic의 "tasks" 필드에서 "expected_workhours" 필드를 찾아 그 값을 모두 합산하여 sprint별 총 작업량을 계산하세요.
-    6. 계산된 총 작업량이 {eff_mandays}를 초과하는지 검사하세요. 만약 초과한다면 모든 task의 expected_workhours를 0.75배로 일괄되게 축소하세요.
-    7. 0.75배로 조정된 "expected_workhours"의 합산이 {eff_mandays}를 초과하는지 검토하세요. 초과할 경우, 모든 task의 expected_workhours를 0.5배로 한 번 더 바꾸세요. 초과하지 않는 경우에는 바꿀 필요 없이 다음 단계로 넘어가세요.
-    8. sprint_days, eff_mandays, workhours_per_day를 4~6번의 계산 과정에 사용한 값 그대로 반환하세요.
-    9. {epics}안에 정의된 epicId는 반드시 그대로 반환하세요. 다시 한 번 말합니다, {epics}안에 정의된 epicId는 절대로 바꾸지 말고 필요한 곳에 그대로 반환하세요.
-    10. 스프린트의 description은 해당 스프린트에 포함된 epic들의 성격을 정의할 수 있는 하나의 문장으로 작성하고, 스프린트의 title은 description을 요약하여 제목으로 정의하세요.
-    
-    결과를 다음과 같은 형식으로 반환하세요. 이때, 만약 startDate와 endDate가 정의되지 않은 task가 존재한다면, sprint와 동일한 시작일, 종료일을 적용하세요.
-    반드시 tasks의 모든 field가 값을 가지는지 확인하세요. 또한 priority 값이 중복되는 task가 존재하지 않도록 하세요.
-    반드시 다음 JSON 형식으로만 응답해주세요. 다른 형식의 응답은 허용되지 않습니다:
-    {{
-        "sprint_days": int,
-        "eff_mandays": int,
-        "workhours_per_day": int,
-        "number_of_sprints": int,
-        "sprints": [
-        {{
-            "title": "string",
-            "description": "string",
-            "startDate": "YYYY-MM-DD",
-            "endDate": "YYYY-MM-DD",
-            "epics": [
-            {{
-                "epicId": "string",
-                "tasks": [
-                {{
-                    "title": "string",
-                    "description": "string",
-                    "assignee": "string",
-                    "startDate": "YYYY-MM-DD",
-                    "endDate": "YYYY-MM-DD",
-                    "expected_workhours": int,
-                    "priority": int
-                }},
-                ...
-                ]
-            }},
-            ...
-            ]
-        }},
-        ...
-        ]
-    }}
-    """)
-    
-    messages = sprint_prompt.format_messages(
+    messages = SPRINT_PROMPT.format_messages(
+        project_context=render_project_context(member_context),
         eff_mandays=eff_mandays,
         sprint_days=sprint_days,
         workhours_per_day=workhours_per_day,
-        today=start_date,
-        project_end_date=project_end_date,
-        epics=tasks_by_epic,
+        number_of_sprints=number_of_sprints,
+        epics=epics_text,
     )
     
     # LLM Config
@@ -633,6 +723,7 @@ async def create_sprint(project_id: str, pending_tasks_ids: Optional[List[str]],
         temperature=0.4,
     )
     response = await llm.ainvoke(messages)
+    record_prompt_usage("sprint", response)
 
     try:
         content = response.content
@@ -645,11 +736,12 @@ async def create_sprint(project_id: str, pending_tasks_ids: Optional[List[str]],
         logger.error(f"GPT API 처리 중 오류 발생: {e}", exc_info=True)
         raise e
     
+    await report_progress(progress_callback, "sprint_generated", 85)
+    
     # GPT가 정의한 Sprint 정보 검토
     gpt_sprint_days = gpt_result["sprint_days"]
     gpt_workhours_per_day = gpt_result["workhours_per_day"]
     gpt_eff_mandays = gpt_result["eff_mandays"]
-    number_of_sprints = gpt_result["number_of_sprints"]
     
     if gpt_sprint_days is None:
         logger.warning(f"⚠️ gpt_result로부터 sprint_days 정보를 추출할 수 없습니다. 기존에 책정된 스프린트 주기: {sprint_days}일을 사용합니다.")
@@ -657,13 +749,11 @@ async def create_sprint(project_id: str, pending_tasks_ids: Optional[List[str]],
         logger.warning(f"⚠️ gpt_result로부터 workhours_per_day 정보를 추출할 수 없습니다. 기존에 책정된 1일 작업 가능 시간: {workhours_per_day}시간을 사용합니다.")
     if gpt_eff_mandays is None:
         logger.warning(f"⚠️ gpt_result로부터 eff_mandays 정보를 추출할 수 없습니다. 기존에 책정된 개발팀의 실제 작업 가능 시간: {eff_mandays}시간을 사용합니다.")
-    if number_of_sprints is None:
-        logger.warning(f"⚠️ gpt_result로부터 number_of_sprints 정보를 추출할 수 없습니다.")
     
     sprint_days = gpt_sprint_days if gpt_sprint_days is not None else sprint_days
-    workhours_per_day = gpt_workhours_per_day if gpt_workhours_per_day is not None else workhours_per_day
+    # 0 이하의 값은 일정 배정(required_workdays)을 실패시키므로 범위를 벗어나면 로컬에서 계산한 값을 사용
+    workhours_per_day = resolve_workhours_per_day(gpt_workhours_per_day, workhours_per_day)
     eff_mandays = gpt_eff_mandays if gpt_eff_mandays is not None else eff_mandays
-    number_of_sprints = number_of_sprints if number_of_sprints is not None else 1
     
     logger.info(f"⚙️ sprint 한 주기: {sprint_days}일")
     logger.info(f"⚙️ 생성된 총 스프린트의 개수: {number_of_sprints}개")
@@ -674,17 +764,11 @@ async def create_sprint(project_id: str, pending_tasks_ids: Optional[List[str]],
     # eff_mandays 내부에 sprint별로 포함된 task들의 '재조정된 기능별 예상 작업시간'의 총합이 들어오는지 확인
     sprints = gpt_result["sprints"]
     for sprint in sprints:
-        assert sprint is not None, "sprint를 감지하지 못하였습니다."
-        sum_of_workdays_per_sprint = 0
-        epics = sprint["epics"]
-        assert len(epics) > 0, "epic의 묶음(epics)을 감지하지 못하였습니다."
-        for epic in epics:
-            assert epic is not None, "epic을 감지하지 못하였습니다."
-            tasks = epic["tasks"]
-            assert len(tasks) > 0, "task의 묶음(tasks)을 감지하지 못하였습니다."
-            for task in tasks:
-                assert task is not None, "task을 감지하지 못하였습니다."
-                sum_of_workdays_per_sprint += task["expected_workhours"]
+        sprint["epics"] = restore_tasks_by_epic(sprint.get("epics", []), aliases, ("expected_workhours", "priority"))
+    # sprint마다 epic이, epic마다 task가 하나 이상 있는지 한 번에 검증
+    sprints = validate_sprints(sprints)
+    for sprint in sprints:
+        sum_of_workdays_per_sprint = sum(task["expected_workhours"] for epic in sprint["epics"] for task in epic["tasks"])
         logger.info(f"⚙️ 스프린트 {sprint['title']}에 포함된 태스크들의 예상 작업 일수의 합: {sum_of_workdays_per_sprint}시간")
         #logger.info(f"⚙️ effective mandays: {eff_mandays}시간")
         if eff_mandays < sum_of_workdays_per_sprint:
@@ -727,23 +811,26 @@ async def create_sprint(project_id: str, pending_tasks_ids: Optional[List[str]],
     ### Task 중복 구성 문제 해결하기 !!! ###
     first_sprint_epics = first_sprint["epics"]
     
-    priority_list = []
+    # 첫 번째 sprint의 기간과 epic 기간 안에서 담당자별 가용 일정을 고려하여 task 일정을 배정
+    first_sprint_start, first_sprint_end = sprint_windows[0]
+    first_sprint["startDate"] = format_date(first_sprint_start)
+    first_sprint["endDate"] = format_date(first_sprint_end)
+    availability = {}
     for epic in first_sprint_epics:
-        priority_list.extend([task["priority"] for task in epic["tasks"]])
-        logger.info(f"🔍 {epic['epicId']} 소속 tasks들의 priority 값 누적 목록: {priority_list}")
-    priority_list = list(set(priority_list))    # set을 사용해서 중복되는 우선순위를 걷어내 보자.
-    p30 = np.percentile(priority_list, 30)
-    p70 = np.percentile(priority_list, 70)
-    logger.info(f"----🔍 priority 목록의 30% 값: {p30}, 70% 값: {p70}----")
+        window_start, window_end = first_sprint_start, first_sprint_end
+        if epic["epicId"] in epic_windows:
+            epic_start, epic_end = (to_date(value) for value in epic_windows[epic["epicId"]])
+            if max(epic_start, window_start) <= min(epic_end, window_end):
+                window_start, window_end = max(epic_start, window_start), min(epic_end, window_end)
+        # DB에 저장된 task(pendingTask)의 일정은 유지하고 담당자 일정에 먼저 반영한 뒤, 새로 정의된 task를 배정
+        schedule_tasks([task for task in epic["tasks"] if task.get("pending")], window_start, window_end, workhours_per_day, availability, keep_existing=True)
+        schedule_tasks([task for task in epic["tasks"] if not task.get("pending")], window_start, window_end, workhours_per_day, availability)
+    
+    # 첫 번째 sprint의 모든 task priority를 한 번의 분위수 계산으로 50/150/250 구간화 (pendingTask는 250)
+    bucket_task_priorities([task for epic in first_sprint_epics for task in epic["tasks"]], pending_tasks_ids)
     
     for epic in first_sprint_epics:
         for task in epic["tasks"]:
-            if task["priority"] <= p30:
-                task["priority"] = 50
-            elif task["priority"] <= p70:
-                task["priority"] = 150
-            else:
-                task["priority"] = 250
             if task["assignee"] not in name_to_id:
                 logger.warning(f"⚠️ 현재 매핑된 사용자 목록: {list(name_to_id.keys())}")
                 logger.warning(f"⚠️ {task['title']}의 담당자인 {task['assignee']}가 매핑된 name_to_id에 존재하지 않습니다.")
@@ -785,6 +872,7 @@ async def create_sprint(project_id: str, pending_tasks_ids: Optional[List[str]],
         ]
     }
     logger.info(f"👉 API 응답 결과: {response}")
+    await report_progress(progress_callback, "finalized", 95)
     return response
     
 if __name__ == "__main__":
@@ -0,0 +1,178 @@
+import logging
+import os
+import re
+from typing import List, Optional
+
+import numpy as np
+from feature_embeddings import aembed_texts
+from prompt_serializer import count_tokens, record_token_savings
+
+logger = logging.getLogger(__name__)
+
+'''
+기능 정의서 텍스트의 섹션 분할과 기능 관련도 필터링
+- 추출된 정의서 텍스트를 제목/번호 패턴("1. 개요", "2.1 기능 요구사항", "제 3 장", "Ⅱ.", "[기능 목록]", "■" 등)으로 섹션으로 나눈다.
+  제목만 있는 짧은 섹션은 다음 섹션과 합치고, 너무 긴 섹션은 문장 경계에서 나눈다.
+- 섹션마다 기능 관련 키워드 밀도와 제목, 그리고 프로젝트 설명과의 embedding 유사도로 관련도를 계산한다.
+- 문서 전체가 DEFINITION_TOKEN_BUDGET 이하면 그대로 사용하고, 넘으면 관련도가 양수인 섹션을 높은 순서로 예산 안에서 골라
+  원래 순서대로 합친다.
+- 줄인 token 수는 /metrics/prompts의 tokenSavings에 "feature_definition.document"로 집계한다.
+'''
+
+DEFINITION_TOKEN_BUDGET = int(os.getenv("DEFINITION_TOKEN_BUDGET") or 6000)
+SECTION_MIN_CHARS = int(os.getenv("SECTION_MIN_CHARS") or 40)
+SECTION_MAX_CHARS = int(os.getenv("SECTION_MAX_CHARS") or 2000)
+KEYWORD_WEIGHT = float(os.getenv("SECTION_KEYWORD_WEIGHT") or 0.5)
+EMBEDDING_WEIGHT = float(os.getenv("SECTION_EMBEDDING_WEIGHT") or 0.5)
+
+# 섹션 시작 위치 (공백 다음에 오는 제목/번호 패턴)
+HEADING_PATTERN = re.compile(
+    r"(?:^|(?<=\s))(?="
+    r"제\s?\d{1,2}\s?[장절]\s"                                 # 제 1 장, 제2절
+    r"|\d{1,2}\.(?:\d{1,2}\.?){0,3}\s+[가-힣A-Za-z\[(]"        # 1. 개요, 2.1 기능, 2.1.3. 로그인
+    r"|(?:[IVX]{1,4}|[Ⅰ-Ⅹ])\.\s"                              # IV. , Ⅱ.
+    r"|[가나다라마바사아자차카타파하]\.\s"                       # 가. 나.
+    r"|[■□●○◆◇▶▷※•]"                                          # 기호 목록
+    r"|\[[^\]\s\d][^\]]{0,29}\]"                               # [기능 목록] (인용 번호 [1]은 제외)
+    r")"
+)
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?다])\s+")
+
+FEATURE_KEYWORDS = (
+    "기능", "요구사항", "요구 사항", "사용자", "회원", "로그인", "화면", "페이지", "메뉴", "버튼", "입력", "출력",
+    "조회", "등록", "수정", "삭제", "검색", "관리", "결제", "알림", "업로드", "다운로드", "API", "할 수 있", "제공",
+)
+FEATURE_HEADING_KEYWORDS = ("기능", "요구사항", "요구 사항", "유스케이스", "use case", "feature", "function", "시나리오", "화면 설계")
+OFF_TOPIC_HEADING_KEYWORDS = ("목차", "참고문헌", "참고 문헌", "팀 소개", "팀원", "예산", "회의록", "부록")
+HEADING_BONUS = 0.3
+KEYWORD_SATURATION = 2.0    # 100자당 키워드 등장 횟수가 이 값 이상이면 키워드 점수 1
+FEATURE_QUERY = "서비스가 제공하는 기능 목록과 사용자 요구사항"
+
+
+class DocumentSection:
+    __slots__ = ("position", "text", "heading", "tokens", "score")
+
+    def __init__(self, position: int, text: str):
+        self.position = position
+        self.text = text
+        self.heading = text[:40]
+        self.tokens = 0
+        self.score = 0.0
+
+    def __repr__(self) -> str:
+        return f"DocumentSection({self.position}, {self.heading!r}, score={self.score:.3f})"
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    if len(text) <= max_chars:
+        return [text]
+    parts, current = [], ""
+    for sentence in SENTENCE_END_PATTERN.split(text):
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            parts.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+        # 문장 경계가 없는 긴 텍스트는 글자 수로 자른다
+        while len(current) > max_chars:
+            parts.append(current[:max_chars])
+            current = current[max_chars:]
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_sections(text: str, min_chars: int = SECTION_MIN_CHARS, max_chars: int = SECTION_MAX_CHARS) -> List[DocumentSection]:
+    """
+    정의서 텍스트를 제목/번호 패턴 기준으로 섹션으로 나눕니다.
+
+    Args:
+        text (str): 정리된 정의서 텍스트
+        min_chars (int): 이보다 짧은 섹션은 다음 섹션과 합침
+        max_chars (int): 이보다 긴 섹션은 문장 경계에서 나눔
+
+    Returns:
+        List[DocumentSection]: 문서 순서대로 정렬된 섹션 목록
+    """
+    starts = sorted({0, *(match.start() for match in HEADING_PATTERN.finditer(text))})
+    pieces = [text[start:end].strip() for start, end in zip(starts, starts[1:] + [len(text)])]
+
+    merged, pending = [], ""
+    for piece in pieces:
+        if not piece:
+            continue
+        pending = f"{pending} {piece}" if pending else piece
+        if len(pending) >= min_chars:
+            merged.append(pending)
+            pending = ""
+    if pending:
+        merged.append(pending)
+
+    sections = []
+    for section_text in merged:
+        for part in _split_long(section_text, max_chars):
+            sections.append(DocumentSection(len(sections), part))
+    return sections
+
+
+def keyword_score(section: DocumentSection) -> float:
+    """
+    기능 관련 키워드 밀도(0~1)에 제목 가산점을 더한 점수를 반환합니다.
+    제목에 기능/요구사항이 있으면 HEADING_BONUS를 더하고, 목차/참고문헌 등이면 뺍니다.
+    """
+    lowered = section.text.lower()
+    hits = sum(lowered.count(keyword.lower()) for keyword in FEATURE_KEYWORDS)
+    density = hits / max(len(section.text) / 100, 1)
+    score = min(density / KEYWORD_SATURATION, 1.0)
+    heading = section.heading.lower()
+    if any(keyword in heading for keyword in FEATURE_HEADING_KEYWORDS):
+        score += HEADING_BONUS
+    if any(keyword in heading for keyword in OFF_TOPIC_HEADING_KEYWORDS):
+        score -= HEADING_BONUS
+    return score
+
+
+async def score_sections(sections: List[DocumentSection], query: str = "") -> List[DocumentSection]:
+    """섹션마다 키워드 점수와 (프로젝트 설명 + 기능 질의)와의 embedding 유사도를 합쳐 score를 계산합니다."""
+    if not sections:
+        return sections
+    vectors = await aembed_texts([f"{query} {FEATURE_QUERY}".strip()] + [section.text for section in sections])
+    similarities = vectors[1:] @ vectors[0]
+    for section, similarity in zip(sections, np.clip(similarities, 0, 1)):
+        section.score = KEYWORD_WEIGHT * keyword_score(section) + EMBEDDING_WEIGHT * float(similarity)
+    return sections
+
+
+async def select_relevant_sections(text: str, query: str = "", token_budget: Optional[int] = None) -> str:
+    """
+    정의서 텍스트에서 기능과 관련된 섹션만 token 예산 안에서 골라 반환합니다.
+
+    Args:
+        text (str): 정리된 정의서 텍스트
+        query (str): 프로젝트 설명 (embedding 유사도 계산에 사용)
+        token_budget (Optional[int]): 선택할 섹션의 최대 token 수 (기본값: DEFINITION_TOKEN_BUDGET)
+
+    Returns:
+        str: 선택된 섹션을 문서 순서대로 합친 텍스트. 문서가 예산 이하면 원문 그대로
+    """
+    token_budget = token_budget or DEFINITION_TOKEN_BUDGET
+    total_tokens = count_tokens(text)
+    if total_tokens <= token_budget:
+        return text
+
+    sections = await score_sections(split_sections(text), query)
+    selected, used = [], 0
+    for section in sorted(sections, key=lambda section: section.score, reverse=True):
+        section.tokens = count_tokens(section.text)
+        if section.score <= 0 or used + section.tokens > token_budget:
+            continue
+        selected.append(section)
+        used += section.tokens
+    if not selected:
+        # 예산보다 큰 섹션이나 관련 없는 섹션만 있으면 가장 관련도가 높은 섹션을 예산만큼 잘라 사용
+        best = max(sections, key=lambda section: section.score)
+        selected = [DocumentSection(best.position, best.text[:token_budget])]
+
+    filtered = "\n\n".join(section.text for section in sorted(selected, key=lambda section: section.position))
+    logger.info(f"📑 정의서 섹션 {len(sections)}개 중 {len(selected)}개 선택 (token {total_tokens} -> 약 {used})")
+    record_token_savings("feature_definition.document", text, filtered)
+    return filtered
@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from redis.exceptions import WatchError
+from redis_setting import redis_client
+
+logger = logging.getLogger(__name__)
+
+'''
+작성 중인 기능 명세서 초안(draft) 저장소
+- 기능 하나를 Redis hash "feature_draft:{email}"의 field 하나(field: 기능 _id, value: 기능 JSON)로 저장한다.
+- 기능 순서(order), 수정 시각(updatedAt), 버전(version)은 metadata hash "feature_draft_meta:{email}"에 저장한다.
+- 일부 기능만 읽거나(HMGET) 변경된 기능만 쓸 수 있으므로, 수정할 때마다 전체 목록을 다시 직렬화하지 않는다.
+- 프로젝트 정보(key: email)와 초안은 pipeline 한 번으로 함께 조회한다.
+- 모든 쓰기는 version을 1 증가시킨다. expected_version을 지정한 쓰기는 metadata hash를 WATCH하여 version이 그대로일 때만
+  적용되며(check-and-set), 그 사이 다른 요청이 먼저 쓴 경우 DraftVersionConflict를 발생시킨다.
+- 초안은 기능 명세 단계가 끝나 MongoDB에 저장되면 삭제하고(delete), 끝나지 않고 방치된 초안은 마지막 쓰기 후
+  FEATURE_DRAFT_TTL초가 지나면 만료된다. (모든 쓰기가 초안과 metadata hash의 TTL을 다시 설정)
+'''
+
+DRAFT_KEY_PREFIX = "feature_draft"
+DRAFT_META_KEY_PREFIX = "feature_draft_meta"
+MAX_UPDATE_RETRIES = 5
+FEATURE_DRAFT_TTL = int(os.getenv("FEATURE_DRAFT_TTL") or 60 * 60 * 24 * 7)     # 기본 7일
+
+
+def draft_key(email: str) -> str:
+    return f"{DRAFT_KEY_PREFIX}:{email}"
+
+
+def draft_meta_key(email: str) -> str:
+    return f"{DRAFT_META_KEY_PREFIX}:{email}"
+
+
+def _encode(feature: Dict[str, Any]) -> str:
+    return json.dumps(feature, ensure_ascii=False, default=str)
+
+
+def _decode_json(value: Optional[str]) -> Any:
+    if value is None:
+        return None
+    return json.loads(value)
+
+
+class DraftVersionConflict(Exception):
+    """초안이 다른 요청에 의해 먼저 변경되어 쓰기를 적용할 수 없는 경우"""
+
+    def __init__(self, email: str, expected_version: int, current_version: int):
+        self.email = email
+        self.expected_version = expected_version
+        self.current_version = current_version
+        super().__init__(f"기능 명세서 초안이 다른 요청에 의해 변경되었습니다. (요청 버전: {expected_version}, 현재 버전: {current_version})")
+
+
+def _ordered(features_by_id: Dict[str, Dict[str, Any]], order: Optional[List[str]]) -> List[Dict[str, Any]]:
+    # order에 없는 기능(예: 순서 정보 유실)은 뒤에 붙인다
+    order = [feature_id for feature_id in order or [] if feature_id in features_by_id]
+    ordered_ids = set(order)
+    remaining = [feature_id for feature_id in features_by_id if feature_id not in ordered_ids]
+    return [features_by_id[feature_id] for feature_id in order + remaining]
+
+
+def _expire_draft(pipe, email: str, ttl: int) -> None:
+    pipe.expire(draft_key(email), ttl)
+    pipe.expire(draft_meta_key(email), ttl)
+
+
+class FeatureDraftStore:
+    """Redis hash 기반 기능 명세서 초안 저장소"""
+
+    def __init__(self, client, ttl: int = FEATURE_DRAFT_TTL):
+        self.client = client
+        self.ttl = ttl
+
+    async def save_all(self, email: str, features: List[Dict[str, Any]]) -> int:
+        """초안 전체를 교체하고 새 version을 반환합니다. (기능 명세서 최초 생성 시 사용)"""
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(draft_key(email))
+            if features:
+                pipe.hset(draft_key(email), mapping={feature["_id"]: _encode(feature) for feature in features})
+            pipe.hset(draft_meta_key(email), mapping={
+                "order": json.dumps([feature["_id"] for feature in features]),
+                "updatedAt": time.time(),
+            })
+            pipe.hincrby(draft_meta_key(email), "version", 1)
+            _expire_draft(pipe, email, self.ttl)
+            *_, version, _, _ = await pipe.execute()
+        logger.info(f"✅ 기능 명세서 초안 저장: {email} (기능 {len(features)}개, 버전 {version})")
+        return version
+
+    async def load_all(self, email: str) -> Optional[List[Dict[str, Any]]]:
+        """초안의 모든 기능을 순서대로 반환합니다. 초안이 없으면 None을 반환합니다."""
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(draft_key(email))
+            pipe.hget(draft_meta_key(email), "order")
+            raw, order = await pipe.execute()
+        if not raw:
+            return None
+        return _ordered({feature_id: json.loads(value) for feature_id, value in raw.items()}, _decode_json(order))
+
+    async def load_features(self, email: str, feature_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """지정한 기능만 조회합니다. 존재하지 않는 기능은 결과에서 제외됩니다."""
+        feature_ids = list(feature_ids)
+        if not feature_ids:
+            return {}
+        values = await self.client.hmget(draft_key(email), feature_ids)
+        return {feature_id: json.loads(value) for feature_id, value in zip(feature_ids, values) if value is not None}
+
+    async def load_with_project(self, email: str) -> Tuple[Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+        """프로젝트 정보(key: email)와 초안을 pipeline 한 번으로 조회합니다."""
+        project, features, _ = await self.load_versioned_with_project(email)
+        return project, features
+
+    async def load_versioned_with_project(self, email: str) -> Tuple[Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]], int]:
+        """프로젝트 정보(key: email), 초안과 초안의 version을 pipeline 한 번으로 조회합니다."""
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(email)
+            pipe.hgetall(draft_key(email))
+            pipe.hmget(draft_meta_key(email), ["order", "version"])
+            project, raw, (order, version) = await pipe.execute()
+        features = None
+        if raw:
+            features = _ordered({feature_id: json.loads(value) for feature_id, value in raw.items()}, _decode_json(order))
+        project = _decode_json(project)
+        if isinstance(project, str):    # save_to_redis로 문자열이 한 번 더 직렬화되어 저장된 경우
+            project = json.loads(project)
+        return project, features, int(version or 0)
+
+    async def apply_changes(
+        self,
+        email: str,
+        upserts: List[Dict[str, Any]],
+        deleted_ids: Iterable[str] = (),
+        order: Optional[List[str]] = None,
+        expected_version: Optional[int] = None,
+    ) -> int:
+        """
+        변경된 기능만 저장하고 삭제된 기능을 제거합니다. 모든 변경은 하나의 MULTI/EXEC로 적용됩니다.
+
+        Args:
+            email (str): 사용자 email
+            upserts (List[Dict[str, Any]]): 생성 또는 수정된 기능 목록
+            deleted_ids (Iterable[str]): 삭제된 기능의 _id 목록
+            order (Optional[List[str]]): 변경 후 전체 기능의 _id 순서 (지정하지 않으면 기존 순서 유지)
+            expected_version (Optional[int]): 지정하면 초안의 version이 이 값과 같을 때만 적용 (check-and-set)
+
+        Returns:
+            int: 변경 후 초안의 version
+
+        Raises:
+            DraftVersionConflict: expected_version이 현재 version과 다르거나, 적용 중 다른 요청이 먼저 쓴 경우
+        """
+        deleted_ids = list(deleted_ids)
+        meta: Dict[str, Any] = {"updatedAt": time.time()}
+        if order is not None:
+            meta["order"] = json.dumps(order)
+
+        def queue_writes(pipe) -> None:
+            if upserts:
+                pipe.hset(draft_key(email), mapping={feature["_id"]: _encode(feature) for feature in upserts})
+            if deleted_ids:
+                pipe.hdel(draft_key(email), *deleted_ids)
+            pipe.hset(draft_meta_key(email), mapping=meta)
+            pipe.hincrby(draft_meta_key(email), "version", 1)
+            _expire_draft(pipe, email, self.ttl)
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            if expected_version is None:
+                queue_writes(pipe)
+                *_, version, _, _ = await pipe.execute()
+            else:
+                try:
+                    await pipe.watch(draft_meta_key(email))
+                    current_version = int(await pipe.hget(draft_meta_key(email), "version") or 0)
+                    if current_version != expected_version:
+                        await pipe.unwatch()
+                        raise DraftVersionConflict(email, expected_version, current_version)
+                    pipe.multi()
+                    queue_writes(pipe)
+                    *_, version, _, _ = await pipe.execute()
+                except WatchError:
+                    current_version = int(await self.client.hget(draft_meta_key(email), "version") or 0)
+                    raise DraftVersionConflict(email, expected_version, current_version)
+        logger.info(f"✅ 기능 명세서 초안 변경 저장: {email} (저장 {len(upserts)}개, 삭제 {len(deleted_ids)}개, 버전 {version})")
+        return version
+
+    async def update_feature(self, email: str, feature_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        기능 하나의 일부 필드를 원자적으로 수정합니다. (WATCH 기반 optimistic transaction)
+
+        Returns:
+            Optional[Dict[str, Any]]: 수정된 기능 (기능이 없으면 None)
+
+        Raises:
+            RuntimeError: 동시 수정으로 MAX_UPDATE_RETRIES회 모두 실패한 경우
+        """
+        key = draft_key(email)
+        for _ in range(MAX_UPDATE_RETRIES):
+            async with self.client.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(key)
+                    current = await pipe.hget(key, feature_id)
+                    if current is None:
+                        await pipe.unwatch()
+                        return None
+                    feature = dict(json.loads(current), **fields)
+                    pipe.multi()
+                    pipe.hset(key, feature_id, _encode(feature))
+                    pipe.hset(draft_meta_key(email), "updatedAt", time.time())
+                    pipe.hincrby(draft_meta_key(email), "version", 1)
+                    _expire_draft(pipe, email, self.ttl)
+                    await pipe.execute()
+                    return feature
+                except WatchError:
+                    logger.info(f"♻️ 기능 {feature_id}이 동시에 수정되어 다시 시도합니다.")
+                    continue
+        raise RuntimeError(f"기능 {feature_id} 수정이 동시 수정으로 인해 실패했습니다.")
+
+    async def get_meta(self, email: str) -> Dict[str, Any]:
+        """초안의 metadata(order, updatedAt, version)를 반환합니다."""
+        raw = await self.client.hgetall(draft_meta_key(email))
+        return {
+            "order": _decode_json(raw.get("order")) or [],
+            "updatedAt": float(raw["updatedAt"]) if "updatedAt" in raw else None,
+            "version": int(raw.get("version", 0)),
+        }
+
+    async def delete(self, email: str) -> None:
+        """초안과 metadata를 삭제합니다. (기능 명세 단계가 끝나 MongoDB에 저장된 경우)"""
+        await self.client.delete(draft_key(email), draft_meta_key(email))
+
+
+def rebase_changes(
+    base_features: List[Dict[str, Any]],
+    latest_features: List[Dict[str, Any]],
+    upserts: List[Dict[str, Any]],
+    deleted_ids: Iterable[str],
+    order: List[str],
+) -> Optional[List[str]]:
+    """
+    base 초안을 기준으로 만든 변경(upserts, deleted_ids)을 다른 요청이 먼저 저장한 latest 초안 위에 다시 적용할 수 있는지 확인합니다.
+    다른 요청이 변경(수정, 생성, 삭제)한 기능과 이번 변경이 겹치지 않으면 적용할 수 있습니다.
+
+    Returns:
+        Optional[List[str]]: latest 초안에 변경을 적용한 뒤의 기능 _id 순서 (변경이 겹치면 None)
+    """
+    base_by_id = {feature["_id"]: feature for feature in base_features}
+    latest_by_id = {feature["_id"]: feature for feature in latest_features}
+    concurrent_ids = {
+        feature_id for feature_id in base_by_id.keys() | latest_by_id.keys()
+        if base_by_id.get(feature_id) != latest_by_id.get(feature_id)
+    }
+    deleted_ids = set(deleted_ids)
+    own_ids = {feature["_id"] for feature in upserts} | deleted_ids
+    overlap = concurrent_ids & own_ids
+    if overlap:
+        logger.info(f"♻️ 동시에 변경된 기능이 겹쳐 rebase할 수 없습니다: {sorted(overlap)}")
+        return None
+    # latest 순서를 유지하고, 이번 요청에서 새로 생성한 기능을 뒤에 붙인다
+    created_ids = {feature["_id"] for feature in upserts} - base_by_id.keys()
+    rebased_order = [feature_id for feature_id in latest_by_id if feature_id not in deleted_ids]
+    rebased_order += [feature_id for feature_id in order if feature_id in created_ids]
+    return rebased_order
+
+
+feature_draft_store = FeatureDraftStore(redis_client)
@@ -1,18 +1,17 @@
-import io
 import json
 import logging
 import os
 from typing import Any, Dict, List, Optional, Union
 
-import aiofiles
-import aiohttp
-import httpx
+from definition_sections import select_relevant_sections
 from dotenv import load_dotenv
+from feedback_intent import classify_feedback_intent
 from gpt_utils import extract_json_from_gpt_response
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
+from near_duplicates import (drop_near_duplicate_additions, drop_near_duplicates,
+                             normalize_feature_name)
 from openai import AsyncOpenAI
-from PyPDF2 import PdfReader
+from prompt_registry import record_prompt_usage, register_prompt
 from read_pdf_util import extract_pdf_text
 from redis_setting import load_from_redis, save_to_redis
 
@@ -25,6 +24,141 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
 
 
+FEATURE_FROM_DOCUMENT_PROMPT = register_prompt(
+    "feature_definition",
+    instructions="""
+    당신의 업무는 주니어 개발팀의 입장에서 개발하려는 서비스에 필요할 것으로 예상되는 기능 목록을 정의하는 것입니다.
+    각 기능은 구현 가능한 작은 단위여야 하고, 반드시 중복되지 않아야 합니다.
+
+    요청에는 개발팀이 사전에 정의한 정의서의 내용과 프로젝트 설명이 포함됩니다. 정의서는 기능을 포함해서 다른 정보들이 모두 섞인 텍스트 파일입니다.
+    따라서 해당 텍스트 파일을 읽고 "기능 목록"과 관련된 내용만 추출해서 features를 구성해 주세요.
+
+    정의서를 자세히 분석하여 다음 사항을 수행해주세요:
+    1. features는 정의서에 이미 명시되어 있는 정보입니다.
+    2. suggestions는 features에 없는 기능들 중에 추가로 필요할 것으로 예상되는 기능을 제안해주세요.
+
+    다음 형식으로 응답해주세요:
+    {{
+        "features": [
+            "정의서에서 추출한 기능1",
+            "정의서에서 추출한 기능2",
+            ...
+        ],
+        "suggestions": [
+            {{
+                "question": "이런 기능을 추가하시는 건 어떤가요?",
+                "answers": [
+                    "추가 제안 기능1",
+                    "추가 제안 기능2",
+                    ...
+                ]
+            }}
+        ]
+    }}
+
+    주의사항:
+    1. 정의서에 명시된 모든 기능을 반드시 포함해주세요.
+    2. 각 기능은 이름만 작성하며 모두 "~기능"으로 끝나야 합니다.
+    3. 기능 간 중복이 없도록 해주세요.
+    """,
+    request="""
+    정의서 내용:
+    {definition_content}
+
+    프로젝트 설명:
+    {user_input}
+    """,
+    with_project_context=False,
+)
+
+FEATURE_SUGGESTION_PROMPT = register_prompt(
+    "feature_suggestion",
+    instructions="""
+    당신의 역할은 주니어 개발팀의 입장에서 개발하려는 서비스에 필요할 것으로 예상되는 기능 목록을 정의하는 것입니다.
+    각 기능은 구현 가능한 작은 단위여야 하고, 반드시 중복되지 않아야 합니다.
+    다음 형식으로 추가하면 좋을 것으로 예상되는 기능 목록을 제안해 주세요:
+    {{
+        "suggestions": [
+            {{
+                "question": "이런 기능을 추가하시는 건 어떤가요?",
+                "answers": ["결제 기능", "주문 기능", "주문 조회 기능"]
+            }}
+        ]
+    }}
+    """,
+    request="""
+    프로젝트 설명:
+    {user_input}
+    """,
+    with_project_context=False,
+)
+
+DEFINITION_FEEDBACK_UPDATE_PROMPT = register_prompt(
+    "definition_feedback_update",
+    instructions="""
+    당신의 업무는 사용자의 피드백을 분석하여 기능 정의 단계를 계속 진행할지 종료할지 판단하고, 수정 요청이면 기능 목록을 업데이트하는 것입니다.
+
+    요청으로 전달되는 기능 정의 단계의 사용자 피드백이 다음 중 어떤 유형인지 판단해주세요:
+    1. 수정/추가 요청:
+    - 새로운 기능 추가 요청
+    - 기존 기능 수정 요청
+    - 기능 목록 변경 요청
+    예시: "장바구니 기능 추가해주세요", "결제 기능도 필요해요"
+
+    2. 종료 요청:
+    - 기능 정의 완료 의사 표현
+    - 더 이상의 수정이 필요 없다는 의견
+    - 다음 단계로 넘어가고 싶다는 의견
+    예시: "이대로 좋습니다", "더 이상 수정할 필요 없어요", "다음으로 넘어가죠"
+
+    1번 유형의 경우는 isNextStep을 0으로 설정하고, 현재 기능 목록과 피드백을 기반으로 업데이트한 전체 기능 목록을 features에 작성해주세요.
+    2번 유형의 경우는 isNextStep을 1로 설정하고, features는 빈 배열로 작성해주세요.
+
+    응답은 반드시 다음과 같은 JSON 형식으로만 작성해주세요:
+    {{
+        "isNextStep": 0,
+        "features": [
+            "기능명1",
+            "기능명2",
+            "기능명3"
+        ]
+    }}
+    """,
+    request="""
+    현재 기능 목록:
+    {current_features}
+
+    사용자 피드백:
+    {feedback}
+    """,
+    with_project_context=False,
+)
+
+DEFINITION_UPDATE_PROMPT = register_prompt(
+    "definition_update",
+    instructions="""
+    현재 기능 목록과 사용자 피드백을 기반으로 기능을 업데이트해주세요.
+
+    응답은 반드시 다음과 같은 JSON 형식으로만 작성해주세요:
+    {{
+        "features": [
+            "기능명1",
+            "기능명2",
+            "기능명3"
+        ]
+    }}
+    """,
+    request="""
+    현재 기능 목록:
+    {current_features}
+
+    사용자 피드백:
+    {feedback}
+    """,
+    with_project_context=False,
+)
+
+
 async def create_feature_definition(email: str, description: str, definition_url: Optional[str] = None) -> Dict[str, Any]:
     """
     기능 정의서를 생성합니다.
@@ -51,54 +185,17 @@ async def create_feature_definition(email: str, description: str, definition_url
         definition_content = await extract_pdf_text(predefined_definition)
         logger.info(f"기능 정의서 pdf로부터 텍스트 추출 완료: {definition_content}")
         
-        # GPT API 호출을 위한 프롬프트 정의
-        create_feature_prompt = ChatPromptTemplate.from_template("""
-        당신은 소프트웨어 요구사항 분석가입니다. 주니어 개발팀의 입장에서 개발하려는 서비스에 필요할 것으로 예상되는 기능 목록을 정의하는 것이 당신의 임무입니다. 
-        각 기능은 구현 가능한 작은 단위여야 하고, 반드시 중복되지 않아야 합니다.
-
-        다음은 개발팀이 사전에 정의한 정의서의 내용입니다. 이는 기능을 포함해서 다른 정보들이 모두 섞인 텍스트 파일입니다.
-        따라서 해당 텍스트 파일을 읽고 "기능 목록"과 관련된 내용만 추출해서 features를 구성해 주세요.
-        {definition_content}
-
-        위 정의서를 자세히 분석하여 다음 사항을 수행해주세요:
-        1. features는 정의서에 이미 명시되어 있는 정보입니다.
-        2. suggestions는 features에 없는 기능들 중에 추가로 필요할 것으로 예상되는 기능을 제안해주세요.
-
-        다음 형식으로 응답해주세요:
-        {{
-            "features": [
-                "정의서에서 추출한 기능1",
-                "정의서에서 추출한 기능2",
-                ...
-            ],
-            "suggestions": [
-                {{
-                    "question": "이런 기능을 추가하시는 건 어떤가요?",
-                    "answers": [
-                        "추가 제안 기능1",
-                        "추가 제안 기능2",
-                        ...
-                    ]
-                }}
-            ]
-        }}
-
-        주의사항:
-        1. 정의서에 명시된 모든 기능을 반드시 포함해주세요.
-        2. 각 기능은 이름만 작성하며 모두 "~기능"으로 끝나야 합니다.
-        3. 기능 간 중복이 없도록 해주세요.
-
-        프로젝트 설명:
-        {user_input}
-        """)
+        # 기능과 관련된 섹션만 token 예산 안에서 전달
+        definition_content = await select_relevant_sections(definition_content, user_input)
         
         # GPT API 호출
-        message = create_feature_prompt.format_messages(
+        message = FEATURE_FROM_DOCUMENT_PROMPT.format_messages(
             definition_content=definition_content,
             user_input=user_input
         )
         llm = ChatOpenAI(model="gpt-4o", temperature=0.7)
         response = llm.invoke(message)
+        record_prompt_usage("feature_definition", response)
         
         # 응답 파싱
         content = response.content
@@ -117,28 +214,11 @@ async def create_feature_definition(email: str, description: str, definition_url
     else:
         logger.info("❌ 기능 정의서가 존재하지 않습니다.")
         
-        # GPT API 호출을 위한 프롬프트 정의
-        create_feature_prompt = ChatPromptTemplate.from_template("""
-        당신의 역할은 주니어 개발팀의 입장에서 개발하려는 서비스에 필요할 것으로 예상되는 기능 목록을 정의하는 것입니다. 
-        각 기능은 구현 가능한 작은 단위여야 하고, 반드시 중복되지 않아야 합니다.
-        다음 형식으로 추가하면 좋을 것으로 예상되는 기능 목록을 제안해 주세요:
-        {{
-            "suggestions": [
-                {{
-                    "question": "이런 기능을 추가하시는 건 어떤가요?",
-                    "answers": ["결제 기능", "주문 기능", "주문 조회 기능"]
-                }}
-            ]
-        }}
-        
-        프로젝트 설명:
-        {user_input}
-        """)
-        
         # GPT API 호출
-        message = create_feature_prompt.format_messages(user_input=user_input)
+        message = FEATURE_SUGGESTION_PROMPT.format_messages(user_input=user_input)
         llm = ChatOpenAI(model="gpt-4o", temperature=0.7)
         response = llm.invoke(message)
+        record_prompt_usage("feature_suggestion", response)
         
         # 응답 파싱
         content = response.content
@@ -152,7 +232,13 @@ async def create_feature_definition(email: str, description: str, definition_url
         features = []
         suggestions = gpt_result["suggestions"][0]["answers"]
         print("기능 정의서로부터 추출한 제안 목록: ", suggestions)
-        
+
+    # 표현만 다른 중복 기능 제외 (정의서에서 추출한 기능을 제안보다 우선)
+    tagged = [("features", name) for name in features] + [("suggestions", name) for name in suggestions]
+    kept, _ = drop_near_duplicates(tagged, key=lambda item: item[1])
+    features = [name for source, name in kept if source == "features"]
+    suggestions = [name for source, name in kept if source == "suggestions"]
+
     # 파싱된 결과 반환
     result = {
         "suggestion": {
@@ -210,47 +296,9 @@ async def update_feature_definition(email: str, feedback: str) -> Dict[str, Any]
     if isinstance(feature_data, str):
         feature_data = json.loads(feature_data)
     
-    # 1. 피드백 분석
-    update_prompt = ChatPromptTemplate.from_template("""
-    당신은 사용자의 피드백을 분석하여 기능 정의 단계를 계속 진행할지 종료할지 판단하는 전문가입니다.
-
-    다음은 기능 정의 단계에서 받은 사용자의 피드백입니다:
-    {feedback}
-
-    이 피드백이 다음 중 어떤 유형인지 판단해주세요:
-    1. 수정/추가 요청:
-    - 새로운 기능 추가 요청
-    - 기존 기능 수정 요청
-    - 기능 목록 변경 요청
-    예시: "장바구니 기능 추가해주세요", "결제 기능도 필요해요"
-
-    2. 종료 요청:
-    - 기능 정의 완료 의사 표현
-    - 더 이상의 수정이 필요 없다는 의견
-    - 다음 단계로 넘어가고 싶다는 의견
-    예시: "이대로 좋습니다", "더 이상 수정할 필요 없어요", "다음으로 넘어가죠"
-
-    1번 유형의 경우는 isNextStep을 0으로, 2번 유형의 경우는 isNextStep을 1로 설정해주세요.
-    응답은 다음과 같은 형식으로 작성해주세요:
-    {{
-        "isNextStep": 1
-    }}
-    """)
-    
-    message = update_prompt.format_messages(feedback=feedback)
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
-    response = llm.invoke(message)
-    
-    try:
-        content = response.content
-        gpt_result = extract_json_from_gpt_response(content)
-    except Exception as e:
-        logger.error(f"GPT util 사용 중 오류 발생: {str(e)}", exc_info=True)
-        raise Exception(f"GPT util 사용 중 오류 발생: {str(e)}", exc_info=True) from e
-    
-    is_next_step = gpt_result["isNextStep"]
-    
-    if is_next_step == 1:
+    # 1. 피드백 분석 (명확한 피드백은 로컬에서 판단)
+    intent = classify_feedback_intent(feedback)
+    if intent.is_next_step == 1:
         result = {
             "features": feature_data,
             "isNextStep": True
@@ -258,79 +306,78 @@ async def update_feature_definition(email: str, feedback: str) -> Dict[str, Any]
         logger.info(f"👉 API 응답 결과: {result}")
         return result
     
+    # 2. 수정 요청이면 기능 목록만 업데이트하고, 의도가 애매하면 판단과 업데이트를 한 번의 호출로 요청
+    if intent.is_next_step is None:
+        prompt_name, prompt = "definition_feedback_update", DEFINITION_FEEDBACK_UPDATE_PROMPT
+    else:
+        prompt_name, prompt = "definition_update", DEFINITION_UPDATE_PROMPT
+    message = prompt.format_messages(
+        current_features=feature_data,
+        feedback=feedback
+    )
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
+    response = await llm.ainvoke(message)
+    record_prompt_usage(prompt_name, response)
     
-    if is_next_step == 0:
-        # 2. 기능을 수정/추가/삭제할 것을 요청하는 사용자 피드백이므로, 기능 목록을 업데이트 합니다.
-        update_features_prompt = ChatPromptTemplate.from_template("""
-        현재 기능 정의서와 사용자 피드백을 기반으로 기능을 업데이트해주세요.
-
-        현재 기능 목록:
-        {current_features}
-
-        사용자 피드백:
-        {feedback}
-
-        응답은 반드시 다음과 같은 JSON 형식으로만 작성해주세요:
-        {{
-            "features": [
-                "기능명1",
-                "기능명2",
-                "기능명3"
-            ]
-        }}
+    # 응답 파싱
+    try:
+        content = response.content
 
-        추가 설명이나 다른 텍스트는 포함하지 마세요.
-        """)
-    
-        message = update_features_prompt.format_messages(
-            current_features=feature_data,
-            feedback=feedback
-        )
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
-        response = llm.invoke(message)
-    
-        # 응답 파싱
         try:
-            content = response.content
-
-            try:
-                updated_features = extract_json_from_gpt_response(content)
-            except Exception as e:
-                logger.error(f"GPT util 사용 중 오류 발생: {str(e)}", exc_info=True)
-                raise Exception(f"GPT util 사용 중 오류 발생: {str(e)}", exc_info=True) from e
-        
-            if not isinstance(updated_features, dict) or "features" not in updated_features:
-                raise ValueError("응답이 올바른 형식이 아닙니다. 'features' 키가 필요합니다.")
-            if not isinstance(updated_features["features"], list):
-                raise ValueError("'features'는 리스트 형식이어야 합니다.")
-            
+            updated_features = extract_json_from_gpt_response(content)
         except Exception as e:
-            logger.error(f"GPT API 응답 처리 중 오류 발생: {str(e)}", exc_info=True)
-            raise Exception(f"GPT API 응답 처리 중 오류 발생: {str(e)}", exc_info=True) from e
-        
-        # Redis 업데이트
-        # 업데이트 전 데이터 로깅
-        print(f"업데이트 전 Redis 데이터: {feature_data}")
-        logger.info(f"업데이트 전 Redis 데이터: {feature_data}")
-    
-        # 기능 목록 업데이트
-        feature_data = updated_features["features"]
-    
-        # 업데이트할 데이터 로깅
-        print(f"업데이트 후 Redis 데이터: {feature_data}, \n다음과 일치하는지 확인하세요: {updated_features['features']}")
-        logger.info(f"업데이트 후 Redis 데이터: {feature_data}")
+            logger.error(f"GPT util 사용 중 오류 발생: {str(e)}", exc_info=True)
+            raise Exception(f"GPT util 사용 중 오류 발생: {str(e)}", exc_info=True) from e
     
-        # Redis에 저장
-        try:
-            await save_to_redis(f"features:{email}", feature_data)
-        except Exception as e:
-            logger.error(f"Redis 업데이트 중 오류 발생: {str(e)}", exc_info=True)
-            raise Exception(f"Redis 업데이트 중 오류 발생: {str(e)}") from e
+        if not isinstance(updated_features, dict) or "features" not in updated_features:
+            raise ValueError("응답이 올바른 형식이 아닙니다. 'features' 키가 필요합니다.")
+        if not isinstance(updated_features["features"], list):
+            raise ValueError("'features'는 리스트 형식이어야 합니다.")
+        if updated_features.get("isNextStep", 0) not in (0, 1):
+            raise ValueError("isNextStep은 0 또는 1이어야 합니다.")
+        
+    except Exception as e:
+        logger.error(f"GPT API 응답 처리 중 오류 발생: {str(e)}", exc_info=True)
+        raise Exception(f"GPT API 응답 처리 중 오류 발생: {str(e)}", exc_info=True) from e
     
-        # API 응답용 결과 반환
+    if updated_features.get("isNextStep", 0) == 1:
+        # LLM이 종료 요청으로 판단한 경우 기능 목록을 변경하지 않음
         result = {
             "features": feature_data,
-            "isNextStep": False
+            "isNextStep": True
         }
         logger.info(f"👉 API 응답 결과: {result}")
         return result
+    
+    # Redis 업데이트
+    # 업데이트 전 데이터 로깅
+    print(f"업데이트 전 Redis 데이터: {feature_data}")
+    logger.info(f"업데이트 전 Redis 데이터: {feature_data}")
+
+    # 기능 목록 업데이트
+    # 기존 기능과 피드백에서 사용자가 직접 언급한 기능은 중복 후보여도 유지하고(기록만 함), LLM이 임의로 추가한 중복 기능만 제외
+    requested = normalize_feature_name(feedback)
+    existing = set(feature_data)
+    feature_data, _ = drop_near_duplicate_additions(
+        updated_features["features"],
+        is_protected=lambda name: name in existing or normalize_feature_name(name) in requested,
+    )
+
+    # 업데이트할 데이터 로깅
+    print(f"업데이트 후 Redis 데이터: {feature_data}, \n다음과 일치하는지 확인하세요: {updated_features['features']}")
+    logger.info(f"업데이트 후 Redis 데이터: {feature_data}")
+
+    # Redis에 저장
+    try:
+        await save_to_redis(f"features:{email}", feature_data)
+    except Exception as e:
+        logger.error(f"Redis 업데이트 중 오류 발생: {str(e)}", exc_info=True)
+        raise Exception(f"Redis 업데이트 중 오류 발생: {str(e)}") from e
+
+    # API 응답용 결과 반환
+    result = {
+        "features": feature_data,
+        "isNextStep": False
+    }
+    logger.info(f"👉 API 응답 결과: {result}")
+    return result
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import os
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import faiss
+import numpy as np
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:     # sentence-transformers가 설치되지 않은 환경에서는 hashing embedding을 사용
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+'''
+기능 embedding과 연관 기능(relfeatIds) index
+- 기능의 name, useCase, input, output을 CPU sentence-embedding 모델(sentence-transformers, requirements.txt)로 batch 단위
+  embedding하여 "embedding" 필드에 채운다. 모델 로드와 embedding은 event loop를 막지 않도록 thread에서 실행한다.
+  모델을 설치하지 않았거나 로드에 실패하면 문자 n-gram hashing embedding으로 대체한다. (의미가 아닌 글자 유사도)
+  서버 시작 시(load_embedding_model) 어떤 embedding을 사용하는지 기록하고, EMBEDDING_MODEL_REQUIRED가 true이면 모델 없이 시작하지 않는다.
+  Docker 이미지는 모델을 미리 받아 두고(HF_HOME) offline으로 로드한다.
+- 요청마다 전달된 프로젝트의 전체 기능 목록과 저장된 embedding으로 faiss inner product index(정규화된 벡터이므로 cosine 유사도)를
+  만들고, 기능마다 가장 가까운 RELATED_TOP_K개(유사도 RELATED_MIN_SIMILARITY 이상)의 기능 _id를 relfeatIds로 기록한다.
+  index를 process에 남겨 두지 않으므로, 다른 worker에서 바뀐 기능도 항상 최신 embedding으로 계산한다.
+'''
+
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL") or "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE") or 32)
+EMBEDDING_MODEL_REQUIRED = (os.getenv("EMBEDDING_MODEL_REQUIRED") or "false").lower() == "true"
+HASH_EMBEDDING_DIM = 256
+RELATED_TOP_K = int(os.getenv("RELATED_TOP_K") or 3)
+RELATED_MIN_SIMILARITY = float(os.getenv("RELATED_MIN_SIMILARITY") or 0.5)
+EMBEDDING_TEXT_FIELDS = ("name", "useCase", "input", "output")
+
+_model = None
+_model_unavailable = SentenceTransformer is None
+_model_lock = threading.Lock()
+
+if SentenceTransformer is None:
+    logger.warning("⚠️ sentence-transformers가 설치되지 않아 hashing embedding을 사용합니다. (requirements.txt 확인)")
+
+
+def _get_model():
+    """embedding 모델을 한 번만 로드합니다. 시간이 오래 걸리므로 thread에서 호출해야 합니다."""
+    global _model, _model_unavailable
+    if _model is None and not _model_unavailable:
+        with _model_lock:
+            if _model is None and not _model_unavailable:
+                try:
+                    _model = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+                    logger.info(f"✅ embedding 모델 로드 완료: {EMBEDDING_MODEL_NAME}")
+                except Exception as e:
+                    logger.warning(f"⚠️ embedding 모델 로드 실패, hashing embedding을 사용합니다: {str(e)}")
+                    _model_unavailable = True
+    return _model
+
+
+def embedding_backend() -> str:
+    """사용 중인 embedding 방식을 반환합니다. ("model" 또는 "hash", 모델을 아직 로드하지 않았으면 "unloaded")"""
+    if _model is not None:
+        return "model"
+    return "hash" if _model_unavailable else "unloaded"
+
+
+async def load_embedding_model(required: bool = EMBEDDING_MODEL_REQUIRED) -> str:
+    """
+    서버 시작 시 embedding 모델을 thread에서 미리 로드하고, 사용할 embedding 방식을 기록합니다.
+
+    Args:
+        required (bool): True이면 모델을 사용할 수 없을 때 서버를 시작하지 않음
+
+    Returns:
+        str: 사용할 embedding 방식 ("model" 또는 "hash")
+
+    Raises:
+        RuntimeError: required인데 모델을 사용할 수 없는 경우
+    """
+    await asyncio.to_thread(_get_model)
+    backend = embedding_backend()
+    if backend == "model":
+        logger.info(f"✅ embedding 방식: {EMBEDDING_MODEL_NAME}")
+    elif required:
+        raise RuntimeError(f"embedding 모델 {EMBEDDING_MODEL_NAME}을 사용할 수 없습니다. (EMBEDDING_MODEL_REQUIRED=true)")
+    else:
+        logger.error(f"🚨 embedding 모델 {EMBEDDING_MODEL_NAME}을 사용할 수 없어 hashing embedding으로 대체합니다. 연관 기능(relfeatIds)이 글자 유사도로 계산됩니다.")
+    return backend
+
+
+def feature_text(feature: Any) -> str:
+    """기능(기능 이름 문자열 또는 dict)을 embedding할 문자열로 변환합니다."""
+    if isinstance(feature, str):
+        return feature
+    return " | ".join(str(feature[field]) for field in EMBEDDING_TEXT_FIELDS if feature.get(field))
+
+
+def hash_embed(texts: List[str], dim: int = HASH_EMBEDDING_DIM) -> np.ndarray:
+    """공백을 제거한 문자 2, 3-gram을 dim 차원으로 hashing한 L2 정규화 벡터를 반환합니다."""
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        compact = "".join(text.lower().split())
+        for n in (2, 3):
+            for i in range(max(len(compact) - n + 1, 0)):
+                vectors[row, zlib.crc32(compact[i:i + n].encode("utf-8")) % dim] += 1.0
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def embed_texts(texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+    """
+    문자열 목록을 L2 정규화된 embedding 행렬로 변환합니다.
+
+    Args:
+        texts (List[str]): embedding할 문자열 목록
+        batch_size (int): 모델에 한 번에 전달할 문자열 수
+
+    Returns:
+        np.ndarray: (len(texts), dim) float32 행렬
+    """
+    if not texts:
+        return np.zeros((0, embedding_dim()), dtype=np.float32)
+    model = _get_model()
+    if model is None:
+        return hash_embed(texts)
+    vectors = model.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False)
+    return vectors.astype(np.float32)
+
+
+def embedding_dim() -> int:
+    model = _get_model()
+    return HASH_EMBEDDING_DIM if model is None else model.get_sentence_embedding_dimension()
+
+
+async def aembed_texts(texts: List[str]) -> np.ndarray:
+    """embed_texts를 event loop를 막지 않도록 별도 thread에서 실행합니다."""
+    return await asyncio.to_thread(embed_texts, texts)
+
+
+async def aembedding_dim() -> int:
+    """embedding_dim을 별도 thread에서 실행합니다. (처음 호출하면 모델을 로드)"""
+    return await asyncio.to_thread(embedding_dim)
+
+
+class FeatureVectorIndex:
+    """기능 _id를 key로 하는 faiss inner product index"""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+        self._labels: Dict[str, int] = {}
+        self._feature_ids: Dict[int, str] = {}
+        self._next_label = 0
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, feature_id: str) -> bool:
+        return feature_id in self._labels
+
+    def feature_ids(self) -> List[str]:
+        return list(self._labels)
+
+    def upsert(self, feature_ids: List[str], vectors: np.ndarray) -> None:
+        self.remove([feature_id for feature_id in feature_ids if feature_id in self._labels])
+        labels = np.arange(self._next_label, self._next_label + len(feature_ids), dtype=np.int64)
+        self._next_label += len(feature_ids)
+        for feature_id, label in zip(feature_ids, labels.tolist()):
+            self._labels[feature_id] = label
+            self._feature_ids[label] = feature_id
+        if len(feature_ids):
+            self.index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), labels)
+
+    def remove(self, feature_ids: Iterable[str]) -> None:
+        labels = [self._labels.pop(feature_id) for feature_id in feature_ids if feature_id in self._labels]
+        for label in labels:
+            del self._feature_ids[label]
+        if labels:
+            self.index.remove_ids(np.array(labels, dtype=np.int64))
+
+    def search(self, vectors: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        """각 벡터와 가장 가까운 기능 k개를 (기능 _id, 유사도) 목록으로 반환합니다."""
+        k = min(k, len(self))
+        if k == 0:
+            return [[] for _ in range(len(vectors))]
+        similarities, labels = self.index.search(np.ascontiguousarray(vectors, dtype=np.float32), k)
+        return [
+            [(self._feature_ids[label], similarity) for label, similarity in zip(row_labels.tolist(), row_similarities.tolist()) if label != -1]
+            for row_labels, row_similarities in zip(labels, similarities)
+        ]
+
+
+async def assign_embeddings(project_id: str, features: List[Dict[str, Any]], recompute_ids: Optional[Set[str]] = None) -> Set[str]:
+    """
+    embedding이 없거나 recompute_ids에 포함된 기능을 embedding하고, 전체 기능의 embedding으로 index를 만들어 relfeatIds를 다시 계산합니다.
+
+    Args:
+        project_id (str): 프로젝트 id
+        features (List[Dict[str, Any]]): 프로젝트의 전체 기능 목록 (입력 목록을 그대로 수정)
+        recompute_ids (Optional[Set[str]]): 내용이 바뀌어 embedding을 다시 계산할 기능 _id 목록
+
+    Returns:
+        Set[str]: embedding 또는 relfeatIds가 바뀐 기능 _id 목록
+    """
+    if not features:
+        return set()
+    recompute_ids = recompute_ids or set()
+    dim = await aembedding_dim()
+    stale = [
+        feature for feature in features
+        if feature["_id"] in recompute_ids or len(feature.get("embedding") or []) != dim
+    ]
+    if stale:
+        vectors = await aembed_texts([feature_text(feature) for feature in stale])
+        for feature, vector in zip(stale, vectors):
+            feature["embedding"] = np.round(vector, 6).tolist()
+    changed = {feature["_id"] for feature in stale}
+
+    # 저장된 embedding으로 index를 새로 만든다 (다른 worker에서 바뀐 기능도 반영)
+    matrix = np.array([feature["embedding"] for feature in features], dtype=np.float32)
+    index = FeatureVectorIndex(dim)
+    index.upsert([feature["_id"] for feature in features], matrix)
+    for feature, neighbors in zip(features, index.search(matrix, RELATED_TOP_K + 1)):
+        related = [
+            feature_id for feature_id, similarity in neighbors
+            if feature_id != feature["_id"] and similarity >= RELATED_MIN_SIMILARITY
+        ][:RELATED_TOP_K]
+        if feature.get("relfeatIds") != related:
+            feature["relfeatIds"] = related
+            changed.add(feature["_id"])
+    logger.info(f"🔍 기능 embedding 갱신: 프로젝트 {project_id}, embedding {len(stale)}개, 변경된 기능 {len(changed)}개")
+    return changed
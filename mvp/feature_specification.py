@@ -1,22 +1,31 @@
 import asyncio
 import json
 import logging
-import math
 import os
 import re
 import uuid
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+from bulk_write_utils import upsert_features
 from dotenv import load_dotenv
+from draft_store import (DraftVersionConflict, feature_draft_store,
+                         rebase_changes)
+from feature_embeddings import assign_embeddings
+from feedback_intent import classify_feedback_intent
 from gpt_utils import extract_json_from_gpt_response
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from mongodb_setting import (get_feature_collection, get_project_collection,
                              get_user_collection)
 from openai import AsyncOpenAI
+from payload_models import validate_feature_specs
+from priority_engine import DEFAULT_DIFFICULTY, priority_scores
+from project_context import fetch_project_context, get_project_context
+from prompt_registry import (record_prompt_usage, register_prompt,
+                             render_project_context)
+from prompt_serializer import (FIELD_WHITELISTS, AliasMap, encode_records,
+                               record_token_savings)
 #from project_member_utils import get_project_members
-from redis_setting import load_from_redis, save_to_redis
+from task_scheduler import allocate_feature_dates
 
 logger = logging.getLogger(__name__)
 # 최상위 디렉토리의 .env 파일 로드
@@ -42,185 +51,96 @@ def assign_featureId(feature: Dict[str, Any]) -> Dict[str, Any]:
     return feature
 
 
-def calculate_priority(expectedDays: int, difficulty: int) -> int:
+def calculate_priority(expectedDays: float, difficulty: float) -> int:
     """
     개발 예상 시간과 난이도를 기반으로 우선순위를 계산합니다.
+    여러 개의 feature나 task를 한 번에 계산할 때는 priority_engine.priority_scores를 사용하세요.
     
     Args:
-        expectedDays (int): 개발 예상 시간
-        difficulty (int): 개발 난이도
+        expectedDays (float): 개발 예상 시간
+        difficulty (float): 개발 난이도
         
     Returns:
         개발 예상 시간(expectedDays: 0~30일)과 난이도(difficulty: 1~5)를
         선형 정규화 후 가중합하여 1~300 범위의 우선순위로 매핑.
         
     Raises:
-        TypeError: expectedDays나 difficulty가 정수가 아닌 경우
+        TypeError: expectedDays나 difficulty가 숫자가 아닌 경우
         ValueError: expectedDays가 0~30 범위를 벗어나거나, difficulty가 1~5 범위를 벗어나는 경우
     """
-    # 입력값 타입 검증
-    if not isinstance(expectedDays, int) or not isinstance(difficulty, int):
-        raise TypeError("expectedDays와 difficulty는 정수여야 합니다.")
-    
-    # 입력값 범위 검증
-    if expectedDays < 0 or expectedDays > 30:
-        raise ValueError("expectedDays는 0~30 범위여야 합니다.")
-    if difficulty < 1 or difficulty > 5:
-        raise ValueError("difficulty는 1~5 범위여야 합니다.")
+    # 입력값 타입 검증 (bool은 숫자로 취급하지 않음)
+    for value in (expectedDays, difficulty):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError("expectedDays와 difficulty는 숫자여야 합니다.")
+    return int(priority_scores([expectedDays], [difficulty])[0])
 
-    # 최대값/최소값 정의
-    MAX_DAYS = 30
-    MIN_DIFF, MAX_DIFF = 1, 5
 
-    # 가중치 (시간 80%, 난이도 20%)
-    w_time = 0.8
-    w_diff = 0.2
+### ======== Sharded Feature Specification ======== ###
+SPEC_BATCH_SIZE = int(os.getenv("SPEC_BATCH_SIZE") or 10)            # batch 하나에 포함할 기능 수
+SPEC_SHARD_THRESHOLD = int(os.getenv("SPEC_SHARD_THRESHOLD") or 15)  # 기능 수가 이보다 많으면 batch로 나누어 생성
+SPEC_MAX_CONCURRENCY = int(os.getenv("SPEC_MAX_CONCURRENCY") or 4)   # 동시에 진행할 LLM 호출 수
+SPEC_MAX_RETRIES = int(os.getenv("SPEC_MAX_RETRIES") or 2)           # 누락된 기능 재요청 횟수
 
-    # 1) 시간 정규화: [0,1], 값이 작을수록(개발기간 짧을수록) 1에 가까움
-    time_score = 1 - (expectedDays / MAX_DAYS)
 
-    # 2) 난이도 정규화: [0,1], 값이 작을수록(난이도 낮을수록) 1에 가까움
-    diff_score = (MAX_DIFF - difficulty) / (MAX_DIFF - MIN_DIFF)
+def normalize_feature_name(name: Any) -> str:
+    """기능 이름 비교를 위해 공백과 대소문자를 정규화합니다."""
+    return re.sub(r"\s+", " ", str(name)).strip().lower()
 
-    # 3) 가중합(raw score)
-    raw = w_time * time_score + w_diff * diff_score
-    # raw ∈ [0,1]
 
-    # 4) 1~300 범위로 선형 매핑
-    priority = math.ceil(raw * 299) + 1
-    return priority
+def _feature_name(feature: Any) -> str:
+    return feature.get("name", "") if isinstance(feature, dict) else str(feature)
 
 
-### ======== Create Feature Specification ======== ###
-async def create_feature_specification(email: str) -> Dict[str, Any]:
-    # /project/specification에서 참조하는 변수 초기화
-    #stacks=[]
-    logger.info(f"🔍 기능 명세서 생성 시작. 조회 key값: {email}")
-    project_members=[]
-    
-    # 프로젝트 정보 조회
-    project_data = await load_from_redis(email)
-    feature_data = await load_from_redis(f"features:{email}")
-    if not project_data:
-        raise ValueError(f"Project for user {email} not found")
-    if not feature_data:
-        raise ValueError(f"Feature for user {email} not found")
+def split_into_batches(items: List[Any], batch_size: int) -> List[List[Any]]:
+    """목록을 batch_size 크기의 batch로 나눕니다."""
+    if batch_size <= 0:
+        raise ValueError("batch_size는 0보다 커야 합니다.")
+    return [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
 
-    try:
-        if isinstance(project_data, str):
-            project_data = json.loads(project_data)
-    except Exception as e:
-        logger.error(f"🚨 email이 일치하는 project 정보 JSON 로드 중 오류 발생: {str(e)}")
-        raise Exception(f"🚨 email이 일치하는 project 정보 JSON 로드 중 오류 발생: {str(e)}") from e
-    
-    try:
-        if isinstance(feature_data, str):
-            feature_data = json.loads(feature_data)
-    except Exception as e:
-        logger.error(f"🚨 email이 일치하는 features 정보 JSON 로드 중 오류 발생: {str(e)}")
-        raise Exception(f"🚨 email이 일치하는 features 정보 JSON 로드 중 오류 발생: {str(e)}") from e
-    
-    
-    # 프로젝트 정보 추출
-    try:
-        projectId = project_data.get("projectId", "")
-    except Exception as e:
-        logger.error(f"projectId 접근 중 오류 발생: {str(e)}")
-        raise
 
-    try:
-        project_start_date = project_data.get("startDate", "")
-    except Exception as e:
-        logger.error(f"project_start_date 접근 중 오류 발생: {str(e)}")
-        raise
+def match_feature_specs(requested: List[Any], generated: List[Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], List[Any]]:
+    """
+    요청한 기능 목록과 LLM이 생성한 명세를 기능 이름으로 대응시킵니다.
+    요청하지 않은 기능과 중복으로 생성된 기능은 제외합니다.
 
-    try:
-        project_end_date = project_data.get("endDate", "")
-    except Exception as e:
-        logger.error(f"project_end_date 접근 중 오류 발생: {str(e)}")
-        raise
+    Args:
+        requested (List[Any]): 요청한 기능 목록 (기능 이름 또는 name을 가진 dict)
+        generated (List[Dict[str, Any]]): LLM이 생성한 기능 명세 목록
 
-    #print(f"프로젝트 아이디: {projectId}")
-    
-    try:
-        logger.info(f"🔍 Redis에서 프로젝트 멤버 정보 불러오기 시작. 조회 key값: {email}")
-        project_data = await load_from_redis(email)
-        members = project_data.get("members", [])
-        logger.info(f"🔍 Redis에서 프로젝트 멤버 정보: {members}")
-    except Exception as e:
-        logger.error(f"프로젝트 멤버 정보가 Redis에 존재하지 않습니다: {str(e)}", exc_info=True)
-        raise
-    for member in members:
-        try:
-            name = member.get("name")
-            logger.info(f"🔍 선택된 프로젝트 멤버의 이름: {name}")
-            profiles = member.get("profiles", [])
-            logger.info(f"🔍 선택된 프로젝트 멤버의 모든 프로필 정보: {profiles}")
-        except Exception as e:
-            logger.error(f"프로젝트 멤버의 name 또는 profiles 정보가 Redis에 존재하지 않습니다: {str(e)}", exc_info=True)
-            raise e
-        for profile in profiles:
-            try:
-                project_id_of_profile = profile.get("projectId")
-            except Exception as e:
-                logger.error(f"프로젝트 멤버의 projectId 정보가 Redis에 존재하지 않습니다: {str(e)}", exc_info=True)
-                raise e
-            if project_id_of_profile == projectId:
-                logger.info(f"🔍 프로젝트 아이디와 일치하는 프로필 정보를 감지함: {profile}")
-                try:
-                    positions = profile.get("positions", [])
-                    if not positions:  # positions가 비어있는 경우
-                        logger.warning(f"⚠️ positions가 비어있습니다.")
-                        positions = [""]  # 빈 문자열을 포함한 리스트로 설정
-                    logger.info(f"🔍 선택된 프로젝트 멤버의 역할들: {positions}")
-                except Exception as e:
-                    logger.error(f"profile positions 접근 중 오류 발생: {str(e)}")
-                    continue
-                try:
-                    member_info = [
-                        name,
-                        positions,  # 모든 positions를 쉼표로 구분하여 하나의 문자열로
-                    ]
-                    project_members.append(", ".join(str(item) for item in member_info))
-                    logger.info(f"🔍 프로젝트 멤버 정보를 project_members에 다음과 같이 추가: {project_members}")
-                except Exception as e:
-                    logger.error(f"member_info 생성 중 오류 발생: {str(e)}")
-                    break
+    Returns:
+        Tuple[Dict[str, Dict[str, Any]], List[Any]]: (정규화된 이름별 명세, 누락된 기능 목록)
+    """
+    requested_names = {normalize_feature_name(_feature_name(feature)) for feature in requested}
+    matched: Dict[str, Dict[str, Any]] = {}
+    for spec in generated:
+        if not isinstance(spec, dict):
+            logger.warning(f"⚠️ dict 형식이 아닌 기능 명세를 제외합니다: {spec}")
+            continue
+        key = normalize_feature_name(spec.get("name", ""))
+        if key not in requested_names:
+            logger.warning(f"⚠️ 요청하지 않은 기능 명세를 제외합니다: {spec.get('name')}")
             continue
+        if key in matched:
+            logger.warning(f"⚠️ 중복으로 생성된 기능 명세를 제외합니다: {spec.get('name')}")
+            continue
+        matched[key] = spec
+    missing = [feature for feature in requested if normalize_feature_name(_feature_name(feature)) not in matched]
+    return matched, missing
 
-    print("\n=== 불러온 프로젝트 정보 ===")
-    print("멤버:", project_members)
-    print("기능 목록:", feature_data)
-    print("시작일:", project_start_date)
-    print("종료일:", project_end_date)
-    print("=== 프로젝트 정보 끝 ===\n")
-    
-    # 프롬프트 템플릿 생성
-    prompt = ChatPromptTemplate.from_template("""
-    당신은 소프트웨어 기능 목록을 분석하여 기능 명세서를 작성하는 일을 도와주는 엔지니어입니다.
-    다음 기능 정의서와 프로젝트 스택 정보, 프로젝트에 참여하는 멤버 정보를 분석하여 
-    각 기능별로 상세 명세를 작성하고, 필요한 정보를 지정해주세요.
-    절대 주석을 추가하지 마세요. 당신은 한글이 주언어입니다.
-    
-    프로젝트 멤버별 [이름, [역할1, 역할2, ...]] 정보:
-    {project_members}
-    
-    정의되어 있는 기능 목록:
-    {feature_data}
-    
-    프로젝트 시작일:
-    {startDate}
-    프로젝트 종료일:
-    {endDate}
+
+FEATURE_SPEC_PROMPT = register_prompt(
+    "feature_specification",
+    instructions="""
+    당신의 업무는 정의되어 있는 기능 목록과 프로젝트 정보(기간, 멤버별 역할)를 분석하여 각 기능별로 상세 명세를 작성하고, 필요한 정보를 지정하는 것입니다.
     
     주의사항:
-    1. 위 기능 정의서에 나열된 모든 기능에 대해 상세 명세를 작성해주세요.
+    1. 요청한 기능 목록에 나열된 모든 기능에 대해 상세 명세를 작성해주세요.
     2. 새로운 기능을 추가하거나 기존 기능을 제외하지 마세요.
-    3. 각 기능의 name은 기능 정의서와 동일하게 사용하고 절대 임의로 바꾸지 마세요.
+    3. 각 기능의 name은 요청한 기능 목록과 동일하게 사용하고 절대 임의로 바꾸지 마세요.
     4. 담당자 할당 시 각 멤버의 역할(BE/FE)을 고려해주세요.
-    5. 기능 별 startDate와 endDate는 프로젝트 시작일인 {startDate}와 종료일인 {endDate} 사이에 있어야 하며, 그 기간이 expected_days와 일치해야 합니다.
+    5. estimatedDays는 멤버 한 명이 기능을 개발하는 데 필요한 예상 근무일 수(1 이상 30 이하의 정수)입니다. 프로젝트 기간을 고려하여 산정해주세요.
     6. difficulty는 1 이상 5 이하의 정수여야 합니다.
-    7. startDate와 endDate는 "YYYY-MM-DD" 형식이어야 합니다.
+    7. 기능별 일정(startDate, endDate)은 서버에서 배정하므로 작성하지 마세요.
     8. useCase는 기능의 사용 사례 설명을 작성해주세요.
     9. input은 기능에 필요한 입력 데이터를 작성해주세요.
     10. output은 기능의 출력 결과를 작성해주세요.
@@ -236,57 +156,199 @@ async def create_feature_specification(email: str) -> Dict[str, Any]:
                 "output": "string",
                 "precondition": "string",
                 "postcondition": "string",
-                "startDate": str(YYYY-MM-DD),
-                "endDate": str(YYYY-MM-DD),
+                "estimatedDays": int,
                 "difficulty": int
             }}
         ]
     }}
-    """)
+    """,
+    request="""
+    명세를 작성할 기능 목록:
+    {feature_data}
+    """,
+)
+
+FEATURE_UPDATE_PROMPT = register_prompt(
+    "feature_update",
+    instructions="""
+    당신의 업무는 사용자의 피드백을 분석하고 프로젝트 정보를 바탕으로 기능 명세에서 누락된 정보를 생성하거나 피드백을 반영하여 정보를 수정하는 것입니다.
     
-    # 프롬프트에 데이터 전달
-    message = prompt.format_messages(
-        project_members=project_members,
-        feature_data=feature_data,
-        startDate=project_start_date,
-        endDate=project_end_date
-    )
+    요청에는 다음 정보가 포함됩니다:
+    - 변경된 기능 목록: 변경되었거나 값이 비어 있는 기능 목록입니다. 첫 줄은 필드 이름이고 id는 featureId, null은 값이 없는 필드입니다.
+    - 그 밖의 기능 목록: 그 밖에 프로젝트에 포함되어 있는 기능 목록입니다. (id|name)
+    - 사용자 피드백: 기능 명세 단계에서 받은 사용자의 피드백입니다.
+    
+    피드백이 다음 중 어떤 유형인지 판단해주세요:
+    1. 수정/삭제 요청:
+    예시: "담당자를 다른 사람으로 변경해 주세요", "~기능 개발 우선순위를 낮추세요", "~기능을 삭제해주세요.
+    2. 종료 요청:
+    예시: "이대로 좋습니다", "더 이상 수정할 필요 없어요", "다음으로 넘어가죠"
+    1번 유형의 경우는 isNextStep을 0으로, 2번 유형의 경우는 isNextStep을 1로 설정해주세요.
+    
+    주의사항:
+    1. 반드시 아래 JSON 형식을 정확하게 따라주세요.
+    2. features에는 값을 생성하거나 수정한 기능만 포함하고, 각 기능에는 featureId와 생성하거나 수정한 필드만 포함하세요. 변경하지 않은 기능과 필드는 절대 포함하지 마세요.
+    3. 변경된 기능 목록에서 null인 필드는 반드시 형식에 맞게 채워주세요.
+    4. 피드백이 그 밖의 기능 목록의 기능을 수정하라는 내용이라면 해당 기능의 featureId와 수정한 필드만 features에 포함하세요.
+    5. 피드백이 기능 삭제를 요청한다면 삭제할 기능의 featureId를 deletedFeatureIds에 포함하세요.
+    6. expectedDays는 멤버 한 명이 기능을 개발하는 데 필요한 예상 근무일 수(1 이상 30 이하의 정수)입니다. 기능별 일정(startDate, endDate)은 서버에서 배정하므로 작성하지 마세요.
+    7. isNextStep은 사용자의 피드백이 종료 요청인 경우 1, 수정/삭제 요청인 경우 0으로 설정해주세요.
+    {{
+        "isNextStep": 0 또는 1,
+        "features": [
+            {{
+                "featureId": "string",
+                "name": "string",
+                "useCase": "string",
+                "input": "string",
+                "output": "string",
+                "precondition": "string",
+                "postcondition": "string",
+                "expectedDays": int,
+                "difficulty": int,
+                "priority": int
+            }}
+        ],
+        "deletedFeatureIds": ["string"]
+    }}
+    """,
+    request="""
+    변경된 기능 목록:
+    {delta_features}
+    
+    그 밖의 기능 목록 (id|name):
+    {other_features}
+    
+    사용자 피드백:
+    {feedback}
+    """,
+)
+
+
+async def _request_feature_specs(feature_data: List[Any], project_context: str) -> List[Dict[str, Any]]:
+    """기능 목록 하나(batch)에 대한 명세를 LLM으로 생성합니다."""
+    # 프로젝트 정보는 모든 batch가 공유하므로 프롬프트의 앞부분(지침, 프로젝트 context)은 batch 간에 cache됨
+    message = FEATURE_SPEC_PROMPT.format_messages(project_context=project_context, feature_data=feature_data)
     
     # LLM 호출
     llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.3)
     response = await llm.ainvoke(message)
+    record_prompt_usage("feature_specification", response)
     
     # 응답 파싱
     try:
-        content = response.content
-        try:
-            gpt_result = extract_json_from_gpt_response(content)
-        except Exception as e:
-            logger.error(f"GPT util 사용 중 오류 발생: {str(e)}")
-            raise Exception(f"GPT util 사용 중 오류 발생: {str(e)}") from e
-        #print(f"📌 응답 파싱 후 gpt_result 타입: {type(gpt_result)}")   # 현재 List 반환 중
-        #print(f"📌 gpt_result 내용: {gpt_result}")
-        
-        try:
-            feature_list = gpt_result["features"]
-        except Exception as e:
-            logger.error(f"📌 gpt result에 list 형식으로 접근할 수 없습니다: {str(e)}")
-            raise Exception(f"📌 gpt result에 list 형식으로 접근할 수 없습니다: {str(e)}") from e
-        #print(f"📌 feature_list 타입: {type(feature_list)}")   # 여기에서 List 반환되어야 함
-        for i in range(len(feature_list)):
-            #print(f"📌 feature_list 하위 항목 타입: {type(feature_list[i])}")   # 여기에서 모두 Dict 반환되어야 함 (PASS)
-            if type(feature_list[i]) != dict:
-                raise ValueError("feature_list 하위 항목은 모두 Dict 형식이어야 합니다.")
+        gpt_result = extract_json_from_gpt_response(response.content)
+    except Exception as e:
+        logger.error(f"GPT util 사용 중 오류 발생: {str(e)}")
+        raise Exception(f"GPT util 사용 중 오류 발생: {str(e)}") from e
+    try:
+        feature_list = gpt_result["features"]
+    except Exception as e:
+        logger.error(f"📌 gpt result에 list 형식으로 접근할 수 없습니다: {str(e)}")
+        raise Exception(f"📌 gpt result에 list 형식으로 접근할 수 없습니다: {str(e)}") from e
+    if not isinstance(feature_list, list):
+        raise ValueError("gpt result의 features는 list 형식이어야 합니다.")
+    return feature_list
+
+
+async def generate_feature_specs(
+    feature_data: List[Any],
+    project_context: str,
+    batch_size: Optional[int] = None,
+    max_concurrency: int = SPEC_MAX_CONCURRENCY,
+    max_retries: int = SPEC_MAX_RETRIES,
+) -> List[Dict[str, Any]]:
+    """
+    기능 목록의 명세를 생성합니다. 기능 수가 SPEC_SHARD_THRESHOLD보다 많으면 batch로 나누어 동시에 생성합니다.
+    모든 입력 기능이 정확히 한 번씩 반환되었는지 검증하고, 누락된 기능은 다시 요청합니다.
+
+    Args:
+        feature_data (List[Any]): 기능 목록 (기능 이름 또는 name을 가진 dict)
+        project_context (str): render_project_context로 렌더링한 프로젝트 정보 (모든 batch가 공유)
+        batch_size (Optional[int]): batch 크기 (지정하지 않으면 기능 수에 따라 결정)
+        max_concurrency (int): 동시에 진행할 LLM 호출 수
+        max_retries (int): 누락된 기능 재요청 횟수
+
+    Returns:
+        List[Dict[str, Any]]: 입력 순서대로 정렬된 기능 명세 목록
+
+    Raises:
+        ValueError: 재요청 후에도 누락된 기능이 있는 경우
+    """
+    if batch_size is None:
+        batch_size = SPEC_BATCH_SIZE if len(feature_data) > SPEC_SHARD_THRESHOLD else max(len(feature_data), 1)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def run_batch(batch: List[Any]) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await _request_feature_specs(batch, project_context)
+    
+    specs: Dict[str, Dict[str, Any]] = {}
+    pending = list(feature_data)
+    for attempt in range(max_retries + 1):
+        batches = split_into_batches(pending, batch_size)
+        logger.info(f"⚙️ 기능 명세 생성 ({attempt + 1}회차): 기능 {len(pending)}개를 {len(batches)}개의 batch로 요청합니다.")
+        results = await asyncio.gather(*(run_batch(batch) for batch in batches))
+        matched, pending = match_feature_specs(pending, [spec for result in results for spec in result])
+        specs.update(matched)
+        if not pending:
+            break
+        logger.warning(f"⚠️ 명세가 생성되지 않은 기능 {len(pending)}개를 다시 요청합니다: {[_feature_name(feature) for feature in pending]}")
+    if pending:
+        raise ValueError(f"다음 기능의 명세가 생성되지 않았습니다: {[_feature_name(feature) for feature in pending]}")
+    
+    return [specs[normalize_feature_name(_feature_name(feature))] for feature in feature_data]
+
+
+def allocation_order(features: List[Dict[str, Any]]) -> List[int]:
+    """
+    기능 일정을 배정할 순서를 반환합니다. 예상 소요일(estimatedDays)과 난이도로 계산한 우선순위가 높은 기능부터 배정하며,
+    우선순위가 같으면 입력 순서를 따릅니다.
+    """
+    def as_number(value: Any, default: float) -> float:
+        return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else default
+    scores = priority_scores(
+        [as_number(feature.get("estimatedDays"), 1) for feature in features],
+        [as_number(feature.get("difficulty"), DEFAULT_DIFFICULTY) for feature in features],
+        strict=False,
+    )
+    return sorted(range(len(features)), key=lambda i: -scores[i])
+
+
+### ======== Create Feature Specification ======== ###
+async def create_feature_specification(email: str) -> Dict[str, Any]:
+    # /project/specification에서 참조하는 변수 초기화
+    #stacks=[]
+    logger.info(f"🔍 기능 명세서 생성 시작. 조회 key값: {email}")
+    # 프로젝트 정보와 기능 목록을 pipeline 한 번으로 조회
+    context, (feature_data,) = await fetch_project_context(email, [f"features:{email}"])
+    if not feature_data:
+        raise ValueError(f"Feature for user {email} not found")
+    project_start_date = context.start_date
+    project_end_date = context.end_date
+    project_members = context.member_descriptions()
+
+    print("\n=== 불러온 프로젝트 정보 ===")
+    print("멤버:", project_members)
+    print("기능 목록:", feature_data)
+    print("시작일:", project_start_date)
+    print("종료일:", project_end_date)
+    print("=== 프로젝트 정보 끝 ===\n")
+    
+    # 중복 기능은 기능 정의 단계(create_feature_definition)에서 이미 제외됨
+    # 기능 목록을 batch로 나누어 병렬로 명세를 생성하고, 모든 기능이 정확히 한 번씩 반환되었는지 검증
+    feature_list = await generate_feature_specs(feature_data, render_project_context(context))
+    
+    try:
+        # 기능별 일정은 LLM이 아닌 allocator가 예상 소요일, 난이도 기반 우선순위와 멤버 수를 바탕으로 프로젝트 기간 안에 배정
+        allocate_feature_dates(
+            feature_list, project_start_date, project_end_date,
+            lanes=len(context.members), order=allocation_order(feature_list),
+        )
         
         features_to_store = []
-        for data in feature_list:
-            try:
-                start_date = datetime.strptime(data["startDate"], "%Y-%m-%d")
-                end_date = datetime.strptime(data["endDate"], "%Y-%m-%d")
-                expected_days = (end_date - start_date).days
-            except Exception as e:
-                logger.error(f"날짜 형식 변환 중 오류 발생: {str(e)}")
-                raise ValueError(f"날짜 형식이 올바르지 않습니다. YYYY-MM-DD 형식이어야 합니다: {str(e)}")
+        # 기능 목록 전체를 한 번에 검증하고 difficulty, 기간(프로젝트 기간 안으로), expectedDays를 보정
+        for data in validate_feature_specs(feature_list, project_start_date, project_end_date):
             feature = {
                 "name": data["name"],
                 "useCase": data["useCase"],
@@ -294,22 +356,34 @@ async def create_feature_specification(email: str) -> Dict[str, Any]:
                 "output": data["output"],
                 "precondition": data["precondition"],
                 "postcondition": data["postcondition"],
-                "priority": calculate_priority(expected_days, data["difficulty"]),
+                "priority": None,   # 모든 feature를 정의한 후 한 번에 계산
                 "relfeatIds": [],
                 "embedding": [],
                 "startDate": data["startDate"],
                 "endDate": data["endDate"],
-                "expectedDays": expected_days,
+                "expectedDays": data["expectedDays"],
                 "difficulty": data["difficulty"]
             }
             feature = assign_featureId(feature)
             logger.info(f"✅ 새롭게 명세된 기능 정보: {feature}")
             features_to_store.append(feature)   # 현재 JSON 타입과 충돌하지 않음 (List of Dict)
         
-        # Redis에 저장
+        # feature 전체의 priority를 한 번에 계산
+        scores = priority_scores(
+            [feature["expectedDays"] for feature in features_to_store],
+            [feature["difficulty"] for feature in features_to_store],
+            strict=False,
+        )
+        for feature, score in zip(features_to_store, scores.tolist()):
+            feature["priority"] = score
+        
+        # 기능별 embedding을 계산하고 프로젝트 index에서 연관 기능(relfeatIds)을 찾음
+        await assign_embeddings(context.project_id, features_to_store)
+        
+        # Redis에 초안으로 저장 (기능별 hash field)
         print(f"✅ Redis에 저장되는 feature 정보들: {features_to_store}")
         try:
-            await save_to_redis(f"features:{email}", features_to_store)
+            draft_version = await feature_draft_store.save_all(email, features_to_store)
         except Exception as e:
             logger.error(f"feature_specification 초안 Redis 저장 실패: {str(e)}", exc_info=True)
             raise e
@@ -325,7 +399,8 @@ async def create_feature_specification(email: str) -> Dict[str, Any]:
                     "output": feature["output"]
                 }
                 for feature in features_to_store
-            ]
+            ],
+            "version": draft_version
         }
         logger.info(f"👉 API 응답 결과: {response}")
         return response
@@ -335,336 +410,349 @@ async def create_feature_specification(email: str) -> Dict[str, Any]:
         raise Exception(f"GPT API 응답 처리 중 오류 발생: {str(e)}", exc_info=True) from e
 
 
+### ======== Delta Feature Update ======== ###
+# 기능별 일정(startDate, endDate)은 LLM이 아닌 allocator가 배정하므로 LLM이 채우거나 수정할 필드에 포함하지 않음
+FEATURE_SPEC_FIELDS = (
+    "name", "useCase", "input", "output", "precondition", "postcondition", "difficulty",
+)
+PATCHABLE_FEATURE_FIELDS = FEATURE_SPEC_FIELDS + ("expectedDays", "priority")
+
+
+def apply_feature_edits(
+    features: List[Dict[str, Any]],
+    createdFeatures: Optional[List[Dict[str, Any]]],
+    modifiedFeatures: Optional[List[Dict[str, Any]]],
+    deletedFeatures: Optional[List[str]],
+) -> Tuple[List[Dict[str, Any]], set]:
+    """
+    사용자가 직접 생성, 수정, 삭제한 기능을 기능 목록에 반영합니다.
+    수정된 기능은 복사본으로 교체하고, 수정되지 않은 기능은 원래 객체를 그대로 유지합니다.
+
+    Args:
+        features (List[Dict[str, Any]]): 현재 기능 목록
+        createdFeatures (Optional[List[Dict[str, Any]]]): 새로 생성된 기능 목록 (_id가 없으면 새로 부여)
+        modifiedFeatures (Optional[List[Dict[str, Any]]]): 수정된 기능 목록 (featureId 기준)
+        deletedFeatures (Optional[List[str]]): 삭제된 기능의 featureId 목록
+
+    Returns:
+        Tuple[List[Dict[str, Any]], set]: (편집이 반영된 기능 목록, 생성 또는 수정된 기능의 _id 집합)
+    """
+    deleted = set(deletedFeatures or [])
+    modified = {feature["featureId"]: feature for feature in modifiedFeatures or []}
+    changed_ids = set()
+    result = []
+    for feature in features:
+        if feature["_id"] in deleted:
+            continue
+        if feature["_id"] in modified:
+            edit = modified[feature["_id"]]
+            feature = dict(feature, **{field: edit[field] for field in ("name", "useCase", "input", "output") if field in edit})
+            changed_ids.add(feature["_id"])
+        result.append(feature)
+    for created in createdFeatures or []:
+        created = dict(created)
+        if not created.get("_id"):
+            if created.get("featureId"):
+                created["_id"] = created.pop("featureId")
+            else:
+                created = assign_featureId(created)
+        changed_ids.add(created["_id"])
+        result.append(created)
+    return result, changed_ids
+
+
+def reallocate_feature_dates(
+    features: List[Dict[str, Any]],
+    project_start_date: str,
+    project_end_date: str,
+    lanes: int,
+) -> set:
+    """
+    변경이 반영된 기능 목록 전체의 일정을 생성 단계와 같은 allocator로 다시 배정합니다.
+    예상 소요일은 expectedDays(LLM이 새로 산정한 값 또는 기존 값)를 사용하며, 일정이 바뀐 기능만 복사본으로 교체합니다.
+
+    Args:
+        features (List[Dict[str, Any]]): 기능 목록 (일정이 바뀐 기능은 복사본으로 교체됨)
+        project_start_date (str): 프로젝트 시작일
+        project_end_date (str): 프로젝트 종료일
+        lanes (int): 동시에 진행할 수 있는 기능 수 (프로젝트 멤버 수)
+
+    Returns:
+        set: 일정이 바뀐 기능의 _id 집합
+    """
+    plans = [{"estimatedDays": feature.get("expectedDays"), "difficulty": feature.get("difficulty")} for feature in features]
+    allocate_feature_dates(plans, project_start_date, project_end_date, lanes=lanes, order=allocation_order(plans))
+    rescheduled_ids = set()
+    for i, (feature, plan) in enumerate(zip(features, plans)):
+        if (feature.get("startDate"), feature.get("endDate")) != (plan["startDate"], plan["endDate"]):
+            features[i] = dict(feature, startDate=plan["startDate"], endDate=plan["endDate"])
+            rescheduled_ids.add(feature["_id"])
+    return rescheduled_ids
+
+
+def select_delta_features(features: List[Dict[str, Any]], changed_ids: set) -> List[Dict[str, Any]]:
+    """변경되었거나 명세 필드 중 값이 비어 있는 기능만 선택합니다."""
+    return [
+        feature for feature in features
+        if feature["_id"] in changed_ids or any(feature.get(field) is None for field in FEATURE_SPEC_FIELDS)
+    ]
+
+
+def merge_feature_patch(
+    features: List[Dict[str, Any]],
+    patches: List[Dict[str, Any]],
+    deleted_ids: Optional[List[str]] = None,
+) -> Tuple[List[Dict[str, Any]], set]:
+    """
+    LLM이 반환한 기능별 patch를 featureId 기준으로 병합합니다.
+    patch되지 않은 기능은 원래 객체를 그대로 유지하며, 알 수 없는 featureId와 허용되지 않은 필드는 무시합니다.
+
+    Args:
+        features (List[Dict[str, Any]]): 기능 목록
+        patches (List[Dict[str, Any]]): featureId와 변경된 필드로 구성된 patch 목록
+        deleted_ids (Optional[List[str]]): 삭제할 featureId 목록
+
+    Returns:
+        Tuple[List[Dict[str, Any]], set]: (patch가 반영된 기능 목록, patch된 기능의 _id 집합)
+    """
+    patch_by_id: Dict[str, Dict[str, Any]] = {}
+    for patch in patches:
+        fields = {field: patch[field] for field in PATCHABLE_FEATURE_FIELDS if patch.get(field) is not None}
+        if fields:
+            patch_by_id.setdefault(patch["featureId"], {}).update(fields)
+    deleted = set(deleted_ids or [])
+    patched_ids = set()
+    result = []
+    for feature in features:
+        if feature["_id"] in deleted:
+            continue
+        if feature["_id"] in patch_by_id:
+            feature = dict(feature, **patch_by_id[feature["_id"]])
+            patched_ids.add(feature["_id"])
+        result.append(feature)
+    return result, patched_ids
+
+
+MAX_REBASE_ATTEMPTS = int(os.getenv("MAX_REBASE_ATTEMPTS") or 3)
+
+
+async def save_draft_changes(
+    email: str,
+    base_features: List[Dict[str, Any]],
+    merged_features: List[Dict[str, Any]],
+    touched_ids: set,
+    base_version: int,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    base 초안(base_version)에서 만든 변경을 check-and-set으로 저장합니다.
+    그 사이 다른 요청이 초안을 변경했더라도 서로 다른 기능을 변경했다면, LLM을 다시 호출하지 않고 최신 초안 위에 변경을 다시 적용(rebase)합니다.
+
+    Args:
+        email (str): 사용자 email
+        base_features (List[Dict[str, Any]]): 요청 시작 시 불러온 초안
+        merged_features (List[Dict[str, Any]]): 변경을 반영한 전체 기능 목록
+        touched_ids (set): 생성 또는 수정된 기능 _id 목록
+        base_version (int): 요청 시작 시 불러온 초안의 version
+
+    Returns:
+        Tuple[int, List[Dict[str, Any]]]: 저장 후 초안의 version과 저장된 전체 기능 목록
+
+    Raises:
+        DraftVersionConflict: 다른 요청과 같은 기능을 변경했거나 rebase를 MAX_REBASE_ATTEMPTS회 시도해도 저장하지 못한 경우
+    """
+    merged_ids = [feature["_id"] for feature in merged_features]
+    remaining_ids = set(merged_ids)
+    upserts = [feature for feature in merged_features if feature["_id"] in touched_ids]
+    deleted_ids = [feature["_id"] for feature in base_features if feature["_id"] not in remaining_ids]
+    order = merged_ids
+    attempts = 0
+    while True:
+        try:
+            version = await feature_draft_store.apply_changes(email, upserts, deleted_ids, order, expected_version=base_version)
+            return version, merged_features
+        except DraftVersionConflict as conflict:
+            attempts += 1
+            if attempts > MAX_REBASE_ATTEMPTS:
+                raise
+            _, latest_features, latest_version = await feature_draft_store.load_versioned_with_project(email)
+            latest_features = latest_features or []
+            rebased_order = rebase_changes(base_features, latest_features, upserts, deleted_ids, order)
+            if rebased_order is None:
+                raise conflict
+            logger.info(f"♻️ 초안이 동시에 변경되어 버전 {latest_version} 위에 변경 사항을 다시 적용합니다. (기존 버전: {base_version})")
+            features_by_id = {feature["_id"]: feature for feature in latest_features}
+            features_by_id.update({feature["_id"]: feature for feature in upserts})
+            merged_features = [features_by_id[feature_id] for feature_id in rebased_order]
+            base_features, base_version, order = latest_features, latest_version, rebased_order
+
+
 ### ======== Update Feature Specification ======== ###
-async def update_feature_specification(email: str, feedback: str, createdFeatures: List[Dict[str, Any]], modifiedFeatures: List[Dict[str, Any]], deletedFeatures: List[str]) -> Dict[str, Any]:
+async def update_feature_specification(email: str, feedback: str, createdFeatures: List[Dict[str, Any]], modifiedFeatures: List[Dict[str, Any]], deletedFeatures: List[str], version: Optional[int] = None) -> Dict[str, Any]:
     logger.info(f"🔍 기능 명세서 업데이트 시작. 조회 key값: {email}")
+    # 프로젝트 정보와 기능 명세서 초안(version 포함)을 pipeline 한 번으로 조회
     try:
-        draft_feature_specification = await load_from_redis(f"features:{email}")
+        project_data, draft_feature_specification, draft_version = await feature_draft_store.load_versioned_with_project(email)
         logger.info(f"🔍 Redis에서 기능 명세서 초안 불러오기 성공: {draft_feature_specification}")
     except Exception as e:
         logger.error(f"Redis로부터 기능 명세서 초안 불러오기 실패: {str(e)}")
         raise Exception(f"Redis로부터 기능 명세서 초안 불러오기 실패: {str(e)}") from e
+    if not draft_feature_specification:
+        raise ValueError(f"Feature specification draft for user {email} not found")
+    if not project_data:
+        raise ValueError(f"Project for user {email} not found")
+    # 클라이언트가 본 초안이 이미 다른 요청에 의해 변경되었다면 LLM을 호출하기 전에 충돌로 응답
+    if version is not None and version != draft_version:
+        raise DraftVersionConflict(email, version, draft_version)
     
-    # Redis에서 가져온 데이터가 문자열인 경우 JSON 파싱
-    if isinstance(draft_feature_specification, str):
-        try:
-            draft_feature_specification = json.loads(draft_feature_specification)
-        except json.JSONDecodeError as e:
-            logger.error(f"Redis 데이터 JSON 파싱 실패: {str(e)}")
-            raise ValueError(f"Redis 데이터가 올바른 JSON 형식이 아닙니다: {str(e)}")
-    try:
-        project_data = await load_from_redis(email)
-    except Exception as e:
-        logger.error(f"Redis로부터 프로젝트 데이터 불러오기 실패: {str(e)}")
-        raise Exception(f"Redis로부터 프로젝트 데이터 불러오기 실패: {str(e)}") from e
-    
-    #print(f"👍 프로젝트 데이터 type: ", type(project_data)) # Dict가 반환됨
-    try:
-        projectId = project_data.get("projectId", "")
-    except Exception as e:
-        logger.error(f"projectId 접근 중 오류 발생: {str(e)}")
-        raise
-
-    project_start_date = project_data.get("startDate")
-    project_end_date = project_data.get("endDate")  # 🚨 Project EndDate는 변경될 수 있음
+    context = get_project_context(email, project_data)
+    project_start_date = context.start_date
+    project_end_date = context.end_date  # 🚨 Project EndDate는 변경될 수 있음
     current_features = draft_feature_specification
-    project_members = []
-    
-    try:
-        logger.info(f"🔍 Redis에서 프로젝트 멤버 정보 불러오기 시작. 조회 key값: {email}")
-        project_data = await load_from_redis(email)
-        members = project_data.get("members", [])
-        logger.info(f"🔍 Redis에서 프로젝트 멤버 정보: {members}")
-    except Exception as e:
-        logger.error(f"프로젝트 멤버 정보가 Redis에 존재하지 않습니다: {str(e)}", exc_info=True)
-        raise
-    for member in members:
-        try:
-            name = member.get("name")
-            logger.info(f"🔍 선택된 프로젝트 멤버의 이름: {name}")
-            profiles = member.get("profiles", [])
-            logger.info(f"🔍 선택된 프로젝트 멤버의 모든 프로필 정보: {profiles}")
-        except Exception as e:
-            logger.error(f"프로젝트 멤버의 name 또는 profiles 정보가 Redis에 존재하지 않습니다: {str(e)}", exc_info=True)
-            raise e
-        for profile in profiles:
-            try:
-                project_id_of_profile = profile.get("projectId")
-            except Exception as e:
-                logger.error(f"프로젝트 멤버의 projectId 정보가 Redis에 존재하지 않습니다: {str(e)}", exc_info=True)
-                raise e
-            if project_id_of_profile == projectId:
-                logger.info(f"🔍 프로젝트 아이디와 일치하는 프로필 정보를 감지함: {profile}")
-                try:
-                    positions = profile.get("positions", [])
-                    if not positions:  # positions가 비어있는 경우
-                        logger.warning(f"⚠️ positions가 비어있습니다.")
-                        positions = [""]  # 빈 문자열을 포함한 리스트로 설정
-                    logger.info(f"🔍 선택된 프로젝트 멤버의 역할들: {positions}")
-                except Exception as e:
-                    logger.error(f"profile positions 접근 중 오류 발생: {str(e)}")
-                    continue
-                try:
-                    member_info = [
-                        name,
-                        positions,  # 모든 positions를 쉼표로 구분하여 하나의 문자열로
-                    ]
-                    project_members.append(", ".join(str(item) for item in member_info))
-                    logger.info(f"🔍 프로젝트 멤버 정보를 project_members에 다음과 같이 추가: {project_members}")
-                except Exception as e:
-                    logger.error(f"member_info 생성 중 오류 발생: {str(e)}")
-                    break
-            continue
+    project_context = render_project_context(context)
     
     logger.info(f"project_start_date: {project_start_date}")
     logger.info(f"project_end_date: {project_end_date}")
-    logger.info(f"project_members: {project_members}")
+    logger.info(f"project_context: {project_context}")
     logger.info(f"current_features: {current_features}")
     
-    prev_feat_num = len(current_features)
-    ######### 삭제된 기능들 제거 (deletedFeatures는 featureId의 배열임)
-    
-    for deleted_feature in deletedFeatures:
-        current_features = [feature for feature in current_features if feature["_id"] != deleted_feature]   # current features 목록에서 deleted features 배제
-        
-    logger.info(f"삭제된 기능들 제거 결과: {current_features}\n전체 기능의 갯수가 {prev_feat_num}개에서 {len(current_features)}개로 줄었습니다.")
-    
-    # 현재 기능들을 featureId를 키로 하는 딕셔너리로 변환
-    feature_dict = {feature["_id"]: feature for feature in current_features}
-    ######### 수정된 기능들로 업데이트
-    for modified_feature in modifiedFeatures:
-        feature_id = modified_feature["featureId"]
-        if feature_id in feature_dict:
-            feature = feature_dict[feature_id]
-            feature.update({
-                "name": modified_feature["name"],
-                "useCase": modified_feature["useCase"],
-                "input": modified_feature["input"],
-                "output": modified_feature["output"]
-            })
-    # 딕셔너리에서 다시 리스트로 변환
-    try:
-        current_features = list(feature_dict.values())
-    except Exception as e:
-        logger.error(f"current_features dict에서 list로 형변환 중 오류 발생: {str(e)}")
-        raise Exception(f"current_features dict에서 list로 형변환 중 오류 발생: {str(e)}") from e
-    
-    logger.info(f"수정된 기능들 업데이트 결과: {current_features}")
-    
-    ######### 생성된 기능들 추가
-    for created_feature in createdFeatures:
-        current_features.append(created_feature)
-    
-    logger.info(f"생성된 기능들 추가 결과: {current_features}")
-    
-    
-    # 피드백 분석 및 기능 업데이트
-    update_prompt = ChatPromptTemplate.from_template("""
-    당신은 사용자의 피드백을 분석하고 프로젝트 정보를 바탕으로 기능 명세에서 누락된 정보를 생성하거나 피드백을 반영하여 정보를 수정하는 전문가입니다.
-    반드시 JSON으로만 응답해주세요. 추가 설명이나 주석은 절대 포함하지 마세요.
-    
-    프로젝트 정보:
-    1. 프로젝트 시작일:
-    {startDate}
-    2. 프로젝트 종료일:
-    {endDate}
-    3. 프로젝트 멤버별 [이름, [역할1, 역할2, ...]]:
-    {project_members}
-    4. 프로젝트에 현재 포함되어 있는 기능 목록:
-    {current_features}
-    
-    사용자 피드백:
-    다음은 기능 명세 단계에서 받은 사용자의 피드백입니다: {feedback}
-    이 피드백이 다음 중 어떤 유형인지 판단해주세요:
-    1. 수정/삭제 요청:
-    예시: "담당자를 다른 사람으로 변경해 주세요", "~기능 개발 우선순위를 낮추세요", "~기능을 삭제해주세요.
-    2. 종료 요청:
-    예시: "이대로 좋습니다", "더 이상 수정할 필요 없어요", "다음으로 넘어가죠"
-    1번 유형의 경우는 isNextStep을 0으로, 2번 유형의 경우는 isNextStep을 1로 설정해주세요.
-
-    다음 형식으로 응답해주세요:
-    주의사항:
-    0. 반드시 모든 내용을 한국어로 작성해주세요. 만약 한국어로 대체하기 어려운 단어가 있다면 영어를 사용해 주세요.
-    1. 반드시 위 JSON 형식을 정확하게 따라주세요.
-    2. 모든 문자열은 쌍따옴표(")로 감싸주세요.
-    3. 객체의 마지막 항목에는 쉼표를 넣지 마세요.
-    4. features에서 null로 전달된 값이 있는 필드는 형식에 맞게 채워주세요.
-    5. isNextStep은 사용자의 피드백이 종료 요청인 경우 1, 수정/삭제 요청인 경우 0으로 설정해주세요.
-    6. 각 기능의 모든 필드를 포함해주세요.
-    7. difficulty는 1에서 5 사이의 정수여야 합니다.
-    8. 절대 주석을 추가하지 마세요.
-    9. startDate와 endDate는 프로젝트 시작일인 {startDate}와 종료일인 {endDate} 사이에 있어야 합니다.
-    10. 값이 null로 반환되는 필드가 없도록 하세요. 값이 없는 필드는 문맥을 참고하여 내용을 생성하세요.
-    11. isNextStep을 1로 판단하였다면, 마지막으로 {feedback}의 내용이 반환할 결과에 반영되었는지 확인하세요.
-    {{
-        "isNextStep": 0 또는 1,
-        "features": [
-            {{
-                "name": "string",
-                "useCase": "string",
-                "input": "string",
-                "output": "string",
-                "precondition": "string",
-                "postcondition": "string",
-                "startDate": str(YYYY-MM-DD),
-                "endDate": str(YYYY-MM-DD),
-                "difficulty": int,
-                "priority": int
-            }}
-        ]
-    }}
-    
-    명심하세요. features에 대해서 모든 하위 feature들의 startDate와 endDate가 프로젝트 시작일과 종료일 사이에 있지 않다면, 프로젝트 시작일과 종료일 사이에 있도록 startDate와 endDate를 수정해 주세요.
-    """)
-    
-    messages = update_prompt.format_messages(
-        startDate=project_start_date,
-        endDate=project_end_date,
-        current_features=current_features,
-        project_members=project_members,
-        feedback=feedback,
-    )
-    
-    # LLM Config
-    llm = ChatOpenAI(
-        model_name="gpt-4o-mini",
-        temperature=0.3
-    )
-    response = await llm.ainvoke(messages)
-    
-    # 응답 파싱
-    try:
-        content = response.content
-        try:
-            gpt_result = extract_json_from_gpt_response(content)
-        except Exception as e:
-            logger.error(f"GPT util 사용 중 오류 발생: {str(e)}")
-            raise Exception(f"GPT util 사용 중 오류 발생: {str(e)}") from e
-        
-        # 응답 검증
-        if isinstance(gpt_result, dict) and "features" in gpt_result:
-            feature_list = gpt_result["features"]
-        elif isinstance(gpt_result, list):
-            feature_list = gpt_result
-        else:
-            raise ValueError("GPT 응답이 유효한 features 리스트를 포함하지 않습니다.")
-        
-        if "isNextStep" not in gpt_result:
-            raise ValueError("isNextStep 필드가 누락되었습니다.")
+    # 사용자가 편집한 내용을 로컬에서 반영하고, 변경되었거나 값이 비어 있는 기능만 LLM에 전달
+    merged_features, changed_ids = apply_feature_edits(current_features, createdFeatures, modifiedFeatures, deletedFeatures)
+    logger.info(f"편집 내용 반영 결과: 전체 기능 {len(current_features)}개 -> {len(merged_features)}개, 변경된 기능 {len(changed_ids)}개")
+    delta_features = select_delta_features(merged_features, changed_ids)
+    
+    if not delta_features and not feedback:
+        logger.info("✅ LLM에 전달할 변경 사항과 피드백이 없으므로 기존 기능 명세를 그대로 사용합니다.")
+        gpt_result = {"isNextStep": 0, "features": [], "deletedFeatureIds": []}
+    elif not delta_features and classify_feedback_intent(feedback).is_next_step == 1:
+        logger.info("✅ 변경 사항이 없고 피드백이 종료 요청이므로 LLM 호출 없이 다음 단계로 진행합니다.")
+        gpt_result = {"isNextStep": 1, "features": [], "deletedFeatureIds": []}
+    else:
+        aliases = AliasMap()
+        delta_text = encode_records(delta_features, FIELD_WHITELISTS["feature_update.delta"], aliases, "F")
+        delta_ids = {feature["_id"] for feature in delta_features}
+        index_text = encode_records(
+            [feature for feature in merged_features if feature["_id"] not in delta_ids],
+            FIELD_WHITELISTS["feature_update.index"], aliases, "F"
+        )
+        record_token_savings("feature_update", merged_features, delta_text + "\n" + index_text)
         
-        if not isinstance(gpt_result["isNextStep"], int) or gpt_result["isNextStep"] not in [0, 1]:
-            raise ValueError("isNextStep은 0 또는 1이어야 합니다.")
+        # 피드백 분석 및 기능 업데이트
+        messages = FEATURE_UPDATE_PROMPT.format_messages(
+            project_context=project_context,
+            delta_features=delta_text,
+            other_features=index_text,
+            feedback=feedback,
+        )
         
-        if "features" not in gpt_result:
-            raise ValueError("features 필드가 누락되었습니다.")
+        # LLM Config
+        llm = ChatOpenAI(
+            model_name="gpt-4o-mini",
+            temperature=0.3
+        )
+        response = await llm.ainvoke(messages)
+        record_prompt_usage("feature_update", response)
         
-        if not isinstance(gpt_result["features"], list):
-            raise ValueError("features는 배열이어야 합니다.")
-        
-        # 각 기능 검증
-        for feature in feature_list:
-            required_fields = [
-                "name", "useCase", "input", "output", "precondition", "postcondition",
-                "startDate", "endDate", "difficulty", "priority"
-            ]
-            for field in required_fields:
-                if field not in feature:
-                    raise ValueError(f"🚨 기능 '{feature.get('name', 'unknown')}'에 '{field}' 필드가 누락되었습니다.")
-            
-            if not isinstance(feature["difficulty"], int) or not 1 <= feature["difficulty"] <= 5:
-                logger.warning(f"⚠️ 기능 '{feature['name']}'의 difficulty 형식이 잘못되었습니다.")
-                feature["difficulty"] = 1       # 1로 강제 정의
-            
-            if not feature["startDate"] >= project_start_date:
-                logger.warning(f"⚠️ 기능 '{feature['name']}'의 startDate는 프로젝트 시작일인 {project_start_date} 이후여야 합니다.")
-                feature["startDate"] = project_start_date
-            
-            if not feature["endDate"] <= project_end_date:
-                logger.warning(f"⚠️ 기능 '{feature['name']}'의 endDate는 프로젝트 종료일인 {project_end_date} 이전이어야 합니다.")
-                feature["endDate"] = project_end_date
-            
-    except Exception as e:
-        logger.error(f"GPT API 응답 처리 중 오류 발생: {str(e)}", exc_info=True)
-        raise Exception(f"GPT API 응답 처리 중 오류 발생: {str(e)}", exc_info=True) from e
-
-    try:
-        merged_features = gpt_result["features"]
-    except Exception as e:
-        logger.error(f"GPT 응답에서 features 필드 추출 중 오류 발생: {str(e)}")
-        raise Exception(f"GPT 응답에서 features 필드 추출 중 오류 발생: {str(e)}") from e
-    
-    # _id가 없는 기능에 대해 assign_featureId 호출
-    for feature in merged_features:
+        # 응답 파싱
         try:
-            feature = assign_featureId(feature)
+            content = response.content
+            try:
+                gpt_result = extract_json_from_gpt_response(content)
+            except Exception as e:
+                logger.error(f"GPT util 사용 중 오류 발생: {str(e)}")
+                raise Exception(f"GPT util 사용 중 오류 발생: {str(e)}") from e
+            
+            # 응답 검증
+            if not isinstance(gpt_result, dict):
+                raise ValueError("GPT 응답이 유효한 JSON 객체가 아닙니다.")
+            if "isNextStep" not in gpt_result:
+                raise ValueError("isNextStep 필드가 누락되었습니다.")
+            if not isinstance(gpt_result["isNextStep"], int) or gpt_result["isNextStep"] not in [0, 1]:
+                raise ValueError("isNextStep은 0 또는 1이어야 합니다.")
+            if not isinstance(gpt_result.get("features", []), list):
+                raise ValueError("features는 배열이어야 합니다.")
         except Exception as e:
-            logger.error(f"featureId 부여 과정에서 오류 발생: {str(e)}")
-            raise Exception(f"featureId 부여 과정에서 오류 발생: {str(e)}") from e
+            logger.error(f"GPT API 응답 처리 중 오류 발생: {str(e)}", exc_info=True)
+            raise Exception(f"GPT API 응답 처리 중 오류 발생: {str(e)}", exc_info=True) from e
         
+        # LLM의 patch를 alias(F1, F2, ...)로부터 원래 featureId로 복원
+        patches = []
+        for patch in gpt_result.get("features") or []:
+            original = aliases.resolve(patch.get("featureId")) if isinstance(patch, dict) else None
+            if original is None:
+                logger.warning(f"⚠️ 응답에 포함된 featureId를 복원할 수 없어 제외합니다: {patch}")
+                continue
+            patches.append(dict(patch, featureId=original["_id"]))
+        gpt_result["features"] = patches
+        gpt_result["deletedFeatureIds"] = [
+            aliases.resolve(alias)["_id"] for alias in gpt_result.get("deletedFeatureIds") or [] if aliases.resolve(alias) is not None
+        ]
+    
+    # patch를 featureId 기준으로 병합 (patch되지 않은 기능은 그대로 유지)
+    merged_features, patched_ids = merge_feature_patch(merged_features, gpt_result["features"], gpt_result["deletedFeatureIds"])
+    touched_ids = (patched_ids | changed_ids) & {feature["_id"] for feature in merged_features}
+    logger.info(f"🔍 LLM patch 반영 결과: 수정된 기능 {len(patched_ids)}개, 삭제된 기능 {len(gpt_result['deletedFeatureIds'])}개")
+    
+    # 기능이 생성, 삭제되었거나 예상 소요일이 바뀌었을 수 있으므로 전체 일정을 allocator로 다시 배정 (LLM은 일정을 작성하지 않음)
+    if touched_ids or gpt_result["deletedFeatureIds"] or deletedFeatures:
+        rescheduled_ids = reallocate_feature_dates(merged_features, project_start_date, project_end_date, lanes=len(context.members))
+        if rescheduled_ids:
+            logger.info(f"📅 일정이 다시 배정된 기능 {len(rescheduled_ids)}개")
+        touched_ids |= rescheduled_ids
+    
+    # 변경된 기능만 한 번에 검증하고 difficulty, 기간, expectedDays를 보정
+    touched_positions = [i for i, feature in enumerate(merged_features) if feature["_id"] in touched_ids]
+    validated_features = validate_feature_specs([merged_features[i] for i in touched_positions], project_start_date, project_end_date)
+    for i, feature in zip(touched_positions, validated_features):
+        merged_features[i] = feature
+    touched_features = validated_features
+    
+    # 변경된 기능 중 LLM이 priority를 직접 지정하지 않은 기능의 priority를 한 번에 다시 계산
+    explicit_priority_ids = {patch["featureId"] for patch in gpt_result["features"] if patch.get("priority") is not None}
+    rescored = [feature for feature in touched_features if feature["_id"] not in explicit_priority_ids]
+    if rescored:
         try:
-            start_date = datetime.strptime(feature["startDate"], "%Y-%m-%d")
-            end_date = datetime.strptime(feature["endDate"], "%Y-%m-%d")
-            workdays = int((end_date - start_date).days)
-            if workdays <= 0:
-                logger.warning(f"⚠️ 기능 '{feature['name']}'의 expectedDays가 0일 이하입니다. 1일로 강제 설정합니다.")
-                workdays = 1
-        except ValueError as e:
-            logger.error(f"날짜 형식이 올바르지 않습니다: {str(e)}")
-            raise ValueError(f"날짜 형식이 올바르지 않습니다. YYYY-MM-DD 형식이어야 합니다: {str(e)}")
-        feature["expectedDays"] = workdays
-        
-        if "priority" not in feature:
-            try:
-                feature["priority"] = calculate_priority(feature["expectedDays"], feature["difficulty"])
-            except Exception as e:
-                logger.error(f"priority 계산 중 오류 발생: {str(e)}")
-                raise Exception(f"priority 계산 중 오류 발생: {str(e)}") from e
+            scores = priority_scores(
+                [feature["expectedDays"] for feature in rescored],
+                [feature["difficulty"] for feature in rescored],
+                strict=False,
+            )
+        except Exception as e:
+            logger.error(f"priority 계산 중 오류 발생: {str(e)}")
+            raise Exception(f"priority 계산 중 오류 발생: {str(e)}") from e
+        for feature, score in zip(rescored, scores.tolist()):
+            feature["priority"] = score
+    
+    # 변경된 기능의 embedding을 다시 계산하고, 연관 기능(relfeatIds)이 바뀐 기능도 저장 대상에 포함
+    touched_ids |= await assign_embeddings(context.project_id, merged_features, recompute_ids=touched_ids)
     
     # 업데이트된 기능 목록으로 교체
     logger.info("\n=== 업데이트된 feature_specification 데이터 ===")
     logger.info(json.dumps(merged_features, indent=2, ensure_ascii=False))
     logger.info("=== 데이터 끝 ===\n")
     
-    # Redis에 저장
+    # Redis에 저장 (변경된 기능만 저장하고 삭제된 기능은 제거, 불러온 version 기준 check-and-set)
     try:
-        await save_to_redis(f"features:{email}", merged_features)
+        draft_version, merged_features = await save_draft_changes(email, current_features, merged_features, touched_ids, draft_version)
+    except DraftVersionConflict:
+        raise
     except Exception as e:
         logger.error(f"업데이트된 feature_specification Redis 저장 실패: {str(e)}", exc_info=True)
         raise e
     
-    # 다음 단게로 넘어가는 경우, MongoDB에 Redis의 데이터를 옮겨서 저장
-    feature_collection = await get_feature_collection()
-
+    # 다음 단게로 넘어가는 경우, MongoDB에 Redis의 데이터를 옮겨서 저장 (featureId, projectId 기준 bulk upsert)
     if gpt_result["isNextStep"] == 1:
         try:
             feature_collection = await get_feature_collection()
-            for feat in merged_features:
-                feature_data = {
-                    "featureId": feat["_id"],
-                    "name": feat["name"],
-                    "useCase": feat["useCase"],
-                    "input": feat["input"],
-                    "output": feat["output"],
-                    "precondition": feat["precondition"],
-                    "postcondition": feat["postcondition"],
-                    "expectedDays": feat["expectedDays"],
-                    "startDate": feat["startDate"],
-                    "endDate": feat["endDate"],
-                    "difficulty": feat["difficulty"],
-                    "priority": feat["priority"],
-                    "projectId": project_data["projectId"],
-                    "createdAt": datetime.utcnow()
-                }
-                try:
-                    await feature_collection.insert_one(feature_data)
-                    logger.info(f"{feat['name']} MongoDB 저장 성공 (ID: {feat['_id']})")
-                except Exception as e:
-                    logger.error(f"{feat['name']} MongoDB 저장 실패: {str(e)}", exc_info=True)
-                    raise e
-            logger.info("모든 feature MongoDB 저장 완료")
+            summary = await upsert_features(feature_collection, merged_features, context.project_id)
+            logger.info(f"모든 feature MongoDB 저장 완료: {summary}")
         except Exception as e:
             logger.error(f"feature_specification MongoDB 저장 실패: {str(e)}", exc_info=True)
             raise e
+        # MongoDB에 저장된 초안은 더 이상 사용하지 않으므로 삭제 (실패해도 FEATURE_DRAFT_TTL 후 만료됨)
+        try:
+            await feature_draft_store.delete(email)
+        except Exception as e:
+            logger.warning(f"⚠️ 기능 명세서 초안 삭제 실패 (TTL 후 만료됨): {str(e)}")
     
     # API 응답 반환
     response = {
@@ -678,7 +766,8 @@ async def update_feature_specification(email: str, feedback: str, createdFeature
             }
             for feature in merged_features
         ],
-        "isNextStep": bool(gpt_result["isNextStep"])
+        "isNextStep": bool(gpt_result["isNextStep"]),
+        "version": draft_version
     }
     logger.info(f"👉 API 응답 결과: {response}")
     return response
\ No newline at end of file
@@ -0,0 +1,151 @@
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+'''
+사용자 피드백 의도(종료/수정) 분류
+- 기능 정의, 기능 명세 단계의 피드백이 "다음 단계로 진행"(isNextStep=1)인지 "수정 요청"(isNextStep=0)인지 LLM 호출 없이 판단한다.
+    1. 규칙: "추가", "삭제"와 같은 수정 표현을 먼저 확인하고, 수정 표현이 없을 때만 "이대로 좋습니다", "수정할 필요 없어요"와 같은
+       종료 표현으로 판단한다. 종료/수정 표현이 함께 있거나 "빠졌네요", "없어요"처럼 누락을 말하는 피드백은 LLM에 맡긴다.
+    2. 모델: 규칙에 해당하지 않으면 예시 문장으로 학습한 문자 n-gram Naive Bayes 분류기로 판단
+- 확신도가 INTENT_CONFIDENCE_THRESHOLD 미만이면 판단하지 않고(is_next_step=None) 기존처럼 LLM에 맡긴다.
+- 규칙/모델/LLM 위임 횟수를 집계한다. (GET /metrics/prompts의 feedbackIntent)
+'''
+
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD") or 0.85)
+RULE_CONFIDENCE = 0.95
+NEXT_STEP, MODIFY = 1, 0
+
+# 수정할 것이 없다는 명시적 표현 (수정 표현을 포함하지만, 다른 수정 표현이 없을 때만 종료 의도)
+NO_CHANGE_PATTERN = re.compile(
+    r"(수정|추가|변경|삭제|고칠|바꿀)\S*\s?(것|필요|사항|부분|내용|거)?\S*\s?(없|안\s?해도)"
+    r"|(문제|상관|불만|이견)\S?\s?없"
+)
+# 종료 표현: "이대로", "다음 단계"처럼 진행을 가리키는 말과 함께 쓰였거나 문장 전체가 짧은 동의인 경우만
+# ("주문 완료 페이지", "확정된 주문 목록"처럼 명사로 쓰인 완료/확정/충분은 종료로 보지 않음)
+DONE_PATTERN = re.compile(
+    r"(이대로|그대로|지금대로|이렇게|이걸로|이\s?정도면).{0,8}(좋|괜찮|진행|가|할게|하죠|하겠|충분|완벽|확정|마무리)"
+    r"|다음\s?(단계|으로|로)|넘어가"
+    r"|^(네|넵|예|응|좋아요?|좋네요|좋습니다|괜찮아요|괜찮습니다|완벽해요|완벽합니다|충분해요|충분합니다|확정할게요|확정합니다"
+    r"|ok|okay|오케이|굿|good|lgtm)[.!~\s]*$",
+    re.IGNORECASE,
+)
+MODIFY_PATTERN = re.compile(
+    r"추가|수정|변경|바꿔|바꾸|삭제|빼|제거|넣어|합쳐|나눠|분리|만들어|구현|기능도|필요해|필요합니다|필요할"
+    r"|있으면|했으면|말고|대신|아직|부족|별로|않"
+)
+# 무언가 빠졌다는 표현: 수정 요청일 수 있지만 무엇을 바꿀지 명확하지 않으므로 LLM에 맡김
+MISSING_PATTERN = re.compile(r"빠졌|빠져|빠진|누락|없(?!이)")
+
+# 모델 학습용 예시 문장
+NEXT_STEP_EXAMPLES = (
+    "이대로 좋습니다", "좋아요 다음으로 넘어가죠", "더 이상 수정할 필요 없어요", "다음 단계로 진행해 주세요", "완벽해요",
+    "이 정도면 충분합니다", "확정할게요", "지금 목록으로 진행하겠습니다", "네 좋습니다", "마음에 들어요", "그대로 가죠",
+    "괜찮은 것 같아요", "문제 없습니다", "만족합니다", "이걸로 할게요", "넘어가도 될 것 같아요", "수정 사항 없습니다",
+    "다 됐어요", "이렇게 진행할게요", "좋네요 진행해주세요", "기능 정의는 끝났어요", "이제 다음 거 해요", "ok 진행",
+)
+MODIFY_EXAMPLES = (
+    "장바구니 기능 추가해주세요", "결제 기능도 필요해요", "로그인 기능은 빼주세요", "회원가입 기능을 수정해 주세요",
+    "알림 기능을 넣어 주세요", "검색 기능이 있으면 좋겠어요", "채팅 기능 대신 게시판으로 바꿔주세요", "관리자 페이지도 만들어 주세요",
+    "소셜 로그인도 구현해야 해요", "기능이 너무 많아요 줄여주세요", "주문 조회랑 주문 내역을 합쳐 주세요", "결제 기능을 두 개로 나눠 주세요",
+    "리뷰 작성 기능이 빠졌어요", "쿠폰 기능 삭제해 주세요", "아직 부족한 것 같아요", "마이페이지 기능 좀 더 자세히 해주세요",
+    "프로필 사진 업로드 기능 넣어줘", "댓글 기능은 필요 없어요", "좋긴 한데 신고 기능도 추가해 주세요", "다크 모드 지원해 주세요",
+    "비밀번호 찾기 기능이 없네요", "지도 기능으로 변경해 주세요", "예약 기능이 필요합니다",
+)
+
+# 모델/규칙/LLM 위임 횟수
+INTENT_STATS: Dict[str, int] = {"rule": 0, "model": 0, "llm": 0}
+
+
+class FeedbackIntent:
+    __slots__ = ("is_next_step", "confidence", "source")
+
+    def __init__(self, is_next_step: Optional[int], confidence: float, source: str):
+        self.is_next_step = is_next_step
+        self.confidence = confidence
+        self.source = source
+
+    def __repr__(self) -> str:
+        return f"FeedbackIntent({self.is_next_step}, {self.confidence:.3f}, {self.source!r})"
+
+
+def _normalize(feedback: str) -> str:
+    return " ".join(feedback.lower().split())
+
+
+def _ngrams(text: str) -> List[str]:
+    # 공백을 경계 문자로 바꾼 문자 1~3-gram
+    padded = f"_{text.replace(' ', '_')}_"
+    return [padded[i:i + n] for n in (1, 2, 3) for i in range(len(padded) - n + 1)]
+
+
+class NgramNaiveBayes:
+    """문자 n-gram multinomial Naive Bayes (Laplace smoothing). 확률은 n-gram 수로 정규화하여 긴 문장에서 과신하지 않습니다."""
+
+    def __init__(self, examples: Dict[int, Tuple[str, ...]], alpha: float = 1.0):
+        self.counts = {label: Counter(gram for text in texts for gram in _ngrams(_normalize(text))) for label, texts in examples.items()}
+        self.totals = {label: sum(counts.values()) for label, counts in self.counts.items()}
+        self.vocabulary_size = len(set().union(*self.counts.values()))
+        self.alpha = alpha
+
+    def predict(self, text: str) -> Tuple[int, float]:
+        """(label, 확률)을 반환합니다."""
+        grams = _ngrams(_normalize(text))
+        scores = {}
+        for label, counts in self.counts.items():
+            denominator = self.totals[label] + self.alpha * self.vocabulary_size
+            log_likelihood = sum(math.log((counts[gram] + self.alpha) / denominator) for gram in grams)
+            scores[label] = log_likelihood / max(len(grams), 1)
+        best = max(scores, key=scores.get)
+        # n-gram당 평균 log likelihood 차이를 n-gram 수의 제곱근만큼 키워 확률로 변환
+        scale = math.sqrt(max(len(grams), 1))
+        total = sum(math.exp((score - scores[best]) * scale) for score in scores.values())
+        return best, 1.0 / total
+
+
+_model = NgramNaiveBayes({NEXT_STEP: NEXT_STEP_EXAMPLES, MODIFY: MODIFY_EXAMPLES})
+
+
+def classify_feedback_intent(feedback: Optional[str], threshold: float = INTENT_CONFIDENCE_THRESHOLD) -> FeedbackIntent:
+    """
+    피드백이 종료(1)인지 수정(0)인지 로컬에서 판단합니다.
+
+    Args:
+        feedback (Optional[str]): 사용자 피드백
+        threshold (float): 모델 판단을 사용할 최소 확신도
+
+    Returns:
+        FeedbackIntent: is_next_step(1, 0 또는 판단하지 못한 경우 None), confidence, source("rule", "model", "llm")
+    """
+    text = _normalize(feedback or "")
+    # "수정할 필요 없어요"처럼 수정할 것이 없다는 표현을 지운 나머지에서 수정/누락 표현을 찾는다
+    rest = NO_CHANGE_PATTERN.sub(" ", text)
+    no_change = rest != text
+    if not text:
+        intent = FeedbackIntent(None, 0.0, "llm")
+    elif MODIFY_PATTERN.search(rest):
+        # 종료 표현이 함께 있으면 LLM에 맡김
+        intent = FeedbackIntent(None, 0.0, "llm") if DONE_PATTERN.search(rest) else FeedbackIntent(MODIFY, RULE_CONFIDENCE, "rule")
+    elif MISSING_PATTERN.search(rest):
+        intent = FeedbackIntent(None, 0.0, "llm")
+    elif no_change or DONE_PATTERN.search(rest):
+        intent = FeedbackIntent(NEXT_STEP, RULE_CONFIDENCE, "rule")
+    else:
+        # 규칙에 없는 표현
+        label, confidence = _model.predict(text)
+        intent = FeedbackIntent(label, confidence, "model") if confidence >= threshold else FeedbackIntent(None, confidence, "llm")
+    INTENT_STATS[intent.source] += 1
+    logger.info(f"🧭 피드백 의도 분류: {intent} ({feedback!r})")
+    return intent
+
+
+def get_intent_stats() -> Dict[str, float]:
+    """규칙/모델/LLM 위임 횟수와 로컬에서 판단한 비율을 반환합니다."""
+    total = sum(INTENT_STATS.values())
+    local = INTENT_STATS["rule"] + INTENT_STATS["model"]
+    return dict(INTENT_STATS, localRatio=round(local / total, 4) if total else 0.0)
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+'''
+외부 HTTP 요청(기능 정의서 PDF 다운로드 등)에 공유하는 aiohttp client
+- 서버 lifespan에서 한 번 생성하고(start_http_client) 종료 시 닫는다(close_http_client).
+- connection pool(HTTP_POOL_LIMIT, host별 HTTP_POOL_LIMIT_PER_HOST), DNS 캐시(HTTP_DNS_CACHE_TTL초),
+  keep-alive(HTTP_KEEPALIVE_TIMEOUT초)를 공유하므로 요청마다 연결과 DNS 조회를 새로 하지 않는다.
+- 연결은 HTTP_CONNECT_TIMEOUT초, 응답 읽기는 chunk 사이 HTTP_READ_TIMEOUT초로 제한한다.
+  (큰 파일 다운로드가 중단되지 않도록 전체 시간은 제한하지 않음)
+- lifespan 밖(스크립트, 테스트)에서는 처음 사용할 때 현재 event loop에 생성한다.
+'''
+
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT") or 100)
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST") or 10)
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL") or 300)
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT") or 30)
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT") or 5)
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT") or 30)
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _create_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        use_dns_cache=True,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+    )
+    timeout = aiohttp.ClientTimeout(total=None, connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+async def start_http_client() -> aiohttp.ClientSession:
+    """공유 HTTP client를 생성합니다. (이미 있으면 그대로 반환)"""
+    return get_http_client()
+
+
+def get_http_client() -> aiohttp.ClientSession:
+    """
+    공유 HTTP client를 반환합니다. 없거나 닫혔거나 다른 event loop에서 생성된 경우 현재 event loop에 새로 생성합니다.
+
+    Raises:
+        RuntimeError: 실행 중인 event loop가 없는 경우
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = _create_session()
+        _session_loop = loop
+        logger.info(f"✅ 공유 HTTP client 생성 (pool {HTTP_POOL_LIMIT}, host별 {HTTP_POOL_LIMIT_PER_HOST})")
+    return _session
+
+
+async def close_http_client() -> None:
+    """공유 HTTP client의 연결을 모두 닫습니다."""
+    global _session, _session_loop
+    session, _session, _session_loop = _session, None, None
+    if session is not None and not session.closed:
+        await session.close()
+        logger.info("✅ 공유 HTTP client 종료")
@@ -11,7 +11,10 @@ from langchain_openai import ChatOpenAI
 from mongodb_setting import (get_epic_collection, get_project_collection,
                              get_user_collection)
 from openai import AsyncOpenAI
+from payload_models import validate_action_items
 from project_member_utils import get_project_members
+from prompt_serializer import (FIELD_WHITELISTS, AliasMap, encode_records,
+                               record_token_savings)
 
 #from transformers import AutoModelForTokenClassification, AutoTokenizer
 
@@ -254,12 +257,12 @@ async def convert_action_items_to_tasks(action_items: List[str], project_id: str
     3. endDate는 endDate가 null인 경우 null을 값으로 그대로 반환하고, null이 아닌 경우 endDate가 오늘 날짜 이후인지 확인하세요. 만약 오늘 날짜 이후가 아닌 경우 endDate 값으로 null을 반환합니다.
     endDate는 datetime 형식을 지닌 string으로 반환하세요.
     4. description을 10글자 이내로 요약하여 title을 구성하세요.
-    5. {epics}에는 프로젝트에 속한 모든 epic들의 title, description, id 정보가 다음과 같은 형식으로 정리되어 있습니다: "내용: (description) --- id: (ObjectId)"
+    5. {epics}에는 프로젝트에 속한 모든 epic들의 id, title, description 정보가 첫 줄의 "id|title|description" 헤더 아래에 한 줄씩 정리되어 있습니다. (예: "E1|로그인|소셜 로그인 기능 구현")
     epic별 description을 바탕으로 현재 item의 내용과 가장 유사한 epic을 {epics} 목록 안에서 선택하세요. 이 때 '유사하다'의 정의는 epic의 description과 item의 description 간의 cosine similarity가 0.95 이상임을 의미합니다.
     만약 유사한 epic이 선택되지 않은 경우에는 cosine similarity의 threshold를 0.95에서 0.90으로 낮춰서 다시 유사한 epic을 선택하세요.
     이 때도 유사한 epic이 선택되지 않으면 threshold를 한 번 더 0.90에서 0.80으로 조정합니다.
     그럼에도 선택되지 않는다면 null을 반환하세요.
-    6. 5번에서 선택한 epic의 id를 epicId로 반환하세요. 이때 직접 epicId를 생성하는 게 아니라 반드시 {epics}에 저장되어 있는 id 값을 그대로 반환해야 합니다. 한 번 더 강조합니다. 절대 epicId를 임의로 생성하지 말고 있는 정보를 그대로 입력하세요.
+    6. 5번에서 선택한 epic의 id를 epicId로 반환하세요. 이때 직접 epicId를 생성하는 게 아니라 반드시 {epics}에 저장되어 있는 id 값(예: "E1")을 그대로 반환해야 합니다. 한 번 더 강조합니다. 절대 epicId를 임의로 생성하지 말고 있는 정보를 그대로 입력하세요.
     
     결과를 다음과 같은 JSON 형식으로 반환해 주세요. 다른 형식의 응답은 허용되지 않습니다. 다시 말하지만 반드시 JSON 형식으로만 응답해 주세요.
     {{
@@ -277,8 +280,14 @@ async def convert_action_items_to_tasks(action_items: List[str], project_id: str
     """)
     epic_collection = await get_epic_collection()
     epics = await epic_collection.find({"projectId": project_id}).to_list(length=None)
-    epics_content = "\n".join([f"epic_description: {epic['description']} --- epic_id: ({epic['_id']})" for epic in epics])  # epic들의 title, description, id 정보를 문자열로 정리
-    #logger.info(f"정리된 epics_content: {epics_content}")
+    # epic id는 짧은 alias(E1, E2, ...)로 전달하고 응답을 받은 뒤 원래 ObjectId로 복원
+    aliases = AliasMap()
+    epics_content = encode_records(epics, FIELD_WHITELISTS["meeting.epics"], aliases, "E")
+    record_token_savings(
+        "meeting",
+        lambda: "\n".join([f"epic_description: {epic['description']} --- epic_id: ({epic['_id']})" for epic in epics]),
+        epics_content,
+    )
     
     project_members = await get_project_members(project_id)
     
@@ -303,7 +312,7 @@ async def convert_action_items_to_tasks(action_items: List[str], project_id: str
         logger.error(f"GPT API 처리 중 오류 발생: {e}", exc_info=True)
         raise Exception(f"GPT API 처리 중 오류 발생: {str(e)}", exc_info=True) from e
     
-    response = gpt_result["actionItems"]
+    response = validate_action_items(gpt_result["actionItems"])
     logger.info(f"actionItems 구성 결과: {response}")
     
     # assignee 이름을 대응되는 id로 변경
@@ -349,16 +358,22 @@ async def convert_action_items_to_tasks(action_items: List[str], project_id: str
         except Exception as e:
             logger.error(f"name_to_id 매핑 처리 중 오류 발생: {str(e)}", exc_info=True)
 
-        # epic이 올바르게 연결되었는지 확인
+        # epic이 올바르게 연결되었는지 확인 (alias를 원래 epic id로 복원)
         try:
             if item["epicId"] is not None:
                 logger.info(f"✅ {item['title']}에 매핑된 epicId가 존재합니다. epicId: {item['epicId']}")
-                try:
-                    selected_epic = await epic_collection.find_one({"_id": item["epicId"]})
-                    logger.info(f"🔍 epicId를 사용해서 epic collection으로부터 조회된 epic 제목: {selected_epic['title']}")
-                except Exception as e:
-                    logger.warning(f"⚠️ 액션 아이템에 할당된 epicId가 존재하지만 실제 epic collection에서 조회되지 않습니다. 오류 내용: {str(e)}", exc_info=True)
+                selected_epic = aliases.resolve(item["epicId"])
+                if selected_epic is None:
+                    logger.warning(f"⚠️ 액션 아이템에 할당된 epicId {item['epicId']}가 epic 목록에 존재하지 않습니다.")
                     item["epicId"] = None
+                else:
+                    try:
+                        selected_epic = await epic_collection.find_one({"_id": selected_epic["_id"]})
+                        logger.info(f"🔍 epicId를 사용해서 epic collection으로부터 조회된 epic 제목: {selected_epic['title']}")
+                        item["epicId"] = str(selected_epic["_id"])
+                    except Exception as e:
+                        logger.warning(f"⚠️ 액션 아이템에 할당된 epicId가 존재하지만 실제 epic collection에서 조회되지 않습니다. 오류 내용: {str(e)}", exc_info=True)
+                        item["epicId"] = None
             else:
                 logger.info(f"🔍 {item['title']}에 매핑된 epic이 없습니다.")
         except Exception as e:
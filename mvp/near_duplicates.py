@@ -0,0 +1,181 @@
+import logging
+import os
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from typing import Any, Callable, List, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+'''
+기능 이름 목록의 near-duplicate 제거 (MinHash/LSH)
+- 기능 이름을 정규화한다: NFC, 소문자, 문장 부호 제거, "기능", "사용자"와 같이 모든 기능에 붙는 단어 제거, 공백 제거
+    예) "사용자 로그인 기능", "로그인 기능", "로그인기능" -> "로그인"
+- 정규화된 이름의 문자 2-gram 집합으로 MinHash signature(MINHASH_PERMUTATIONS개)를 계산하고, LSH(band LSH_BANDS개)로
+  같은 bucket에 들어간 쌍만 후보로 삼아 실제 Jaccard 유사도를 확인한다. 목록 길이에 선형인 시간으로 동작한다.
+- Jaccard 유사도가 NEAR_DUPLICATE_THRESHOLD 이상인 쌍을 중복으로 본다. 한 이름이 다른 이름을 포함하는 경우("댓글 작성" / "대댓글 작성",
+  "알림 설정" / "알림 설정 변경")는 서로 다른 기능이므로 중복으로 보지 않는다.
+- LLM이 처음 만든 목록(create_feature_definition)에서는 뒤에 나온 기능을 제외한다. (기능 정의서에서 추출한 기능이 제안보다 우선)
+- 사용자 피드백으로 바뀐 목록(update_feature_definition)에서는 LLM이 임의로 추가한 기능만 제외한다.
+  기존 기능과 사용자가 직접 요청한 기능은 사라지지 않도록 제외하지 않고 중복 후보를 기록만 한다.
+'''
+
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD") or 0.85)
+MINHASH_PERMUTATIONS = int(os.getenv("MINHASH_PERMUTATIONS") or 128)
+LSH_BANDS = int(os.getenv("LSH_BANDS") or 32)
+SHINGLE_SIZE = 2
+GENERIC_WORDS = ("기능", "사용자", "서비스", "시스템")
+FEATURE_SUFFIX = "기능"
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240301)
+_PERMUTATION_A = _rng.integers(1, _MERSENNE_PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)
+_PERMUTATION_B = _rng.integers(0, _MERSENNE_PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+_PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+_GENERIC_PATTERN = re.compile(r"(?:^|\s)(?:" + "|".join(GENERIC_WORDS) + r")(?=\s|$)")
+
+
+def normalize_feature_name(name: str) -> str:
+    """기능 이름을 비교용 문자열로 정규화합니다. (일반적인 단어만 있으면 원래 단어를 유지)"""
+    text = _PUNCTUATION_PATTERN.sub(" ", unicodedata.normalize("NFC", name).lower())
+    stripped = _GENERIC_PATTERN.sub(" ", text)
+    normalized = "".join((stripped if stripped.strip() else text).split())
+    # "로그인기능"처럼 붙여 쓴 접미사
+    return normalized[:-len(FEATURE_SUFFIX)] if normalized.endswith(FEATURE_SUFFIX) and len(normalized) > len(FEATURE_SUFFIX) else normalized
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """문자 size-gram 집합을 반환합니다. (size보다 짧으면 문자열 자체)"""
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def minhash_signature(shingle_set: Set[str]) -> np.ndarray:
+    """shingle 집합의 MinHash signature (MINHASH_PERMUTATIONS개의 uint64)를 반환합니다."""
+    if not shingle_set:
+        return np.full(MINHASH_PERMUTATIONS, _MERSENNE_PRIME, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingle_set), dtype=np.uint64, count=len(shingle_set))
+    hashes %= np.uint64(_MERSENNE_PRIME)
+    # (a * h + b) mod p: a, h < 2^31이므로 uint64에서 overflow가 발생하지 않음
+    permuted = (np.outer(_PERMUTATION_A, hashes) + _PERMUTATION_B[:, None]) % np.uint64(_MERSENNE_PRIME)
+    return permuted.min(axis=1)
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def find_near_duplicates(names: List[str], threshold: float = NEAR_DUPLICATE_THRESHOLD) -> List[Tuple[int, int, float]]:
+    """
+    Jaccard 유사도가 threshold 이상인 기능 이름 쌍을 찾습니다.
+
+    Args:
+        names (List[str]): 기능 이름 목록
+        threshold (float): 중복으로 판단할 Jaccard 유사도 (정규화된 이름의 문자 2-gram 기준)
+
+    Returns:
+        List[Tuple[int, int, float]]: (앞 기능 위치, 뒤 기능 위치, 유사도) 목록 (위치 순서로 정렬)
+    """
+    normalized = [normalize_feature_name(name) for name in names]
+    shingle_sets = [shingles(text) for text in normalized]
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    buckets = defaultdict(list)
+    for position, shingle_set in enumerate(shingle_sets):
+        signature = minhash_signature(shingle_set)
+        for band in range(LSH_BANDS):
+            buckets[(band, signature[band * rows:(band + 1) * rows].tobytes())].append(position)
+
+    candidates = set()
+    for positions in buckets.values():
+        for k, i in enumerate(positions):
+            candidates.update((i, j) for j in positions[k + 1:])
+
+    duplicates = []
+    for i, j in sorted(candidates):
+        a, b = normalized[i], normalized[j]
+        if a != b and (a in b or b in a):
+            # 한 기능이 다른 기능을 더 구체화한 이름 (대댓글 작성 ⊃ 댓글 작성)
+            continue
+        similarity = jaccard(shingle_sets[i], shingle_sets[j])
+        if similarity >= threshold:
+            duplicates.append((i, j, similarity))
+    return duplicates
+
+
+def drop_near_duplicates(items: List[Any], threshold: float = NEAR_DUPLICATE_THRESHOLD, key: Callable[[Any], str] = str) -> Tuple[List[Any], List[Any]]:
+    """
+    near-duplicate 쌍 중 뒤에 나온 항목을 제외합니다.
+
+    Args:
+        items (List[Any]): 기능 목록
+        threshold (float): 중복으로 판단할 Jaccard 유사도
+        key (Callable[[Any], str]): 항목에서 기능 이름을 얻는 함수
+
+    Returns:
+        Tuple[List[Any], List[Any]]: (남은 항목 목록, 제외된 항목 목록)
+    """
+    if len(items) < 2:
+        return list(items), []
+    names = [key(item) for item in items]
+    dropped_positions = set()
+    for i, j, similarity in find_near_duplicates(names, threshold):
+        if i in dropped_positions or j in dropped_positions:
+            continue
+        logger.warning(f"⚠️ 중복 기능으로 판단되어 제외합니다: '{names[j]}' ≈ '{names[i]}' (유사도 {similarity:.3f})")
+        dropped_positions.add(j)
+    kept = [item for position, item in enumerate(items) if position not in dropped_positions]
+    dropped = [item for position, item in enumerate(items) if position in dropped_positions]
+    return kept, dropped
+
+
+def flag_near_duplicates(items: List[Any], threshold: float = NEAR_DUPLICATE_THRESHOLD, key: Callable[[Any], str] = str) -> List[Tuple[str, str, float]]:
+    """
+    near-duplicate 쌍을 제외하지 않고 기록만 합니다. (사용자가 요청한 기능이 사라지지 않도록)
+
+    Returns:
+        List[Tuple[str, str, float]]: (앞 기능 이름, 뒤 기능 이름, 유사도) 목록
+    """
+    names = [key(item) for item in items]
+    flagged = [(names[i], names[j], similarity) for i, j, similarity in find_near_duplicates(names, threshold)]
+    for first, second, similarity in flagged:
+        logger.warning(f"⚠️ 중복일 수 있는 기능 (제외하지 않음): '{second}' ≈ '{first}' (유사도 {similarity:.3f})")
+    return flagged
+
+
+def drop_near_duplicate_additions(items: List[Any], is_protected: Callable[[Any], bool], threshold: float = NEAR_DUPLICATE_THRESHOLD, key: Callable[[Any], str] = str) -> Tuple[List[Any], List[Any]]:
+    """
+    보호되지 않은 항목(LLM이 추가한 기능) 중 다른 항목과 near-duplicate인 항목만 제외합니다.
+    보호된 항목(기존 기능, 사용자가 요청한 기능)끼리의 중복은 제외하지 않고 기록만 합니다.
+
+    Args:
+        items (List[Any]): 기능 목록
+        is_protected (Callable[[Any], bool]): 제외하지 않을 항목인지 판단하는 함수
+        threshold (float): 중복으로 판단할 Jaccard 유사도
+        key (Callable[[Any], str]): 항목에서 기능 이름을 얻는 함수
+
+    Returns:
+        Tuple[List[Any], List[Any]]: (남은 항목 목록, 제외된 항목 목록) (원래 순서 유지)
+    """
+    protected = [bool(is_protected(item)) for item in items]
+    # 보호된 항목을 앞에 두어, 중복 쌍의 뒤 항목이 보호된 항목이면 앞 항목도 보호된 항목이 되도록 함
+    order = sorted(range(len(items)), key=lambda position: not protected[position])
+    names = [key(items[position]) for position in order]
+    dropped_positions = set()
+    for i, j, similarity in find_near_duplicates(names, threshold):
+        if order[i] in dropped_positions or order[j] in dropped_positions:
+            continue
+        if protected[order[j]]:
+            logger.warning(f"⚠️ 중복일 수 있는 기능 (제외하지 않음): '{names[j]}' ≈ '{names[i]}' (유사도 {similarity:.3f})")
+            continue
+        logger.warning(f"⚠️ 중복 기능으로 판단되어 제외합니다: '{names[j]}' ≈ '{names[i]}' (유사도 {similarity:.3f})")
+        dropped_positions.add(order[j])
+    kept = [item for position, item in enumerate(items) if position not in dropped_positions]
+    dropped = [item for position, item in enumerate(items) if position in dropped_positions]
+    return kept, dropped
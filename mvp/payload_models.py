@@ -0,0 +1,233 @@
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import (AfterValidator, BeforeValidator, ConfigDict, Field,
+                      TypeAdapter, ValidationError, ValidationInfo)
+from task_scheduler import count_working_days, format_date, to_date
+from typing_extensions import Annotated, NotRequired, TypedDict
+
+logger = logging.getLogger(__name__)
+
+'''
+LLM 응답(feature, task, sprint, action item) 검증 schema
+- TypedDict schema를 Pydantic v2 TypeAdapter로 compile해 두고, 목록 전체를 한 번의 호출로 검증하고 타입을 변환한다.
+  검증 결과는 model 객체가 아닌 dict이므로 별도의 직렬화(model_dump) 비용이 없다.
+- 문서화된 보정 규칙을 검증 단계에서 함께 적용한다.
+  - feature: difficulty가 1~5 정수가 아니면 1, startDate/endDate는 to_date로 해석해 YYYY-MM-DD로 정규화, 기간은 프로젝트 시작일/종료일 안으로 보정, expectedDays는 startDate부터 endDate까지(양 끝 포함)의 근무일 수 (최소 1일)
+  - task: difficulty는 1~5로 보정(정수가 아니면 3), expected_workhours는 0 이상(없으면 0)
+  - action item: 날짜로 해석할 수 없는 endDate는 null
+- schema에 없는 필드(_id, embedding, taskId 등)는 그대로 유지한다.
+- 검증에 실패하면 ValueError를 발생시킨다.
+'''
+
+MIN_DIFFICULTY, MAX_DIFFICULTY = 1, 5
+DEFAULT_FEATURE_DIFFICULTY = 1      # feature의 difficulty 형식이 잘못된 경우 1로 강제 정의
+DEFAULT_TASK_DIFFICULTY = 3
+
+
+
+def _normalize_date_string(value: Any) -> str:
+    # LLM이 "2025-6-1"이나 "2025-06-01T00:00:00"처럼 응답해도 일정 배치와 같은 규칙(to_date)으로 해석해 "YYYY-MM-DD"로 맞춘다
+    return format_date(to_date(value))
+
+
+DateString = Annotated[str, BeforeValidator(_normalize_date_string)]
+
+
+def _repair_feature_difficulty(value: Any) -> int:
+    if type(value) is int and MIN_DIFFICULTY <= value <= MAX_DIFFICULTY:
+        return value
+    logger.warning(f"⚠️ 기능의 difficulty 형식이 잘못되었습니다: {value}")
+    return DEFAULT_FEATURE_DIFFICULTY
+
+
+def _repair_task_difficulty(value: Any) -> int:
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if type(value) is not int:
+        return DEFAULT_TASK_DIFFICULTY
+    return min(max(value, MIN_DIFFICULTY), MAX_DIFFICULTY)
+
+
+def _repair_workhours(value: Any) -> Any:
+    if value is None:
+        return 0
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value < 0:
+        return 0
+    return value
+
+
+def _repair_end_date(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        datetime.fromisoformat(str(value))
+    except ValueError:
+        logger.warning(f"⚠️ action item의 endDate를 날짜로 해석할 수 없어 null로 설정합니다: {value}")
+        return None
+    return str(value)
+
+
+class FeatureSpecPayload(TypedDict):
+    """기능 명세"""
+    __pydantic_config__ = ConfigDict(extra="allow")
+
+    name: str
+    useCase: str
+    input: str
+    output: str
+    precondition: str
+    postcondition: str
+    startDate: DateString
+    endDate: DateString
+    difficulty: Annotated[int, BeforeValidator(_repair_feature_difficulty)]
+
+
+def _clamp_feature_period(feature: Dict[str, Any], info: ValidationInfo) -> Dict[str, Any]:
+    # startDate, endDate는 DateString에서 "YYYY-MM-DD"로 정규화되었고, 프로젝트 기간은 validate_feature_specs에서 date로 변환됨
+    project_start, project_end = info.context or (None, None)
+    start, end = to_date(feature["startDate"]), to_date(feature["endDate"])
+    if project_start and start < project_start:
+        logger.warning(f"⚠️ 기능 '{feature['name']}'의 startDate는 프로젝트 시작일인 {format_date(project_start)} 이후여야 합니다.")
+        start = project_start
+        feature["startDate"] = format_date(start)
+    if project_end and end > project_end:
+        logger.warning(f"⚠️ 기능 '{feature['name']}'의 endDate는 프로젝트 종료일인 {format_date(project_end)} 이전이어야 합니다.")
+        end = project_end
+        feature["endDate"] = format_date(end)
+    # 일정 배치(allocate_feature_dates)와 같은 근무일 기준으로 계산
+    expected_days = count_working_days(start, end)
+    if expected_days <= 0:
+        logger.warning(f"⚠️ 기능 '{feature['name']}'의 기간에 근무일이 없습니다. expectedDays를 1일로 강제 설정합니다.")
+        expected_days = 1
+    feature["expectedDays"] = expected_days
+    return feature
+
+
+class TaskPayload(TypedDict):
+    """LLM이 정의한 task"""
+    __pydantic_config__ = ConfigDict(extra="allow")
+
+    title: Optional[str]
+    description: NotRequired[Optional[str]]
+    assignee: NotRequired[Optional[str]]
+    difficulty: NotRequired[Annotated[int, BeforeValidator(_repair_task_difficulty)]]
+    expected_workhours: Annotated[float, BeforeValidator(_repair_workhours), Field(ge=0)]
+
+
+class SprintTaskPayload(TypedDict):
+    """sprint에 배치된 task (expected_workhours는 sprint 작업량 계산에 사용)"""
+    __pydantic_config__ = ConfigDict(extra="allow")
+
+    expected_workhours: Annotated[float, Field(ge=0)]
+
+
+class SprintEpicPayload(TypedDict):
+    __pydantic_config__ = ConfigDict(extra="allow")
+
+    tasks: Annotated[List[SprintTaskPayload], Field(min_length=1)]
+
+
+class SprintPayload(TypedDict):
+    __pydantic_config__ = ConfigDict(extra="allow")
+
+    title: str
+    epics: Annotated[List[SprintEpicPayload], Field(min_length=1)]
+
+
+class ActionItemPayload(TypedDict):
+    """회의록에서 추출하여 task 형식으로 변환한 action item"""
+    __pydantic_config__ = ConfigDict(extra="allow")
+
+    title: NotRequired[Optional[str]]
+    description: str
+    assigneeId: NotRequired[Optional[str]]
+    endDate: NotRequired[Annotated[Optional[str], BeforeValidator(_repair_end_date)]]
+    epicId: NotRequired[Optional[str]]
+
+
+_feature_specs_adapter = TypeAdapter(List[Annotated[FeatureSpecPayload, AfterValidator(_clamp_feature_period)]])
+_tasks_adapter = TypeAdapter(List[TaskPayload])
+_sprints_adapter = TypeAdapter(List[SprintPayload])
+_action_items_adapter = TypeAdapter(List[ActionItemPayload])
+
+
+def _describe_errors(kind: str, items: List[Any], error: ValidationError) -> str:
+    messages = []
+    for detail in error.errors(include_url=False)[:10]:
+        location = detail["loc"]
+        position = location[0] if location and isinstance(location[0], int) else None
+        item = items[position] if position is not None and position < len(items) else None
+        name = (item.get("name") or item.get("title")) if isinstance(item, dict) else None
+        field = ".".join(str(part) for part in location[1:]) or "-"
+        messages.append(f"{kind} '{name or position}'의 {field}: {detail['msg']}")
+    return f"🚨 {kind} 검증 실패 ({error.error_count()}건): " + "; ".join(messages)
+
+
+def _validate(adapter: TypeAdapter, kind: str, items: List[Any], context: Any = None) -> List[Any]:
+    if not isinstance(items, list):
+        raise ValueError(f"🚨 {kind} 목록은 배열이어야 합니다: {type(items).__name__}")
+    try:
+        return adapter.validate_python(items, context=context)
+    except ValidationError as e:
+        raise ValueError(_describe_errors(kind, items, e)) from e
+
+
+def validate_feature_specs(features: List[Dict[str, Any]], project_start_date: Union[str, date, None] = None, project_end_date: Union[str, date, None] = None) -> List[Dict[str, Any]]:
+    """
+    기능 명세 목록을 한 번에 검증하고 보정합니다.
+
+    Args:
+        features (List[Dict[str, Any]]): 기능 명세 목록
+        project_start_date (Union[str, date, None]): 프로젝트 시작일 (YYYY-MM-DD 또는 ISO 형식). 지정하면 startDate를 이 날짜 이후로 보정
+        project_end_date (Union[str, date, None]): 프로젝트 종료일 (YYYY-MM-DD 또는 ISO 형식). 지정하면 endDate를 이 날짜 이전으로 보정
+
+    Returns:
+        List[Dict[str, Any]]: 검증된 기능 명세 목록 (startDate, endDate는 YYYY-MM-DD로 정규화, expectedDays 포함, 입력 목록은 변경하지 않음)
+
+    Raises:
+        ValueError: 필수 필드가 없거나 날짜 형식이 올바르지 않은 경우
+    """
+    context = tuple(to_date(value) if value else None for value in (project_start_date, project_end_date))
+    return _validate(_feature_specs_adapter, "기능", features, context)
+
+
+def validate_tasks(tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    LLM이 정의한 task 목록을 한 번에 검증하고 difficulty, expected_workhours를 보정합니다.
+    description, assignee가 없으면 null, difficulty가 없으면 3으로 채웁니다.
+
+    Raises:
+        ValueError: title이 없거나 필드 타입이 올바르지 않은 경우
+    """
+    validated = _validate(_tasks_adapter, "task", tasks)
+    for task in validated:
+        task.setdefault("description", None)
+        task.setdefault("assignee", None)
+        task.setdefault("difficulty", DEFAULT_TASK_DIFFICULTY)
+    return validated
+
+
+def validate_sprints(sprints: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    sprint 목록을 한 번에 검증합니다. sprint마다 epic이, epic마다 task가 하나 이상 있어야 합니다.
+
+    Raises:
+        ValueError: sprint, epic, task 구성이 올바르지 않은 경우
+    """
+    return _validate(_sprints_adapter, "sprint", sprints)
+
+
+def validate_action_items(action_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    action item 목록을 한 번에 검증하고 endDate를 보정합니다. title, assigneeId, endDate, epicId가 없으면 null로 채웁니다.
+
+    Raises:
+        ValueError: description이 없는 등 형식이 올바르지 않은 경우
+    """
+    validated = _validate(_action_items_adapter, "action item", action_items)
+    for item in validated:
+        for field in ("title", "assigneeId", "endDate", "epicId"):
+            item.setdefault(field, None)
+    return validated
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from artifact_store import get_artifact_writer
+from redis_setting import redis_client
+
+logger = logging.getLogger(__name__)
+
+'''
+기능 정의서 PDF 추출 텍스트 캐시
+- 정리된 텍스트는 PDF 내용의 SHA-256을 이름으로 artifact store에 저장한다. (content-addressed)
+  파일 이름이 같은 다른 문서가 서로 덮어쓰지 않고, URL이 달라도 내용이 같은 PDF는 다시 추출하지 않는다.
+- URL별로 마지막에 받은 PDF의 SHA-256과 ETag/Last-Modified를 Redis에 저장한다. (PDF_CACHE_TTL)
+  같은 URL을 다시 요청하면 conditional GET을 보내고, 304 응답이면 다운로드와 추출 없이 캐시된 텍스트를 사용한다.
+- 디스크 사용량과 보관 기간은 artifact store(ARTIFACT_MAX_BYTES, ARTIFACT_MAX_AGE)가 제한한다.
+- Redis 오류나 artifact store에서 삭제된 캐시는 캐시가 없는 것으로 보고 진행한다.
+'''
+
+PDF_CACHE_TTL = int(os.getenv("PDF_CACHE_TTL") or 60 * 60 * 24 * 30)     # 기본 30일
+PDF_CACHE_PREFIX = "pdf_cache"
+PDF_TEXT_ARTIFACT_PREFIX = "pdf-text"
+
+
+def make_url_key(url: str) -> str:
+    """URL 색인의 Redis key ("pdf_cache:url:{sha256}")를 생성합니다."""
+    return f"{PDF_CACHE_PREFIX}:url:{hashlib.sha256(url.encode('utf-8')).hexdigest()}"
+
+
+def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """URL 색인에 저장된 ETag/Last-Modified로 conditional GET header를 만듭니다."""
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("lastModified"):
+        headers["If-Modified-Since"] = entry["lastModified"]
+    return headers
+
+
+async def load_url_entry(url: str) -> Optional[Dict[str, Any]]:
+    """URL로 마지막에 받은 PDF의 sha256, etag, lastModified를 반환합니다. 없거나 Redis 오류가 발생하면 None을 반환합니다."""
+    try:
+        data = await redis_client.get(make_url_key(url))
+    except Exception as e:
+        logger.warning(f"⚠️ PDF 캐시 색인 조회 중 오류 발생 (캐시 없이 진행): {str(e)}")
+        return None
+    if not data:
+        return None
+    try:
+        entry = json.loads(data)
+    except json.JSONDecodeError:
+        logger.warning(f"⚠️ PDF 캐시 색인의 형식이 올바르지 않아 무시합니다: {url}")
+        return None
+    return entry if isinstance(entry, dict) and entry.get("sha256") else None
+
+
+async def save_url_entry(url: str, sha256: str, etag: Optional[str] = None, last_modified: Optional[str] = None, ttl: int = PDF_CACHE_TTL) -> None:
+    """URL과 PDF 내용의 SHA-256, 검증 header를 색인에 저장합니다. 저장 실패는 요청 처리를 중단시키지 않습니다."""
+    entry = {"sha256": sha256, "etag": etag, "lastModified": last_modified}
+    try:
+        await redis_client.set(make_url_key(url), json.dumps(entry), ex=ttl)
+    except Exception as e:
+        logger.warning(f"⚠️ PDF 캐시 색인 저장 중 오류 발생: {str(e)}")
+
+
+def _artifact_name(sha256: str) -> str:
+    return f"{PDF_TEXT_ARTIFACT_PREFIX}-{sha256}.txt"
+
+
+async def load_cached_text(sha256: str) -> Optional[str]:
+    """
+    PDF 내용의 SHA-256으로 artifact store에 캐시된 텍스트를 반환합니다.
+
+    Returns:
+        Optional[str]: 캐시된 텍스트 (없으면 None)
+    """
+    text = await get_artifact_writer().get(_artifact_name(sha256))
+    if text is not None:
+        logger.info(f"♻️ PDF 텍스트 캐시 적중: {sha256[:12]}")
+    return text
+
+
+def save_cached_text(sha256: str, text: str) -> None:
+    """텍스트를 PDF 내용의 SHA-256 이름으로 artifact store에 저장합니다. (background writer가 저장하므로 기다리지 않음)"""
+    get_artifact_writer().put(_artifact_name(sha256), text)
@@ -0,0 +1,157 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+'''
+feature, task 우선순위 계산 엔진
+- 개발 예상 기간(0~30일)과 난이도(1~5)를 선형 정규화 후 가중합(기간 80%, 난이도 20%)하여 1~300 범위의 점수로 매핑한다.
+- 점수 계산과 분위수 구간화(50/150/250)를 task 배열 단위로 한 번에 수행한다.
+- pendingTask는 PENDING_PRIORITY(300)로 고정되며, 구간화할 때는 분위수 계산에서 제외하고 항상 가장 높은 구간에 배정한다.
+'''
+
+MAX_DAYS = 30
+MIN_DIFF, MAX_DIFF = 1, 5
+DEFAULT_DIFFICULTY = 3
+
+# 가중치 (시간 80%, 난이도 20%)
+W_TIME = 0.8
+W_DIFF = 0.2
+
+PENDING_PRIORITY = 300
+PRIORITY_LOW, PRIORITY_MEDIUM, PRIORITY_HIGH = 50, 150, 250
+BUCKET_PERCENTILES = (30, 70)     # Low: ~30%, Medium: 30~70%, High: 70%~
+
+
+def priority_scores(expected_days: Sequence[float], difficulty: Sequence[float], strict: bool = True) -> np.ndarray:
+    """
+    개발 예상 기간과 난이도 배열로부터 우선순위 점수 배열을 계산합니다.
+
+    Args:
+        expected_days (Sequence[float]): 개발 예상 기간(일) 배열
+        difficulty (Sequence[float]): 개발 난이도(1~5) 배열
+        strict (bool): True이면 범위를 벗어난 값에 대해 ValueError를 발생시키고, False이면 범위 안으로 보정합니다.
+
+    Returns:
+        np.ndarray: 1~300 범위의 정수 우선순위 배열
+
+    Raises:
+        ValueError: 배열 길이가 다르거나, strict 모드에서 값이 범위를 벗어나는 경우
+    """
+    days = np.asarray(expected_days, dtype=float)
+    diff = np.asarray(difficulty, dtype=float)
+    if days.shape != diff.shape:
+        raise ValueError("expectedDays와 difficulty의 개수가 일치하지 않습니다.")
+    if strict:
+        if np.any((days < 0) | (days > MAX_DAYS)):
+            raise ValueError(f"expectedDays는 0~{MAX_DAYS} 범위여야 합니다.")
+        if np.any((diff < MIN_DIFF) | (diff > MAX_DIFF)):
+            raise ValueError(f"difficulty는 {MIN_DIFF}~{MAX_DIFF} 범위여야 합니다.")
+    else:
+        days = np.clip(days, 0, MAX_DAYS)
+        diff = np.clip(diff, MIN_DIFF, MAX_DIFF)
+
+    time_score = 1 - days / MAX_DAYS                        # 개발 기간이 짧을수록 1에 가까움
+    diff_score = (MAX_DIFF - diff) / (MAX_DIFF - MIN_DIFF)   # 난이도가 낮을수록 1에 가까움
+    raw = W_TIME * time_score + W_DIFF * diff_score          # raw ∈ [0,1]
+    return (np.ceil(raw * 299) + 1).astype(int)
+
+
+def _task_arrays(tasks: List[Dict[str, Any]], workhours_per_day: float):
+    workhours = np.array([task.get("expected_workhours") or 0 for task in tasks], dtype=float)
+    difficulty = np.array([task.get("difficulty") or DEFAULT_DIFFICULTY for task in tasks], dtype=float)
+    return workhours / workhours_per_day, difficulty
+
+
+def score_tasks(tasks: List[Dict[str, Any]], workhours_per_day: float, pending_ids: Optional[Iterable[Any]] = None) -> List[Dict[str, Any]]:
+    """
+    task 목록의 priority를 한 번에 계산하여 기록합니다.
+    expected_workhours는 workhours_per_day로 나누어 개발 예상 기간(일)으로 환산하며, 범위를 벗어난 값은 보정합니다.
+    pending_ids에 포함된 task와 "pending" 표시가 있는 task는 PENDING_PRIORITY를 부여합니다.
+
+    Args:
+        tasks (List[Dict[str, Any]]): difficulty, expected_workhours를 가진 task 목록
+        workhours_per_day (float): 1일 개발 업무 시간
+        pending_ids (Optional[Iterable[Any]]): 우선 배치할 task id 목록
+
+    Returns:
+        List[Dict[str, Any]]: priority가 기록된 task 목록 (입력 목록을 그대로 수정)
+
+    Raises:
+        ValueError: workhours_per_day가 0 이하인 경우
+    """
+    if workhours_per_day <= 0:
+        raise ValueError("workhours_per_day는 0보다 커야 합니다.")
+    if not tasks:
+        return tasks
+    days, difficulty = _task_arrays(tasks, workhours_per_day)
+    scores = priority_scores(days, difficulty, strict=False)
+    pinned = pending_mask(tasks, pending_ids)
+    scores[pinned] = PENDING_PRIORITY
+    for task, score in zip(tasks, scores.tolist()):
+        task["priority"] = score
+    return tasks
+
+
+def pending_mask(tasks: List[Dict[str, Any]], pending_ids: Optional[Iterable[Any]] = None) -> np.ndarray:
+    """pending_ids에 포함되거나 "pending" 표시가 있는 task의 위치를 True로 표시한 배열을 반환합니다."""
+    mask = np.zeros(len(tasks), dtype=bool)
+    pending = {str(task_id) for task_id in pending_ids or []}
+    if pending:
+        indices = [i for i, task in enumerate(tasks) if task.get("pending") or str(task.get("_id")) in pending]
+    else:
+        indices = [i for i, task in enumerate(tasks) if task.get("pending")]
+    mask[indices] = True
+    return mask
+
+
+def bucket_priorities(priorities: Sequence[float], pinned: Optional[Sequence[bool]] = None) -> np.ndarray:
+    """
+    우선순위 점수 배열을 30/70 분위수 기준으로 50(Low), 150(Medium), 250(High) 세 구간으로 나눕니다.
+    분위수는 고정(pinned)되지 않은 점수의 고유값으로 한 번만 계산하므로, 같은 점수를 가진 task는 항상 같은 구간에 배정되고
+    동점인 task가 많아도 구간이 한쪽으로 쏠리지 않습니다. 고정된 task는 분위수 계산에서 제외되며 항상 High 구간에 배정됩니다.
+
+    Args:
+        priorities (Sequence[float]): 우선순위 점수 배열
+        pinned (Optional[Sequence[bool]]): 고정할 위치를 True로 표시한 배열 (예: pendingTask)
+
+    Returns:
+        np.ndarray: 50, 150, 250으로 구간화된 우선순위 배열
+    """
+    values = np.asarray(priorities, dtype=float)
+    pinned = np.zeros(values.shape, dtype=bool) if pinned is None else np.asarray(pinned, dtype=bool)
+    buckets = np.full(values.shape, PRIORITY_HIGH, dtype=int)
+    free = values[~pinned]
+    if free.size == 0:
+        return buckets
+    p_low, p_high = np.percentile(np.unique(free), BUCKET_PERCENTILES)
+    logger.info(f"🔍 priority 목록의 {BUCKET_PERCENTILES[0]}% 값: {p_low}, {BUCKET_PERCENTILES[1]}% 값: {p_high}")
+    free_buckets = np.select(
+        [free <= p_low, free <= p_high],
+        [PRIORITY_LOW, PRIORITY_MEDIUM],
+        default=PRIORITY_HIGH,
+    )
+    buckets[~pinned] = free_buckets
+    return buckets
+
+
+def bucket_task_priorities(tasks: List[Dict[str, Any]], pending_ids: Optional[Iterable[Any]] = None) -> List[Dict[str, Any]]:
+    """
+    task 목록의 priority를 50/150/250 구간으로 재조정합니다. pendingTask는 High 구간에 배정됩니다.
+
+    Args:
+        tasks (List[Dict[str, Any]]): priority를 가진 task 목록
+        pending_ids (Optional[Iterable[Any]]): 우선 배치할 task id 목록
+
+    Returns:
+        List[Dict[str, Any]]: priority가 재조정된 task 목록 (입력 목록을 그대로 수정)
+    """
+    if not tasks:
+        return tasks
+    priorities = np.array([task["priority"] for task in tasks], dtype=float)
+    buckets = bucket_priorities(priorities, pending_mask(tasks, pending_ids))
+    for task, bucket in zip(tasks, buckets.tolist()):
+        task["priority"] = bucket
+    return tasks
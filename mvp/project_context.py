@@ -0,0 +1,221 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from redis_setting import redis_client
+
+logger = logging.getLogger(__name__)
+
+'''
+프로젝트 context (projectId, 시작일, 종료일, 멤버별 이름과 역할)
+- Redis의 프로젝트 blob(key: email)은 함께 필요한 key(예: features:{email})와 pipeline 한 번으로 조회하고, 또는 MongoDB의 project/user 문서로부터 한 번만 구성한다.
+- Redis blob으로 구성한 context는 email별로 memoize하며, blob 내용이 바뀌면(fingerprint 불일치) 다시 구성한다.
+- MongoDB로 구성한 context는 projectId별로 PROJECT_CONTEXT_TTL초 동안 재사용한다.
+'''
+
+PROJECT_CONTEXT_CACHE_SIZE = int(os.getenv("PROJECT_CONTEXT_CACHE_SIZE") or 256)
+PROJECT_CONTEXT_TTL = float(os.getenv("PROJECT_CONTEXT_TTL") or 60)
+
+
+class ProjectMember:
+    __slots__ = ("name", "positions")
+
+    def __init__(self, name: str, positions: Tuple[str, ...]):
+        self.name = name
+        self.positions = positions
+
+    def __repr__(self) -> str:
+        return f"ProjectMember({self.name!r}, {list(self.positions)!r})"
+
+
+class ProjectContext:
+    __slots__ = ("project_id", "start_date", "end_date", "members")
+
+    def __init__(self, project_id: Any, start_date: Optional[str], end_date: Optional[str], members: Tuple[ProjectMember, ...]):
+        self.project_id = project_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.members = members
+
+    @classmethod
+    def from_project_blob(cls, project_data: Dict[str, Any]) -> "ProjectContext":
+        """
+        Redis에 저장된 프로젝트 blob으로부터 context를 구성합니다.
+        멤버별 profiles 중 projectId가 일치하는 profile의 positions를 역할로 사용합니다.
+        """
+        project_id = project_data.get("projectId", "")
+        members = []
+        for member in project_data.get("members", []):
+            name = member.get("name")
+            for profile in member.get("profiles", []):
+                if profile.get("projectId") != project_id:
+                    continue
+                positions = profile.get("positions", [])
+                if not positions:  # positions가 비어있는 경우
+                    logger.warning(f"⚠️ 멤버 {name}의 positions가 비어있습니다.")
+                    positions = [""]
+                members.append(ProjectMember(name, tuple(positions)))
+        return cls(project_id, project_data.get("startDate", ""), project_data.get("endDate", ""), tuple(members))
+
+    @classmethod
+    def from_mongo_documents(cls, project_data: Dict[str, Any], users: List[Dict[str, Any]]) -> "ProjectContext":
+        """
+        MongoDB의 project 문서와 멤버 user 문서 목록으로부터 context를 구성합니다.
+        projectId가 일치하는 profile이 없거나 positions가 비어 있는 멤버는 제외합니다.
+        """
+        project_id = project_data["_id"]
+        users_by_id = {user["_id"]: user for user in users}
+        members = []
+        for member_ref in project_data.get("members", []):
+            user_id = getattr(member_ref, "id", member_ref)
+            user_info = users_by_id.get(user_id)
+            if not user_info:
+                logger.warning(f"⚠️ 사용자 정보를 찾을 수 없습니다: {user_id}")
+                continue
+            name = user_info.get("name")
+            if name is None:
+                logger.warning(f"⚠️ 사용자 이름이 없습니다: {user_id}")
+                continue
+            for profile in user_info.get("profiles", []):
+                if profile.get("projectId") == project_id and profile.get("positions"):
+                    members.append(ProjectMember(name, tuple(profile["positions"])))
+        return cls(project_id, project_data.get("startDate"), project_data.get("endDate"), tuple(members))
+
+    def member_descriptions(self) -> List[str]:
+        """기능 명세 프롬프트에서 사용하는 "이름, [역할1, 역할2]" 형식의 멤버 목록"""
+        return [f"{member.name}, {list(member.positions)}" for member in self.members]
+
+    def member_tuples(self) -> List[Tuple[str, str]]:
+        """[(멤버 이름, "역할1, 역할2"), ...] 형식의 멤버 목록"""
+        return [(member.name, ", ".join(member.positions)) for member in self.members]
+
+
+_blob_cache: "OrderedDict[str, Tuple[str, ProjectContext]]" = OrderedDict()
+_mongo_cache: "OrderedDict[Any, Tuple[float, ProjectContext]]" = OrderedDict()
+
+
+def _fingerprint(project_data: Any) -> str:
+    raw = project_data if isinstance(project_data, str) else json.dumps(project_data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _remember(cache: OrderedDict, key: Any, value: Any) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > PROJECT_CONTEXT_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def get_project_context(email: str, project_data: Any) -> ProjectContext:
+    """
+    email의 프로젝트 blob으로부터 context를 반환합니다. blob이 이전과 같으면 memoize된 context를 재사용합니다.
+
+    Args:
+        email (str): 사용자 email (Redis 프로젝트 blob의 key)
+        project_data (Any): Redis에서 조회한 프로젝트 blob (dict 또는 JSON 문자열)
+
+    Returns:
+        ProjectContext: 프로젝트 context
+
+    Raises:
+        ValueError: 프로젝트 blob이 없는 경우
+    """
+    if not project_data:
+        raise ValueError(f"Project for user {email} not found")
+    fingerprint = _fingerprint(project_data)
+    cached = _blob_cache.get(email)
+    if cached is not None and cached[0] == fingerprint:
+        _blob_cache.move_to_end(email)
+        return cached[1]
+    if isinstance(project_data, str):
+        project_data = json.loads(project_data)
+    context = ProjectContext.from_project_blob(project_data)
+    _remember(_blob_cache, email, (fingerprint, context))
+    logger.info(f"🔍 프로젝트 context 구성: {email} (멤버 {len(context.members)}명)")
+    return context
+
+
+def _decode_json(value: Optional[str]) -> Any:
+    if value is None:
+        return None
+    value = json.loads(value)
+    if isinstance(value, str):    # save_to_redis로 문자열이 한 번 더 직렬화되어 저장된 경우
+        value = json.loads(value)
+    return value
+
+
+async def fetch_project_context(email: str, extra_keys: Iterable[str] = (), client=redis_client) -> Tuple[ProjectContext, List[Any]]:
+    """
+    프로젝트 blob(key: email)과 함께 필요한 key들을 pipeline 한 번으로 조회하고 프로젝트 context를 반환합니다.
+
+    Args:
+        email (str): 사용자 email
+        extra_keys (Iterable[str]): 함께 조회할 key 목록 (예: features:{email})
+        client: Redis client
+
+    Returns:
+        Tuple[ProjectContext, List[Any]]: 프로젝트 context와 extra_keys 순서대로 JSON 디코딩된 값 목록 (없는 key는 None)
+
+    Raises:
+        ValueError: 프로젝트 blob이 없는 경우
+    """
+    extra_keys = list(extra_keys)
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.get(email)
+        for key in extra_keys:
+            pipe.get(key)
+        raw_project, *raw_values = await pipe.execute()
+    if isinstance(raw_project, str) and raw_project.startswith('"'):
+        raw_project = json.loads(raw_project)
+    return get_project_context(email, raw_project), [_decode_json(value) for value in raw_values]
+
+
+async def load_project_context(project_id: Any, project_collection, user_collection) -> ProjectContext:
+    """
+    MongoDB에서 프로젝트와 멤버 정보를 조회하여 context를 반환합니다.
+    멤버 user 문서는 $in 조회 한 번으로 가져오며, 결과는 PROJECT_CONTEXT_TTL초 동안 재사용합니다.
+
+    Args:
+        project_id (Any): 프로젝트 ID
+        project_collection: project collection
+        user_collection: user collection
+
+    Returns:
+        ProjectContext: 프로젝트 context
+
+    Raises:
+        Exception: 프로젝트를 찾을 수 없는 경우
+        AssertionError: 프로젝트에 멤버가 없는 경우
+    """
+    cached = _mongo_cache.get(project_id)
+    if cached is not None and time.monotonic() - cached[0] < PROJECT_CONTEXT_TTL:
+        _mongo_cache.move_to_end(project_id)
+        return cached[1]
+
+    project_data = await project_collection.find_one({"_id": project_id})
+    if not project_data:
+        logger.error(f"projectId {project_id}에 해당하는 프로젝트를 찾을 수 없습니다.")
+        raise Exception(f"projectId {project_id}에 해당하는 프로젝트를 찾을 수 없습니다.")
+    members = project_data.get("members", [])
+    assert len(members) > 0, "members가 없습니다."
+    user_ids = [getattr(member_ref, "id", member_ref) for member_ref in members]
+    users = await user_collection.find({"_id": {"$in": user_ids}}).to_list(length=None)
+    context = ProjectContext.from_mongo_documents(project_data, users)
+    _remember(_mongo_cache, project_id, (time.monotonic(), context))
+    return context
+
+
+def invalidate_project_context(email: Optional[str] = None, project_id: Any = None) -> None:
+    """memoize된 context를 제거합니다. 인자가 없으면 모두 제거합니다."""
+    if email is None and project_id is None:
+        _blob_cache.clear()
+        _mongo_cache.clear()
+        return
+    if email is not None:
+        _blob_cache.pop(email, None)
+    if project_id is not None:
+        _mongo_cache.pop(project_id, None)
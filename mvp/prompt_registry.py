@@ -0,0 +1,157 @@
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from langchain_core.prompts import ChatPromptTemplate
+from project_context import ProjectContext
+from task_scheduler import format_date, to_date
+
+logger = logging.getLogger(__name__)
+
+'''
+LLM 프롬프트 registry
+- 모든 프롬프트는 바뀌지 않는 부분에서 자주 바뀌는 부분 순서로 메시지를 구성한다.
+    1. 공통 시스템 지침 (COMMON_SYSTEM_PROMPT, 모든 단계가 공유)
+    2. 단계별 지침과 응답 형식 (변수 없음)
+    3. 프로젝트 context (기간, 멤버; 같은 프로젝트라면 기능 정의 → 기능 명세 → 스프린트 단계에서 동일)
+    4. 요청별 값 (기능 목록, 피드백, task 목록 등)
+  OpenAI의 prompt caching은 앞부분이 같은 프롬프트의 입력 token을 재사용하므로, 같은 단계를 반복 호출하면 1~3이 cache된다.
+- ChatPromptTemplate은 import 시점에 register_prompt로 한 번만 compile하여 PROMPTS에 등록하고, 호출마다 다시 만들지 않는다.
+  메시지 template의 해시를 프롬프트 버전(PROMPT_VERSIONS)으로 기록하여, 프롬프트가 바뀌면 LLM 응답 캐시(task_cache)가 새로 생성되도록 한다.
+- 응답의 usage 정보로 프롬프트별 입력 token 중 cache된 token 비율을 집계한다. (GET /metrics/prompts)
+'''
+
+COMMON_SYSTEM_PROMPT = """
+당신은 주니어 개발팀의 소프트웨어 프로젝트를 기능 정의, 기능 명세, 스프린트 계획 단계에 걸쳐 돕는 애자일 프로젝트 매니저이자 요구사항 분석가입니다.
+당신의 주요 언어는 한국어입니다. 모든 내용은 한국어로 작성하고, 한국어로 대체하기 어려운 단어만 영어를 사용하세요.
+
+응답 공통 규칙:
+1. 반드시 요청한 JSON 형식으로만 응답하세요. 추가 설명, 다른 텍스트, 주석은 절대 포함하지 마세요.
+2. 모든 문자열은 쌍따옴표(")로 감싸고, 객체의 마지막 항목에는 쉼표를 넣지 마세요.
+3. 전달받은 id(featureId, epicId, taskId 등)는 절대 바꾸지 말고 그대로 반환하세요.
+4. 담당자(assignee)는 반드시 프로젝트 멤버 중 한 명의 이름만 사용하고, FE, BE와 같은 역할은 제외하세요.
+5. difficulty는 반드시 1 이상 5 이하의 정수여야 합니다.
+6. 날짜는 "YYYY-MM-DD" 형식을 사용하세요.
+"""
+
+PROJECT_CONTEXT_PROMPT = """
+프로젝트 정보:
+{project_context}
+"""
+
+UNKNOWN_DATE = "미정"
+
+# 이름별로 compile된 프롬프트
+PROMPTS: Dict[str, ChatPromptTemplate] = {}
+
+# 이름별 프롬프트 버전 (메시지 template의 SHA-256 앞 16자리)
+PROMPT_VERSIONS: Dict[str, str] = {}
+
+# 프롬프트별 입력 token 통계: {"calls", "input_tokens", "cached_tokens"}
+PROMPT_USAGE: Dict[str, Dict[str, int]] = {}
+
+
+def register_prompt(name: str, instructions: str, request: str, with_project_context: bool = True) -> ChatPromptTemplate:
+    """
+    공통 prefix 구조로 프롬프트를 compile하여 등록합니다.
+
+    Args:
+        name (str): 프롬프트 이름 (usage 통계의 key)
+        instructions (str): 단계별 지침과 응답 형식. cache 대상이므로 변수를 포함하지 않아야 합니다.
+        request (str): 요청별 값이 들어가는 마지막 메시지 template
+        with_project_context (bool): 프로젝트 context 메시지({project_context}) 포함 여부
+
+    Returns:
+        ChatPromptTemplate: compile된 프롬프트
+
+    Raises:
+        ValueError: 같은 이름의 프롬프트가 이미 등록되었거나, instructions에 변수가 포함된 경우
+    """
+    if name in PROMPTS:
+        raise ValueError(f"이미 등록된 프롬프트입니다: {name}")
+    if ChatPromptTemplate.from_messages([("system", instructions)]).input_variables:
+        raise ValueError(f"프롬프트 {name}의 지침에는 변수를 포함할 수 없습니다. 요청별 값은 request에 작성하세요.")
+    messages = [("system", COMMON_SYSTEM_PROMPT), ("system", instructions)]
+    if with_project_context:
+        messages.append(("human", PROJECT_CONTEXT_PROMPT))
+    messages.append(("human", request))
+    prompt = PROMPTS[name] = ChatPromptTemplate.from_messages(messages)
+    PROMPT_VERSIONS[name] = hashlib.sha256(json.dumps(messages, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+    return prompt
+
+
+def get_prompt(name: str) -> ChatPromptTemplate:
+    """등록된 프롬프트를 반환합니다."""
+    try:
+        return PROMPTS[name]
+    except KeyError:
+        raise KeyError(f"등록되지 않은 프롬프트입니다: {name}") from None
+
+
+def get_prompt_version(name: str) -> str:
+    """등록된 프롬프트의 버전(메시지 template의 해시)을 반환합니다."""
+    try:
+        return PROMPT_VERSIONS[name]
+    except KeyError:
+        raise KeyError(f"등록되지 않은 프롬프트입니다: {name}") from None
+
+
+def _format_period_date(value: Any) -> str:
+    if not value:
+        return UNKNOWN_DATE
+    try:
+        return format_date(to_date(value))
+    except ValueError:
+        return str(value)
+
+
+def render_project_context(context: ProjectContext) -> str:
+    """
+    프로젝트 context를 모든 단계에서 같은 문자열이 되도록 렌더링합니다.
+    Redis blob(문자열 날짜)과 MongoDB 문서(datetime)로 구성한 context가 같은 결과를 내도록 날짜를 정규화합니다.
+    """
+    lines = [f"- 프로젝트 기간: {_format_period_date(context.start_date)} ~ {_format_period_date(context.end_date)}"]
+    lines.append("- 프로젝트 멤버 (이름: 역할):")
+    for member in context.members:
+        positions = ", ".join(position for position in member.positions if position) or "역할 없음"
+        lines.append(f"  - {member.name}: {positions}")
+    return "\n".join(lines)
+
+
+def _usage_tokens(response: Any) -> Optional[Dict[str, int]]:
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        details = usage.get("input_token_details") or {}
+        return {"input_tokens": usage.get("input_tokens", 0), "cached_tokens": details.get("cache_read") or 0}
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage")
+    if isinstance(token_usage, dict):
+        details = token_usage.get("prompt_tokens_details") or {}
+        return {"input_tokens": token_usage.get("prompt_tokens", 0), "cached_tokens": details.get("cached_tokens") or 0}
+    return None
+
+
+def record_prompt_usage(name: str, response: Any) -> Optional[Dict[str, int]]:
+    """
+    LLM 응답의 usage 정보로 프롬프트별 입력 token과 cache된 token 수를 누적합니다.
+
+    Returns:
+        Optional[Dict[str, int]]: 이번 호출의 input_tokens, cached_tokens (usage 정보가 없으면 None)
+    """
+    tokens = _usage_tokens(response)
+    if tokens is None:
+        return None
+    stats = PROMPT_USAGE.setdefault(name, {"calls": 0, "input_tokens": 0, "cached_tokens": 0})
+    stats["calls"] += 1
+    stats["input_tokens"] += tokens["input_tokens"]
+    stats["cached_tokens"] += tokens["cached_tokens"]
+    logger.info(f"🧊 [{name}] 입력 token {tokens['input_tokens']}개 중 {tokens['cached_tokens']}개 cache 사용")
+    return tokens
+
+
+def get_prompt_usage() -> Dict[str, Dict[str, Any]]:
+    """프롬프트별 누적 입력 token과 cache된 token 비율을 반환합니다."""
+    return {
+        name: dict(stats, cached_ratio=round(stats["cached_tokens"] / stats["input_tokens"], 4) if stats["input_tokens"] else 0.0)
+        for name, stats in PROMPT_USAGE.items()
+    }
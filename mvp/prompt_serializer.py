@@ -0,0 +1,213 @@
+import logging
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+'''
+프롬프트에 포함되는 MongoDB 문서 직렬화 유틸
+- 호출 위치(call site)별로 필요한 필드만 남긴다. (FIELD_WHITELISTS)
+- ObjectId 같은 긴 id는 "E1", "T1"과 같은 짧은 alias로 바꾸고, 응답을 받은 뒤 AliasMap으로 원래 값을 복원한다.
+- 문서는 "헤더 한 줄 + 레코드별 한 줄"의 '|' 구분 형식으로 인코딩한다.
+    예) id|title|assignee|expected_workhours|priority
+        T1|로그인 API 구현|홍길동|16|250
+- 기존 방식(dict repr) 대비 절약한 token 수를 endpoint별로 집계한다.
+  token 수 계산은 요청마다 하지 않고 endpoint별 TOKEN_SAVINGS_SAMPLE_EVERY번째 호출마다(첫 호출 포함) 한다.
+  기존 방식의 payload는 함수로 넘겨 측정하는 호출에서만 만들 수 있다.
+'''
+
+FIELD_WHITELISTS: Dict[str, Sequence[str]] = {
+    "sprint.tasks": ("title", "assignee", "expected_workhours", "priority"),
+    "task_from_epic.tasks": ("title", "description", "assignee", "priority"),
+    "meeting.epics": ("title", "description"),
+    "feature_update.delta": ("name", "useCase", "input", "output", "precondition", "postcondition",
+                             "expectedDays", "difficulty", "priority"),
+    "feature_update.index": ("name",),
+}
+
+FIELD_SEPARATOR = "|"
+NULL_VALUE = "null"
+
+TOKEN_SAVINGS_SAMPLE_EVERY = int(os.getenv("TOKEN_SAVINGS_SAMPLE_EVERY") or 20)
+
+# endpoint별 token 절약 통계: {"calls", "sampled_calls", "raw_tokens", "compact_tokens"} (token 수는 측정한 호출의 합)
+TOKEN_SAVINGS: Dict[str, Dict[str, int]] = {}
+
+_encoding = None
+
+
+class AliasMap:
+    """짧은 alias와 원래 값(id 또는 문서)을 양방향으로 매핑합니다."""
+
+    def __init__(self):
+        self._by_alias: Dict[str, Any] = {}
+        self._counters: Dict[str, int] = {}
+
+    def register(self, value: Any, prefix: str) -> str:
+        """value에 prefix로 시작하는 새 alias를 부여합니다. (예: prefix "T" -> "T1", "T2", ...)"""
+        self._counters[prefix] = self._counters.get(prefix, 0) + 1
+        alias = f"{prefix}{self._counters[prefix]}"
+        self._by_alias[alias] = value
+        return alias
+
+    def resolve(self, alias: Any, default: Any = None) -> Any:
+        """alias에 대응되는 원래 값을 반환합니다. 공백, 따옴표, 괄호가 섞인 응답도 허용합니다."""
+        if alias is None:
+            return default
+        key = str(alias).strip().strip("\"'()[]")
+        return self._by_alias.get(key, default)
+
+    def __contains__(self, alias: Any) -> bool:
+        return self.resolve(alias, default=_MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._by_alias)
+
+
+_MISSING = object()
+
+
+def _format_value(value: Any) -> str:
+    if value is None or value == "":
+        return NULL_VALUE
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, (list, tuple)):
+        value = ", ".join(str(item) for item in value)
+    text = str(value)
+    # 구분자와 줄바꿈이 레코드 구조를 깨지 않도록 치환
+    return text.replace("\r", " ").replace("\n", " ").replace(FIELD_SEPARATOR, "/")
+
+
+def encode_records(
+    records: Iterable[Dict[str, Any]],
+    fields: Sequence[str],
+    aliases: Optional[AliasMap] = None,
+    prefix: Optional[str] = None,
+) -> str:
+    """
+    문서 목록을 헤더 한 줄과 레코드별 한 줄로 인코딩합니다.
+
+    Args:
+        records (Iterable[Dict[str, Any]]): 인코딩할 문서 목록
+        fields (Sequence[str]): 포함할 필드 (whitelist)
+        aliases (Optional[AliasMap]): 지정된 경우 각 문서에 alias를 부여하여 첫 번째 열("id")로 출력
+        prefix (Optional[str]): alias prefix (aliases와 함께 사용)
+
+    Returns:
+        str: 인코딩된 문자열
+    """
+    with_alias = aliases is not None and prefix is not None
+    header = (["id"] if with_alias else []) + list(fields)
+    lines = [FIELD_SEPARATOR.join(header)]
+    for record in records:
+        row = [aliases.register(record, prefix)] if with_alias else []
+        row.extend(_format_value(record.get(field)) for field in fields)
+        lines.append(FIELD_SEPARATOR.join(row))
+    return "\n".join(lines)
+
+
+def encode_tasks_by_epic(tasks_by_epic: List[Dict[str, Any]], aliases: AliasMap, fields: Sequence[str] = FIELD_WHITELISTS["sprint.tasks"]) -> str:
+    """
+    create_sprint의 tasks_by_epic을 epic 단위 블록으로 인코딩합니다.
+    epic id는 "E{n}", task는 "T{n}" alias로 바뀌며 aliases에 원래 epicId와 task 문서가 기록됩니다.
+
+    예)
+        [epic E1]
+        id|title|assignee|expected_workhours|priority
+        T1|로그인 API 구현|홍길동|16|250
+    """
+    blocks = []
+    for epic in tasks_by_epic:
+        epic_alias = aliases.register(epic["epicId"], "E")
+        blocks.append(f"[epic {epic_alias}]\n" + encode_records(epic["tasks"], fields, aliases, "T"))
+    return "\n\n".join(blocks)
+
+
+def restore_tasks_by_epic(epics: List[Dict[str, Any]], aliases: AliasMap, updatable_fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    LLM 응답의 epicId, taskId alias를 원래 epicId와 task 문서로 복원합니다.
+    task 문서는 복사본에 updatable_fields로 지정된 필드만 LLM 응답 값으로 갱신합니다.
+    알 수 없는 alias는 경고 후 제외합니다.
+    """
+    restored_epics = []
+    for epic in epics:
+        epic_id = aliases.resolve(epic.get("epicId"))
+        if epic_id is None:
+            logger.warning(f"⚠️ 응답에 포함된 epicId {epic.get('epicId')}를 복원할 수 없어 제외합니다.")
+            continue
+        restored_tasks = []
+        for task in epic.get("tasks", []):
+            original = aliases.resolve(task.get("taskId"))
+            if not isinstance(original, dict):
+                logger.warning(f"⚠️ 응답에 포함된 taskId {task.get('taskId')}를 복원할 수 없어 제외합니다.")
+                continue
+            restored = dict(original)
+            for field in updatable_fields:
+                if task.get(field) is not None:
+                    restored[field] = task[field]
+            restored_tasks.append(restored)
+        restored_epics.append({"epicId": epic_id, "tasks": restored_tasks})
+    return restored_epics
+
+
+def count_tokens(text: str) -> int:
+    """o200k_base 기준 token 수를 반환합니다. (tiktoken이 없으면 문자 수로 추정)"""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logger.warning(f"⚠️ tiktoken을 사용할 수 없어 문자 수 기반으로 token 수를 추정합니다: {str(e)}")
+            _encoding = False
+    if _encoding is False:
+        return max(1, len(text) // 4)
+    return len(_encoding.encode(text))
+
+
+def record_token_savings(endpoint: str, raw_payload: Union[Any, Callable[[], Any]], compact_payload: str) -> Optional[Dict[str, int]]:
+    """
+    기존 방식(raw_payload의 문자열 표현)과 압축 직렬화 결과의 token 수를 비교하여 endpoint별로 누적합니다.
+    호출 수는 매번 세고, token 수는 TOKEN_SAVINGS_SAMPLE_EVERY번째 호출마다 측정합니다.
+
+    Args:
+        endpoint (str): 집계할 endpoint 이름
+        raw_payload (Union[Any, Callable[[], Any]]): 기존 방식의 payload (인자 없는 함수이면 측정할 때만 호출)
+        compact_payload (str): 압축 직렬화 결과
+
+    Returns:
+        Optional[Dict[str, int]]: 이번 호출의 raw_tokens, compact_tokens, saved_tokens (측정하지 않은 호출이면 None)
+    """
+    stats = TOKEN_SAVINGS.setdefault(endpoint, {"calls": 0, "sampled_calls": 0, "raw_tokens": 0, "compact_tokens": 0})
+    stats["calls"] += 1
+    if (stats["calls"] - 1) % max(1, TOKEN_SAVINGS_SAMPLE_EVERY):
+        return None
+    if callable(raw_payload):
+        raw_payload = raw_payload()
+    raw_tokens = count_tokens(raw_payload if isinstance(raw_payload, str) else str(raw_payload))
+    compact_tokens = count_tokens(compact_payload)
+    stats["sampled_calls"] += 1
+    stats["raw_tokens"] += raw_tokens
+    stats["compact_tokens"] += compact_tokens
+    saved = raw_tokens - compact_tokens
+    ratio = (saved / raw_tokens * 100) if raw_tokens else 0.0
+    logger.info(f"📉 [{endpoint}] 프롬프트 직렬화 token: {raw_tokens} -> {compact_tokens} ({saved}개, {ratio:.1f}% 절약)")
+    return {"raw_tokens": raw_tokens, "compact_tokens": compact_tokens, "saved_tokens": saved}
+
+
+def get_token_savings() -> Dict[str, Dict[str, Any]]:
+    """
+    endpoint별 누적 token 절약 통계를 반환합니다.
+    saved_tokens와 saved_ratio는 측정한 호출 기준이며, estimated_saved_tokens는 전체 호출 수로 환산한 값입니다.
+    """
+    report = {}
+    for endpoint, stats in TOKEN_SAVINGS.items():
+        saved = stats["raw_tokens"] - stats["compact_tokens"]
+        report[endpoint] = dict(
+            stats,
+            saved_tokens=saved,
+            saved_ratio=round(saved / stats["raw_tokens"], 4) if stats["raw_tokens"] else 0.0,
+            estimated_saved_tokens=round(saved * stats["calls"] / stats["sampled_calls"]) if stats["sampled_calls"] else 0,
+        )
+    return report
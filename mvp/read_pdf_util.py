@@ -1,113 +1,392 @@
 import asyncio
-import io
+import hashlib
 import logging
+import mmap
+import multiprocessing
 import os
 import re
+import tempfile
+import unicodedata
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
 
-import aiofiles
 import aiohttp
+from http_client import get_http_client
+from pdf_text_cache import (conditional_headers, load_cached_text,
+                            load_url_entry, save_cached_text, save_url_entry)
 from PyPDF2 import PdfReader
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def clean_text(text: str) -> str:
+'''
+기능 정의서 PDF 텍스트 추출
+- PDF는 공유 HTTP client(http_client)로 PDF_CHUNK_SIZE 단위로 내려받아 SpooledTemporaryFile에 기록한다. PDF_SPOOL_MAX_MEMORY까지는 메모리에,
+  그보다 크면 디스크에 기록하고 memory-mapped 파일로 읽으므로 PDF 크기와 관계없이 메모리 사용량이 제한된다.
+- 첫 chunk에서 "%PDF-" 시그니처를 확인하고, PDF_MAX_BYTES를 넘는 파일은 다운로드를 중단한다.
+- 텍스트 추출은 CPU를 많이 사용하므로 process pool(PDF_EXTRACT_WORKERS개)에서 페이지를 PDF_PAGES_PER_TASK개씩 나누어 실행하고,
+  페이지 순서대로 합친다. 문서 하나의 추출은 PDF_EXTRACT_TIMEOUT초로 제한한다.
+  제한 시간을 넘기면 아직 시작하지 않은 작업은 취소하고, 이미 실행 중인 작업이 있으면 공유 pool의 worker process를 종료한 뒤
+  다음 요청에서 pool을 새로 만든다. (문제가 있는 PDF 하나가 시간 초과 후에도 모든 worker를 점유하지 않도록)
+- 페이지 텍스트는 추출하는 대로 normalize_text로 한 번만 정리하고(문단 경계 유지), 페이지 사이는 빈 줄로 합친다.
+- 추출한 텍스트는 pdf_text_cache에 PDF 내용의 SHA-256으로 저장한다. 같은 URL은 conditional GET으로 변경 여부를 확인하고,
+  내용이 같은 PDF는 추출을 다시 하지 않는다.
+'''
+
+PDF_MAGIC = b"%PDF-"
+PDF_CHUNK_SIZE = int(os.getenv("PDF_CHUNK_SIZE") or 64 * 1024)
+PDF_SPOOL_MAX_MEMORY = int(os.getenv("PDF_SPOOL_MAX_MEMORY") or 4 * 1024 * 1024)
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES") or 50 * 1024 * 1024)
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS") or os.cpu_count() or 1)
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK") or 20)
+PDF_EXTRACT_TIMEOUT = float(os.getenv("PDF_EXTRACT_TIMEOUT") or 120)
+
+# 텍스트 정리 pattern (모두 import 시점에 compile)
+_INVISIBLE_PATTERN = re.compile(r"[\u00ad\u200b-\u200d\u2060\ufeff]+")     # soft hyphen, zero-width 문자
+_HYPHENATION_PATTERN = re.compile(r"([A-Za-z])-[^\S\n]*\n\s*(?=[a-z])")    # 줄 끝에서 나뉜 영어 단어 (soft-\nware)
+_PARAGRAPH_PATTERN = re.compile(r"\n[^\S\n]*\n")                           # 빈 줄 (문단 경계)
+_SPACING_PATTERN = re.compile(r" (?:(?=[.,!?)])|(?<=\( ))")                # 문장 부호, 닫는 괄호 앞과 여는 괄호 뒤의 공백
+
+
+def normalize_text(text: str, keep_paragraphs: bool = True) -> str:
     """
     PDF에서 추출된 텍스트를 정리합니다.
+    - 분해된 한글 자모(NFD)를 완성형 음절(NFC)로 합치고, soft hyphen과 zero-width 문자를 제거합니다.
+    - 줄 끝에서 하이픈으로 나뉜 영어 단어를 합치고, 연속된 공백과 줄바꿈은 공백 하나로 바꿉니다.
+    - 문장 부호 앞과 괄호 안쪽의 공백을 제거합니다.
+    공백 정리는 str.split으로 한 번에 처리하고, 나머지 규칙은 해당 문자가 있을 때만 적용합니다.
     
     Args:
         text (str): 원본 텍스트
+        keep_paragraphs (bool): 빈 줄(문단 경계)을 "\n\n"으로 유지할지 여부 (False면 공백 하나)
         
     Returns:
         str: 정리된 텍스트
     """
-    # 연속된 공백을 하나로 통일
-    text = re.sub(r'\s+', ' ', text)
+    if not unicodedata.is_normalized("NFC", text):
+        text = unicodedata.normalize("NFC", text)
+    if _INVISIBLE_PATTERN.search(text):
+        text = _INVISIBLE_PATTERN.sub("", text)
+    if "-" in text:
+        text = _HYPHENATION_PATTERN.sub(r"\1", text)
+    if keep_paragraphs:
+        paragraphs = (" ".join(paragraph.split()) for paragraph in _PARAGRAPH_PATTERN.split(text))
+        text = "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+    else:
+        text = " ".join(text.split())
+    return _SPACING_PATTERN.sub("", text)
+
+
+def clean_text(text: str) -> str:
+    """
+    PDF에서 추출된 텍스트를 한 줄로 정리합니다.
+    
+    Args:
+        text (str): 원본 텍스트
+        
+    Returns:
+        str: 정리된 텍스트
+    """
+    return normalize_text(text, keep_paragraphs=False)
+
+class SpooledPdfFile(tempfile.SpooledTemporaryFile):
+    """
+    PDF_SPOOL_MAX_MEMORY까지는 메모리에 기록하고, 넘으면 이름 있는 임시 파일로 옮기는 SpooledTemporaryFile.
+    이름이 있으므로 worker process에서 경로로 열 수 있습니다.
+    download_pdf가 내용의 SHA-256과 응답의 ETag/Last-Modified를 함께 기록합니다.
+    """
+    sha256: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def rollover(self):
+        if self._rolled:
+            return
+        memory_file = self._file
+        self._file = tempfile.NamedTemporaryFile(suffix=".pdf")
+        self._file.write(memory_file.getvalue())
+        self._file.seek(memory_file.tell(), 0)
+        self._rolled = True
+
+    def materialize(self) -> str:
+        """내용을 디스크에 기록하고(아직 메모리에 있다면) 임시 파일 경로를 반환합니다."""
+        self.rollover()
+        self._file.flush()
+        return self._file.name
+
+
+def _extract_page_texts(pdf_reader: PdfReader, start: int = 0, end: Optional[int] = None) -> List[str]:
+    # 페이지별 텍스트는 list에 모아 한 번에 합친다
+    page_texts = []
+    for i, page in enumerate(pdf_reader.pages[start:end], start + 1):
+        page_text = page.extract_text()
+        if page_text:
+            # 각 페이지의 텍스트를 추출하는 대로 정리 (문단 경계 유지)
+            page_texts.append(normalize_text(page_text))
+        logger.debug(f"✅ 페이지 {i} 텍스트 추출 및 정리 완료")
+    return page_texts
+
+
+def read_pdf_pages(pdf_file: IO[bytes]) -> str:
+    """
+    PDF 파일 객체에서 페이지별 텍스트를 현재 process에서 추출하고 정리합니다.
+    
+    Args:
+        pdf_file (IO[bytes]): 처음 위치로 이동된 PDF 파일 객체 (mmap 포함)
+        
+    Returns:
+        str: 정리된 전체 텍스트
+    """
+    pdf_reader = PdfReader(pdf_file)
+    logger.info(f"✅ PdfReader 생성 성공 (페이지 수: {len(pdf_reader.pages)})")
+    
+    # 페이지는 이미 정리되었으므로 문단 경계로 합치기만 한다
+    text_content = "\n\n".join(_extract_page_texts(pdf_reader))
+    logger.info(f"✅ 전체 텍스트 추출 및 정리 완료 (길이: {len(text_content)} 문자)")
+    return text_content
+
+
+def read_spooled_pdf(spooled_file: IO[bytes]) -> str:
+    """
+    download_pdf로 받은 파일에서 텍스트를 현재 process에서 추출합니다.
+    디스크로 넘어간 큰 파일은 memory-mapped 파일로 읽어 PDF 전체를 메모리에 복사하지 않습니다.
+    """
+    spooled_file.seek(0)
+    if not getattr(spooled_file, "_rolled", False):
+        return read_pdf_pages(spooled_file)
+    with mmap.mmap(spooled_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return read_pdf_pages(mapped)
+
+
+### ======== Process pool 추출 ======== ###
+# worker process에서 실행되므로 pickle 가능한 최상위 함수로 정의하고, PDF는 파일 경로로 전달한다.
+def count_pdf_pages(path: str) -> int:
+    """PDF 파일의 페이지 수를 반환합니다. (worker process에서 실행)"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return len(PdfReader(mapped).pages)
+
+
+def extract_page_range(path: str, start: int, end: int) -> List[str]:
+    """PDF 파일의 [start, end) 페이지 텍스트를 정리하여 반환합니다. (worker process에서 실행)"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return _extract_page_texts(PdfReader(mapped), start, end)
+
+
+def split_page_ranges(page_count: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    """페이지를 pages_per_task개씩 [start, end) 구간으로 나눕니다."""
+    pages_per_task = max(1, pages_per_task)
+    return [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+
+
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """PDF 추출용 process pool을 반환합니다. (처음 호출할 때 PDF_EXTRACT_WORKERS개의 process로 생성)"""
+    global _pdf_executor
+    if _pdf_executor is None:
+        # event loop와 thread가 동작 중인 서버 process를 fork하지 않도록 spawn으로 worker를 생성
+        _pdf_executor = ProcessPoolExecutor(max_workers=PDF_EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        logger.info(f"✅ PDF 추출 process pool 생성 (worker {PDF_EXTRACT_WORKERS}개)")
+    return _pdf_executor
+
+
+def shutdown_pdf_executor() -> None:
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(wait=False, cancel_futures=True)
+        _pdf_executor = None
+
+
+def recycle_pdf_executor() -> None:
+    """
+    공유 process pool의 worker process를 종료하고, 다음 호출에서 pool을 새로 만들도록 합니다.
+    같은 pool에서 실행 중이던 다른 요청의 추출도 실패(BrokenProcessPool)합니다.
+    """
+    global _pdf_executor
+    executor, _pdf_executor = _pdf_executor, None
+    if executor is None:
+        return
+    # shutdown은 실행 중인 작업을 멈추지 않으므로 worker process를 직접 종료
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    logger.warning(f"⚠️ PDF 추출 process pool을 다시 생성합니다. (종료한 worker {len(processes)}개)")
+
+
+async def extract_pdf_text_in_pool(
+    spooled_file: "SpooledPdfFile",
+    executor: Optional[Executor] = None,
+    pages_per_task: int = PDF_PAGES_PER_TASK,
+    timeout: float = PDF_EXTRACT_TIMEOUT,
+) -> str:
+    """
+    download_pdf로 받은 PDF의 텍스트를 process pool에서 추출합니다.
+    페이지를 pages_per_task개씩 나누어 worker들이 동시에 추출하고, 결과는 페이지 순서대로 합칩니다.
+    
+    Args:
+        spooled_file (SpooledPdfFile): download_pdf가 반환한 임시 파일
+        executor (Optional[Executor]): 사용할 executor (기본값: get_pdf_executor())
+        pages_per_task (int): worker 작업 하나가 처리할 페이지 수
+        timeout (float): 문서 하나의 추출 제한 시간(초). 넘기면 시작하지 않은 작업은 취소하고, 실행 중인 작업이 있으면
+            공유 pool의 worker를 종료합니다. (직접 전달한 executor는 취소만 하며 실행 중인 작업은 끝날 때까지 계속됩니다)
+        
+    Returns:
+        str: 정리된 전체 텍스트
+        
+    Raises:
+        TimeoutError: timeout 안에 추출을 마치지 못한 경우
+    """
+    executor = executor or get_pdf_executor()
+    path = spooled_file.materialize()
+    submitted: List[Future] = []
     
-    # 불필요한 공백 제거
-    text = text.strip()
+    def submit(fn: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        future = executor.submit(fn, *args)
+        submitted.append(future)
+        return asyncio.wrap_future(future)
     
-    # 문장 끝에 있는 공백 제거
-    text = re.sub(r'\s+([.,!?])', r'\1', text)
+    async def extract() -> List[List[str]]:
+        page_count = await submit(count_pdf_pages, path)
+        ranges = split_page_ranges(page_count, pages_per_task)
+        logger.info(f"✅ PDF 페이지 {page_count}개를 {len(ranges)}개의 작업으로 나누어 추출합니다.")
+        return await asyncio.gather(*(submit(extract_page_range, path, start, end) for start, end in ranges))
     
-    # 괄호 안의 공백 정리
-    text = re.sub(r'\(\s+', '(', text)
-    text = re.sub(r'\s+\)', ')', text)
+    try:
+        chunks = await asyncio.wait_for(extract(), timeout)
+    except asyncio.TimeoutError:
+        # 아직 시작하지 않은 작업은 취소하고, 이미 실행 중인 작업은 pool을 다시 만들어 멈춘다
+        running = [future for future in submitted if not future.cancel() and not future.done()]
+        logger.error(f"🚨 PDF 텍스트 추출이 {timeout}초 안에 끝나지 않았습니다. (실행 중인 작업 {len(running)}개)")
+        if running and executor is _pdf_executor:
+            recycle_pdf_executor()
+        raise TimeoutError(f"PDF 텍스트 추출 시간({timeout}초)을 초과했습니다.") from None
     
-    # 줄바꿈 정리
-    text = re.sub(r'\n\s*\n', '\n\n', text)
+    # 페이지는 worker에서 이미 정리되었으므로 문단 경계로 합치기만 한다
+    text_content = "\n\n".join(text for chunk in chunks for text in chunk)
+    logger.info(f"✅ 전체 텍스트 추출 및 정리 완료 (길이: {len(text_content)} 문자)")
+    return text_content
+
+
+async def download_pdf(
+    url: str,
+    session: Optional[aiohttp.ClientSession] = None,
+    max_bytes: int = PDF_MAX_BYTES,
+    headers: Optional[Dict[str, str]] = None,
+) -> Optional[SpooledPdfFile]:
+    """
+    PDF를 PDF_CHUNK_SIZE 단위로 내려받아 임시 파일에 저장합니다.
+    PDF_SPOOL_MAX_MEMORY를 넘는 파일은 디스크에 기록되므로 PDF 크기와 관계없이 메모리 사용량이 제한됩니다.
     
-    return text
+    Args:
+        url (str): PDF 파일 URL
+        session (Optional[aiohttp.ClientSession]): 사용할 HTTP session (기본값: 공유 HTTP client)
+        max_bytes (int): 허용하는 최대 파일 크기
+        headers (Optional[Dict[str, str]]): 요청 header (If-None-Match, If-Modified-Since 등 conditional GET)
+        
+    Returns:
+        Optional[SpooledPdfFile]: PDF 내용이 기록된 임시 파일 (처음 위치, 사용 후 닫아야 함).
+            conditional GET에 304 응답을 받으면 None
+        
+    Raises:
+        ValueError: 파일이 비어 있거나, PDF가 아니거나, max_bytes를 초과하는 경우
+        Exception: HTTP 응답 코드가 200(또는 conditional GET의 304)이 아닌 경우
+    """
+    session = session or get_http_client()
+    
+    spooled_file = SpooledPdfFile(max_size=PDF_SPOOL_MAX_MEMORY)
+    try:
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and headers:
+                logger.info(f"♻️ 기능 정의서가 변경되지 않았습니다 (HTTP 304)")
+                spooled_file.close()
+                return None
+            if response.status != 200:
+                logger.error(f"기능 정의서 다운로드 실패: HTTP {response.status}")
+                raise Exception(f"기능 정의서 다운로드 실패: HTTP {response.status}")
+            logger.info(f"✅ 기능 정의서 URL 접근 성공")
+            
+            content_length = getattr(response, "content_length", None)
+            if isinstance(content_length, int) and content_length > max_bytes:
+                raise ValueError(f"PDF 파일이 최대 크기({max_bytes} bytes)를 초과합니다. (크기: {content_length} bytes)")
+            
+            size = 0
+            head = b""
+            digest = hashlib.sha256()
+            async for chunk in response.content.iter_chunked(PDF_CHUNK_SIZE):
+                # 첫 chunk에서 PDF 여부를 확인하여, PDF가 아니면 나머지를 내려받지 않는다
+                if len(head) < len(PDF_MAGIC):
+                    head += chunk[:len(PDF_MAGIC) - len(head)]
+                    if len(head) == len(PDF_MAGIC) and head != PDF_MAGIC:
+                        raise ValueError("유효한 PDF 파일이 아닙니다.")
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"PDF 파일이 최대 크기({max_bytes} bytes)를 초과합니다.")
+                digest.update(chunk)
+                spooled_file.write(chunk)
+            
+            if size == 0:
+                raise ValueError("다운로드된 PDF 파일이 비어있습니다.")
+            if head != PDF_MAGIC:
+                raise ValueError("유효한 PDF 파일이 아닙니다.")
+            logger.info(f"✅ 기능 정의서 다운로드 완료 (크기: {size} bytes)")
+            
+            spooled_file.sha256 = digest.hexdigest()
+            response_headers = getattr(response, "headers", None) or {}
+            spooled_file.etag = _header_value(response_headers, "ETag")
+            spooled_file.last_modified = _header_value(response_headers, "Last-Modified")
+    except BaseException:
+        spooled_file.close()
+        raise
+    spooled_file.seek(0)
+    return spooled_file
+
+
+def _header_value(headers, name: str) -> Optional[str]:
+    value = headers.get(name)
+    return value if isinstance(value, str) and value else None
+
 
 async def extract_pdf_text(predefined_definition: str) -> str:
     """
-    PDF 파일에서 텍스트를 추출하는 함수를 테스트합니다.
+    PDF 파일을 내려받아 텍스트를 추출합니다.
+    같은 URL의 PDF가 변경되지 않았거나(304), 내용이 같은 PDF를 이미 추출했다면 캐시된 텍스트를 반환합니다.
     
     Args:
-        pdf_path (str): PDF 파일 경로
+        predefined_definition (str): PDF 파일 URL
         
     Returns:
         str: 추출된 텍스트
     """
     try:
-        asset_dir=os.path.join(os.path.dirname(__file__), "asset")
-        os.makedirs(asset_dir, exist_ok=True)
+        # 이전에 받은 PDF의 텍스트가 남아 있을 때만 conditional GET을 보낸다
+        entry = await load_url_entry(predefined_definition)
+        cached_text = await load_cached_text(entry["sha256"]) if entry else None
+        headers = conditional_headers(entry) if cached_text is not None else None
+        
+        spooled_file = await download_pdf(predefined_definition, headers=headers)
+        if spooled_file is None:
+            return cached_text
         
-        filename=os.path.basename(predefined_definition)
+        with spooled_file:
+            text_content = cached_text if spooled_file.sha256 == (entry or {}).get("sha256") else None
+            if text_content is None:
+                text_content = await load_cached_text(spooled_file.sha256)
+            if text_content is None:
+                # PDF를 텍스트로 변환 (CPU를 많이 사용하므로 event loop가 아닌 process pool에서 추출)
+                try:
+                    text_content = await extract_pdf_text_in_pool(spooled_file)
+                except Exception as e:
+                    logger.error(f"PDF 처리 중 오류 발생: {str(e)}", exc_info=True)
+                    raise Exception(f"PDF 처리 중 오류 발생: {str(e)}") from e
+                
+                # 텍스트 저장 (background writer가 저장하므로 기다리지 않음)
+                save_cached_text(spooled_file.sha256, text_content)
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(predefined_definition) as response:
-                if response.status == 200:
-                    logger.info(f"✅ 기능 정의서 URL 접근 성공")
-                    # PDF 데이터를 바이트로 읽기
-                    pdf_bytes = await response.content.read()
-                    logger.info(f"✅ 기능 정의서 bytes로 읽기 성공 (크기: {len(pdf_bytes)} bytes)")
-                    
-                    if len(pdf_bytes) == 0:
-                        raise ValueError("다운로드된 PDF 파일이 비어있습니다.")
-                    
-                    # PDF를 텍스트로 변환
-                    try:
-                        pdf_file = io.BytesIO(pdf_bytes)
-                        logger.info(f"✅ io.BytesIO 생성 성공")
-                        
-                        # PDF 파일 유효성 검사
-                        if not pdf_file.read(5).startswith(b'%PDF-'):
-                            raise ValueError("유효한 PDF 파일이 아닙니다.")
-                        pdf_file.seek(0)  # 파일 포인터를 다시 처음으로
-                        
-                        pdf_reader = PdfReader(pdf_file)
-                        logger.info(f"✅ PdfReader 생성 성공 (페이지 수: {len(pdf_reader.pages)})")
-                        
-                        text_content = ""
-                        for i, page in enumerate(pdf_reader.pages, 1):
-                            page_text = page.extract_text()
-                            if page_text:
-                                # 각 페이지의 텍스트를 정리
-                                cleaned_text = clean_text(page_text)
-                                text_content += cleaned_text + "\n\n"
-                            logger.info(f"✅ 페이지 {i} 텍스트 추출 및 정리 완료")
-                        
-                        # 전체 텍스트 정리
-                        text_content = clean_text(text_content)
-                        logger.info(f"✅ 전체 텍스트 추출 및 정리 완료 (길이: {len(text_content)} 문자)")
-                        
-                        # 텍스트 파일로 저장
-                        text_filename = os.path.splitext(filename)[0] + ".txt"
-                        text_file_path = os.path.join(asset_dir, text_filename)
-                        
-                        async with aiofiles.open(text_file_path, 'w', encoding='utf-8') as f:
-                            await f.write(text_content)
-                        logger.info(f"✅ 텍스트 파일 저장 성공: {text_file_path}")
-                        return text_content
-                        
-                    except Exception as e:
-                        logger.error(f"PDF 처리 중 오류 발생: {str(e)}", exc_info=True)
-                        raise Exception(f"PDF 처리 중 오류 발생: {str(e)}") from e
-                else:
-                    logger.error(f"기능 정의서 다운로드 실패: HTTP {response.status}")
-                    raise Exception(f"기능 정의서 다운로드 실패: HTTP {response.status}")
+        await save_url_entry(predefined_definition, spooled_file.sha256, spooled_file.etag, spooled_file.last_modified)
+        return text_content
     except Exception as e:
         logger.error(f"기능 정의서 다운로드 및 변환 중 오류 발생: {str(e)}", exc_info=True)
-        raise Exception(f"기능 정의서 다운로드 및 변환 중 오류 발생: {str(e)}") from e
\ No newline at end of file
+        raise Exception(f"기능 정의서 다운로드 및 변환 중 오류 발생: {str(e)}") from e
@@ -5,21 +5,29 @@ from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-import httpx
 import redis.asyncio as aioredis
+from artifact_store import close_artifact_writer, start_artifact_writer
 from create_sprint import create_sprint
 from dotenv import load_dotenv
+from draft_store import DraftVersionConflict
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from feature_definition import (create_feature_definition,
                                 update_feature_definition)
+from feature_embeddings import load_embedding_model
 from feature_specification import (create_feature_specification,
                                    update_feature_specification)
+from feedback_intent import get_intent_stats
+from http_client import close_http_client, start_http_client
 from meeting_analysis import analyze_meeting_document
 from mongodb_setting import test_mongodb_connection
+from prompt_registry import get_prompt_usage
+from prompt_serializer import get_token_savings
 from pydantic import BaseModel
+from read_pdf_util import shutdown_pdf_executor
 from redis_setting import test_redis_connection
+from sprint_jobs import SprintJobQueue, create_job_store
 
 # 로깅 설정
 logging.basicConfig(
@@ -48,11 +56,13 @@ class FeatureSpecificationPUTRequest(BaseModel):
     createdFeatures: Optional[List[Dict[str, Any]]] = None
     modifiedFeatures: Optional[List[Dict[str, Any]]] = None
     deletedFeatures: Optional[List[str]] = None
+    version: Optional[int] = None     # 클라이언트가 마지막으로 받은 초안 version (다르면 409 응답)
     
 class EpicPOSTRequest(BaseModel):
     projectId: str
     pendingTasksIds: Optional[List[str]] = None
     startDate: datetime
+    forceRegenerate: bool = False     # True이면 task 생성 캐시를 무시하고 새로 생성
 
 class MeetingPOSTRequest(BaseModel):
     title: str
@@ -70,6 +80,7 @@ class CreateFeatureDefinitionResponse(BaseModel):
 
 class CreateFeatureSpecificationResponse(BaseModel):
     features: List[Dict[str, Any]]
+    version: Optional[int] = None
 
 class CreateSprintResponse(BaseModel):
     sprint: Dict[str, Any]
@@ -82,6 +93,7 @@ class FeedbackFeatureDefinitionResponse(BaseModel):
 class FeedbackFeatureSpecificationResponse(BaseModel):
     features: List[Dict[str, Any]]
     isNextStep: bool
+    version: Optional[int] = None
 
 class CreateSprintResponse(BaseModel):
     sprint: Dict[str, Any]
@@ -91,8 +103,19 @@ class CreateMeetingResponse(BaseModel):
     summary: str
     actionItems: List[Dict[str, Any]]
 
+class SprintJobResponse(BaseModel):
+    jobId: str
+    status: str
+    stage: str
+    progress: int
+    result: Optional[CreateSprintResponse] = None
+    error: Optional[str] = None
+
 app = FastAPI(docs_url="/docs")
 
+# 스프린트 생성 job 대기열 (worker는 lifespan에서 시작)
+sprint_job_queue = SprintJobQueue(create_job_store(), create_sprint)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info(f"🚀 Uvicorn 서버 시작 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -107,7 +130,17 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"서버 시작 중 오류 발생: {str(e)}")
         raise e
+    await start_http_client()
+    await start_artifact_writer()
+    await load_embedding_model()
+    await sprint_job_queue.start()
+    logger.info("스프린트 생성 job worker 시작 완료")
     yield
+    await sprint_job_queue.stop()
+    logger.info("스프린트 생성 job worker 종료 완료")
+    shutdown_pdf_executor()
+    await close_http_client()
+    await close_artifact_writer()
 
 app = FastAPI(docs_url="/docs", lifespan=lifespan)
 
@@ -179,9 +212,15 @@ async def put_specification(request: FeatureSpecificationPUTRequest):
     try:
         logger.info(f"📨 PUT /specification 요청 수신: {request}")
         logger.info(f"📨 요청 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        result = await update_feature_specification(request.email, request.feedback, request.createdFeatures, request.modifiedFeatures, request.deletedFeatures)
+        result = await update_feature_specification(request.email, request.feedback, request.createdFeatures, request.modifiedFeatures, request.deletedFeatures, request.version)
         logger.info(f"✅ 처리 결과: {result}")
         return result
+    except DraftVersionConflict as e:
+        logger.warning(f"⚠️ 기능 명세서 초안 버전 충돌: {str(e)}")
+        raise HTTPException(
+            status_code=409,
+            detail={"message": str(e), "currentVersion": e.current_version}
+        )
     except Exception as e:
         logger.error(f"🔥 예외 발생: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -189,20 +228,35 @@ async def put_specification(request: FeatureSpecificationPUTRequest):
             detail=f"기능 명세서 업데이트 중 오류 발생: {str(e)}"
         )
 
-@app.post("/sprint", response_model=CreateSprintResponse)
+@app.post("/sprint", response_model=SprintJobResponse, status_code=202)
 async def post_epic(request: EpicPOSTRequest):
     try:
         logger.info(f"📨 POST /sprint 요청 수신: {request}")
         logger.info(f"📨 요청 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        result = await create_sprint(request.projectId, request.pendingTasksIds, request.startDate)
-        logger.info(f"✅ 처리 결과: {result}")
-        return result
+        job = await sprint_job_queue.enqueue(request.projectId, request.pendingTasksIds, request.startDate, request.forceRegenerate)
+        logger.info(f"✅ 스프린트 생성 job 등록 결과: {job['jobId']} ({job['status']})")
+        return job
+    except Exception as e:
+        logger.error(f"🔥 예외 발생: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"스프린트 생성 job 등록 중 오류 발생: {str(e)}"
+        )
+
+@app.get("/sprint/jobs/{job_id}", response_model=SprintJobResponse)
+async def get_sprint_job(job_id: str, wait: float = 0):
+    # wait > 0 이면 job의 단계가 바뀌거나 완료될 때까지 최대 wait초(최대 30초) 대기 후 응답 (long polling)
+    try:
+        job = await sprint_job_queue.wait(job_id, timeout=min(max(wait, 0), 30))
     except Exception as e:
         logger.error(f"🔥 예외 발생: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=500,
-            detail=f"스프린트 생성 중 오류 발생: {str(e)}"
+            detail=f"스프린트 생성 job 조회 중 오류 발생: {str(e)}"
         )
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"jobId {job_id}에 해당하는 스프린트 생성 job을 찾을 수 없습니다.")
+    return job
 
 @app.post("/meeting", response_model=CreateMeetingResponse)
 async def post_meeting(request: MeetingPOSTRequest):
@@ -219,6 +273,11 @@ async def post_meeting(request: MeetingPOSTRequest):
             detail=f"회의록 요약 중 오류 발생: {str(e)}"
         )
 
+@app.get("/metrics/prompts")
+async def get_prompt_metrics():
+    # endpoint별 프롬프트 직렬화 token 절약 통계, 프롬프트별 prompt cache 사용 비율, 피드백 의도 로컬 판단 비율
+    return {"tokenSavings": get_token_savings(), "promptCache": get_prompt_usage(), "feedbackIntent": get_intent_stats()}
+
 # 실행 예시
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,385 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+'''
+POST /sprint 요청을 HTTP 요청 안에서 처리하지 않고 job으로 등록한 뒤, worker coroutine이 create_sprint를 실행한다.
+- 같은 요청(projectId, pendingTasksIds, startDate)이 반복되면 진행 중이거나 완료된 job을 그대로 반환한다.
+- job의 상태(status), 단계(stage), 진행률(progress), 결과(result)는 store에 저장되며 GET /sprint/jobs/{id}로 조회한다.
+- store는 Redis(RedisJobStore)를 기본으로 사용하고, 테스트에서는 InMemoryJobStore를 사용한다.
+- worker는 대기열에서 꺼낸 job을 처리 중 목록으로 옮기고(BLMOVE) 끝나면 지운다. 실행 중에는 SPRINT_JOB_HEARTBEAT_INTERVAL초마다
+  heartbeatAt을 갱신한다.
+    - worker가 취소되면(서버 종료) 실행 중인 job을 다시 대기열에 넣는다.
+    - pod가 중단되어 heartbeat가 SPRINT_JOB_STALE_AFTER초 넘게 갱신되지 않은 job은 worker 시작 시 대기열로 복구하고,
+      같은 요청이 다시 들어오면 새 job으로 교체한다.
+    - 대기 중(queued)인 job도 SPRINT_JOB_STALE_AFTER초가 지났는데 대기열과 처리 중 목록 어디에도 없으면(Redis failover 등으로
+      대기열에서 사라진 경우) 같은 요청이 다시 들어왔을 때 새 job으로 교체한다.
+- job 정보를 갱신할 때마다 TTL(SPRINT_JOB_TTL)을 다시 설정하여, 만료된 뒤 늦게 도착한 갱신이 TTL 없는 key를 남기지 않는다.
+'''
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+FINISHED_STATUSES = (JOB_COMPLETED, JOB_FAILED)
+
+SPRINT_JOB_BACKEND = os.getenv("SPRINT_JOB_BACKEND") or ("redis")
+SPRINT_JOB_WORKERS = int(os.getenv("SPRINT_JOB_WORKERS") or 2)
+SPRINT_JOB_TTL = int(os.getenv("SPRINT_JOB_TTL") or 60 * 60 * 24)    # 완료된 job 결과 보관 시간(초)
+SPRINT_JOB_HEARTBEAT_INTERVAL = float(os.getenv("SPRINT_JOB_HEARTBEAT_INTERVAL") or 30)
+SPRINT_JOB_STALE_AFTER = float(os.getenv("SPRINT_JOB_STALE_AFTER") or 180)     # heartbeat가 이 시간(초) 넘게 없으면 중단된 job으로 봄
+
+ProgressCallback = Callable[[str, int], Awaitable[None]]
+
+
+def make_request_key(project_id: str, pending_tasks_ids: Optional[List[str]], start_date: datetime) -> str:
+    """같은 sprint 생성 요청을 식별하기 위한 key를 생성합니다."""
+    payload = json.dumps({
+        "projectId": project_id,
+        "pendingTasksIds": sorted(pending_tasks_ids or []),
+        "startDate": start_date.isoformat() if isinstance(start_date, datetime) else str(start_date),
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_stale(job: Dict[str, Any], now: Optional[float] = None, stale_after: float = SPRINT_JOB_STALE_AFTER) -> bool:
+    """실행 중(또는 대기열에서 꺼낸 뒤 시작하지 못한) job의 heartbeat가 stale_after초 넘게 갱신되지 않았는지 확인합니다."""
+    if job["status"] in FINISHED_STATUSES:
+        return False
+    last_seen = job.get("heartbeatAt") or job.get("startedAt") or job.get("createdAt") or 0
+    return (time.time() if now is None else now) - last_seen > stale_after
+
+
+class InMemoryJobStore:
+    """프로세스 내부에서만 동작하는 job store (테스트 및 로컬 실행용)"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._keys: Dict[str, str] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._queued: List[str] = []
+        self._processing: List[str] = []
+
+    async def claim_request_key(self, request_key: str, job_id: str, replace: bool = False) -> Optional[str]:
+        existing = self._keys.get(request_key)
+        if not replace and existing is not None and existing in self._jobs and self._jobs[existing]["status"] != JOB_FAILED:
+            return existing
+        self._keys[request_key] = job_id
+        return None
+
+    async def save(self, job: Dict[str, Any]) -> None:
+        self._jobs[job["jobId"]] = dict(job)
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        if job_id in self._jobs:
+            self._jobs[job_id].update(fields)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def push(self, job_id: str) -> None:
+        self._queued.append(job_id)
+        await self._queue.put(job_id)
+
+    async def pop(self, timeout: float) -> Optional[str]:
+        try:
+            job_id = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._queued.remove(job_id)
+        self._processing.append(job_id)
+        return job_id
+
+    async def is_pending(self, job_id: str) -> bool:
+        return job_id in self._queued or job_id in self._processing
+
+    async def ack(self, job_id: str) -> None:
+        if job_id in self._processing:
+            self._processing.remove(job_id)
+
+    async def requeue(self, job_id: str) -> None:
+        await self.ack(job_id)
+        await self.push(job_id)
+
+    async def processing(self) -> List[str]:
+        return list(self._processing)
+
+
+class RedisJobStore:
+    """Redis hash(job 정보)와 list(대기열)를 사용하는 job store"""
+
+    QUEUE_KEY = "sprint_jobs:queue"
+    PROCESSING_KEY = "sprint_jobs:processing"
+
+    def __init__(self, client, ttl: int = SPRINT_JOB_TTL):
+        self.client = client
+        self.ttl = ttl
+
+    @staticmethod
+    def _job_key(job_id: str) -> str:
+        return f"sprint_job:{job_id}"
+
+    @staticmethod
+    def _request_key(request_key: str) -> str:
+        return f"sprint_job_request:{request_key}"
+
+    async def claim_request_key(self, request_key: str, job_id: str, replace: bool = False) -> Optional[str]:
+        key = self._request_key(request_key)
+        if replace:
+            await self.client.set(key, job_id, ex=self.ttl)
+            return None
+        if await self.client.set(key, job_id, nx=True, ex=self.ttl):
+            return None
+        existing = await self.client.get(key)
+        if existing is not None:
+            status = await self.client.hget(self._job_key(existing), "status")
+            if status is not None and json.loads(status) != JOB_FAILED:
+                return existing
+        # 실패했거나 만료된 job은 새 job으로 교체
+        await self.client.set(key, job_id, ex=self.ttl)
+        return None
+
+    async def _write(self, job_id: str, fields: Dict[str, Any]) -> None:
+        # hset과 TTL 설정을 한 번에 실행하여, 만료된 뒤 늦게 도착한 갱신이 TTL 없는 key를 만들지 않도록 함
+        key = self._job_key(job_id)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(key, mapping={k: json.dumps(v, ensure_ascii=False, default=str) for k, v in fields.items()})
+        pipe.expire(key, self.ttl)
+        await pipe.execute()
+
+    async def save(self, job: Dict[str, Any]) -> None:
+        await self._write(job["jobId"], job)
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        await self._write(job_id, fields)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.hgetall(self._job_key(job_id))
+        if not raw:
+            return None
+        return {k: json.loads(v) for k, v in raw.items()}
+
+    async def push(self, job_id: str) -> None:
+        await self.client.rpush(self.QUEUE_KEY, job_id)
+
+    async def pop(self, timeout: float) -> Optional[str]:
+        # 꺼낸 job은 처리 중 목록으로 옮겨 pod가 중단되어도 잃어버리지 않음
+        return await self.client.blmove(self.QUEUE_KEY, self.PROCESSING_KEY, max(1, int(timeout)), "LEFT", "RIGHT")
+
+    async def ack(self, job_id: str) -> None:
+        await self.client.lrem(self.PROCESSING_KEY, 1, job_id)
+
+    async def requeue(self, job_id: str) -> None:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrem(self.PROCESSING_KEY, 1, job_id)
+        pipe.rpush(self.QUEUE_KEY, job_id)
+        await pipe.execute()
+
+    async def processing(self) -> List[str]:
+        return await self.client.lrange(self.PROCESSING_KEY, 0, -1)
+
+    async def is_pending(self, job_id: str) -> bool:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.lpos(self.QUEUE_KEY, job_id)
+        pipe.lpos(self.PROCESSING_KEY, job_id)
+        return any(position is not None for position in await pipe.execute())
+
+
+class SprintJobQueue:
+    """sprint 생성 job을 등록하고 worker coroutine으로 실행합니다."""
+
+    def __init__(self, store, runner: Callable[..., Awaitable[Dict[str, Any]]], num_workers: int = SPRINT_JOB_WORKERS):
+        self.store = store
+        self.runner = runner
+        self.num_workers = num_workers
+        self._workers: List[asyncio.Task] = []
+
+    async def enqueue(self, project_id: str, pending_tasks_ids: Optional[List[str]], start_date: datetime, force_regenerate: bool = False) -> Dict[str, Any]:
+        """
+        sprint 생성 job을 등록합니다. 같은 요청의 job이 이미 있다면 해당 job을 반환합니다.
+        force_regenerate가 True이면 기존 job과 task 생성 캐시를 무시하고 새 job을 등록합니다.
+
+        Returns:
+            Dict[str, Any]: job 정보 (jobId, status, stage, progress, ...)
+        """
+        request_key = make_request_key(project_id, pending_tasks_ids, start_date)
+        job_id = str(uuid.uuid4())
+        existing_job_id = await self.store.claim_request_key(request_key, job_id, replace=force_regenerate)
+        if existing_job_id is not None:
+            existing = await self.store.get(existing_job_id)
+            if existing is not None and await self._is_abandoned(existing):
+                # 실행하던 pod가 중단되었거나 대기열에서 사라진 job은 실패로 기록하고 새 job으로 교체
+                logger.warning(f"⚠️ 중단된 sprint 생성 job을 새 job으로 교체합니다: {existing_job_id} ({existing['status']})")
+                await self.store.update(existing_job_id, status=JOB_FAILED, stage=JOB_FAILED, error="heartbeat 만료", finishedAt=time.time())
+                await self.store.claim_request_key(request_key, job_id, replace=True)
+            elif existing is not None:
+                logger.info(f"♻️ 동일한 sprint 생성 요청의 job이 이미 존재합니다: {existing_job_id} ({existing['status']})")
+                return existing
+
+        job = {
+            "jobId": job_id,
+            "status": JOB_QUEUED,
+            "stage": JOB_QUEUED,
+            "progress": 0,
+            "request": {
+                "projectId": project_id,
+                "pendingTasksIds": pending_tasks_ids,
+                "startDate": start_date.isoformat() if isinstance(start_date, datetime) else start_date,
+                "forceRegenerate": force_regenerate,
+            },
+            "result": None,
+            "error": None,
+            "createdAt": time.time(),
+        }
+        await self.store.save(job)
+        await self.store.push(job_id)
+        logger.info(f"📥 sprint 생성 job 등록: {job_id}")
+        return job
+
+    async def _is_abandoned(self, job: Dict[str, Any]) -> bool:
+        """heartbeat가 끊긴 running job이거나, 오래되었는데 대기열과 처리 중 목록에 없는 queued job인지 확인합니다."""
+        if not is_stale(job):
+            return False
+        if job["status"] == JOB_RUNNING:
+            return True
+        # 대기열이 밀려 오래 기다리는 job은 교체하지 않음
+        return job["status"] == JOB_QUEUED and not await self.store.is_pending(job["jobId"])
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.store.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float, interval: float = 0.5) -> Optional[Dict[str, Any]]:
+        """
+        job의 stage가 바뀌거나 완료될 때까지 최대 timeout초 기다린 후 job 정보를 반환합니다. (long polling)
+        """
+        job = await self.store.get(job_id)
+        if job is None or timeout <= 0 or job["status"] in FINISHED_STATUSES:
+            return job
+        initial_stage = job["stage"]
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(interval)
+            job = await self.store.get(job_id)
+            if job is None or job["stage"] != initial_stage or job["status"] in FINISHED_STATUSES:
+                break
+        return job
+
+    async def run_job(self, job_id: str) -> None:
+        job = await self.store.get(job_id)
+        if job is None:
+            logger.warning(f"⚠️ 대기열에 있는 job {job_id}의 정보를 찾을 수 없습니다.")
+            await self.store.ack(job_id)
+            return
+        if job["status"] in FINISHED_STATUSES:
+            # 복구 과정에서 다시 대기열에 들어온, 이미 끝난 job
+            await self.store.ack(job_id)
+            return
+        request = job["request"]
+
+        async def report_progress(stage: str, progress: int) -> None:
+            await self.store.update(job_id, stage=stage, progress=progress, heartbeatAt=time.time())
+            logger.info(f"⏳ job {job_id} 진행 상황: {stage} ({progress}%)")
+
+        now = time.time()
+        await self.store.update(job_id, status=JOB_RUNNING, stage="started", progress=0, startedAt=now, heartbeatAt=now)
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await self.runner(
+                request["projectId"],
+                request["pendingTasksIds"],
+                datetime.fromisoformat(request["startDate"]),
+                force_regenerate=request.get("forceRegenerate", False),
+                progress_callback=report_progress,
+            )
+            await self.store.update(job_id, status=JOB_COMPLETED, stage=JOB_COMPLETED, progress=100, result=result, finishedAt=time.time())
+            logger.info(f"✅ sprint 생성 job 완료: {job_id}")
+        except asyncio.CancelledError:
+            # worker가 취소되면(서버 종료) 다른 worker가 처음부터 다시 실행하도록 대기열에 되돌린다
+            logger.warning(f"⚠️ sprint 생성 job {job_id} 실행이 취소되어 대기열에 다시 넣습니다.")
+            try:
+                await self.store.update(job_id, status=JOB_QUEUED, stage=JOB_QUEUED, progress=0)
+                await self.store.requeue(job_id)
+            except Exception as e:
+                logger.error(f"🚨 취소된 job {job_id}을 대기열에 되돌리지 못했습니다: {str(e)}", exc_info=True)
+            raise
+        except Exception as e:
+            logger.error(f"🚨 sprint 생성 job {job_id} 실행 중 오류 발생: {str(e)}", exc_info=True)
+            await self.store.update(job_id, status=JOB_FAILED, stage=JOB_FAILED, error=str(e), finishedAt=time.time())
+        finally:
+            heartbeat.cancel()
+        await self.store.ack(job_id)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(SPRINT_JOB_HEARTBEAT_INTERVAL)
+            try:
+                await self.store.update(job_id, heartbeatAt=time.time())
+            except Exception as e:
+                logger.warning(f"⚠️ job {job_id}의 heartbeat 갱신 중 오류 발생: {str(e)}")
+
+    async def recover(self) -> int:
+        """
+        처리 중 목록에 남은 job 중 끝났거나 heartbeat가 끊긴 job을 정리합니다. (pod가 중단된 경우)
+        끝난 job과 정보가 없는 job은 목록에서 지우고, 끝나지 않은 job은 대기열로 되돌립니다.
+
+        Returns:
+            int: 대기열로 되돌린 job 수
+        """
+        requeued = 0
+        for job_id in await self.store.processing():
+            job = await self.store.get(job_id)
+            if job is None or job["status"] in FINISHED_STATUSES:
+                await self.store.ack(job_id)
+            elif is_stale(job):
+                await self.store.update(job_id, status=JOB_QUEUED, stage=JOB_QUEUED, progress=0, heartbeatAt=time.time())
+                await self.store.requeue(job_id)
+                requeued += 1
+        if requeued:
+            logger.info(f"♻️ 중단된 sprint 생성 job {requeued}개를 대기열에 다시 넣었습니다.")
+        return requeued
+
+    async def _worker(self, index: int) -> None:
+        logger.info(f"👷 sprint job worker {index} 시작")
+        while True:
+            try:
+                job_id = await self.store.pop(timeout=5)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"🚨 sprint job 대기열 조회 중 오류 발생: {str(e)}", exc_info=True)
+                await asyncio.sleep(1)
+                continue
+            if job_id is not None:
+                await self.run_job(job_id)
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        try:
+            await self.recover()
+        except Exception as e:
+            logger.error(f"🚨 중단된 sprint 생성 job 복구 중 오류 발생: {str(e)}", exc_info=True)
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.num_workers)]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+def create_job_store(backend: str = SPRINT_JOB_BACKEND):
+    """환경 변수 SPRINT_JOB_BACKEND에 따라 job store를 생성합니다. ("redis" 또는 "memory")"""
+    if backend == "memory":
+        return InMemoryJobStore()
+    from redis_setting import redis_client
+    return RedisJobStore(redis_client)
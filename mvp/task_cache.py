@@ -0,0 +1,112 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from redis_setting import redis_client
+
+logger = logging.getLogger(__name__)
+
+'''
+epic 하위 task 생성 결과(LLM 응답) 캐시
+- key는 epic, feature의 내용과 workhours_per_day, 프로젝트 멤버 목록, 프롬프트 버전의 해시로 구성한다.
+  프롬프트가 바뀌면 이전 프롬프트로 생성한 task 목록을 재사용하지 않는다.
+- 내용이 바뀌지 않은 epic은 sprint를 다시 계획하더라도 이전에 생성된 task 목록을 재사용한다.
+- 캐시 값은 검증(validate_tasks)을 통과한 task 목록({"tasks": [...]})만 저장하므로, 형식이 잘못된 LLM 응답은 캐시되지 않는다.
+  null로부터 생성한 task는 LLM이 정의한 epic_description도 함께 저장하며, 필요한 값이 없는 캐시는 캐시가 없는 것으로 처리한다.
+  일정 배정과 우선순위 계산은 재사용 시에도 다시 수행된다.
+'''
+
+TASK_CACHE_TTL = int(os.getenv("TASK_CACHE_TTL") or 60 * 60 * 24 * 7)    # 기본 7일
+TASK_CACHE_PREFIX = "task_cache"
+
+EPIC_CACHE_FIELDS = ("title", "description")
+FEATURE_CACHE_FIELDS = ("name", "useCase", "input", "output", "startDate", "endDate", "expectedDays")
+
+
+def _pick(document: Optional[Dict[str, Any]], fields) -> Optional[Dict[str, Any]]:
+    if document is None:
+        return None
+    return {field: document.get(field) for field in fields}
+
+
+def make_task_cache_key(
+    source: str,
+    epic: Optional[Dict[str, Any]],
+    feature: Optional[Dict[str, Any]],
+    workhours_per_day: int,
+    project_members: List[Any],
+    extra: Optional[Dict[str, Any]] = None,
+    prompt_version: Optional[str] = None,
+) -> str:
+    """
+    task 생성 캐시 key를 생성합니다.
+
+    Args:
+        source (str): task 생성 방식 ("feature" 또는 "null")
+        epic (Optional[Dict[str, Any]]): epic 문서
+        feature (Optional[Dict[str, Any]]): feature 문서
+        workhours_per_day (int): 1일 개발 업무 시간
+        project_members (List[Any]): 프로젝트 멤버 목록
+        extra (Optional[Dict[str, Any]]): 추가로 key에 반영할 context (예: 프로젝트 description)
+        prompt_version (Optional[str]): task 생성에 사용하는 프롬프트의 버전 (prompt_registry.get_prompt_version)
+
+    Returns:
+        str: "task_cache:{source}:{sha256}" 형식의 key
+    """
+    payload = {
+        "epic": _pick(epic, EPIC_CACHE_FIELDS),
+        "feature": _pick(feature, FEATURE_CACHE_FIELDS),
+        "workhours_per_day": workhours_per_day,
+        "members": sorted(json.dumps(member, ensure_ascii=False, default=str) for member in project_members),
+        "extra": extra,
+        "prompt": prompt_version,
+    }
+    digest = hashlib.sha256(
+        json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return f"{TASK_CACHE_PREFIX}:{source}:{digest}"
+
+
+async def load_cached_tasks(key: str, required_fields: Sequence[str] = ()) -> Optional[Dict[str, Any]]:
+    """
+    캐시된 task 목록을 반환합니다.
+
+    Args:
+        key (str): 캐시 key (make_task_cache_key)
+        required_fields (Sequence[str]): tasks 외에 캐시 값에 있어야 하는 필드 (예: "epic_description")
+
+    Returns:
+        Optional[Dict[str, Any]]: 캐시 값 (캐시가 없거나, 필요한 값이 없거나, Redis 오류가 발생하면 None)
+    """
+    try:
+        data = await redis_client.get(key)
+    except Exception as e:
+        logger.warning(f"⚠️ task 캐시 조회 중 오류 발생 (캐시 없이 진행): {str(e)}")
+        return None
+    if not data:
+        return None
+    try:
+        cached = json.loads(data)
+    except json.JSONDecodeError:
+        logger.warning(f"⚠️ task 캐시 {key}의 형식이 올바르지 않아 무시합니다.")
+        return None
+    if not isinstance(cached, dict) or not isinstance(cached.get("tasks"), list):
+        logger.warning(f"⚠️ task 캐시 {key}에 task 목록이 없어 무시합니다.")
+        return None
+    missing = [field for field in required_fields if field not in cached]
+    if missing:
+        logger.warning(f"⚠️ task 캐시 {key}에 {missing}이 없어 무시합니다.")
+        return None
+    logger.info(f"♻️ task 캐시 적중: {key}")
+    return cached
+
+
+async def save_cached_tasks(key: str, gpt_result: Dict[str, Any], ttl: int = TASK_CACHE_TTL) -> None:
+    """검증된 task 목록({"tasks": [...], ...})을 TTL과 함께 캐시에 저장합니다. 저장 실패는 요청 처리를 중단시키지 않습니다."""
+    try:
+        await redis_client.set(key, json.dumps(gpt_result, ensure_ascii=False, default=str), ex=ttl)
+        logger.info(f"✅ task 캐시 저장: {key} (TTL {ttl}초)")
+    except Exception as e:
+        logger.warning(f"⚠️ task 캐시 저장 중 오류 발생: {str(e)}")
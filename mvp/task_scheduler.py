@@ -0,0 +1,260 @@
+import heapq
+import logging
+import math
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = "%Y-%m-%d"
+WORKING_WEEKDAYS = (0, 1, 2, 3, 4)     # 월~금 (주 5일 근무)
+
+DateLike = Union[date, datetime, str]
+
+
+def to_date(value: DateLike) -> date:
+    """
+    datetime, date, "YYYY-MM-DD"(또는 ISO 형식) 문자열을 date로 변환합니다.
+
+    Raises:
+        ValueError: 변환할 수 없는 값인 경우
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return datetime.strptime(value[:10], DATE_FORMAT).date()
+        except ValueError as e:
+            raise ValueError(f"날짜 형식이 올바르지 않습니다. YYYY-MM-DD 형식이어야 합니다: {value}") from e
+    raise ValueError(f"날짜로 변환할 수 없는 값입니다: {value!r}")
+
+
+def format_date(value: date) -> str:
+    return value.strftime(DATE_FORMAT)
+
+
+def is_working_day(day: date) -> bool:
+    return day.weekday() in WORKING_WEEKDAYS
+
+
+def next_working_day(day: date) -> date:
+    """day가 근무일이면 그대로, 아니라면 다음 근무일을 반환합니다."""
+    while not is_working_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+def previous_working_day(day: date) -> date:
+    """day가 근무일이면 그대로, 아니라면 직전 근무일을 반환합니다."""
+    while not is_working_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def add_working_days(start: date, workdays: int) -> date:
+    """
+    start를 첫 번째 근무일로 세어 workdays번째 근무일을 반환합니다.
+
+    Args:
+        start (date): 시작일 (근무일이 아니면 다음 근무일부터 셉니다)
+        workdays (int): 1 이상의 근무일 수
+
+    Returns:
+        date: 마지막 근무일
+    """
+    if workdays < 1:
+        raise ValueError("workdays는 1 이상이어야 합니다.")
+    day = next_working_day(start)
+    remaining = workdays - 1
+    # 주 단위로 먼저 건너뛰고 나머지는 하루씩 이동
+    weeks, remaining = divmod(remaining, len(WORKING_WEEKDAYS))
+    day += timedelta(weeks=weeks)
+    while remaining > 0:
+        day += timedelta(days=1)
+        if is_working_day(day):
+            remaining -= 1
+    return day
+
+
+def count_working_days(start: date, end: date) -> int:
+    """start부터 end까지(양 끝 포함) 근무일 수를 반환합니다."""
+    if end < start:
+        return 0
+    total_days = (end - start).days + 1
+    weeks, extra = divmod(total_days, 7)
+    count = weeks * len(WORKING_WEEKDAYS)
+    for offset in range(extra):
+        if is_working_day(start + timedelta(days=weeks * 7 + offset)):
+            count += 1
+    return count
+
+
+def required_workdays(expected_workhours: Optional[float], workhours_per_day: float) -> int:
+    """예상 작업 시간을 1일 작업 시간으로 나누어 필요한 근무일 수(최소 1일)를 계산합니다."""
+    if workhours_per_day <= 0:
+        raise ValueError("workhours_per_day는 0보다 커야 합니다.")
+    if not expected_workhours or expected_workhours <= 0:
+        return 1
+    return max(1, math.ceil(float(expected_workhours) / workhours_per_day))
+
+
+def resolve_workhours_per_day(value: Any, default: float) -> float:
+    """
+    LLM이 반환한 1일 작업 시간이 24 이하의 양수이면 사용하고, 아니면 default(로컬에서 계산한 값)를 사용합니다.
+
+    Returns:
+        float: 일정 배정에 사용할 1일 작업 시간
+    """
+    hours = _as_days(value)
+    if hours is None or not 0 < hours <= 24:
+        if value is not None:
+            logger.warning(f"⚠️ workhours_per_day {value!r}는 사용할 수 없는 값입니다. 기존에 책정된 {default}시간을 사용합니다.")
+        return default
+    return hours
+
+
+def schedule_tasks(
+    tasks: List[Dict[str, Any]],
+    window_start: DateLike,
+    window_end: DateLike,
+    workhours_per_day: float,
+    availability: Optional[Dict[str, date]] = None,
+    keep_existing: bool = False,
+) -> Tuple[List[Dict[str, Any]], Dict[str, date]]:
+    """
+    task들의 startDate, endDate를 결정론적으로 배정합니다.
+
+    각 담당자(assignee)는 한 번에 하나의 task만 진행한다고 가정하고, 주어진 순서대로
+    담당자의 다음 가용일부터 expected_workhours / workhours_per_day 만큼의 근무일을 배정합니다.
+    배정 결과는 [window_start, window_end] 구간(epic 또는 sprint 기간)을 벗어나지 않도록 조정됩니다.
+
+    Args:
+        tasks (List[Dict[str, Any]]): "assignee", "expected_workhours"를 가진 task 목록 (제자리에서 수정됨)
+        window_start (DateLike): 배정 가능한 시작일
+        window_end (DateLike): 배정 가능한 종료일
+        workhours_per_day (float): 1일 개발 업무 시간
+        availability (Optional[Dict[str, date]]): 담당자별 다음 가용일. 여러 epic에 걸쳐 공유할 수 있습니다.
+        keep_existing (bool): True인 경우 이미 startDate, endDate가 있는 task(DB에 저장된 task)는 일정을 유지하고(YYYY-MM-DD 형식으로 변환) 담당자 일정에만 반영합니다.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Dict[str, date]]: 날짜가 배정된 task 목록과 갱신된 담당자별 가용일
+
+    Raises:
+        ValueError: window_end가 window_start보다 이전인 경우
+    """
+    start = to_date(window_start)
+    end = to_date(window_end)
+    if end < start:
+        raise ValueError(f"종료일({end})이 시작일({start})보다 이전입니다.")
+    availability = {} if availability is None else availability
+
+    first_day = next_working_day(start)
+    last_day = previous_working_day(end)
+    if last_day < first_day:
+        # 구간 안에 근무일이 없다면 주말이라도 구간 자체를 사용
+        first_day, last_day = start, end
+
+    for task in tasks:
+        assignee = task.get("assignee") or ""
+
+        if keep_existing and task.get("startDate") and task.get("endDate"):
+            existing_end = to_date(task["endDate"])
+            # DB에서 불러온 datetime도 응답 형식(YYYY-MM-DD)으로 맞춤
+            task["startDate"] = format_date(to_date(task["startDate"]))
+            task["endDate"] = format_date(existing_end)
+            cursor = availability.get(assignee)
+            if cursor is None or cursor <= existing_end:
+                availability[assignee] = next_working_day(existing_end + timedelta(days=1))
+            continue
+
+        workdays = required_workdays(task.get("expected_workhours"), workhours_per_day)
+        task_start = max(availability.get(assignee, first_day), first_day)
+        task_start = next_working_day(task_start)
+        if task_start > last_day:
+            logger.warning(f"⚠️ 담당자 {assignee}의 가용 일정이 기간({first_day}~{last_day})을 초과하여 task '{task.get('title')}'를 마지막 근무일에 배정합니다.")
+            task_start = last_day
+        task_end = add_working_days(task_start, workdays)
+        if task_end > last_day:
+            logger.warning(f"⚠️ task '{task.get('title')}'의 예상 종료일 {task_end}이 기간 종료일 {last_day}을 초과하여 조정합니다.")
+            task_end = last_day
+
+        task["startDate"] = format_date(task_start)
+        task["endDate"] = format_date(task_end)
+        availability[assignee] = next_working_day(task_end + timedelta(days=1))
+
+    logger.info(f"📅 {first_day}~{last_day} 기간에 task {len(tasks)}개 일정 배정 완료")
+    return tasks, availability
+
+
+def _as_days(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    try:
+        days = float(value)
+    except (TypeError, ValueError):
+        return None
+    return days if math.isfinite(days) else None
+
+
+def allocate_feature_dates(
+    features: List[Dict[str, Any]],
+    window_start: DateLike,
+    window_end: DateLike,
+    lanes: int,
+    order: Optional[List[int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    기능들의 startDate, endDate를 프로젝트 기간 안에 결정론적으로 배정합니다.
+
+    프로젝트 멤버 수만큼의 기능을 동시에 진행할 수 있다고 가정하고(lanes), order 순서대로 가장 먼저 비는 lane의
+    다음 근무일부터 estimatedDays 근무일을 배정합니다. 전체 작업량이 기간 내 가용 근무일(근무일 수 × lanes)을 초과하면
+    모든 기능의 기간을 같은 비율로 줄이고, 그래도 넘치는 기능은 기간 종료일에 맞춥니다.
+
+    Args:
+        features (List[Dict[str, Any]]): "estimatedDays"(예상 소요 근무일)를 가진 기능 목록 (제자리에서 수정됨)
+        window_start (DateLike): 프로젝트 시작일
+        window_end (DateLike): 프로젝트 종료일
+        lanes (int): 동시에 진행할 수 있는 기능 수 (프로젝트 멤버 수, 최소 1)
+        order (Optional[List[int]]): 배정할 기능의 위치 순서 (기본값: 입력 순서)
+
+    Returns:
+        List[Dict[str, Any]]: startDate, endDate가 배정된 기능 목록
+
+    Raises:
+        ValueError: window_end가 window_start보다 이전인 경우
+    """
+    start = to_date(window_start)
+    end = to_date(window_end)
+    if end < start:
+        raise ValueError(f"종료일({end})이 시작일({start})보다 이전입니다.")
+    if not features:
+        return features
+
+    first_day = next_working_day(start)
+    last_day = previous_working_day(end)
+    if last_day < first_day:
+        first_day, last_day = start, end
+    window_workdays = max(count_working_days(first_day, last_day), 1)
+
+    lanes = max(1, min(lanes, len(features)))
+    efforts = [required_workdays(_as_days(feature.get("estimatedDays")), 1) for feature in features]
+    capacity = window_workdays * lanes
+    scale = min(1.0, capacity / sum(efforts))
+    if scale < 1.0:
+        logger.warning(f"⚠️ 기능 예상 소요일의 합({sum(efforts)}일)이 가용 근무일({capacity}일)을 초과하여 기간을 {scale:.2f}배로 조정합니다.")
+    durations = [min(max(1, math.floor(effort * scale)), window_workdays) for effort in efforts]
+
+    lane_free = [(first_day, lane) for lane in range(lanes)]
+    heapq.heapify(lane_free)
+    for position in (order if order is not None else range(len(features))):
+        free_day, lane = heapq.heappop(lane_free)
+        feature_start = min(next_working_day(free_day), last_day)
+        feature_end = min(add_working_days(feature_start, durations[position]), last_day)
+        features[position]["startDate"] = format_date(feature_start)
+        features[position]["endDate"] = format_date(feature_end)
+        heapq.heappush(lane_free, (next_working_day(feature_end + timedelta(days=1)), lane))
+
+    logger.info(f"📅 {first_day}~{last_day} 기간에 기능 {len(features)}개 일정 배정 완료 (동시 진행 {lanes}개)")
+    return features
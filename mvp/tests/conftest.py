@@ -1,4 +1,5 @@
 import os
+from typing import Any, Dict, List
 from unittest.mock import patch
 
 import mongomock
@@ -9,6 +10,7 @@ import pytest
 # 환경 변수 로드
 #load_dotenv()
 os.environ["OPENAI_API_KEY"] = "sk-proj-1234567890"
+os.environ.setdefault("REDIS_PORT", "6379")   # redis_setting import 시 필요 (실제 연결은 하지 않음)
 #os.environ["DB_NAME"] = "test_db"
 #os.environ["REDIS_HOST"] = "localhost"
 #os.environ["REDIS_PORT"] = "6379"
@@ -23,6 +25,136 @@ os.environ["OPENAI_API_KEY"] = "sk-proj-1234567890"
 #        "REDIS_URL": os.getenv("REDIS_URL")
 #    }
 
+class FakeRedis:
+    """테스트용 in-memory Redis (string, hash, list와 pipeline/WATCH 일부만 지원)"""
+
+    def __init__(self):
+        self.data: Dict[str, Any] = {}
+        self.ttls: Dict[str, int] = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value)
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    async def hmget(self, key, fields):
+        return [self.data.get(key, {}).get(field) for field in fields]
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        target = self.data.setdefault(key, {})
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        for k, v in items.items():
+            target[k] = str(v)
+        return len(items)
+
+    async def hdel(self, key, *fields):
+        target = self.data.get(key, {})
+        return sum(target.pop(field, None) is not None for field in fields)
+
+    async def hincrby(self, key, field, amount=1):
+        target = self.data.setdefault(key, {})
+        target[field] = str(int(target.get(field, 0)) + amount)
+        return int(target[field])
+
+    async def expire(self, key, seconds):
+        if key not in self.data:
+            return False
+        self.ttls[key] = seconds
+        return True
+
+    async def rpush(self, key, *values):
+        target = self.data.setdefault(key, [])
+        target.extend(str(value) for value in values)
+        return len(target)
+
+    async def lrange(self, key, start, end):
+        target = self.data.get(key, [])
+        return list(target[start:] if end == -1 else target[start:end + 1])
+
+    async def lrem(self, key, count, value):
+        target = self.data.get(key, [])
+        if str(value) in target:
+            target.remove(str(value))
+            return 1
+        return 0
+
+    async def lpos(self, key, value):
+        target = self.data.get(key, [])
+        return target.index(str(value)) if str(value) in target else None
+
+    async def blmove(self, first_list, second_list, timeout, src="LEFT", dest="RIGHT"):
+        # 대기하지 않고 비어 있으면 바로 None을 반환
+        source = self.data.get(first_list, [])
+        if not source:
+            return None
+        value = source.pop(0 if src == "LEFT" else -1)
+        target = self.data.setdefault(second_list, [])
+        target.insert(0 if dest == "LEFT" else len(target), value)
+        return value
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """명령을 모아 두었다가 execute에서 순서대로 실행하는 pipeline. watch 이후 multi 전에는 즉시 실행한다."""
+
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands: List[Any] = []
+        self.immediate = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def watch(self, *keys):
+        self.immediate = True
+
+    async def unwatch(self):
+        self.immediate = False
+
+    def multi(self):
+        self.immediate = False
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+
+        def command(*args, **kwargs):
+            if self.immediate:
+                return method(*args, **kwargs)
+            self.commands.append((method, args, kwargs))
+            return self
+        return command
+
+    async def execute(self):
+        results = [await method(*args, **kwargs) for method, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+
+@pytest.fixture
+def fake_redis():
+    """in-memory Redis fixture"""
+    return FakeRedis()
+
 @pytest.fixture(scope="function")
 def mock_openai():
     """OpenAI API 모킹을 위한 fixture"""
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import threading
+
+import pytest
+from artifact_store import (ArtifactWriter, LocalDiskArtifactStore,
+                            NullArtifactStore, create_artifact_store)
+
+
+def test_local_disk_store_evicts_by_size_and_age(tmp_path):
+    """크기 한도를 넘으면 가장 오래 사용하지 않은 파일을, 보관 기간이 지나면 크기와 관계없이 삭제하는지 테스트"""
+    store = LocalDiskArtifactStore(str(tmp_path), max_bytes=250, max_age=1000)
+    for i, name in enumerate(("old", "used", "new")):
+        (tmp_path / f"{name}.txt").write_text("x" * 100)
+        os.utime(tmp_path / f"{name}.txt", (5000 + i, 5000 + i))
+    os.utime(tmp_path / "old.txt", (5010, 5010))     # 최근 사용
+
+    assert store.evict(now=5100) == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["new.txt", "old.txt"]
+    assert store.evict(now=6005) == 1     # new.txt는 마지막 사용 후 1000초가 지남
+    assert [path.name for path in tmp_path.iterdir()] == ["old.txt"]
+
+def test_local_disk_store_evict_skips_temp_files(tmp_path):
+    """다른 worker가 쓰고 있는 임시 파일은 한도를 넘어도 삭제하지 않는지 테스트"""
+    store = LocalDiskArtifactStore(str(tmp_path), max_bytes=50, max_age=1000)
+    (tmp_path / "a.txt.123.tmp").write_text("x" * 100)
+    os.utime(tmp_path / "a.txt.123.tmp", (1000, 1000))
+    assert store.evict(now=5000) == 0
+    assert (tmp_path / "a.txt.123.tmp").exists()
+
+def test_local_disk_store_write_removes_temp_file_on_failure(tmp_path, monkeypatch):
+    """이름 변경에 실패하면 임시 파일을 남기지 않고 오류를 전달하는지 테스트"""
+    store = LocalDiskArtifactStore(str(tmp_path))
+
+    def fail_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail_replace)
+    with pytest.raises(OSError):
+        store.write("a.txt", "로그인 기능")
+    assert list(tmp_path.iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_local_disk_store_get_refreshes_mtime(tmp_path):
+    store = LocalDiskArtifactStore(str(tmp_path))
+    assert await store.get("missing.txt") is None
+    store.write("a.txt", "로그인 기능")
+    os.utime(tmp_path / "a.txt", (1000, 1000))
+    assert await store.get("a.txt") == "로그인 기능"
+    assert os.path.getmtime(tmp_path / "a.txt") > 1000
+    with pytest.raises(ValueError):
+        await store.get("../a.txt")
+
+@pytest.mark.asyncio
+async def test_artifact_writer_does_not_wait_for_disk(tmp_path):
+    """쓰기는 대기열에 넣고 바로 반환하며, 저장 전에도 읽을 수 있는지 테스트"""
+    release = threading.Event()
+
+    class SlowStore(LocalDiskArtifactStore):
+        def write(self, name, text):
+            release.wait(5)
+            super().write(name, text)
+
+    writer = ArtifactWriter(SlowStore(str(tmp_path)), queue_size=1)
+    assert writer.put("a.txt", "A")
+    await asyncio.sleep(0.05)           # worker가 a.txt를 꺼내 쓰기 시작
+    assert writer.put("b.txt", "B")
+    assert not writer.put("c.txt", "C")     # 대기열이 가득 차면 버림
+    assert await writer.get("b.txt") == "B"
+    assert not (tmp_path / "a.txt").exists()
+
+    release.set()
+    await writer.stop()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.txt", "b.txt"]
+    assert await writer.get("b.txt") == "B"
+    with pytest.raises(ValueError):
+        writer.put("../escape.txt", "x")
+
+@pytest.mark.asyncio
+async def test_null_store_and_backend_selection(tmp_path):
+    writer = ArtifactWriter(NullArtifactStore())
+    assert writer.put("a.txt", "A")
+    await writer.stop()
+    assert await writer.get("a.txt") is None
+    assert isinstance(create_artifact_store("none"), NullArtifactStore)
+    assert isinstance(create_artifact_store("local"), LocalDiskArtifactStore)
@@ -0,0 +1,79 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import mongomock
+import pytest
+from bulk_write_utils import (build_upsert_operations, bulk_upsert,
+                              upsert_features)
+
+
+class AsyncCollection:
+    """mongomock collection을 motor처럼 사용하기 위한 async wrapper"""
+
+    def __init__(self):
+        self.sync = mongomock.MongoClient().db.features
+        self.name = "features"
+        self.calls = []
+
+    async def bulk_write(self, operations, ordered=True, session=None):
+        # mongomock은 최신 pymongo의 UpdateOne을 bulk_write로 처리하지 못하므로 update_one으로 재현
+        self.calls.append((len(operations), ordered))
+        matched = modified = upserted = 0
+        for operation in operations:
+            result = self.sync.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+            matched += result.matched_count
+            modified += result.modified_count
+            upserted += result.upserted_id is not None
+        return SimpleNamespace(matched_count=matched, modified_count=modified, upserted_count=upserted)
+
+
+def make_feature(feature_id, name, difficulty=2):
+    return {
+        "_id": feature_id, "name": name, "useCase": "사용 사례", "input": "입력", "output": "출력",
+        "precondition": "전제", "postcondition": "결과", "expectedDays": 5, "startDate": "2024-03-01",
+        "endDate": "2024-03-06", "difficulty": difficulty, "priority": 200, "relfeatIds": [],
+    }
+
+
+def test_build_upsert_operations_requires_keys():
+    """key 필드 기준 upsert 연산 생성과 key 누락 검증 테스트"""
+    created_at = datetime(2024, 3, 1)
+    operations = build_upsert_operations([{"featureId": "f1", "projectId": "p1", "name": "A"}], ("featureId", "projectId"), created_at)
+    assert operations[0]._filter == {"featureId": "f1", "projectId": "p1"}
+    assert operations[0]._doc["$setOnInsert"] == {"createdAt": created_at}
+    assert operations[0]._upsert is True
+    with pytest.raises(ValueError):
+        build_upsert_operations([{"featureId": "f1"}], ("featureId", "projectId"))
+
+@pytest.mark.asyncio
+async def test_upsert_features_is_idempotent():
+    """같은 기능 명세를 다시 저장해도 문서가 중복 생성되지 않고 한 번의 bulk_write로 처리되는지 테스트"""
+    collection = AsyncCollection()
+    features = [make_feature("f1", "로그인 기능"), make_feature("f2", "결제 기능")]
+
+    first = await upsert_features(collection, features, "p1")
+    assert first["upserted"] == 2
+    assert collection.calls == [(2, False)]
+
+    created_at = collection.sync.find_one({"featureId": "f1"})["createdAt"]
+    features[0]["difficulty"] = 4
+    second = await upsert_features(collection, features, "p1")
+    assert second["upserted"] == 0
+    assert second["matched"] == 2
+    assert collection.sync.count_documents({}) == 2
+    stored = collection.sync.find_one({"featureId": "f1", "projectId": "p1"})
+    assert stored["difficulty"] == 4
+    assert stored["createdAt"] == created_at
+    assert stored["relfeatIds"] == []
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_batches():
+    """batch_size에 따라 bulk_write가 나누어 호출되는지 테스트"""
+    collection = AsyncCollection()
+    documents = [{"featureId": f"f{i}", "projectId": "p1"} for i in range(5)]
+    summary = await bulk_upsert(collection, documents, ("featureId", "projectId"), batch_size=2)
+    assert [count for count, _ in collection.calls] == [2, 2, 1]
+    assert summary["upserted"] == 5
+    assert await bulk_upsert(collection, [], ("featureId",)) == {"matched": 0, "modified": 0, "upserted": 0}
+    with pytest.raises(ValueError):
+        await bulk_upsert(collection, documents, ("featureId",), batch_size=0)
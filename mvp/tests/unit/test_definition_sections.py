@@ -0,0 +1,52 @@
+import pytest
+from definition_sections import (DocumentSection, keyword_score,
+                                 select_relevant_sections, split_sections)
+
+DOCUMENT = (
+    "1. 프로젝트 개요 본 프로젝트는 대학생 팀이 진행하는 스터디 모임 매칭 서비스입니다. 2024년 3월부터 6월까지 진행합니다. "
+    "관심 분야와 지역이 같은 학생들이 쉽게 스터디를 만들고 참여하는 것을 목표로 합니다. "
+    "2. 팀 소개 홍길동은 백엔드를, 김철수는 프론트엔드를 담당합니다. 팀원 모두 졸업 프로젝트로 참여하며 매주 화요일에 회의를 진행합니다. "
+    "회의 내용은 공유 문서에 정리합니다. "
+    "3. 기능 요구사항 3.1 회원 기능 사용자는 이메일로 회원가입과 로그인을 할 수 있습니다. 회원 정보 수정 및 탈퇴 기능을 제공합니다. "
+    "비밀번호를 잊은 사용자는 이메일 인증으로 재설정할 수 있습니다. "
+    "3.2 스터디 기능 사용자는 스터디를 등록, 조회, 검색할 수 있고 참여 신청 시 알림을 받을 수 있습니다. "
+    "스터디장은 참여 신청을 승인하거나 거절할 수 있습니다. "
+    "4. 참고문헌 [1] 애자일 소프트웨어 개발 방법론, 2020. [2] 스터디 플랫폼 시장 조사 보고서, 2023. [3] 대학생 커뮤니티 이용 실태 조사, 2022."
+)
+
+
+def test_split_sections_by_headings():
+    """번호 제목으로 나누고, 짧은 섹션은 다음 섹션과 합치는지 테스트"""
+    sections = split_sections(DOCUMENT)
+    headings = [section.text.split(" ")[1] for section in sections]
+    assert headings == ["프로젝트", "팀", "기능", "스터디", "참고문헌"]
+    assert split_sections("1. 개요 짧은 소개 2. 기능 로그인 기능", min_chars=10)[0].text == "1. 개요 짧은 소개"
+    assert len(split_sections("1. 개요 짧은 소개 2. 기능 로그인 기능")) == 1
+    assert [section.position for section in sections] == list(range(len(sections)))
+    # 날짜의 "2024년"이나 문장 끝 "합니다."는 제목으로 보지 않음
+    assert sections[0].text.startswith("1. 프로젝트 개요") and "6월까지 진행합니다." in sections[0].text
+
+def test_split_sections_splits_long_text_at_sentences():
+    text = " ".join(f"사용자는 {i}번째 기능을 사용할 수 있습니다." for i in range(50))
+    sections = split_sections(text, max_chars=200)
+    assert len(sections) > 1
+    assert all(len(section.text) <= 200 for section in sections)
+    assert " ".join(section.text for section in sections) == text
+
+def test_keyword_score_prefers_feature_sections():
+    feature = DocumentSection(0, "3. 기능 요구사항 사용자는 이메일로 회원가입과 로그인을 할 수 있습니다.")
+    references = DocumentSection(1, "4. 참고문헌 [1] 애자일 소프트웨어 개발 방법론, 2020.")
+    assert keyword_score(feature) > 0.5 > keyword_score(references)
+
+@pytest.mark.asyncio
+async def test_select_relevant_sections_within_budget(monkeypatch):
+    import definition_sections
+    monkeypatch.setattr(definition_sections, "count_tokens", len)     # 글자 수를 token 수로 사용
+    assert await select_relevant_sections(DOCUMENT, token_budget=len(DOCUMENT)) == DOCUMENT
+
+    filtered = await select_relevant_sections(DOCUMENT, "스터디 매칭 서비스", token_budget=300)
+    assert len(filtered) <= 300
+    assert "회원가입과 로그인" in filtered and "스터디를 등록" in filtered
+    assert "참고문헌" not in filtered and "팀 소개" not in filtered
+    # 선택된 섹션은 문서 순서를 유지
+    assert filtered.index("회원가입") < filtered.index("스터디를 등록")
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+from draft_store import (DraftVersionConflict, FeatureDraftStore, draft_key,
+                         draft_meta_key, rebase_changes)
+
+
+def make_feature(feature_id, name):
+    return {"_id": feature_id, "name": name, "useCase": f"{name} 사용", "relfeatIds": []}
+
+@pytest.mark.asyncio
+async def test_save_and_load_all_keeps_order(fake_redis):
+    """기능별 hash field로 저장하고 저장한 순서대로 불러오는지 테스트"""
+    store = FeatureDraftStore(fake_redis)
+    features = [make_feature("b", "결제 기능"), make_feature("a", "로그인 기능")]
+    await store.save_all("user@example.com", features)
+
+    assert set(fake_redis.data[draft_key("user@example.com")]) == {"a", "b"}
+    assert await store.load_all("user@example.com") == features
+    assert (await store.get_meta("user@example.com"))["version"] == 1
+    assert await store.load_all("nobody@example.com") is None
+
+@pytest.mark.asyncio
+async def test_partial_read_and_apply_changes(fake_redis):
+    """일부 기능 조회와 변경된 기능만 저장/삭제하는지 테스트"""
+    store = FeatureDraftStore(fake_redis)
+    features = [make_feature("a", "로그인 기능"), make_feature("b", "결제 기능"), make_feature("c", "검색 기능")]
+    await store.save_all("user@example.com", features)
+    untouched = fake_redis.data[draft_key("user@example.com")]["a"]
+
+    assert await store.load_features("user@example.com", ["c", "x"]) == {"c": features[2]}
+
+    modified = dict(features[1], name="간편 결제 기능")
+    created = make_feature("d", "채팅 기능")
+    await store.apply_changes("user@example.com", [modified, created], deleted_ids=["c"], order=["d", "a", "b"])
+
+    loaded = await store.load_all("user@example.com")
+    assert [feature["_id"] for feature in loaded] == ["d", "a", "b"]
+    assert loaded[2]["name"] == "간편 결제 기능"
+    assert fake_redis.data[draft_key("user@example.com")]["a"] == untouched
+    assert (await store.get_meta("user@example.com"))["version"] == 2
+
+@pytest.mark.asyncio
+async def test_update_feature_merges_fields(fake_redis):
+    """기능 하나의 일부 필드만 수정하는지 테스트"""
+    store = FeatureDraftStore(fake_redis)
+    await store.save_all("user@example.com", [make_feature("a", "로그인 기능")])
+    updated = await store.update_feature("user@example.com", "a", {"difficulty": 3})
+    assert updated == dict(make_feature("a", "로그인 기능"), difficulty=3)
+    assert json.loads(fake_redis.data[draft_key("user@example.com")]["a"])["difficulty"] == 3
+    assert await store.update_feature("user@example.com", "zzz", {"difficulty": 3}) is None
+
+@pytest.mark.asyncio
+async def test_load_with_project(fake_redis):
+    """프로젝트 정보와 초안을 함께 조회하는지 테스트"""
+    store = FeatureDraftStore(fake_redis)
+    fake_redis.data["user@example.com"] = json.dumps({"projectId": "p1"})
+    project, features = await store.load_with_project("user@example.com")
+    assert project == {"projectId": "p1"}
+    assert features is None
+    assert draft_meta_key("user@example.com") not in fake_redis.data
+
+@pytest.mark.asyncio
+async def test_apply_changes_checks_version(fake_redis):
+    """expected_version이 현재 version과 같을 때만 변경이 적용되는지 테스트"""
+    store = FeatureDraftStore(fake_redis)
+    version = await store.save_all("user@example.com", [make_feature("a", "로그인 기능")])
+    _, features, loaded_version = await store.load_versioned_with_project("user@example.com")
+    assert loaded_version == version == 1
+
+    assert await store.apply_changes("user@example.com", [make_feature("b", "결제 기능")], expected_version=1) == 2
+    with pytest.raises(DraftVersionConflict) as conflict:
+        await store.apply_changes("user@example.com", [make_feature("c", "검색 기능")], expected_version=1)
+    assert (conflict.value.expected_version, conflict.value.current_version) == (1, 2)
+    assert "c" not in fake_redis.data[draft_key("user@example.com")]
+
+def test_rebase_changes_only_without_overlap():
+    """다른 요청과 서로 다른 기능을 변경했을 때만 rebase되고, 최신 순서에 새 기능이 뒤에 붙는지 테스트"""
+    base = [make_feature("a", "로그인 기능"), make_feature("b", "결제 기능"), make_feature("c", "검색 기능")]
+    latest = [dict(base[0], name="소셜 로그인 기능"), base[1], make_feature("e", "알림 기능")]     # a 수정, c 삭제, e 생성
+    created = make_feature("d", "채팅 기능")
+
+    order = rebase_changes(base, latest, [dict(base[1], name="간편 결제 기능"), created], [], ["a", "b", "c", "d"])
+    assert order == ["a", "b", "e", "d"]
+    assert rebase_changes(base, latest, [dict(base[0], name="이메일 로그인")], [], ["a", "b", "c"]) is None
+    assert rebase_changes(base, latest, [], ["c"], ["a", "b"]) is None
+
+@pytest.mark.asyncio
+async def test_writes_refresh_ttl_and_delete(fake_redis):
+    """모든 쓰기가 초안과 metadata의 TTL을 다시 설정하고, delete가 둘 다 지우는지 테스트"""
+    store = FeatureDraftStore(fake_redis, ttl=60)
+    await store.save_all("user@example.com", [make_feature("a", "로그인 기능")])
+    keys = (draft_key("user@example.com"), draft_meta_key("user@example.com"))
+    assert all(fake_redis.ttls[key] == 60 for key in keys)
+
+    fake_redis.ttls.clear()
+    assert await store.apply_changes("user@example.com", [make_feature("b", "결제 기능")], expected_version=1) == 2
+    assert all(fake_redis.ttls[key] == 60 for key in keys)
+    fake_redis.ttls.clear()
+    await store.update_feature("user@example.com", "a", {"useCase": "소셜 로그인"})
+    assert all(fake_redis.ttls[key] == 60 for key in keys)
+
+    await store.delete("user@example.com")
+    assert not any(key in fake_redis.data for key in keys)
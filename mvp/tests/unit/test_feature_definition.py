@@ -122,4 +122,80 @@ async def test_update_feature_definition_gpt_failure():
     
     # 에러 메시지 검증
     assert isinstance(error_message, str)
-    assert "GPT API" in error_message
\ No newline at end of file
+    assert "GPT API" in error_message
+@pytest.mark.asyncio
+async def test_update_feature_definition_skips_llm_for_clear_feedback():
+    """명확한 종료 피드백은 LLM 호출 없이 다음 단계로 진행하는지 테스트"""
+    import feature_definition
+    features = ["로그인 기능", "결제 기능"]
+    with patch.object(feature_definition, "load_from_redis", AsyncMock(return_value=features)), \
+         patch.object(feature_definition, "ChatOpenAI") as chat:
+        result = await feature_definition.update_feature_definition("user@example.com", "이대로 좋습니다")
+    chat.assert_not_called()
+    assert result == {"features": features, "isNextStep": True}
+
+@pytest.mark.asyncio
+async def test_update_feature_definition_classifies_and_updates_in_one_call():
+    """의도가 애매한 피드백은 판단과 업데이트를 한 번의 LLM 호출로 처리하는지 테스트"""
+    import json
+
+    import feature_definition
+    features = ["로그인 기능", "결제 기능"]
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=AIMessage(content=json.dumps({"isNextStep": 0, "features": ["로그인 기능", "결제 기능", "채팅 기능"]}, ensure_ascii=False)))
+    save = AsyncMock()
+    with patch.object(feature_definition, "load_from_redis", AsyncMock(return_value=features)), \
+         patch.object(feature_definition, "save_to_redis", save), \
+         patch.object(feature_definition, "ChatOpenAI", return_value=llm):
+        result = await feature_definition.update_feature_definition("user@example.com", "흠 채팅은 어떨까 싶네요")
+    
+    llm.ainvoke.assert_awaited_once()
+    assert "isNextStep" in llm.ainvoke.call_args.args[0][1].content      # 판단과 업데이트를 함께 요청하는 프롬프트
+    assert result == {"features": ["로그인 기능", "결제 기능", "채팅 기능"], "isNextStep": False}
+    save.assert_awaited_once_with("features:user@example.com", result["features"])
+    
+    # LLM이 종료 요청으로 판단하면 기능 목록을 변경하지 않음
+    llm.ainvoke = AsyncMock(return_value=AIMessage(content='{"isNextStep": 1, "features": []}'))
+    save.reset_mock()
+    with patch.object(feature_definition, "load_from_redis", AsyncMock(return_value=features)), \
+         patch.object(feature_definition, "save_to_redis", save), \
+         patch.object(feature_definition, "ChatOpenAI", return_value=llm):
+        result = await feature_definition.update_feature_definition("user@example.com", "흠 잘 모르겠네요")
+    assert result == {"features": features, "isNextStep": True}
+    save.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_update_feature_definition_drops_only_suggested_near_duplicates():
+    """피드백으로 바뀐 목록에서 LLM이 임의로 추가한 중복 기능만 제외하고, 기존 기능과 사용자가 요청한 기능은 유지하는지 테스트"""
+    import feature_definition
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=AIMessage(content='{"features": ["로그인 기능", "결제 기능", "사용자 로그인 기능", "채팅 기능", "채팅기능", "회원 가입 기능", "회원가입 기능"]}'))
+    save = AsyncMock()
+    with patch.object(feature_definition, "load_from_redis", AsyncMock(return_value=["로그인 기능", "결제 기능", "회원 가입 기능", "회원가입 기능"])), \
+         patch.object(feature_definition, "save_to_redis", save), \
+         patch.object(feature_definition, "ChatOpenAI", return_value=llm):
+        result = await feature_definition.update_feature_definition("user@example.com", "채팅 기능 추가해주세요")
+    # "사용자 로그인 기능"은 LLM이 추가한 중복이므로 제외, 사용자가 요청한 "채팅 기능"과 기존 기능의 중복은 유지
+    assert result == {"features": ["로그인 기능", "결제 기능", "채팅 기능", "채팅기능", "회원 가입 기능", "회원가입 기능"], "isNextStep": False}
+    save.assert_awaited_once_with("features:user@example.com", result["features"])
+
+@pytest.mark.asyncio
+async def test_create_feature_definition_drops_suggestions_duplicating_features():
+    """정의서 기능과 중복되는 제안을 제외하고 저장하는지 테스트"""
+    import json
+
+    import feature_definition
+    llm = MagicMock()
+    llm.invoke = MagicMock(return_value=AIMessage(content=json.dumps({
+        "features": ["로그인 기능", "회원 가입 기능", "회원가입 기능"],
+        "suggestions": [{"question": "이런 기능을 추가하시는 건 어떤가요?", "answers": ["사용자 로그인 기능", "장바구니 기능", "장바구니  기능"]}]
+    }, ensure_ascii=False)))
+    save = AsyncMock()
+    with patch.object(feature_definition, "extract_pdf_text", AsyncMock(return_value="정의서")), \
+         patch.object(feature_definition, "select_relevant_sections", AsyncMock(return_value="정의서")), \
+         patch.object(feature_definition, "save_to_redis", save), \
+         patch.object(feature_definition, "ChatOpenAI", return_value=llm):
+        result = await feature_definition.create_feature_definition("user@example.com", "쇼핑몰 서비스", "https://example.com/definition.pdf")
+    assert result["suggestion"]["features"] == ["로그인 기능", "회원 가입 기능"]
+    assert result["suggestion"]["suggestions"][0]["answers"] == ["장바구니 기능"]
+    save.assert_awaited_once_with("features:user@example.com", ["로그인 기능", "회원 가입 기능", "장바구니 기능"])
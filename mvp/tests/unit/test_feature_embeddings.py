@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from feature_embeddings import (HASH_EMBEDDING_DIM, FeatureVectorIndex,
+                                assign_embeddings, hash_embed)
+
+
+def make_feature(feature_id, name, use_case):
+    return {"_id": feature_id, "name": name, "useCase": use_case, "input": "입력", "output": "출력", "relfeatIds": [], "embedding": []}
+
+@pytest.fixture(autouse=True)
+def use_hash_embedding(monkeypatch):
+    import feature_embeddings
+    monkeypatch.setattr(feature_embeddings, "_model", None)
+    monkeypatch.setattr(feature_embeddings, "_model_unavailable", True)
+
+def test_hash_embed_is_normalized_and_deterministic():
+    vectors = hash_embed(["로그인 기능", "로그인 기능", ""])
+    assert vectors.shape == (3, HASH_EMBEDDING_DIM)
+    assert np.allclose(np.linalg.norm(vectors[:2], axis=1), 1)
+    assert np.array_equal(vectors[0], vectors[1])
+    assert not vectors[2].any()
+
+def test_feature_vector_index_upsert_remove_search():
+    """기능 _id 기준으로 벡터를 교체, 삭제하고 가까운 기능을 찾는지 테스트"""
+    index = FeatureVectorIndex(2)
+    index.upsert(["a", "b"], np.array([[1, 0], [0, 1]], dtype=np.float32))
+    index.upsert(["b"], np.array([[0.6, 0.8]], dtype=np.float32))
+    assert len(index) == 2
+
+    [neighbors] = index.search(np.array([[1, 0]], dtype=np.float32), 2)
+    assert [feature_id for feature_id, _ in neighbors] == ["a", "b"]
+    assert neighbors[1][1] == pytest.approx(0.6)
+
+    index.remove(["a"])
+    assert index.feature_ids() == ["b"]
+    assert index.search(np.array([[1, 0]], dtype=np.float32), 3)[0][0][0] == "b"
+
+@pytest.mark.asyncio
+async def test_assign_embeddings_fills_related_features(monkeypatch):
+    """embedding과 relfeatIds를 채우고, 이미 embedding된 기능은 다시 계산하지 않는지 테스트"""
+    import feature_embeddings
+    features = [
+        make_feature("a", "로그인 기능", "이메일로 로그인"),
+        make_feature("b", "소셜 로그인 기능", "카카오 계정으로 로그인"),
+        make_feature("c", "결제 내역 조회", "월별 결제 내역 확인"),
+    ]
+    monkeypatch.setattr(feature_embeddings, "RELATED_MIN_SIMILARITY", 0.3)
+    changed = await assign_embeddings("p1", features)
+    assert changed == {"a", "b", "c"}
+    assert all(len(feature["embedding"]) == HASH_EMBEDDING_DIM for feature in features)
+    assert features[0]["relfeatIds"][0] == "b"
+    assert "a" not in features[0]["relfeatIds"]
+
+    embedded = []
+    original = feature_embeddings.embed_texts
+    monkeypatch.setattr(feature_embeddings, "embed_texts", lambda texts: embedded.extend(texts) or original(texts))
+    assert await assign_embeddings("p1", features) == set()
+    assert embedded == []
+
+    # 기능이 삭제되면 index에서 제거되고 연관 기능에서도 빠짐
+    changed = await assign_embeddings("p1", features[:1] + features[2:])
+    assert "b" not in features[0]["relfeatIds"]
+    assert "a" in changed
+
+@pytest.mark.asyncio
+async def test_assign_embeddings_uses_stored_embeddings():
+    """다른 worker에서 다시 계산해 저장한 embedding도 relfeatIds 계산에 반영되는지 테스트"""
+    features = [
+        make_feature("a", "로그인 기능", "이메일로 로그인"),
+        make_feature("b", "결제 내역 조회", "월별 결제 내역 확인"),
+        make_feature("c", "채팅 기능", "실시간 채팅"),
+    ]
+    await assign_embeddings("p1", features)
+    assert "c" not in features[0]["relfeatIds"]
+
+    # 다른 worker가 c의 내용을 바꾸어 a와 같은 embedding을 저장한 경우
+    features[2]["embedding"] = list(features[0]["embedding"])
+    assert "a" in await assign_embeddings("p1", features)
+    assert features[0]["relfeatIds"][0] == "c"
+
+@pytest.mark.asyncio
+async def test_load_embedding_model_reports_hash_fallback():
+    """모델을 사용할 수 없으면 hashing embedding 사용을 알리고, 모델이 필수이면 시작하지 않는지 테스트"""
+    from feature_embeddings import load_embedding_model
+    assert await load_embedding_model(required=False) == "hash"
+    with pytest.raises(RuntimeError):
+        await load_embedding_model(required=True)
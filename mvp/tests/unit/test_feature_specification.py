@@ -169,4 +169,218 @@ async def test_update_feature_specification_gpt_failure():
     
     # 에러 메시지 검증
     assert isinstance(error_message, str)
-    assert "GPT API" in error_message
\ No newline at end of file
+    assert "GPT API" in error_message
+def test_split_into_batches():
+    """기능 목록 batch 분할 테스트"""
+    from feature_specification import split_into_batches
+    assert split_into_batches([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+    assert split_into_batches([], 3) == []
+    with pytest.raises(ValueError):
+        split_into_batches([1], 0)
+
+def test_match_feature_specs_drops_duplicates_and_unknown():
+    """생성된 명세를 이름으로 대응시키고 중복, 미요청, 누락 기능을 구분하는지 테스트"""
+    from feature_specification import match_feature_specs
+    requested = ["로그인 기능", {"name": "결제 기능"}, "검색 기능"]
+    generated = [
+        {"name": " 로그인  기능", "useCase": "첫 번째"},
+        {"name": "로그인 기능", "useCase": "중복"},
+        {"name": "알림 기능"},
+        {"name": "결제 기능"},
+    ]
+    matched, missing = match_feature_specs(requested, generated)
+    assert set(matched) == {"로그인 기능", "결제 기능"}
+    assert matched["로그인 기능"]["useCase"] == "첫 번째"
+    assert missing == ["검색 기능"]
+
+@pytest.mark.asyncio
+async def test_generate_feature_specs_sharded_with_retry():
+    """batch로 나누어 생성하고 누락된 기능을 재요청한 뒤 입력 순서대로 반환하는지 테스트"""
+    import feature_specification
+    features = [f"기능{i}" for i in range(7)]
+    calls = []
+    
+    async def fake_request(batch, project_context):
+        calls.append(list(batch))
+        # "기능3"은 처음 요청될 때 누락
+        first_call = sum(call.count("기능3") for call in calls) == 1
+        return [{"name": name} for name in batch if not (name == "기능3" and first_call)]
+    
+    with patch.object(feature_specification, "_request_feature_specs", side_effect=fake_request):
+        specs = await feature_specification.generate_feature_specs(features, "", batch_size=3, max_concurrency=2)
+    assert [spec["name"] for spec in specs] == features
+    assert calls[:3] == [["기능0", "기능1", "기능2"], ["기능3", "기능4", "기능5"], ["기능6"]]
+    assert calls[3] == ["기능3"]
+
+@pytest.mark.asyncio
+async def test_generate_feature_specs_missing_after_retries():
+    """재요청 후에도 누락된 기능이 있으면 ValueError가 발생하는지 테스트"""
+    import feature_specification
+    
+    async def fake_request(batch, project_context):
+        return [{"name": name} for name in batch if name != "기능1"]
+    
+    with patch.object(feature_specification, "_request_feature_specs", side_effect=fake_request):
+        with pytest.raises(ValueError):
+            await feature_specification.generate_feature_specs(["기능0", "기능1"], "", max_retries=1)
+
+def make_spec(feature_id, name, **overrides):
+    spec = {
+        "_id": feature_id, "name": name, "useCase": f"{name} 사용", "input": "입력", "output": "출력",
+        "precondition": "전제", "postcondition": "결과", "startDate": "2024-03-01", "endDate": "2024-03-10",
+        "difficulty": 2, "priority": 200, "expectedDays": 9,
+    }
+    spec.update(overrides)
+    return spec
+
+def test_apply_feature_edits_and_select_delta():
+    """편집 내용 반영 후 변경되었거나 값이 비어 있는 기능만 선택되는지 테스트"""
+    from feature_specification import apply_feature_edits, select_delta_features
+    features = [make_spec("a", "로그인 기능"), make_spec("b", "결제 기능"), make_spec("c", "검색 기능", useCase=None), make_spec("d", "알림 기능")]
+    merged, changed_ids = apply_feature_edits(
+        features,
+        createdFeatures=[{"name": "채팅 기능"}],
+        modifiedFeatures=[{"featureId": "b", "name": "간편 결제 기능", "useCase": "간편 결제", "input": "카드", "output": "영수증"}],
+        deletedFeatures=["d"],
+    )
+    assert [feature["name"] for feature in merged] == ["로그인 기능", "간편 결제 기능", "검색 기능", "채팅 기능"]
+    assert merged[0] is features[0]                 # 수정되지 않은 기능은 그대로 유지
+    assert features[1]["name"] == "결제 기능"         # 원본은 변경되지 않음
+    new_id = merged[3]["_id"]
+    assert changed_ids == {"b", new_id}
+    delta = select_delta_features(merged, changed_ids)
+    assert [feature["_id"] for feature in delta] == ["b", "c", new_id]
+
+def test_merge_feature_patch_preserves_untouched():
+    """patch된 기능만 교체되고 알 수 없는 필드, featureId는 무시되는지 테스트"""
+    from feature_specification import merge_feature_patch
+    features = [make_spec("a", "로그인 기능"), make_spec("b", "결제 기능"), make_spec("c", "검색 기능")]
+    patches = [
+        {"featureId": "b", "difficulty": 4, "embedding": [1, 2]},
+        {"featureId": "zzz", "name": "없는 기능"},
+        {"featureId": "a", "name": None},
+    ]
+    merged, patched_ids = merge_feature_patch(features, patches, deleted_ids=["c"])
+    assert patched_ids == {"b"}
+    assert merged[0] is features[0]
+    assert merged[1]["difficulty"] == 4
+    assert "embedding" not in merged[1]
+    assert len(merged) == 2
+
+@pytest.mark.asyncio
+async def test_update_feature_specification_sends_only_delta(fake_redis):
+    """LLM에는 변경된 기능만 전달되고, 응답 patch가 featureId로 병합되어 변경된 기능만 저장되는지 테스트"""
+    import feature_specification
+    from draft_store import FeatureDraftStore, draft_key
+    store = FeatureDraftStore(fake_redis)
+    import feature_embeddings
+    # a의 일정은 allocator가 배정한 값과 같아 다시 저장되지 않음 (3/1부터 9 근무일)
+    draft = [make_spec("a", "로그인 기능", endDate="2024-03-13"), make_spec("b", "결제 기능"), make_spec("c", "검색 기능")]
+    with patch.object(feature_embeddings, "RELATED_MIN_SIMILARITY", 1.01):
+        await feature_embeddings.assign_embeddings("p1", draft)
+    await store.save_all("user@example.com", draft)
+    untouched = fake_redis.data[draft_key("user@example.com")]["a"]
+    fake_redis.data["user@example.com"] = json.dumps({"projectId": "p1", "startDate": "2024-03-01", "endDate": "2024-04-30", "members": []})
+    
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=AIMessage(content=json.dumps({
+        "isNextStep": 0,
+        "features": [{"featureId": "F1", "useCase": "카드 결제", "expectedDays": 14, "endDate": "2024-03-20"}],
+        "deletedFeatureIds": ["F3"],
+    }, ensure_ascii=False)))
+    
+    # 연관 기능이 바뀌지 않도록 유사도 기준을 높여, 변경되지 않은 기능이 다시 저장되지 않는지 확인
+    with patch.object(feature_specification, "feature_draft_store", store), \
+         patch.object(feature_specification, "ChatOpenAI", return_value=llm), \
+         patch.object(feature_embeddings, "RELATED_MIN_SIMILARITY", 1.01):
+        result = await feature_specification.update_feature_specification(
+            "user@example.com", "결제 기능의 사용 사례를 구체화하고 검색 기능은 삭제해주세요", [],
+            [{"featureId": "b", "name": "결제 기능", "useCase": "결제", "input": "카드", "output": "영수증"}], [],
+        )
+    
+    prompt = llm.ainvoke.call_args.args[0][-1].content     # 요청별 값은 마지막 메시지에 전달
+    assert "F1|결제 기능|결제|카드|영수증" in prompt
+    assert "로그인 기능 사용" not in prompt     # 변경되지 않은 기능은 이름만 전달
+    assert "F2|로그인 기능" in prompt
+    assert "startDate" not in prompt       # 일정은 LLM이 아닌 allocator가 배정
+    
+    saved = await store.load_all("user@example.com")
+    assert [feature["_id"] for feature in saved] == ["a", "b"]
+    assert fake_redis.data[draft_key("user@example.com")]["a"] == untouched
+    assert saved[1]["useCase"] == "카드 결제"
+    # LLM이 보낸 endDate는 무시하고, 새로 산정한 expectedDays로 a 다음 근무일부터 배정
+    assert (saved[1]["startDate"], saved[1]["endDate"], saved[1]["expectedDays"]) == ("2024-03-14", "2024-04-02", 14)
+    assert result["isNextStep"] is False
+
+@pytest.mark.asyncio
+async def test_save_draft_changes_rebases_concurrent_update(fake_redis):
+    """다른 요청이 먼저 초안을 변경했을 때, 겹치지 않는 변경은 rebase하여 저장하고 겹치면 충돌이 발생하는지 테스트"""
+    import feature_specification
+    from draft_store import DraftVersionConflict, FeatureDraftStore
+    store = FeatureDraftStore(fake_redis)
+    base = [make_spec("a", "로그인 기능"), make_spec("b", "결제 기능")]
+    base_version = await store.save_all("user@example.com", base)
+    # 다른 탭에서 a를 먼저 수정
+    await store.apply_changes("user@example.com", [dict(base[0], useCase="소셜 로그인")], expected_version=base_version)
+    
+    with patch.object(feature_specification, "feature_draft_store", store):
+        modified_b = dict(base[1], difficulty=4)
+        version, saved = await feature_specification.save_draft_changes("user@example.com", base, [base[0], modified_b], {"b"}, base_version)
+        assert version == 3
+        assert [feature["useCase"] for feature in saved] == ["소셜 로그인", "결제 기능 사용"]
+        loaded = await store.load_all("user@example.com")
+        assert loaded[0]["useCase"] == "소셜 로그인" and loaded[1]["difficulty"] == 4
+        
+        with pytest.raises(DraftVersionConflict) as conflict:
+            await feature_specification.save_draft_changes("user@example.com", base, [dict(base[0], name="이메일 로그인"), base[1]], {"a"}, base_version)
+        assert conflict.value.current_version == 3
+
+@pytest.mark.asyncio
+async def test_update_feature_specification_rejects_stale_version(fake_redis):
+    """클라이언트가 보낸 version이 현재 초안과 다르면 LLM 호출 없이 충돌이 발생하는지 테스트"""
+    import feature_specification
+    from draft_store import DraftVersionConflict, FeatureDraftStore
+    store = FeatureDraftStore(fake_redis)
+    await store.save_all("user@example.com", [make_spec("a", "로그인 기능")])
+    fake_redis.data["user@example.com"] = json.dumps({"projectId": "p1", "startDate": "2024-03-01", "endDate": "2024-04-30", "members": []})
+    
+    with patch.object(feature_specification, "feature_draft_store", store), \
+         patch.object(feature_specification, "ChatOpenAI") as chat:
+        with pytest.raises(DraftVersionConflict):
+            await feature_specification.update_feature_specification("user@example.com", "좋아요", [], [], [], version=0)
+    chat.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_update_feature_specification_finishes_without_llm(fake_redis):
+    """편집 내용 없이 종료 피드백만 있으면 LLM 호출 없이 MongoDB에 저장하고 다음 단계로 진행하는지 테스트"""
+    import feature_specification
+    from draft_store import FeatureDraftStore
+    store = FeatureDraftStore(fake_redis)
+    await store.save_all("user@example.com", [make_spec("a", "로그인 기능")])
+    fake_redis.data["user@example.com"] = json.dumps({"projectId": "p1", "startDate": "2024-03-01", "endDate": "2024-04-30", "members": []})
+    
+    upsert = AsyncMock(return_value={})
+    with patch.object(feature_specification, "feature_draft_store", store), \
+         patch.object(feature_specification, "ChatOpenAI") as chat, \
+         patch.object(feature_specification, "get_feature_collection", AsyncMock()), \
+         patch.object(feature_specification, "upsert_features", upsert):
+        result = await feature_specification.update_feature_specification("user@example.com", "이대로 좋습니다", [], [], [])
+    chat.assert_not_called()
+    upsert.assert_awaited_once()
+    assert result["isNextStep"] is True
+    assert [feature["featureId"] for feature in result["features"]] == ["a"]
+    assert await store.load_all("user@example.com") is None     # MongoDB에 저장된 초안은 삭제
+
+@pytest.mark.asyncio
+async def test_update_feature_specification_requires_draft(fake_redis):
+    """초안이 없으면 기능 정의 단계의 기능 이름 목록(features:{email})을 초안으로 사용하지 않고 오류가 발생하는지 테스트"""
+    import feature_specification
+    from draft_store import FeatureDraftStore
+    fake_redis.data["user@example.com"] = json.dumps({"projectId": "p1", "startDate": "2024-03-01", "endDate": "2024-04-30", "members": []})
+    fake_redis.data["features:user@example.com"] = json.dumps(["로그인 기능", "결제 기능"], ensure_ascii=False)
+    with patch.object(feature_specification, "feature_draft_store", FeatureDraftStore(fake_redis)), \
+         patch.object(feature_specification, "ChatOpenAI") as chat:
+        with pytest.raises(ValueError):
+            await feature_specification.update_feature_specification("user@example.com", "좋아요", [], [], [])
+    chat.assert_not_called()
+
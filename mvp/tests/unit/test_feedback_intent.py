@@ -0,0 +1,55 @@
+import pytest
+from feedback_intent import (NgramNaiveBayes, classify_feedback_intent,
+                             get_intent_stats)
+
+
+@pytest.mark.parametrize("feedback, expected", [
+    ("이대로 좋습니다", 1),
+    ("더 이상 수정할 필요 없어요", 1),
+    ("다음 단계로 넘어가죠", 1),
+    ("이대로 진행해 주세요", 1),
+    ("네!", 1),
+    ("장바구니 기능 추가해주세요", 0),
+    ("결제 기능도 필요해요", 0),
+    ("좋긴 한데 신고 기능도 추가해 주세요", 0),
+])
+def test_classify_feedback_intent_rules(feedback, expected):
+    intent = classify_feedback_intent(feedback)
+    assert (intent.is_next_step, intent.source) == (expected, "rule")
+
+@pytest.mark.parametrize("feedback, expected", [
+    ("결제 수정은 없어도 되는데 장바구니를 추가해주세요", (0, "rule")),
+    ("삭제할 부분은 없는데 검색 기능 하나 더 넣어줘", (0, "rule")),
+    ("주문 완료 페이지가 빠졌네요", (None, "llm")),
+    ("확정된 주문 목록 화면이 없어요", (None, "llm")),
+    ("이대로 좋은데 검색 기능도 추가해 주세요", (None, "llm")),
+    ("문제 없습니다", (1, "rule")),
+])
+def test_classify_feedback_intent_does_not_drop_edit_requests(feedback, expected):
+    """수정할 것이 없다는 표현이나 명사로 쓰인 완료/확정이 있어도 수정 요청을 종료로 판단하지 않는지 테스트"""
+    intent = classify_feedback_intent(feedback)
+    assert (intent.is_next_step, intent.source) == expected
+
+def test_classify_feedback_intent_model_and_escalation():
+    """규칙에 없는 표현은 모델로 판단하고, 확신도가 낮으면 LLM에 맡기는지 테스트"""
+    intent = classify_feedback_intent("마음에 들어요")
+    assert (intent.is_next_step, intent.source) == (1, "model")
+    assert intent.confidence >= 0.85
+
+    intent = classify_feedback_intent("흠 잘 모르겠네요")
+    assert (intent.is_next_step, intent.source) == (None, "llm")
+    assert classify_feedback_intent("흠 잘 모르겠네요", threshold=0.5).source == "model"
+    assert classify_feedback_intent("  ").is_next_step is None
+
+def test_ngram_naive_bayes_predict():
+    model = NgramNaiveBayes({1: ("좋아요", "완료"), 0: ("추가해 주세요", "삭제해 주세요")})
+    assert model.predict("수정해 주세요")[0] == 0
+    label, confidence = model.predict("좋아요 완료")
+    assert label == 1 and 0.5 < confidence <= 1
+
+def test_get_intent_stats(monkeypatch):
+    import feedback_intent
+    monkeypatch.setattr(feedback_intent, "INTENT_STATS", {"rule": 0, "model": 0, "llm": 0})
+    classify_feedback_intent("이대로 좋습니다")
+    classify_feedback_intent("흠 잘 모르겠네요")
+    assert get_intent_stats() == {"rule": 1, "model": 0, "llm": 1, "localRatio": 0.5}
@@ -0,0 +1,25 @@
+import pytest
+from http_client import close_http_client, get_http_client, start_http_client
+
+
+@pytest.mark.asyncio
+async def test_shared_http_client_is_reused_until_closed(monkeypatch):
+    import http_client
+    monkeypatch.setattr(http_client, "HTTP_POOL_LIMIT_PER_HOST", 4)
+    session = await start_http_client()
+    try:
+        assert get_http_client() is session
+        assert session.connector.limit_per_host == 4
+        assert session.timeout.total is None and session.timeout.connect == http_client.HTTP_CONNECT_TIMEOUT
+    finally:
+        await close_http_client()
+    assert session.closed
+
+    session = get_http_client()     # 닫힌 뒤에는 새로 생성
+    assert not session.closed
+    await close_http_client()
+    await close_http_client()       # 두 번 닫아도 오류 없음
+
+def test_get_http_client_requires_running_loop():
+    with pytest.raises(RuntimeError):
+        get_http_client()
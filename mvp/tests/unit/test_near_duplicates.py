@@ -0,0 +1,67 @@
+import time
+
+import pytest
+from near_duplicates import (drop_near_duplicate_additions,
+                             drop_near_duplicates, find_near_duplicates,
+                             flag_near_duplicates, minhash_signature,
+                             normalize_feature_name, shingles)
+
+
+def test_normalize_feature_name():
+    assert normalize_feature_name("사용자 로그인 기능") == "로그인"
+    assert normalize_feature_name("로그인  기능!") == "로그인"
+    assert normalize_feature_name("회원 가입 기능") == normalize_feature_name("회원가입 기능")
+    assert normalize_feature_name("기능") == "기능"     # 일반적인 단어만 있으면 유지
+    assert normalize_feature_name("기능명세 작성") == "기능명세작성"    # 단어의 일부는 제거하지 않음
+
+def test_minhash_signature_estimates_jaccard():
+    """MinHash signature의 일치 비율이 Jaccard 유사도에 가까운지 테스트"""
+    a, b = shingles("주문내역조회및취소"), shingles("주문내역조회및환불")
+    exact = len(a & b) / len(a | b)
+    estimate = float((minhash_signature(a) == minhash_signature(b)).mean())
+    assert estimate == pytest.approx(exact, abs=0.15)
+    assert (minhash_signature(a) == minhash_signature(set(a))).all()
+
+def test_find_near_duplicates():
+    names = ["로그인 기능", "결제 기능", "사용자 로그인 기능", "소셜 로그인 기능", "회원 가입 기능", "회원가입 기능"]
+    duplicates = find_near_duplicates(names)
+    assert [(i, j) for i, j, _ in duplicates] == [(0, 2), (4, 5)]
+    assert all(similarity == 1.0 for _, _, similarity in duplicates)
+
+@pytest.mark.parametrize("first, second", [
+    ("댓글 작성", "대댓글 작성"),
+    ("일정 등록", "반복 일정 등록"),
+    ("알림 설정", "알림 설정 변경"),
+    ("로그인 기능", "소셜 로그인 기능"),
+])
+def test_find_near_duplicates_keeps_more_specific_features(first, second):
+    """한 이름이 다른 이름을 포함하면 유사도가 높아도 다른 기능으로 보는지 테스트"""
+    assert find_near_duplicates([first, second], threshold=0.5) == []
+
+def test_flag_near_duplicates_does_not_drop():
+    names = ["로그인 기능", "결제 기능", "사용자 로그인 기능"]
+    assert flag_near_duplicates(names) == [("로그인 기능", "사용자 로그인 기능", 1.0)]
+
+def test_drop_near_duplicates_keeps_first():
+    kept, dropped = drop_near_duplicates(["로그인 기능", "결제 기능", "사용자 로그인 기능", "로그인기능"])
+    assert kept == ["로그인 기능", "결제 기능"]
+    assert dropped == ["사용자 로그인 기능", "로그인기능"]
+    assert drop_near_duplicates(["로그인 기능"]) == (["로그인 기능"], [])
+
+    items = [{"name": "결제 기능"}, {"name": "결제  기능"}]
+    assert drop_near_duplicates(items, key=lambda item: item["name"]) == ([items[0]], [items[1]])
+
+def test_drop_near_duplicate_additions_keeps_protected():
+    """보호된 항목은 뒤에 나와도 유지하고, 보호되지 않은 항목만 제외하는지 테스트"""
+    names = ["사용자 로그인 기능", "결제 기능", "로그인 기능", "로그인기능", "결제  기능"]
+    protected = {"결제 기능", "로그인 기능", "결제  기능"}
+    kept, dropped = drop_near_duplicate_additions(names, is_protected=lambda name: name in protected)
+    assert kept == ["결제 기능", "로그인 기능", "결제  기능"]
+    assert dropped == ["사용자 로그인 기능", "로그인기능"]
+
+def test_find_near_duplicates_scales_linearly():
+    """서로 다른 기능이 많아도 후보 쌍만 비교하는지 테스트"""
+    names = [f"기능{i:05d} 항목{i * 7919 % 100003:06d} 관리" for i in range(2000)]
+    start = time.perf_counter()
+    assert find_near_duplicates(names, threshold=0.9) == []
+    assert time.perf_counter() - start < 10
@@ -0,0 +1,83 @@
+import pytest
+from payload_models import (validate_action_items, validate_feature_specs,
+                            validate_sprints, validate_tasks)
+
+
+def make_spec(**overrides):
+    spec = {
+        "_id": "f1", "name": "로그인 기능", "useCase": "로그인", "input": "이메일", "output": "토큰",
+        "precondition": "회원가입", "postcondition": "로그인 상태", "startDate": "2024-03-01", "endDate": "2024-03-10",
+        "difficulty": 2, "embedding": [0.1],
+    }
+    spec.update(overrides)
+    return spec
+
+def test_validate_feature_specs_repairs_documented_fallbacks():
+    """difficulty, 기간 보정과 근무일 기준 expectedDays 계산, 추가 필드 유지 테스트"""
+    specs = [
+        make_spec(),
+        make_spec(_id="f2", difficulty=9, startDate="2024-02-20", endDate="2024-05-01"),
+        make_spec(_id="f3", difficulty="3", startDate="2024-03-05", endDate="2024-03-05"),
+        make_spec(_id="f4", startDate="2024-03-09", endDate="2024-03-10"),
+    ]
+    validated = validate_feature_specs(specs, "2024-03-01", "2024-04-30")
+
+    assert validated[0]["expectedDays"] == 6     # 3/1(금) ~ 3/10(일): 주말 제외, 양 끝 포함
+    assert validated[0]["_id"] == "f1" and validated[0]["embedding"] == [0.1]
+    assert (validated[1]["difficulty"], validated[1]["startDate"], validated[1]["endDate"]) == (1, "2024-03-01", "2024-04-30")
+    assert validated[1]["expectedDays"] == 43
+    assert (validated[2]["difficulty"], validated[2]["expectedDays"]) == (1, 1)
+    assert validated[3]["expectedDays"] == 1     # 주말뿐인 기간은 최소 1일
+    assert specs[1]["difficulty"] == 9      # 입력 목록은 변경하지 않음
+
+def test_validate_feature_specs_normalizes_date_formats():
+    """0으로 채우지 않은 날짜나 datetime 형식도 날짜로 비교해 보정하고 YYYY-MM-DD로 반환하는지 테스트"""
+    specs = [
+        make_spec(startDate="2024-3-5", endDate="2024-03-08T00:00:00"),
+        make_spec(_id="f2", startDate="2024-2-9", endDate="2024-5-1"),
+        make_spec(_id="f3", startDate="2024-03-11T09:00:00", endDate="2024-4-30"),
+    ]
+    validated = validate_feature_specs(specs, "2024-3-1", "2024-04-30T00:00:00")
+
+    assert (validated[0]["startDate"], validated[0]["endDate"], validated[0]["expectedDays"]) == ("2024-03-05", "2024-03-08", 4)
+    assert (validated[1]["startDate"], validated[1]["endDate"]) == ("2024-03-01", "2024-04-30")
+    assert (validated[2]["startDate"], validated[2]["endDate"]) == ("2024-03-11", "2024-04-30")
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"useCase": None}, "useCase"),
+    ({"startDate": "2024/03/01"}, "startDate"),
+    ({"endDate": "2024-02-31"}, "endDate.*2024-02-31"),
+    ({"startDate": None}, "startDate"),
+])
+def test_validate_feature_specs_rejects_invalid(overrides, message):
+    spec = make_spec(**overrides)
+    with pytest.raises(ValueError, match=message):
+        validate_feature_specs([spec], "2024-03-01", "2024-04-30")
+
+def test_validate_tasks_coerces_and_fills_defaults():
+    tasks = validate_tasks([
+        {"title": "API 구현", "description": "로그인 API", "assignee": "홍길동", "difficulty": 7, "expected_workhours": "12.5"},
+        {"title": "화면 구현", "difficulty": 2.0, "expected_workhours": -3, "taskId": "T1"},
+    ])
+    assert tasks[0]["difficulty"] == 5 and tasks[0]["expected_workhours"] == 12.5
+    assert tasks[1] == {"title": "화면 구현", "difficulty": 2, "expected_workhours": 0, "taskId": "T1", "description": None, "assignee": None}
+    with pytest.raises(ValueError, match="expected_workhours"):
+        validate_tasks([{"title": "API 구현", "expected_workhours": "많음"}])
+
+def test_validate_sprints_requires_epics_and_tasks():
+    sprints = validate_sprints([{"title": "스프린트 1", "epics": [{"epicId": "e1", "tasks": [{"taskId": "t1", "expected_workhours": 4}]}]}])
+    assert sprints[0]["epics"][0]["tasks"][0] == {"taskId": "t1", "expected_workhours": 4.0}
+    with pytest.raises(ValueError, match="epics"):
+        validate_sprints([{"title": "스프린트 1", "epics": []}])
+    with pytest.raises(ValueError, match="tasks"):
+        validate_sprints([{"title": "스프린트 1", "epics": [{"epicId": "e1", "tasks": []}]}])
+
+def test_validate_action_items_repairs_end_date():
+    items = validate_action_items([
+        {"title": "회의록 정리", "description": "회의록 정리하기", "assigneeId": "홍길동", "endDate": "2024-03-10", "epicId": "E1"},
+        {"description": "배포하기", "endDate": "다음 주 금요일"},
+    ])
+    assert items[0]["endDate"] == "2024-03-10"
+    assert items[1] == {"description": "배포하기", "endDate": None, "title": None, "assigneeId": None, "epicId": None}
+    with pytest.raises(ValueError):
+        validate_action_items({"description": "배포하기"})
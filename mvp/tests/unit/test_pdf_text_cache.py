@@ -0,0 +1,42 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pdf_text_cache import (conditional_headers, load_cached_text,
+                            load_url_entry, save_cached_text, save_url_entry)
+
+
+@pytest.fixture(autouse=True)
+async def cache_dir(tmp_path, monkeypatch):
+    import artifact_store
+    writer = artifact_store.ArtifactWriter(artifact_store.LocalDiskArtifactStore(str(tmp_path)))
+    monkeypatch.setattr(artifact_store, "_writer", writer)
+    yield tmp_path
+    await writer.stop()
+
+@pytest.mark.asyncio
+async def test_save_and_load_cached_text(cache_dir):
+    from artifact_store import get_artifact_writer
+    save_cached_text("a" * 64, "로그인 기능")
+    assert await load_cached_text("a" * 64) == "로그인 기능"      # 저장 전에도 대기열에서 읽음
+    await get_artifact_writer().flush()
+    assert await load_cached_text("a" * 64) == "로그인 기능"
+    assert await load_cached_text("b" * 64) is None
+    assert [path.name for path in cache_dir.iterdir()] == ["pdf-text-" + "a" * 64 + ".txt"]
+
+@pytest.mark.asyncio
+async def test_url_entry_round_trip(fake_redis):
+    with patch("pdf_text_cache.redis_client", fake_redis):
+        assert await load_url_entry("http://test.com/a.pdf") is None
+        await save_url_entry("http://test.com/a.pdf", "abc", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+        entry = await load_url_entry("http://test.com/a.pdf")
+    assert entry["sha256"] == "abc"
+    assert conditional_headers(entry) == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert conditional_headers({"sha256": "abc", "etag": None, "lastModified": None}) == {}
+
+@pytest.mark.asyncio
+async def test_load_url_entry_ignores_redis_errors():
+    with patch("pdf_text_cache.redis_client") as mock_redis:
+        mock_redis.get = AsyncMock(side_effect=ConnectionError("Redis 연결 실패"))
+        assert await load_url_entry("http://test.com/a.pdf") is None
+        mock_redis.get = AsyncMock(return_value="{invalid")
+        assert await load_url_entry("http://test.com/a.pdf") is None
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from feature_specification import calculate_priority
+from priority_engine import (PENDING_PRIORITY, bucket_priorities,
+                             bucket_task_priorities, priority_scores,
+                             score_tasks)
+
+
+def test_priority_scores_bounds():
+    """최소/최대 입력에 대한 우선순위 점수 테스트"""
+    scores = priority_scores([30, 0, 15], [5, 1, 3])
+    assert scores.tolist()[:2] == [1, 300]
+    assert 1 <= scores[2] <= 300
+
+def test_priority_scores_invalid_input():
+    """범위를 벗어나거나 길이가 다른 입력 테스트"""
+    with pytest.raises(ValueError):
+        priority_scores([31], [3])
+    with pytest.raises(ValueError):
+        priority_scores([10], [0])
+    with pytest.raises(ValueError):
+        priority_scores([10, 20], [3])
+    # strict=False이면 범위 안으로 보정
+    assert priority_scores([40, -1], [9, 0], strict=False).tolist() == [1, 300]
+
+def test_calculate_priority_matches_vectorized():
+    """scalar 함수가 float 입력을 허용하고 vectorized 결과와 일치하는지 테스트"""
+    assert calculate_priority(30, 5) == 1
+    assert calculate_priority(0, 1) == 300
+    assert calculate_priority(2.5, 2) == priority_scores([2.5], [2])[0]
+    with pytest.raises(TypeError):
+        calculate_priority("30", 5)
+    with pytest.raises(TypeError):
+        calculate_priority(True, 5)
+    with pytest.raises(ValueError):
+        calculate_priority(31, 5)
+
+def test_score_tasks_converts_workhours_and_pins_pending():
+    """expected_workhours를 일 단위로 환산하고 pendingTask에 300을 부여하는지 테스트"""
+    tasks = [
+        {"_id": "a", "difficulty": 1, "expected_workhours": 0},
+        {"_id": "b", "difficulty": 5, "expected_workhours": 8 * 30},
+        {"_id": "c", "difficulty": 3, "expected_workhours": 8},
+        {"_id": "d", "difficulty": None, "expected_workhours": None, "pending": True},
+    ]
+    score_tasks(tasks, 8, pending_ids=["c"])
+    assert [task["priority"] for task in tasks] == [300, 1, PENDING_PRIORITY, PENDING_PRIORITY]
+    with pytest.raises(ValueError):
+        score_tasks(tasks, 0)
+
+def test_bucket_priorities_ties_and_pinned():
+    """동점 task는 같은 구간에, 고정된 task는 분위수 계산에서 제외되어 High에 배정되는지 테스트"""
+    priorities = [10, 10, 10, 10, 100, 200, 300, 1]
+    pinned = [False] * 7 + [True]
+    buckets = bucket_priorities(priorities, pinned)
+    assert len(set(buckets[:4].tolist())) == 1
+    assert buckets[0] == 50
+    assert buckets[-1] == 250
+    assert buckets[6] == 250
+    assert bucket_priorities([], []).tolist() == []
+    assert bucket_priorities([5, 6], [True, True]).tolist() == [250, 250]
+
+def test_bucket_task_priorities_matches_percentile_rule():
+    """task 목록 구간화 결과가 30/70 분위수 규칙과 일치하는지 테스트"""
+    values = np.arange(1, 11) * 10
+    tasks = [{"_id": str(i), "priority": int(v)} for i, v in enumerate(values)]
+    bucket_task_priorities(tasks, pending_ids=["0"])
+    p30, p70 = np.percentile(values[1:], [30, 70])
+    for task, value in zip(tasks[1:], values[1:]):
+        expected = 50 if value <= p30 else 150 if value <= p70 else 250
+        assert task["priority"] == expected
+    assert tasks[0]["priority"] == 250
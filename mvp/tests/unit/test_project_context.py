@@ -0,0 +1,85 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from project_context import (ProjectContext, fetch_project_context,
+                             get_project_context, invalidate_project_context,
+                             load_project_context)
+
+PROJECT = {
+    "projectId": "p1",
+    "startDate": "2024-03-01",
+    "endDate": "2024-04-30",
+    "members": [
+        {"name": "홍길동", "profiles": [{"projectId": "p1", "positions": ["BE", "FE"]}, {"projectId": "p2", "positions": ["AI"]}]},
+        {"name": "김철수", "profiles": [{"projectId": "p1", "positions": []}]},
+        {"name": "이영희", "profiles": [{"projectId": "p2", "positions": ["FE"]}]},
+    ],
+}
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    invalidate_project_context()
+    yield
+    invalidate_project_context()
+
+def test_from_project_blob_keeps_legacy_member_format():
+    """기존 기능 명세 프롬프트와 같은 형식의 멤버 목록을 만드는지 테스트"""
+    context = ProjectContext.from_project_blob(PROJECT)
+
+    assert (context.project_id, context.start_date, context.end_date) == ("p1", "2024-03-01", "2024-04-30")
+    assert context.member_descriptions() == ["홍길동, ['BE', 'FE']", "김철수, ['']"]
+    assert context.member_tuples() == [("홍길동", "BE, FE"), ("김철수", "")]
+    with pytest.raises(AttributeError):
+        context.extra = 1
+
+def test_get_project_context_memoizes_until_blob_changes():
+    """같은 blob이면 context를 재사용하고, blob이 바뀌면 다시 구성하는지 테스트"""
+    first = get_project_context("user@example.com", PROJECT)
+
+    assert get_project_context("user@example.com", dict(PROJECT)) is first
+    changed = dict(PROJECT, endDate="2024-05-31")
+    second = get_project_context("user@example.com", changed)
+    assert second is not first
+    assert second.end_date == "2024-05-31"
+
+    invalidate_project_context(email="user@example.com")
+    assert get_project_context("user@example.com", changed) is not second
+
+def test_get_project_context_without_project():
+    with pytest.raises(ValueError, match="not found"):
+        get_project_context("user@example.com", None)
+
+@pytest.mark.asyncio
+async def test_fetch_project_context_with_extra_keys(fake_redis):
+    """프로젝트 blob과 기능 목록을 한 번에 조회하는지 테스트 (문자열로 한 번 더 직렬화된 blob 포함)"""
+    fake_redis.data["user@example.com"] = json.dumps(json.dumps(PROJECT))
+    fake_redis.data["features:user@example.com"] = json.dumps(["로그인", "회원가입"])
+
+    context, (features, missing) = await fetch_project_context(
+        "user@example.com", ["features:user@example.com", "missing"], client=fake_redis
+    )
+
+    assert context.project_id == "p1"
+    assert features == ["로그인", "회원가입"]
+    assert missing is None
+
+@pytest.mark.asyncio
+async def test_load_project_context_queries_users_once():
+    """MongoDB의 멤버 user 문서를 $in 조회 한 번으로 가져오고 결과를 재사용하는지 테스트"""
+    project_collection = MagicMock()
+    project_collection.find_one = AsyncMock(return_value={"_id": "p1", "members": [MagicMock(id="u1"), MagicMock(id="u2")]})
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[
+        {"_id": "u1", "name": "홍길동", "profiles": [{"projectId": "p1", "positions": ["BE", "FE"]}]},
+        {"_id": "u2", "name": "김철수", "profiles": [{"projectId": "p2", "positions": ["FE"]}]},
+    ])
+    user_collection = MagicMock()
+    user_collection.find = MagicMock(return_value=cursor)
+
+    context = await load_project_context("p1", project_collection, user_collection)
+    assert context.member_tuples() == [("홍길동", "BE, FE")]
+    user_collection.find.assert_called_once_with({"_id": {"$in": ["u1", "u2"]}})
+
+    assert await load_project_context("p1", project_collection, user_collection) is context
+    assert project_collection.find_one.await_count == 1
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import prompt_registry
+import pytest
+from langchain_core.messages import AIMessage
+from project_context import ProjectContext, ProjectMember
+from prompt_registry import (PROMPTS, get_prompt, get_prompt_usage,
+                             record_prompt_usage, register_prompt,
+                             render_project_context)
+
+
+@pytest.fixture(autouse=True)
+def isolate_registry(monkeypatch):
+    monkeypatch.setattr(prompt_registry, "PROMPTS", dict(PROMPTS))
+    monkeypatch.setattr(prompt_registry, "PROMPT_USAGE", {})
+
+def test_register_prompt_keeps_variables_in_last_message():
+    """지침과 프로젝트 context는 요청과 관계없이 같고, 요청별 값은 마지막 메시지에만 들어가는지 테스트"""
+    prompt = register_prompt("test_prompt", instructions="JSON 형식: {{\"a\": int}}", request="기능 목록: {features}")
+    assert get_prompt("test_prompt") is prompt
+    first = prompt.format_messages(project_context="- 멤버", features="로그인 기능")
+    second = prompt.format_messages(project_context="- 멤버", features="결제 기능")
+    assert [message.content for message in first[:-1]] == [message.content for message in second[:-1]]
+    assert first[0].content == prompt_registry.COMMON_SYSTEM_PROMPT
+    assert '{"a": int}' in first[1].content
+    assert "로그인 기능" in first[-1].content
+
+    with pytest.raises(ValueError, match="이미 등록된"):
+        register_prompt("test_prompt", instructions="지침", request="{features}")
+    with pytest.raises(ValueError, match="변수를 포함할 수 없습니다"):
+        register_prompt("bad_prompt", instructions="기간: {startDate}", request="{features}")
+    with pytest.raises(KeyError):
+        get_prompt("unknown")
+
+def test_registered_prompts_share_common_prefix():
+    """모든 단계의 프롬프트가 같은 공통 시스템 메시지로 시작하는지 테스트"""
+    import create_sprint  # noqa: F401
+    import feature_definition  # noqa: F401
+    import feature_specification  # noqa: F401
+    assert {"feature_definition", "feature_specification", "feature_update", "task_from_feature", "sprint"} <= set(prompt_registry.PROMPTS)
+    for prompt in prompt_registry.PROMPTS.values():
+        assert prompt.messages[0].prompt.template == prompt_registry.COMMON_SYSTEM_PROMPT
+
+def test_render_project_context_normalizes_dates():
+    """Redis blob(문자열)과 MongoDB(datetime)로 구성한 context가 같은 문자열로 렌더링되는지 테스트"""
+    members = (ProjectMember("홍길동", ("BE", "FE")), ProjectMember("김철수", ("",)))
+    from_blob = ProjectContext("p1", "2024-03-01", "2024-04-30", members)
+    from_mongo = ProjectContext("p1", datetime(2024, 3, 1), datetime(2024, 4, 30, 9), members)
+    rendered = render_project_context(from_blob)
+    assert rendered == render_project_context(from_mongo)
+    assert "2024-03-01 ~ 2024-04-30" in rendered
+    assert "홍길동: BE, FE" in rendered and "김철수: 역할 없음" in rendered
+    assert "미정" in render_project_context(ProjectContext("p1", None, "", members))
+
+def test_record_prompt_usage_reports_cached_ratio():
+    response = AIMessage(content="{}", usage_metadata={
+        "input_tokens": 2000, "output_tokens": 100, "total_tokens": 2100, "input_token_details": {"cache_read": 1536},
+    })
+    assert record_prompt_usage("feature_update", response) == {"input_tokens": 2000, "cached_tokens": 1536}
+    record_prompt_usage("feature_update", AIMessage(content="{}", response_metadata={"token_usage": {"prompt_tokens": 2000}}))
+    assert record_prompt_usage("sprint", AIMessage(content="{}")) is None
+    assert get_prompt_usage() == {"feature_update": {"calls": 2, "input_tokens": 4000, "cached_tokens": 1536, "cached_ratio": 0.384}}
@@ -0,0 +1,94 @@
+import prompt_serializer
+import pytest
+from prompt_serializer import (FIELD_WHITELISTS, AliasMap, encode_records,
+                               encode_tasks_by_epic, get_token_savings,
+                               record_token_savings, restore_tasks_by_epic)
+
+
+def test_alias_map_register_and_resolve():
+    """alias 부여 및 따옴표/괄호가 섞인 alias 복원 테스트"""
+    aliases = AliasMap()
+    assert aliases.register("epic-1", "E") == "E1"
+    assert aliases.register("epic-2", "E") == "E2"
+    assert aliases.register({"title": "A"}, "T") == "T1"
+    assert aliases.resolve("E2") == "epic-2"
+    assert aliases.resolve(' "(E1)" ') == "epic-1"
+    assert aliases.resolve("E9") is None
+    assert aliases.resolve(None, default="x") == "x"
+    assert "T1" in aliases
+    assert "T2" not in aliases
+    assert len(aliases) == 3
+
+def test_encode_records_whitelist_and_escaping():
+    """whitelist 필드만 포함하고 null, 구분자, 줄바꿈을 처리하는지 테스트"""
+    records = [
+        {"_id": "abc", "title": "로그인|회원가입", "assignee": None, "expected_workhours": 16.0, "priority": 250, "extra": "x"},
+        {"_id": "def", "title": "결제\n연동", "assignee": "홍길동", "expected_workhours": 7.5, "priority": 100},
+    ]
+    text = encode_records(records, FIELD_WHITELISTS["sprint.tasks"])
+    assert text.splitlines() == [
+        "title|assignee|expected_workhours|priority",
+        "로그인/회원가입|null|16|250",
+        "결제 연동|홍길동|7.5|100",
+    ]
+
+def test_encode_records_with_alias():
+    """alias를 사용하면 id 열이 추가되고 원래 문서가 기록되는지 테스트"""
+    aliases = AliasMap()
+    records = [{"title": "A", "description": "설명"}]
+    text = encode_records(records, ("title", "description"), aliases, "E")
+    assert text.splitlines() == ["id|title|description", "E1|A|설명"]
+    assert aliases.resolve("E1") is records[0]
+
+def test_encode_and_restore_tasks_by_epic():
+    """epic 단위 인코딩 후 LLM 응답의 alias가 원래 epicId와 task로 복원되는지 테스트"""
+    tasks_by_epic = [
+        {"epicId": "epic-a", "tasks": [{"_id": "t1", "title": "A", "assignee": "홍길동", "expected_workhours": 8, "priority": 100}]},
+        {"epicId": "epic-b", "tasks": [{"_id": "t2", "title": "B", "assignee": "김철수", "expected_workhours": 4, "priority": 50}]},
+    ]
+    aliases = AliasMap()
+    text = encode_tasks_by_epic(tasks_by_epic, aliases)
+    assert "[epic E1]" in text and "[epic E2]" in text
+    assert "epic-a" not in text and "t1" not in text
+
+    response = [
+        {"epicId": "E2", "tasks": [{"taskId": "T2", "expected_workhours": 6, "priority": 70}]},
+        {"epicId": "E9", "tasks": []},
+        {"epicId": "E1", "tasks": [{"taskId": "T7"}]},
+    ]
+    restored = restore_tasks_by_epic(response, aliases, ("expected_workhours", "priority"))
+    assert restored == [
+        {"epicId": "epic-b", "tasks": [{"_id": "t2", "title": "B", "assignee": "김철수", "expected_workhours": 6, "priority": 70}]},
+        {"epicId": "epic-a", "tasks": []},
+    ]
+    # 원래 문서는 변경되지 않음
+    assert tasks_by_epic[1]["tasks"][0]["expected_workhours"] == 4
+
+def test_record_token_savings(monkeypatch):
+    """endpoint별 token 절약 통계 누적 테스트"""
+    monkeypatch.setattr(prompt_serializer, "TOKEN_SAVINGS", {})
+    monkeypatch.setattr(prompt_serializer, "TOKEN_SAVINGS_SAMPLE_EVERY", 1)
+    monkeypatch.setattr(prompt_serializer, "_encoding", False)    # 문자 수 기반 추정 사용
+    stats = record_token_savings("sprint", "x" * 400, "x" * 100)
+    assert stats == {"raw_tokens": 100, "compact_tokens": 25, "saved_tokens": 75}
+    record_token_savings("sprint", "x" * 400, "x" * 100)
+
+    report = get_token_savings()
+    assert report["sprint"]["calls"] == 2
+    assert report["sprint"]["saved_tokens"] == 150
+    assert report["sprint"]["saved_ratio"] == pytest.approx(0.75)
+
+def test_record_token_savings_samples_calls(monkeypatch):
+    """token 수는 표본 호출에서만 계산하고, 기존 방식 payload 함수도 그때만 호출하는지 테스트"""
+    monkeypatch.setattr(prompt_serializer, "TOKEN_SAVINGS", {})
+    monkeypatch.setattr(prompt_serializer, "TOKEN_SAVINGS_SAMPLE_EVERY", 3)
+    monkeypatch.setattr(prompt_serializer, "_encoding", False)
+    built = []
+    results = [record_token_savings("meeting", lambda: built.append(1) or "x" * 400, "x" * 100) for _ in range(4)]
+    assert [result is not None for result in results] == [True, False, False, True]
+    assert len(built) == 2
+
+    report = get_token_savings()["meeting"]
+    assert (report["calls"], report["sampled_calls"], report["saved_tokens"]) == (4, 2, 150)
+    assert report["saved_ratio"] == pytest.approx(0.75)
+    assert report["estimated_saved_tokens"] == 300
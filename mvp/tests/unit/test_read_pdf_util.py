@@ -2,9 +2,39 @@ import io
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from read_pdf_util import clean_text
+from read_pdf_util import clean_text, normalize_text
 
 
+def mock_pdf_response(status, content=b"", chunk_size=16, headers=None):
+    """content를 chunk_size 단위로 나누어 iter_chunked로 전달하는 aiohttp 응답 모의 객체"""
+    async def iter_chunked(n):
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size]
+    mock_response = AsyncMock()
+    mock_response.__aenter__.return_value.status = status
+    mock_response.__aenter__.return_value.content_length = None
+    mock_response.__aenter__.return_value.headers = headers or {}
+    mock_response.__aenter__.return_value.content.iter_chunked = iter_chunked
+    return mock_response
+
+@pytest.fixture(autouse=True)
+async def pdf_cache(tmp_path, fake_redis, monkeypatch):
+    """PDF 텍스트 캐시를 임시 디렉터리의 artifact store와 in-memory Redis로 대체 (테스트가 끝나면 writer를 멈춤)"""
+    import artifact_store
+    import pdf_text_cache
+    writer = artifact_store.ArtifactWriter(artifact_store.LocalDiskArtifactStore(str(tmp_path)))
+    monkeypatch.setattr(artifact_store, "_writer", writer)
+    monkeypatch.setattr(pdf_text_cache, "redis_client", fake_redis)
+    yield tmp_path
+    await writer.stop()
+
+@pytest.fixture(autouse=True)
+async def shared_http_client():
+    """테스트마다 event loop가 다르므로 공유 HTTP client를 테스트가 끝날 때 닫음"""
+    from http_client import close_http_client
+    yield
+    await close_http_client()
+
 def test_clean_text_basic():
     """기본적인 텍스트 정리 테스트"""
     input_text = "  Hello   World  !  "
@@ -35,6 +65,21 @@ def test_clean_text_multiple_newlines():
     expected = "Hello World!"
     assert clean_text(input_text) == expected
 
+def test_normalize_text_keeps_paragraphs():
+    """문단 경계는 유지하고, 줄바꿈과 연속된 공백은 공백 하나로 정리하는지 테스트"""
+    input_text = "기능 정의서\n  1. 개요  \n \n\n사용자는 ( 이메일 ) 로그인 !\n"
+    assert normalize_text(input_text) == "기능 정의서 1. 개요\n\n사용자는 (이메일) 로그인!"
+    assert clean_text(input_text) == "기능 정의서 1. 개요 사용자는 (이메일) 로그인!"
+
+def test_normalize_text_fixes_pdf_artifacts():
+    """분해된 한글 자모, zero-width 문자, 줄 끝 하이픈을 정리하는지 테스트"""
+    import unicodedata
+    decomposed = unicodedata.normalize("NFD", "기능 정의서")
+    assert len(decomposed) > len("기능 정의서")
+    assert normalize_text(decomposed) == "기능 정의서"
+    assert normalize_text("로그\u200b인 기능\ufeff") == "로그인 기능"
+    assert normalize_text("soft-\nware, e-mail, Front-\nEnd") == "software, e-mail, Front- End"
+
 @pytest.mark.asyncio
 async def test_extract_pdf_text_success():
     """PDF 텍스트 추출 성공 테스트"""
@@ -79,13 +124,10 @@ startxref
     mock_pdf_reader.pages = [mock_page1]
     
     # HTTP 응답 모의
-    mock_response = AsyncMock()
-    mock_response.__aenter__.return_value.status = 200
-    mock_response.__aenter__.return_value.content.read = AsyncMock(return_value=mock_pdf_content)
+    mock_response = mock_pdf_response(200, mock_pdf_content)
     
     with patch('aiohttp.ClientSession.get', return_value=mock_response), \
-         patch('PyPDF2.PdfReader', return_value=mock_pdf_reader), \
-         patch('aiofiles.open', MagicMock()):
+         patch('PyPDF2.PdfReader', return_value=mock_pdf_reader):
         
         from read_pdf_util import extract_pdf_text
         result = await extract_pdf_text("http://test.com/test.pdf")
@@ -99,9 +141,7 @@ startxref
 async def test_extract_pdf_text_invalid_pdf():
     """잘못된 PDF 파일 테스트"""
     # HTTP 응답 모의
-    mock_response = AsyncMock()
-    mock_response.__aenter__.return_value.status = 200
-    mock_response.__aenter__.return_value.content.read = AsyncMock(return_value=b'Invalid PDF content')
+    mock_response = mock_pdf_response(200, b'Invalid PDF content')
     
     with patch('aiohttp.ClientSession.get', return_value=mock_response):
         from read_pdf_util import extract_pdf_text
@@ -112,8 +152,7 @@ async def test_extract_pdf_text_invalid_pdf():
 async def test_extract_pdf_text_download_failure():
     """PDF 다운로드 실패 테스트"""
     # HTTP 응답 모의
-    mock_response = AsyncMock()
-    mock_response.__aenter__.return_value.status = 404
+    mock_response = mock_pdf_response(404)
     
     with patch('aiohttp.ClientSession.get', return_value=mock_response):
         from read_pdf_util import extract_pdf_text
@@ -124,9 +163,7 @@ async def test_extract_pdf_text_download_failure():
 async def test_extract_pdf_text_empty_file():
     """빈 PDF 파일 테스트"""
     # HTTP 응답 모의
-    mock_response = AsyncMock()
-    mock_response.__aenter__.return_value.status = 200
-    mock_response.__aenter__.return_value.content.read = AsyncMock(return_value=b'')
+    mock_response = mock_pdf_response(200, b'')
     
     with patch('aiohttp.ClientSession.get', return_value=mock_response):
         from read_pdf_util import extract_pdf_text
@@ -177,9 +214,7 @@ startxref
     mock_pdf_reader.pages = [mock_page]
     
     # HTTP 응답 모의
-    mock_response = AsyncMock()
-    mock_response.__aenter__.return_value.status = 200
-    mock_response.__aenter__.return_value.content.read = AsyncMock(return_value=mock_pdf_content)
+    mock_response = mock_pdf_response(200, mock_pdf_content)
     
     with patch('aiohttp.ClientSession.get', return_value=mock_response), \
          patch('PyPDF2.PdfReader', return_value=mock_pdf_reader), \
@@ -187,4 +222,150 @@ startxref
         
         from read_pdf_util import extract_pdf_text
         with pytest.raises(Exception, match="기능 정의서 다운로드 및 변환 중 오류 발생"):
-            await extract_pdf_text("http://test.com/test.pdf") 
\ No newline at end of file
+            await extract_pdf_text("http://test.com/test.pdf") 
+
+MINIMAL_PDF = b'''%PDF-1.4
+1 0 obj
+<< /Type /Catalog /Pages 2 0 R >>
+endobj
+2 0 obj
+<< /Type /Pages /Kids [3 0 R] /Count 1 >>
+endobj
+3 0 obj
+<< /Type /Page /Parent 2 0 R /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>
+endobj
+4 0 obj
+<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>
+endobj
+5 0 obj
+<< /Length 44 >>
+stream
+BT /F1 12 Tf 100 700 Td (Test Content) Tj ET
+endstream
+endobj
+xref
+0 6
+0000000000 65535 f
+0000000009 00000 n
+0000000056 00000 n
+0000000111 00000 n
+0000000212 00000 n
+0000000256 00000 n
+trailer
+<< /Size 6 /Root 1 0 R >>
+startxref
+364
+%%EOF'''
+
+@pytest.mark.asyncio
+async def test_download_pdf_stops_at_max_bytes():
+    """최대 크기를 넘으면 다운로드를 중단하는지 테스트"""
+    from aiohttp import ClientSession
+    from read_pdf_util import download_pdf
+    with patch('aiohttp.ClientSession.get', return_value=mock_pdf_response(200, MINIMAL_PDF)):
+        async with ClientSession() as session:
+            with pytest.raises(ValueError, match="최대 크기"):
+                await download_pdf("http://test.com/test.pdf", session, max_bytes=100)
+            spooled_file = await download_pdf("http://test.com/test.pdf", session)
+    with spooled_file:
+        assert spooled_file.read() == MINIMAL_PDF
+
+def test_read_spooled_pdf_reads_large_file_with_mmap():
+    """메모리 한도를 넘어 디스크에 기록된 PDF는 memory-mapped 파일로 읽는지 테스트"""
+    import mmap
+
+    from read_pdf_util import SpooledPdfFile, read_spooled_pdf
+    with SpooledPdfFile(max_size=64) as spooled_file, patch('mmap.mmap', wraps=mmap.mmap) as mmap_class:
+        spooled_file.write(MINIMAL_PDF)
+        assert spooled_file._rolled
+        assert read_spooled_pdf(spooled_file) == "Test Content"
+    mmap_class.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_extract_pdf_text_in_pool_keeps_page_order():
+    """페이지 구간별 추출 결과를 페이지 순서대로 합치는지 테스트"""
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    import read_pdf_util
+    from read_pdf_util import SpooledPdfFile, extract_pdf_text_in_pool, split_page_ranges
+    assert split_page_ranges(5, 2) == [(0, 2), (2, 4), (4, 5)]
+
+    def slow_first_range(path, start, end):
+        time.sleep(0.05 if start == 0 else 0)    # 앞 구간이 늦게 끝나도 순서 유지
+        return [f"page{i}" for i in range(start, end)]
+
+    with SpooledPdfFile(max_size=1024) as spooled_file, ThreadPoolExecutor(4) as executor, \
+         patch.object(read_pdf_util, "count_pdf_pages", return_value=5), \
+         patch.object(read_pdf_util, "extract_page_range", side_effect=slow_first_range):
+        spooled_file.write(MINIMAL_PDF)
+        text = await extract_pdf_text_in_pool(spooled_file, executor, pages_per_task=2)
+        assert text == "page0\n\npage1\n\npage2\n\npage3\n\npage4"
+        
+        with patch.object(read_pdf_util, "count_pdf_pages", side_effect=lambda path: time.sleep(0.5)):
+            with pytest.raises(TimeoutError):
+                await extract_pdf_text_in_pool(spooled_file, executor, timeout=0.05)
+
+@pytest.mark.asyncio
+async def test_extract_pdf_text_in_pool_timeout_cancels_and_recycles(monkeypatch):
+    """시간 초과 시 시작하지 않은 구간은 취소하고, 실행 중인 작업이 있으면 공유 pool을 다시 만드는지 테스트"""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    import read_pdf_util
+    from read_pdf_util import SpooledPdfFile, extract_pdf_text_in_pool
+    release = threading.Event()
+    started = []
+
+    def blocking_range(path, start, end):
+        started.append(start)
+        release.wait(1)
+        return []
+
+    executor = ThreadPoolExecutor(1)
+    monkeypatch.setattr(read_pdf_util, "_pdf_executor", executor)
+    with SpooledPdfFile(max_size=1024) as spooled_file, \
+         patch.object(read_pdf_util, "count_pdf_pages", return_value=3), \
+         patch.object(read_pdf_util, "extract_page_range", side_effect=blocking_range):
+        spooled_file.write(MINIMAL_PDF)
+        with pytest.raises(TimeoutError):
+            await extract_pdf_text_in_pool(spooled_file, pages_per_task=1, timeout=0.1)
+        release.set()
+        executor.shutdown(wait=True)
+    assert started == [0]       # 나머지 구간은 시작하지 않고 취소됨
+    assert read_pdf_util._pdf_executor is None     # 다음 요청에서 pool을 새로 생성
+
+@pytest.mark.asyncio
+async def test_extract_pdf_text_in_process_pool():
+    """worker process에서 파일 경로로 PDF를 열어 추출하는지 테스트"""
+    from read_pdf_util import (SpooledPdfFile, extract_pdf_text_in_pool,
+                               get_pdf_executor)
+    with SpooledPdfFile(max_size=1024 * 1024) as spooled_file:
+        spooled_file.write(MINIMAL_PDF)
+        assert await extract_pdf_text_in_pool(spooled_file, get_pdf_executor()) == "Test Content"
+        assert spooled_file._rolled     # worker가 열 수 있도록 디스크에 기록됨
+
+@pytest.mark.asyncio
+async def test_extract_pdf_text_uses_cache(pdf_cache):
+    """같은 URL은 conditional GET의 304 응답으로, 내용이 같은 PDF는 SHA-256으로 추출을 건너뛰는지 테스트"""
+    import read_pdf_util
+    from artifact_store import get_artifact_writer
+    from read_pdf_util import extract_pdf_text
+    url = "http://test.com/docs/definition.pdf"
+    extract = AsyncMock(return_value="Test Content")
+    with patch.object(read_pdf_util, "extract_pdf_text_in_pool", extract), \
+         patch('aiohttp.ClientSession.get', return_value=mock_pdf_response(200, MINIMAL_PDF, headers={"ETag": '"v1"'})) as get:
+        assert await extract_pdf_text(url) == "Test Content"
+        assert get.call_args.kwargs["headers"] is None
+        # 다른 URL이지만 내용이 같은 PDF (파일 이름이 같은 다른 문서와도 구분됨)
+        assert await extract_pdf_text("http://other.com/definition.pdf") == "Test Content"
+    assert extract.await_count == 1
+    await get_artifact_writer().flush()
+    assert len(list(pdf_cache.glob("*.txt"))) == 1
+    
+    with patch.object(read_pdf_util, "extract_pdf_text_in_pool", extract), \
+         patch('aiohttp.ClientSession.get', return_value=mock_pdf_response(304)) as get:
+        assert await extract_pdf_text(url) == "Test Content"
+        assert get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert extract.await_count == 1
+
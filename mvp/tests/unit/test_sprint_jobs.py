@@ -0,0 +1,190 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sprint_jobs import (JOB_COMPLETED, JOB_FAILED, JOB_QUEUED, JOB_RUNNING,
+                         InMemoryJobStore, RedisJobStore, SprintJobQueue,
+                         make_request_key)
+
+START_DATE = datetime(2024, 3, 4)
+
+
+def make_runner(calls, fail=False):
+    async def runner(project_id, pending_tasks_ids, start_date, force_regenerate=False, progress_callback=None):
+        calls.append((project_id, pending_tasks_ids, start_date))
+        await progress_callback("tasks_defined", 60)
+        if fail:
+            raise RuntimeError("LLM 호출 실패")
+        return {"sprint": {"title": "스프린트 1"}, "epics": []}
+    return runner
+
+
+def test_make_request_key_ignores_pending_order():
+    """pendingTasksIds 순서와 무관하게 같은 key를 생성하는지 테스트"""
+    key1 = make_request_key("p1", ["t2", "t1"], START_DATE)
+    key2 = make_request_key("p1", ["t1", "t2"], START_DATE)
+    key3 = make_request_key("p2", ["t1", "t2"], START_DATE)
+    assert key1 == key2
+    assert key1 != key3
+
+@pytest.mark.asyncio
+async def test_enqueue_is_idempotent():
+    """같은 요청을 여러 번 등록해도 하나의 job만 생성되는지 테스트"""
+    queue = SprintJobQueue(InMemoryJobStore(), make_runner([]))
+    job1 = await queue.enqueue("p1", None, START_DATE)
+    job2 = await queue.enqueue("p1", None, START_DATE)
+    assert job1["jobId"] == job2["jobId"]
+    assert job1["status"] == JOB_QUEUED
+
+@pytest.mark.asyncio
+async def test_run_job_stores_result_and_progress():
+    """worker가 job을 실행하고 결과를 저장하는지 테스트"""
+    calls = []
+    queue = SprintJobQueue(InMemoryJobStore(), make_runner(calls))
+    job = await queue.enqueue("p1", ["t1"], START_DATE)
+    await queue.run_job(job["jobId"])
+
+    stored = await queue.get(job["jobId"])
+    assert stored["status"] == JOB_COMPLETED
+    assert stored["progress"] == 100
+    assert stored["result"]["sprint"]["title"] == "스프린트 1"
+    assert calls == [("p1", ["t1"], START_DATE)]
+
+    # 완료된 job은 다시 등록해도 캐시된 결과를 반환
+    again = await queue.enqueue("p1", ["t1"], START_DATE)
+    assert again["jobId"] == job["jobId"]
+    assert again["status"] == JOB_COMPLETED
+
+@pytest.mark.asyncio
+async def test_failed_job_can_be_retried():
+    """실패한 job은 재등록 시 새로운 job으로 생성되는지 테스트"""
+    queue = SprintJobQueue(InMemoryJobStore(), make_runner([], fail=True))
+    job = await queue.enqueue("p1", None, START_DATE)
+    await queue.run_job(job["jobId"])
+    failed = await queue.get(job["jobId"])
+    assert failed["status"] == JOB_FAILED
+    assert "LLM 호출 실패" in failed["error"]
+
+    retried = await queue.enqueue("p1", None, START_DATE)
+    assert retried["jobId"] != job["jobId"]
+
+@pytest.mark.asyncio
+async def test_workers_process_queue_and_wait():
+    """worker coroutine이 대기열의 job을 처리하고 wait로 완료를 확인할 수 있는지 테스트"""
+    queue = SprintJobQueue(InMemoryJobStore(), make_runner([]), num_workers=1)
+    await queue.start()
+    try:
+        job = await queue.enqueue("p1", None, START_DATE)
+        for _ in range(20):
+            result = await queue.wait(job["jobId"], timeout=1, interval=0.01)
+            if result["status"] == JOB_COMPLETED:
+                break
+        assert result["status"] == JOB_COMPLETED
+    finally:
+        await queue.stop()
+
+@pytest.mark.asyncio
+async def test_force_regenerate_creates_new_job():
+    """forceRegenerate 요청은 완료된 job이 있어도 새 job을 등록하는지 테스트"""
+    queue = SprintJobQueue(InMemoryJobStore(), make_runner([]))
+    job = await queue.enqueue("p1", None, START_DATE)
+    await queue.run_job(job["jobId"])
+    forced = await queue.enqueue("p1", None, START_DATE, force_regenerate=True)
+    assert forced["jobId"] != job["jobId"]
+    assert forced["request"]["forceRegenerate"] is True
+
+@pytest.mark.asyncio
+async def test_get_unknown_job():
+    """존재하지 않는 job 조회 테스트"""
+    queue = SprintJobQueue(InMemoryJobStore(), make_runner([]))
+    assert await queue.get("unknown") is None
+    assert await queue.wait("unknown", timeout=0.1) is None
+
+@pytest.mark.asyncio
+async def test_cancelled_job_is_requeued():
+    """worker가 취소되면 실행 중인 job을 running으로 남기지 않고 대기열에 되돌리는지 테스트"""
+    started = asyncio.Event()
+
+    async def slow_runner(*args, **kwargs):
+        started.set()
+        await asyncio.sleep(10)
+
+    store = InMemoryJobStore()
+    queue = SprintJobQueue(store, slow_runner, num_workers=1)
+    await queue.start()
+    job = await queue.enqueue("p1", None, START_DATE)
+    await asyncio.wait_for(started.wait(), 1)
+    await queue.stop()
+
+    stored = await queue.get(job["jobId"])
+    assert stored["status"] == JOB_QUEUED
+    assert await store.processing() == []
+    assert await store.pop(timeout=0.1) == job["jobId"]
+    assert (await queue.enqueue("p1", None, START_DATE))["jobId"] == job["jobId"]
+
+@pytest.mark.asyncio
+async def test_stale_running_job_is_replaced():
+    """heartbeat가 끊긴 running job은 같은 요청이 들어오면 새 job으로 교체되는지 테스트"""
+    store = InMemoryJobStore()
+    queue = SprintJobQueue(store, make_runner([]))
+    job = await queue.enqueue("p1", None, START_DATE)
+    await store.update(job["jobId"], status=JOB_RUNNING, heartbeatAt=1000)
+
+    replaced = await queue.enqueue("p1", None, START_DATE)
+    assert replaced["jobId"] != job["jobId"]
+    assert (await queue.get(job["jobId"]))["status"] == JOB_FAILED
+    assert (await queue.enqueue("p1", None, START_DATE))["jobId"] == replaced["jobId"]
+
+@pytest.mark.asyncio
+async def test_redis_store_recovers_processing_jobs(fake_redis):
+    """BLMOVE로 꺼낸 job이 처리 중 목록에 남고, pod가 중단된 경우 worker 시작 시 대기열로 복구되는지 테스트"""
+    store = RedisJobStore(fake_redis)
+    calls = []
+    queue = SprintJobQueue(store, make_runner(calls), num_workers=1)
+    job = await queue.enqueue("p1", None, START_DATE)
+    done = await queue.enqueue("p2", None, START_DATE)
+    assert await store.pop(timeout=1) == job["jobId"]
+    assert await store.pop(timeout=1) == done["jobId"]
+    assert await store.processing() == [job["jobId"], done["jobId"]]
+
+    # job은 실행 중에 pod가 중단되었고, done은 완료 후 목록에서 지우기 전에 중단됨
+    await store.update(job["jobId"], status=JOB_RUNNING, heartbeatAt=1000)
+    await store.update(done["jobId"], status=JOB_COMPLETED)
+    assert await queue.recover() == 1
+    assert await store.processing() == []
+    assert (await queue.get(job["jobId"]))["status"] == JOB_QUEUED
+
+    assert await store.pop(timeout=1) == job["jobId"]
+    await queue.run_job(job["jobId"])
+    assert (await queue.get(job["jobId"]))["status"] == JOB_COMPLETED
+    assert await store.processing() == []
+    assert calls == [("p1", None, START_DATE)]
+
+@pytest.mark.asyncio
+async def test_lost_queued_job_is_replaced():
+    """대기열에서 사라진 오래된 queued job은 교체하고, 대기열에서 기다리는 job은 유지하는지 테스트"""
+    store = InMemoryJobStore()
+    queue = SprintJobQueue(store, make_runner([]))
+    waiting = await queue.enqueue("p1", None, START_DATE)
+    await store.update(waiting["jobId"], createdAt=1000)
+    assert (await queue.enqueue("p1", None, START_DATE))["jobId"] == waiting["jobId"]
+
+    # hset 후 rpush 전에 Redis failover가 일어나 대기열 항목이 사라진 경우
+    lost = await queue.enqueue("p2", None, START_DATE)
+    await store.pop(timeout=0.1)
+    assert await store.pop(timeout=0.1) == lost["jobId"]
+    await store.ack(lost["jobId"])
+    await store.update(lost["jobId"], createdAt=1000)
+    replaced = await queue.enqueue("p2", None, START_DATE)
+    assert replaced["jobId"] != lost["jobId"]
+    assert (await queue.get(lost["jobId"]))["status"] == JOB_FAILED
+
+@pytest.mark.asyncio
+async def test_redis_store_update_refreshes_ttl(fake_redis):
+    """job 정보를 갱신할 때마다 TTL을 다시 설정하여, 만료 후 늦게 도착한 갱신도 TTL이 있는 key로 남는지 테스트"""
+    store = RedisJobStore(fake_redis, ttl=60)
+    await store.update("expired", heartbeatAt=1000)
+    assert fake_redis.ttls[RedisJobStore._job_key("expired")] == 60
+    assert not await store.is_pending("expired")
+    await store.push("expired")
+    assert await store.is_pending("expired")
@@ -0,0 +1,138 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from task_cache import (load_cached_tasks, make_task_cache_key,
+                        save_cached_tasks)
+
+FEATURE = {
+    "_id": "f1",
+    "name": "로그인 기능",
+    "useCase": "사용자 로그인",
+    "input": "이메일, 비밀번호",
+    "output": "JWT 토큰",
+    "startDate": "2024-03-01",
+    "endDate": "2024-03-05",
+    "expectedDays": 4,
+    "createdAt": "2024-02-01T00:00:00",
+}
+MEMBERS = [("홍길동", "BE"), ("김철수", "FE")]
+
+
+def test_cache_key_depends_on_content_only():
+    """feature 내용이 같으면 같은 key, 내용이 바뀌면 다른 key가 생성되는지 테스트"""
+    key = make_task_cache_key("feature", None, FEATURE, 8, MEMBERS)
+    assert key.startswith("task_cache:feature:")
+
+    # 캐시와 관련 없는 필드(_id, createdAt)와 멤버 순서는 key에 영향을 주지 않음
+    same = dict(FEATURE, _id="f2", createdAt="2024-02-02T00:00:00")
+    assert make_task_cache_key("feature", None, same, 8, list(reversed(MEMBERS))) == key
+
+    changed = dict(FEATURE, useCase="소셜 로그인")
+    assert make_task_cache_key("feature", None, changed, 8, MEMBERS) != key
+    assert make_task_cache_key("feature", None, FEATURE, 6, MEMBERS) != key
+    assert make_task_cache_key("feature", None, FEATURE, 8, MEMBERS[:1]) != key
+    assert make_task_cache_key("null", None, FEATURE, 8, MEMBERS) != key
+
+def test_cache_key_depends_on_prompt_version():
+    """프롬프트가 바뀌면 이전 프롬프트로 생성한 task 목록을 재사용하지 않는지 테스트"""
+    from prompt_registry import get_prompt_version
+    version = get_prompt_version("task_from_feature")
+    key = make_task_cache_key("feature", None, FEATURE, 8, MEMBERS, prompt_version=version)
+    assert make_task_cache_key("feature", None, FEATURE, 8, MEMBERS, prompt_version=version) == key
+    assert make_task_cache_key("feature", None, FEATURE, 8, MEMBERS, prompt_version="changed") != key
+
+@pytest.mark.asyncio
+async def test_save_and_load_cached_tasks():
+    """캐시 저장 시 TTL이 설정되고, 저장된 값을 그대로 불러오는지 테스트"""
+    gpt_result = {"tasks": [{"title": "로그인 API 구현", "difficulty": 3, "expected_workhours": 16}]}
+    with patch("task_cache.redis_client") as mock_redis:
+        mock_redis.set = AsyncMock()
+        await save_cached_tasks("task_cache:feature:abc", gpt_result, ttl=60)
+        args, kwargs = mock_redis.set.call_args
+        assert args[0] == "task_cache:feature:abc"
+        assert kwargs["ex"] == 60
+
+        mock_redis.get = AsyncMock(return_value=args[1])
+        assert await load_cached_tasks("task_cache:feature:abc") == gpt_result
+
+@pytest.mark.asyncio
+async def test_load_cached_tasks_miss_and_errors():
+    """캐시가 없거나 Redis 오류가 발생하면 None을 반환하는지 테스트"""
+    with patch("task_cache.redis_client") as mock_redis:
+        mock_redis.get = AsyncMock(return_value=None)
+        assert await load_cached_tasks("missing") is None
+
+        mock_redis.get = AsyncMock(return_value="{invalid")
+        assert await load_cached_tasks("broken") is None
+
+        # task 목록이 없는 값(이전 버전에서 저장된 잘못된 응답)은 캐시가 없는 것으로 처리
+        mock_redis.get = AsyncMock(return_value=json.dumps({"task": []}))
+        assert await load_cached_tasks("malformed") is None
+
+        mock_redis.get = AsyncMock(side_effect=ConnectionError("Redis 연결 실패"))
+        assert await load_cached_tasks("error") is None
+
+@pytest.mark.asyncio
+async def test_create_task_from_feature_caches_only_validated_tasks():
+    """LLM 응답이 검증을 통과하지 못하면 캐시하지 않고, 통과하면 검증된 task 목록만 캐시하는지 테스트"""
+    from unittest.mock import MagicMock
+
+    import create_sprint
+    from langchain_core.messages import AIMessage
+    feature_collection = MagicMock()
+    feature_collection.find_one = AsyncMock(return_value=dict(FEATURE, featureId="f1"))
+    member_context = MagicMock()
+    member_context.member_tuples.return_value = MEMBERS
+    save = AsyncMock()
+    reply = AsyncMock(return_value=AIMessage(content='{"task": []}'))
+    with patch.object(create_sprint, "init_collections", AsyncMock(return_value=(feature_collection, None, None, None, None))), \
+         patch.object(create_sprint, "get_project_member_context", AsyncMock(return_value=member_context)), \
+         patch.object(create_sprint, "render_project_context", return_value="프로젝트 정보"), \
+         patch.object(create_sprint, "load_cached_tasks", AsyncMock(return_value=None)), \
+         patch.object(create_sprint, "save_cached_tasks", save), \
+         patch.object(create_sprint, "ChatOpenAI"), \
+         patch.object(create_sprint, "safe_chat_completion", reply):
+        with pytest.raises(ValueError):
+            await create_sprint.create_task_from_feature("e1", "f1", "p1", 8)
+        save.assert_not_awaited()
+
+        reply.return_value = AIMessage(content=json.dumps({"tasks": [{"title": "로그인 API 구현", "expected_workhours": 16}]}, ensure_ascii=False))
+        tasks = await create_sprint.create_task_from_feature("e1", "f1", "p1", 8)
+    assert [task["title"] for task in tasks] == ["로그인 API 구현"]
+    key, cached = save.call_args.args
+    assert key.startswith("task_cache:feature:")
+    assert cached["tasks"][0]["difficulty"] == 3     # 검증 과정에서 채운 기본값까지 저장
+
+@pytest.mark.asyncio
+async def test_create_task_from_null_uses_cached_epic_description():
+    """null로부터 생성한 task 캐시에 저장된 epic_description으로 공란인 epic description을 채우는지 테스트"""
+    from unittest.mock import MagicMock
+
+    import create_sprint
+    project_collection = MagicMock()
+    project_collection.find_one = AsyncMock(return_value={"_id": "p1", "description": "일정 관리 서비스"})
+    epic_collection = MagicMock()
+    epic = {"_id": "e1", "title": "로그인", "description": None}
+    epic_collection.find_one = AsyncMock(return_value=epic)
+    member_context = MagicMock()
+    member_context.member_tuples.return_value = MEMBERS
+    cached = {"tasks": [{"title": "로그인 API 구현", "expected_workhours": 16}], "epic_description": "이메일 로그인"}
+    llm = MagicMock()
+    with patch.object(create_sprint, "init_collections", AsyncMock(return_value=(None, project_collection, epic_collection, None, None))), \
+         patch.object(create_sprint, "get_project_member_context", AsyncMock(return_value=member_context)), \
+         patch.object(create_sprint, "load_cached_tasks", AsyncMock(return_value=cached)) as load, \
+         patch.object(create_sprint, "ChatOpenAI", return_value=llm):
+        tasks = await create_sprint.create_task_from_null("e1", "p1", 8)
+    assert [task["title"] for task in tasks] == ["로그인 API 구현"]
+    assert load.call_args.kwargs["required_fields"] == ("epic_description",)
+    assert epic["description"] == "이메일 로그인"
+    llm.ainvoke.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_load_cached_tasks_requires_fields():
+    """필요한 필드가 없는 캐시(이전 버전에서 task 목록만 저장한 값)는 캐시가 없는 것으로 처리하는지 테스트"""
+    with patch("task_cache.redis_client") as mock_redis:
+        mock_redis.get = AsyncMock(return_value=json.dumps({"tasks": []}))
+        assert await load_cached_tasks("null", required_fields=("epic_description",)) is None
+        assert await load_cached_tasks("feature") == {"tasks": []}
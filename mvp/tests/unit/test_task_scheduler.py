@@ -0,0 +1,125 @@
+from datetime import date, datetime
+
+import pytest
+from task_scheduler import (add_working_days, allocate_feature_dates,
+                            count_working_days, required_workdays,
+                            resolve_workhours_per_day, schedule_tasks,
+                            to_date)
+
+
+def test_to_date_various_inputs():
+    """문자열, datetime, date 입력 변환 테스트"""
+    assert to_date("2024-03-01") == date(2024, 3, 1)
+    assert to_date("2024-03-01T09:00:00") == date(2024, 3, 1)
+    assert to_date(datetime(2024, 3, 1, 12)) == date(2024, 3, 1)
+    assert to_date(date(2024, 3, 1)) == date(2024, 3, 1)
+    with pytest.raises(ValueError):
+        to_date("")
+    with pytest.raises(ValueError):
+        to_date("2024/03/01")
+
+def test_add_working_days_skips_weekend():
+    """주말을 건너뛰는 근무일 계산 테스트"""
+    # 2024-03-01은 금요일
+    assert add_working_days(date(2024, 3, 1), 1) == date(2024, 3, 1)
+    assert add_working_days(date(2024, 3, 1), 2) == date(2024, 3, 4)
+    assert add_working_days(date(2024, 3, 2), 1) == date(2024, 3, 4)  # 토요일 시작
+    assert add_working_days(date(2024, 3, 4), 10) == date(2024, 3, 15)
+    with pytest.raises(ValueError):
+        add_working_days(date(2024, 3, 4), 0)
+
+def test_count_working_days():
+    """근무일 수 계산 테스트"""
+    assert count_working_days(date(2024, 3, 4), date(2024, 3, 8)) == 5
+    assert count_working_days(date(2024, 3, 4), date(2024, 3, 17)) == 10
+    assert count_working_days(date(2024, 3, 9), date(2024, 3, 10)) == 0
+    assert count_working_days(date(2024, 3, 10), date(2024, 3, 4)) == 0
+
+def test_required_workdays():
+    """예상 작업 시간으로부터 필요한 근무일 수 계산 테스트"""
+    assert required_workdays(16, 8) == 2
+    assert required_workdays(17.5, 8) == 3
+    assert required_workdays(0, 8) == 1
+    assert required_workdays(None, 8) == 1
+    with pytest.raises(ValueError):
+        required_workdays(8, 0)
+
+def test_schedule_tasks_sequential_per_assignee():
+    """같은 담당자의 task는 순차적으로, 다른 담당자는 병렬로 배정되는지 테스트"""
+    tasks = [
+        {"title": "A", "assignee": "홍길동", "expected_workhours": 16},
+        {"title": "B", "assignee": "홍길동", "expected_workhours": 8},
+        {"title": "C", "assignee": "김철수", "expected_workhours": 24},
+    ]
+    scheduled, availability = schedule_tasks(tasks, "2024-03-04", "2024-03-29", 8)
+    assert scheduled[0]["startDate"] == "2024-03-04"
+    assert scheduled[0]["endDate"] == "2024-03-05"
+    assert scheduled[1]["startDate"] == "2024-03-06"
+    assert scheduled[1]["endDate"] == "2024-03-06"
+    assert scheduled[2]["startDate"] == "2024-03-04"
+    assert scheduled[2]["endDate"] == "2024-03-06"
+    assert availability["홍길동"] == date(2024, 3, 7)
+
+def test_schedule_tasks_clamps_to_window():
+    """epic 기간을 초과하는 task가 기간 안으로 조정되는지 테스트"""
+    tasks = [
+        {"title": "A", "assignee": "홍길동", "expected_workhours": 80},
+        {"title": "B", "assignee": "홍길동", "expected_workhours": 8},
+    ]
+    scheduled, _ = schedule_tasks(tasks, "2024-03-01", "2024-03-06", 8)
+    assert scheduled[0]["startDate"] == "2024-03-01"
+    assert scheduled[0]["endDate"] == "2024-03-06"
+    assert scheduled[1]["startDate"] == "2024-03-06"
+    assert scheduled[1]["endDate"] == "2024-03-06"
+
+def test_schedule_tasks_shared_availability_and_existing_dates():
+    """여러 epic에 걸친 담당자 가용일 공유와 기존 일정 유지 테스트"""
+    availability = {}
+    first = [{"title": "A", "assignee": "홍길동", "expected_workhours": 8, "startDate": "2024-03-04", "endDate": "2024-03-06"}]
+    schedule_tasks(first, "2024-03-04", "2024-03-15", 8, availability, keep_existing=True)
+    assert first[0]["startDate"] == "2024-03-04"
+    assert first[0]["endDate"] == "2024-03-06"
+
+    second = [{"title": "B", "assignee": "홍길동", "expected_workhours": 8}]
+    schedule_tasks(second, "2024-03-04", "2024-03-15", 8, availability)
+    assert second[0]["startDate"] == "2024-03-07"
+
+def test_schedule_tasks_keeps_db_dates_as_strings():
+    """DB에서 불러온 datetime 일정을 유지하면서 YYYY-MM-DD 문자열로 맞추는지 테스트"""
+    tasks = [{"title": "A", "assignee": "홍길동", "expected_workhours": 40,
+              "startDate": datetime(2024, 3, 5, 9), "endDate": datetime(2024, 3, 6, 18)}]
+    _, availability = schedule_tasks(tasks, "2024-03-04", "2024-03-15", 8, keep_existing=True)
+    assert (tasks[0]["startDate"], tasks[0]["endDate"]) == ("2024-03-05", "2024-03-06")
+    assert availability["홍길동"] == date(2024, 3, 7)
+
+@pytest.mark.parametrize("value, expected", [(6, 6), ("4", 4), (0, 8), (-2, 8), (None, 8), ("많이", 8), (48, 8)])
+def test_resolve_workhours_per_day(value, expected):
+    """LLM이 반환한 1일 작업 시간이 양수가 아니면 로컬에서 계산한 값을 사용하는지 테스트"""
+    assert resolve_workhours_per_day(value, 8) == expected
+
+def test_schedule_tasks_invalid_window():
+    """종료일이 시작일보다 이전인 경우 테스트"""
+    with pytest.raises(ValueError):
+        schedule_tasks([], "2024-03-10", "2024-03-01", 8)
+
+def test_allocate_feature_dates_fills_lanes_in_order():
+    """order 순서대로 가장 먼저 비는 lane에 기능을 배정하는지 테스트"""
+    # 2024-03-04(월) ~ 2024-03-29(금), 근무일 20일
+    features = [{"name": "A", "estimatedDays": 5}, {"name": "B", "estimatedDays": 3}, {"name": "C", "estimatedDays": "2"}]
+    allocate_feature_dates(features, "2024-03-04", "2024-03-29", lanes=2, order=[1, 0, 2])
+    assert (features[1]["startDate"], features[1]["endDate"]) == ("2024-03-04", "2024-03-06")
+    assert (features[0]["startDate"], features[0]["endDate"]) == ("2024-03-04", "2024-03-08")
+    assert (features[2]["startDate"], features[2]["endDate"]) == ("2024-03-07", "2024-03-08")
+
+    again = [{"name": "A", "estimatedDays": 5}, {"name": "B", "estimatedDays": 3}, {"name": "C", "estimatedDays": "2"}]
+    assert allocate_feature_dates(again, "2024-03-04", "2024-03-29", lanes=2, order=[1, 0, 2]) == features
+
+def test_allocate_feature_dates_compresses_to_window():
+    """작업량이 가용 근무일을 넘으면 기간을 줄여 모든 기능을 기간 안에 배정하는지 테스트"""
+    features = [{"estimatedDays": 10}, {"estimatedDays": 10}, {"estimatedDays": None}, {"estimatedDays": float("nan")}]
+    allocate_feature_dates(features, "2024-03-04", "2024-03-15", lanes=1)
+    for feature in features:
+        assert "2024-03-04" <= feature["startDate"] <= feature["endDate"] <= "2024-03-15"
+    assert features[0]["endDate"] < features[1]["startDate"]
+    with pytest.raises(ValueError):
+        allocate_feature_dates(features, "2024-03-15", "2024-03-04", lanes=1)